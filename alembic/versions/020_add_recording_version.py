@@ -0,0 +1,31 @@
+"""add_recording_version
+
+Revision ID: 020
+Revises: 019
+Create Date: 2026-10-18 12:00:00.000000
+
+Колонка version для optimistic concurrency: растет при каждом изменении записи
+(before_update listener в database/models.py), задачи сохраняют результаты короткой
+транзакцией без удержания соединения во время долгих внешних вызовов и выявляют
+конкурентные изменения сравнением версии со snapshot (api/helpers/unit_of_work.py).
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "020"
+down_revision = "019"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Добавляем recordings.version."""
+    op.add_column("recordings", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    """Удаляем recordings.version."""
+    op.drop_column("recordings", "version")
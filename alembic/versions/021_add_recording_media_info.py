@@ -0,0 +1,30 @@
+"""add_recording_media_info
+
+Revision ID: 021
+Revises: 020
+Create Date: 2026-10-18 14:00:00.000000
+
+Колонка media_info: длительность, потоки, кодеки и битрейт скачанного файла,
+полученные из MP4 боксов во время скачивания (последующие стадии не вызывают ffprobe).
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "021"
+down_revision = "020"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Добавляем recordings.media_info."""
+    op.add_column("recordings", sa.Column("media_info", postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Удаляем recordings.media_info."""
+    op.drop_column("recordings", "media_info")
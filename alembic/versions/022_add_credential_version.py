@@ -0,0 +1,29 @@
+"""add_credential_version
+
+Revision ID: 022
+Revises: 021
+Create Date: 2026-10-18 16:00:00.000000
+
+Колонка version у user_credentials: увеличивается при каждом обновлении,
+по ней процессы инвалидируют кэш расшифрованных credentials (api.auth.credential_cache).
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "022"
+down_revision = "021"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Добавляем user_credentials.version."""
+    op.add_column("user_credentials", sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+
+
+def downgrade() -> None:
+    """Удаляем user_credentials.version."""
+    op.drop_column("user_credentials", "version")
@@ -0,0 +1,68 @@
+"""add_recording_stats
+
+Revision ID: 023
+Revises: 022
+Create Date: 2026-10-18 18:00:00.000000
+
+Таблица recording_stats: материализованные счетчики записей пользователя
+(database.recording_stats). Заполняется текущими значениями из recordings и
+output_targets, дальше обновляется при flush и сверяется maintenance задачей.
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "023"
+down_revision = "022"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Создаем recording_stats и заполняем счетчики."""
+    op.create_table(
+        "recording_stats",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("metric", sa.String(length=100), nullable=False),
+        sa.Column("value", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint("user_id", "metric"),
+    )
+    op.create_index("ix_recording_stats_metric", "recording_stats", ["metric"])
+
+    op.execute(
+        """
+        INSERT INTO recording_stats (user_id, metric, value)
+        SELECT user_id, metric, value FROM (
+            SELECT user_id, 'recordings' AS metric, COUNT(*) AS value
+            FROM recordings GROUP BY user_id
+            UNION ALL
+            SELECT user_id, 'status:' || status::text, COUNT(*)
+            FROM recordings GROUP BY user_id, status
+            UNION ALL
+            SELECT user_id, 'failed', COUNT(*) FILTER (WHERE failed)
+            FROM recordings GROUP BY user_id
+            UNION ALL
+            SELECT user_id, 'storage_bytes', COALESCE(SUM(video_file_size), 0)
+            FROM recordings GROUP BY user_id
+            UNION ALL
+            SELECT user_id, 'transcribed', COUNT(*)
+            FROM recordings WHERE transcription_dir IS NOT NULL GROUP BY user_id
+            UNION ALL
+            SELECT user_id, 'transcribed_minutes', COALESCE(SUM(duration), 0)
+            FROM recordings WHERE transcription_dir IS NOT NULL GROUP BY user_id
+            UNION ALL
+            SELECT user_id, 'uploads:' || target_type::text, COUNT(*)
+            FROM output_targets WHERE status = 'UPLOADED' GROUP BY user_id, target_type
+        ) AS stats
+        WHERE user_id IS NOT NULL AND value <> 0
+        """
+    )
+
+
+def downgrade() -> None:
+    """Удаляем recording_stats."""
+    op.drop_index("ix_recording_stats_metric", table_name="recording_stats")
+    op.drop_table("recording_stats")
@@ -0,0 +1,48 @@
+"""add_recording_query_indexes
+
+Revision ID: 024
+Revises: 023
+Create Date: 2026-10-18 19:00:00.000000
+
+Составные, частичные и trigram индексы для горячих запросов к recordings:
+- list_by_user (user_id + status/input_source_id, ORDER BY start_time DESC)
+- find_by_source_key / DatabaseManager._find_existing_recording (user_id, start_time;
+  source_metadata покрыт unique_source_per_recording: source_type, source_key, recording_id)
+- bulk фильтры (user_id + template_id/failed, ORDER BY created_at; search по display_name ILIKE)
+
+Индексы создаются CONCURRENTLY (без блокировки записи в recordings).
+Проверка планов: scripts/bench_query_plans.py (make bench-query-plans).
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "024"
+down_revision = "023"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_recordings_user_start_time": "(user_id, start_time DESC)",
+    "ix_recordings_user_status_start_time": "(user_id, status, start_time DESC)",
+    "ix_recordings_user_source_start_time": "(user_id, input_source_id, start_time DESC)",
+    "ix_recordings_user_template_created_at": "(user_id, template_id, created_at)",
+    "ix_recordings_user_created_at": "(user_id, created_at)",
+    "ix_recordings_user_failed_created_at": "(user_id, created_at) WHERE failed",
+    "ix_recordings_display_name_trgm": "USING gin (display_name gin_trgm_ops)",
+}
+
+
+def upgrade() -> None:
+    """Создаем индексы recordings (и расширение pg_trgm для поиска по подстроке)."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON recordings {definition}")
+
+
+def downgrade() -> None:
+    """Удаляем индексы recordings (pg_trgm остается: может использоваться вне приложения)."""
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,98 @@
+"""add_transcript_segments
+
+Revision ID: 025
+Revises: 024
+Create Date: 2026-10-18 20:00:00.000000
+
+Таблица transcript_segments: полнотекстовый индекс транскрипций и топиков
+(database.transcript_search). search_vector вычисляется Postgres
+(to_tsvector('russian', text)), GIN индекс для GET /recordings/search.
+Заполняется из recordings.transcription_info / topic_timestamps / main_topics,
+дальше обновляется при flush RecordingModel.
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "025"
+down_revision = "024"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Создаем transcript_segments и индексируем существующие транскрипции."""
+    op.create_table(
+        "transcript_segments",
+        sa.Column("id", sa.Integer(), sa.Identity(), nullable=False),
+        sa.Column("recording_id", sa.Integer(), sa.ForeignKey("recordings.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("start_sec", sa.Float(), nullable=True),
+        sa.Column("end_sec", sa.Float(), nullable=True),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('russian'::regconfig, text)", persisted=True),
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_transcript_segments_user_id", "transcript_segments", ["user_id"])
+    op.create_index("ix_transcript_segments_recording_kind", "transcript_segments", ["recording_id", "kind"])
+
+    # Backfill до GIN индекса: построить индекс один раз быстрее, чем обновлять на каждой строке.
+    # jsonb_array_elements падает на не-массиве (null, объект) - CASE подставляет пустой массив
+    op.execute(
+        """
+        INSERT INTO transcript_segments (recording_id, user_id, kind, position, start_sec, end_sec, text)
+        SELECT recording_id, user_id, kind, position, start_sec, end_sec, btrim(text)
+        FROM (
+            SELECT r.id AS recording_id, r.user_id, 'segment' AS kind, (e.ordinality - 1)::int AS position,
+                   (e.value ->> 'start')::float AS start_sec, (e.value ->> 'end')::float AS end_sec,
+                   e.value ->> 'text' AS text
+            FROM recordings r,
+                 jsonb_array_elements(
+                     CASE WHEN jsonb_typeof(r.transcription_info -> 'segments') = 'array'
+                          THEN r.transcription_info -> 'segments' ELSE '[]'::jsonb END
+                 ) WITH ORDINALITY AS e(value, ordinality)
+            WHERE jsonb_typeof(e.value) = 'object'
+            UNION ALL
+            SELECT r.id, r.user_id, 'topic', (e.ordinality - 1)::int,
+                   (e.value ->> 'start')::float, (e.value ->> 'end')::float,
+                   e.value ->> 'topic'
+            FROM recordings r,
+                 jsonb_array_elements(
+                     CASE WHEN jsonb_typeof(r.topic_timestamps) = 'array' THEN r.topic_timestamps ELSE '[]'::jsonb END
+                 ) WITH ORDINALITY AS e(value, ordinality)
+            WHERE jsonb_typeof(e.value) = 'object'
+            UNION ALL
+            SELECT r.id, r.user_id, 'main_topic', (e.ordinality - 1)::int, NULL, NULL, e.value #>> '{}'
+            FROM recordings r,
+                 jsonb_array_elements(
+                     CASE WHEN jsonb_typeof(r.main_topics) = 'array' THEN r.main_topics ELSE '[]'::jsonb END
+                 ) WITH ORDINALITY AS e(value, ordinality)
+            WHERE jsonb_typeof(e.value) = 'string'
+        ) AS rows
+        WHERE user_id IS NOT NULL AND btrim(coalesce(text, '')) <> ''
+        """
+    )
+
+    op.create_index(
+        "ix_transcript_segments_search_vector",
+        "transcript_segments",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    """Удаляем transcript_segments."""
+    op.drop_index("ix_transcript_segments_search_vector", table_name="transcript_segments")
+    op.drop_index("ix_transcript_segments_recording_kind", table_name="transcript_segments")
+    op.drop_index("ix_transcript_segments_user_id", table_name="transcript_segments")
+    op.drop_table("transcript_segments")
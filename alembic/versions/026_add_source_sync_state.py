@@ -0,0 +1,38 @@
+"""add_source_sync_state
+
+Revision ID: 026
+Revises: 025
+Create Date: 2026-10-18 21:00:00.000000
+
+Таблица source_sync_state: водяной знак инкрементальной синхронизации источника
+(api.helpers.sync_watermark) - последний увиденный start_time и отпечатки
+recording_files встреч. Заполняется при первой синхронизации источника.
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "026"
+down_revision = "025"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Создаем source_sync_state."""
+    op.create_table(
+        "source_sync_state",
+        sa.Column("source_id", sa.Integer(), sa.ForeignKey("input_sources.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("watermark_start_time", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("meetings", postgresql.JSONB(astext_type=sa.Text()), server_default="{}", nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("source_id"),
+    )
+
+
+def downgrade() -> None:
+    """Удаляем source_sync_state."""
+    op.drop_table("source_sync_state")
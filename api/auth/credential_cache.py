@@ -0,0 +1,297 @@
+"""Кэш расшифрованных credentials в памяти процесса и координация refresh.
+
+DatabaseCredentialProvider читал строку user_credentials и расшифровывал ее
+(Fernet) в каждом get_*/update_* вызове, refresh токена еще раз загружал
+данные перед сохранением, CredentialService тоже расшифровывал на каждый
+запрос: во время bulk загрузки один credential расшифровывался сотни раз,
+а параллельные задачи одновременно обновляли один и тот же VK/Google токен
+(каждый refresh VK инвалидирует предыдущий токен).
+
+CredentialCache:
+- хранит расшифрованные данные по credential_id вместе с version строки;
+  в пределах TTL (credential_cache_ttl_seconds) отдается без обращения к БД,
+  после TTL - легкий запрос version: не изменилась - TTL продлевается без
+  расшифровки, изменилась - строка перечитывается
+- repository.update увеличивает version, поэтому запись в другом процессе
+  видна не позже чем через TTL, а своя запись сразу кладется в кэш
+- отдает копии: вызывающий код может менять данные (update_vk_credentials)
+- refresh_lock() - один refresh на credential: asyncio.Lock в процессе и
+  Redis lock между процессами; дождавшийся lock перечитывает данные и
+  использует уже обновленный токен (refresh collision) вместо второго refresh
+
+Расшифрованные данные живут только в памяти процесса и только TTL; в Redis и
+на диск они не попадают. Redis недоступен - lock пропускается (refresh не
+блокируется), как и в api.tasks.scheduling.
+
+Состояние в Redis (тот же инстанс, что и broker):
+    leap:cred:refresh:{credential_id}  - lock refresh (TTL)
+    leap:cred:cache:{YYYYmmddHH}       - hash счетчиков кэша за час (decrypts, hits, ...)
+"""
+
+import asyncio
+import copy
+import time
+import uuid
+import weakref
+from collections import Counter
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+from typing import Any
+
+import redis
+
+from api.config import get_settings
+from logger import get_logger
+
+logger = get_logger()
+
+REFRESH_LOCK_KEY = "leap:cred:refresh:{credential_id}"
+METRICS_KEY = "leap:cred:cache:{bucket}"
+
+REFRESH_LOCK_TTL_MS = 30_000  # refresh - один HTTP запрос к OAuth серверу
+REFRESH_LOCK_WAIT_SECONDS = 30.0
+REFRESH_LOCK_POLL_SECONDS = 0.2
+METRICS_FLUSH_SECONDS = 30.0
+METRICS_TTL_SECONDS = 48 * 3600
+
+METRIC_NAMES = ("decrypts", "hits", "misses", "version_checks", "refreshes", "refresh_collisions", "lock_waits")
+# Редкие события пишутся в Redis сразу, частые (hits) - не чаще METRICS_FLUSH_SECONDS
+_FLUSH_NOW = frozenset({"refreshes", "refresh_collisions", "lock_waits"})
+
+# Снять lock только своим токеном (lock мог истечь и достаться другому процессу)
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+@dataclass
+class CachedCredential:
+    """Расшифрованные данные credential и версия строки, из которой они получены"""
+
+    credential_id: int
+    version: int
+    is_active: bool
+    data: dict[str, Any]
+
+
+@dataclass
+class _Entry:
+    version: int
+    is_active: bool
+    data: dict[str, Any]
+    expires_at: float  # time.monotonic()
+
+
+@lru_cache(maxsize=1)
+def _redis() -> redis.Redis:
+    return redis.Redis.from_url(
+        get_settings().celery_broker_url,
+        decode_responses=True,
+        socket_timeout=1,
+        socket_connect_timeout=1,
+    )
+
+
+def _bucket(moment: datetime) -> str:
+    return METRICS_KEY.format(bucket=moment.strftime("%Y%m%d%H"))
+
+
+class CredentialCache:
+    """Расшифрованные credentials процесса с инвалидацией по version"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.stats: Counter[str] = Counter()  # счетчики процесса с момента старта
+        self._entries: dict[int, _Entry] = {}
+        # Lock живет, пока его кто-то ждет (каждый asyncio.run Celery задачи - новый event loop)
+        self._locks: weakref.WeakValueDictionary[int, asyncio.Lock] = weakref.WeakValueDictionary()
+        self._unflushed: Counter[str] = Counter()
+        self._last_flush = time.monotonic()
+
+    # ---------- чтение ----------
+
+    async def load(
+        self, credential_id: int, repo: Any, encryption: Any, revalidate: bool = False
+    ) -> CachedCredential | None:
+        """
+        Данные credential (None - нет строки или encrypted_data пусто).
+
+        Args:
+            credential_id: ID credential
+            repo: UserCredentialRepository текущей сессии
+            encryption: CredentialEncryption
+            revalidate: Сверить version с БД даже в пределах TTL (перед refresh)
+        """
+        entry = self._entries.get(credential_id)
+        if entry is not None:
+            now = time.monotonic()
+            if not revalidate and entry.expires_at > now:
+                self._record("hits")
+                return self._snapshot(credential_id, entry)
+
+            self._record("version_checks")
+            current = await repo.get_version(credential_id)
+            if current is None:
+                self.invalidate(credential_id)
+                return None
+            version, is_active = current
+            if version == entry.version:
+                entry.is_active = is_active
+                entry.expires_at = now + self.ttl_seconds
+                self._record("hits")
+                return self._snapshot(credential_id, entry)
+
+        credential = await repo.get_by_id(credential_id)
+        if not credential or not credential.encrypted_data:
+            self.invalidate(credential_id)
+            return None
+        data = self.decrypt(credential, encryption)
+        return CachedCredential(credential_id, credential.version, credential.is_active, data)
+
+    def decrypt(self, credential: Any, encryption: Any) -> dict[str, Any]:
+        """
+        Расшифровать строку user_credentials (UserCredentialInDB) с кэшем по (id, version).
+
+        Для вызывающих, которые уже прочитали строку (CredentialService): экономится расшифровка.
+        """
+        entry = self._entries.get(credential.id)
+        if entry is not None and entry.version == credential.version:
+            entry.is_active = credential.is_active
+            entry.expires_at = time.monotonic() + self.ttl_seconds
+            self._record("hits")
+            return copy.deepcopy(entry.data)
+
+        self._record("misses")
+        data = encryption.decrypt_credentials(credential.encrypted_data)
+        self._record("decrypts")
+        self.store(credential.id, credential.version, credential.is_active, data)
+        return copy.deepcopy(data)
+
+    # ---------- запись ----------
+
+    def store(self, credential_id: int, version: int, is_active: bool, data: dict[str, Any]) -> None:
+        """Положить данные после записи в БД (version - из обновленной строки)."""
+        if self.ttl_seconds <= 0:
+            return
+        current = self._entries.get(credential_id)
+        if current is not None and current.version > version:
+            return  # уже есть более новая версия
+        self._entries[credential_id] = _Entry(
+            version=version,
+            is_active=is_active,
+            data=copy.deepcopy(data),
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+
+    def invalidate(self, credential_id: int) -> None:
+        self._entries.pop(credential_id, None)
+
+    # ---------- refresh ----------
+
+    @asynccontextmanager
+    async def refresh_lock(self, credential_id: int) -> AsyncIterator[bool]:
+        """
+        Эксклюзивный refresh credential в процессе и между процессами.
+
+        Yields:
+            True - пришлось ждать другой refresh (данные стоит перечитать с revalidate=True)
+        """
+        lock = self._locks.get(credential_id)
+        if lock is None:
+            lock = self._locks[credential_id] = asyncio.Lock()
+        waited = lock.locked()
+
+        async with lock:
+            key = REFRESH_LOCK_KEY.format(credential_id=credential_id)
+            token = uuid.uuid4().hex
+            acquired, redis_waited = await self._acquire(key, token)
+            waited = waited or redis_waited
+            if waited:
+                self._record("lock_waits")
+            try:
+                yield waited
+            finally:
+                if acquired:
+                    try:
+                        _redis().eval(_RELEASE_SCRIPT, 1, key, token)
+                    except redis.RedisError as e:
+                        logger.warning(f"Credential cache: failed to release refresh lock {key}: {e}")
+
+    async def _acquire(self, key: str, token: str) -> tuple[bool, bool]:
+        """Redis lock: (захвачен, ждали). Не дождались или Redis недоступен - refresh без lock."""
+        deadline = time.monotonic() + REFRESH_LOCK_WAIT_SECONDS
+        waited = False
+        while True:
+            try:
+                if _redis().set(key, token, nx=True, px=REFRESH_LOCK_TTL_MS):
+                    return True, waited
+            except redis.RedisError as e:
+                logger.warning(f"Credential cache: refresh lock {key} unavailable, refreshing without it: {e}")
+                return False, waited
+            if time.monotonic() >= deadline:
+                logger.warning(f"Credential cache: timed out waiting for refresh lock {key}, refreshing anyway")
+                return False, waited
+            waited = True
+            await asyncio.sleep(REFRESH_LOCK_POLL_SECONDS)
+
+    def record_refresh(self, collision: bool = False) -> None:
+        """Учесть refresh токена (collision - использован токен, обновленный другим процессом)."""
+        self._record("refresh_collisions" if collision else "refreshes")
+
+    # ---------- метрики ----------
+
+    def _snapshot(self, credential_id: int, entry: _Entry) -> CachedCredential:
+        return CachedCredential(credential_id, entry.version, entry.is_active, copy.deepcopy(entry.data))
+
+    def _record(self, name: str) -> None:
+        self.stats[name] += 1
+        self._unflushed[name] += 1
+        now = time.monotonic()
+        if name in _FLUSH_NOW or now - self._last_flush >= METRICS_FLUSH_SECONDS:
+            self._last_flush = now
+            self._flush()
+
+    def _flush(self) -> None:
+        counts, self._unflushed = self._unflushed, Counter()
+        key = _bucket(datetime.now(UTC))
+        try:
+            pipe = _redis().pipeline()
+            for name, count in counts.items():
+                pipe.hincrby(key, name, count)
+            pipe.expire(key, METRICS_TTL_SECONDS)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Credential cache: failed to record metrics: {e}")
+
+
+_credential_cache: CredentialCache | None = None
+
+
+def get_credential_cache() -> CredentialCache:
+    """Глобальный CredentialCache процесса."""
+    global _credential_cache
+    if _credential_cache is None:
+        _credential_cache = CredentialCache(ttl_seconds=get_settings().credential_cache_ttl_seconds)
+    return _credential_cache
+
+
+def get_credential_cache_metrics() -> dict[str, Any]:
+    """Счетчики кэша всех процессов за текущий и предыдущий час."""
+    client = _redis()
+    now = datetime.now(UTC)
+    totals: Counter[str] = Counter()
+    for key in (_bucket(now - timedelta(hours=1)), _bucket(now)):
+        for name, value in client.hgetall(key).items():
+            totals[name] += int(value)
+
+    lookups = totals["hits"] + totals["misses"]
+    return {
+        **{name: totals[name] for name in METRIC_NAMES},
+        "hit_ratio": round(totals["hits"] / lookups, 3) if lookups else None,
+    }
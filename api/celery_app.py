@@ -8,7 +8,7 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 from celery import Celery  # noqa: E402
-from celery.signals import task_failure, task_postrun, task_prerun  # noqa: E402
+from celery.signals import task_failure, task_postrun, task_prerun, task_revoked  # noqa: E402
 
 from api.config import get_settings  # noqa: E402
 from config.settings import settings as app_settings  # noqa: E402
@@ -51,7 +51,15 @@ celery_app.conf.update(
 )
 
 # Настройка очередей
+# CPU-bound этапы (ffmpeg) вынесены в отдельную очередь media, чтобы длинные trim/process
+# не занимали воркеры processing (download, transcribe, topics, subtitles) и upload.
+# Точные имена задач имеют приоритет над glob шаблонами.
 celery_app.conf.task_routes = {
+    "api.tasks.processing.trim_video": {"queue": "media"},
+    "api.tasks.processing.process_recording": {"queue": "media"},
+    # Легкие периодические задачи не должны ждать за длинными processing/upload задачами (иначе истекают по expires)
+    "api.tasks.processing.poll_batch_transcriptions": {"queue": "maintenance"},
+    "api.tasks.upload.release_deferred_uploads": {"queue": "maintenance"},
     "api.tasks.processing.*": {"queue": "processing"},
     "api.tasks.upload.*": {"queue": "upload"},
     "api.tasks.automation.*": {"queue": "automation"},
@@ -60,12 +68,14 @@ celery_app.conf.task_routes = {
     "api.tasks.template.*": {"queue": "processing"},  # Template tasks use processing queue
 }
 
-# Приоритеты очередей
+# Приоритеты сообщений (Redis transport): 0 - наивысший, 9 - низший.
+# Приоритет рассчитывает api.tasks.scheduling (тип задачи, план, fair share по пользователям).
 celery_app.conf.broker_transport_options = {
-    "priority_steps": list(range(10)),  # 0-9, где 9 - наивысший приоритет
+    "priority_steps": list(range(10)),
     "sep": ":",
     "queue_order_strategy": "priority",
 }
+celery_app.conf.task_default_priority = 5  # Задачи, поставленные мимо планировщика
 
 # Celery Beat Schedule для периодических задач
 from celery.schedules import crontab  # noqa: E402
@@ -75,6 +85,24 @@ celery_app.conf.beat_schedule = {
         "task": "maintenance.cleanup_expired_tokens",
         "schedule": crontab(hour=3, minute=0),  # Каждый день в 3:00 UTC
     },
+    "gc-artifact-store": {
+        "task": "maintenance.gc_artifact_store",
+        "schedule": crontab(hour=3, minute=30),  # Каждый день в 3:30 UTC
+    },
+    "reconcile-recording-stats": {
+        "task": "maintenance.reconcile_recording_stats",
+        "schedule": crontab(hour=4, minute=0),  # Каждый день в 4:00 UTC
+    },
+    "poll-batch-transcriptions": {
+        "task": "api.tasks.processing.poll_batch_transcriptions",
+        "schedule": 30.0,  # Каждые 30 секунд (интервал для каждого job адаптивный)
+        "options": {"expires": 25},  # Не копить проходы, если воркер занят
+    },
+    "release-deferred-uploads": {
+        "task": "api.tasks.upload.release_deferred_uploads",
+        "schedule": 60.0,  # Каждую минуту: загрузки, отложенные по квоте YouTube, с подходящим временем запуска
+        "options": {"expires": 55},
+    },
 }
 
 
@@ -83,6 +111,10 @@ def task_prerun_handler(task_id, task, *args, **kwargs):
     """Обработчик перед запуском задачи."""
     print(f"[CELERY] Starting task {task.name} [{task_id}]")
 
+    from api.tasks.scheduling import record_task_started
+
+    record_task_started(task.request)
+
 
 @task_postrun.connect
 def task_postrun_handler(task_id, task, *args, **kwargs):
@@ -94,3 +126,15 @@ def task_postrun_handler(task_id, task, *args, **kwargs):
 def task_failure_handler(task_id, exception, *args, **kwargs):
     """Обработчик при ошибке задачи."""
     print(f"[CELERY] Failed task [{task_id}]: {exception}")
+
+
+@task_revoked.connect
+def task_revoked_handler(request, terminated=False, **_kwargs):
+    """Обработчик отмены задачи (revoke/expires): снять ее с backlog пользователя."""
+    # revoke(terminate=True) прерывает уже запущенную задачу: backlog уменьшен в task_prerun
+    if terminated:
+        return
+
+    from api.tasks.scheduling import record_task_discarded
+
+    record_task_discarded(request)
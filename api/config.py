@@ -58,6 +58,9 @@ class APISettings(BaseSettings):
 
     # Security
     bcrypt_rounds: int = Field(default=12, ge=4, le=31, description="Раунды bcrypt хеширования")
+    credential_cache_ttl_seconds: int = Field(
+        default=60, ge=0, le=3600, description="Время жизни расшифрованных credentials в памяти процесса (0 - без кэша)"
+    )
 
     # Rate Limiting
     rate_limit_enabled: bool = Field(default=True, description="Включить rate limiting")
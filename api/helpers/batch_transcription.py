@@ -0,0 +1,143 @@
+"""Helper для отслеживания Fireworks batch jobs.
+
+Незавершенный batch job хранится в TRANSCRIBE stage (status=IN_PROGRESS),
+его параметры - в stage_meta. Общий поллер (api.tasks.processing.poll_batch_transcriptions)
+читает такие этапы одним запросом и сам решает, какие из них пора проверить,
+поэтому ни один воркер не спит в ожидании конкретного job.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any
+
+# Статус в stage_meta, пока finalize task сохраняет результат (поллер такие jobs пропускает)
+BATCH_STATUS_FINALIZING = "finalizing"
+
+# Статусы Fireworks, после которых job уже не завершится успешно
+BATCH_TERMINAL_FAILURE_STATUSES = frozenset({"failed", "cancelled", "expired"})
+
+# Максимальный интервал между проверками одного job (секунды)
+MAX_POLL_INTERVAL = 600.0
+
+# Если finalize task не отработал за это время - job снова становится доступен поллеру
+FINALIZE_TIMEOUT = 900.0
+
+# Ограничения одного прохода поллера
+POLL_BATCH_LIMIT = 500
+POLL_MAX_CONCURRENCY = 10
+
+
+def build_batch_meta(
+    batch_id: str,
+    poll_interval: float = 10.0,
+    max_wait_time: float = 3600.0,
+    language: str | None = None,
+    prompt: str | None = None,
+    audio_path: str | None = None,
+) -> dict[str, Any]:
+    """
+    Сформировать stage_meta для только что отправленного batch job.
+
+    Args:
+        batch_id: ID batch job от Fireworks
+        poll_interval: Базовый интервал проверки (секунды)
+        max_wait_time: Максимальное время ожидания (секунды)
+        language: Язык транскрибации
+        prompt: Промпт, отправленный вместе с job
+        audio_path: Отправленный файл (для usage metadata)
+
+    Returns:
+        Словарь для stage_meta
+    """
+    now = datetime.utcnow()
+    return {
+        "provider": "fireworks",
+        "mode": "batch_api",
+        "batch_id": batch_id,
+        "batch_status": "submitted",
+        "submitted_at": now.isoformat(),
+        "next_poll_at": (now + timedelta(seconds=poll_interval)).isoformat(),
+        "poll_attempts": 0,
+        "poll_interval": poll_interval,
+        "max_wait_time": max_wait_time,
+        "language": language,
+        "prompt": prompt,
+        "audio_path": audio_path,
+    }
+
+
+def compute_poll_delay(age_seconds: float, base_interval: float = 10.0) -> float:
+    """
+    Адаптивный интервал до следующей проверки в зависимости от возраста job.
+
+    Свежие jobs проверяются часто (короткие записи завершаются за минуты),
+    долгие - все реже, чтобы не тратить запросы на многочасовые очереди.
+
+    Args:
+        age_seconds: Время с момента отправки job
+        base_interval: Базовый интервал (секунды)
+
+    Returns:
+        Задержка в секундах
+    """
+    base_interval = max(1.0, base_interval)
+
+    if age_seconds < 300:
+        delay = base_interval
+    elif age_seconds < 1800:
+        delay = base_interval * 3
+    elif age_seconds < 7200:
+        delay = base_interval * 6
+    else:
+        delay = base_interval * 12
+
+    return min(delay, MAX_POLL_INTERVAL)
+
+
+def get_batch_age(meta: dict[str, Any], now: datetime) -> float:
+    """Возраст job в секундах (0 если submitted_at отсутствует)."""
+    submitted_at = meta.get("submitted_at")
+    if not submitted_at:
+        return 0.0
+    return max(0.0, (now - datetime.fromisoformat(submitted_at)).total_seconds())
+
+
+def is_poll_due(meta: dict[str, Any], now: datetime) -> bool:
+    """Проверить, пора ли опрашивать job."""
+    if meta.get("batch_status") == BATCH_STATUS_FINALIZING:
+        # Повторно забираем job, только если finalize task потерялся
+        last_polled_at = meta.get("last_polled_at")
+        if not last_polled_at:
+            return True
+        return (now - datetime.fromisoformat(last_polled_at)).total_seconds() > FINALIZE_TIMEOUT
+
+    next_poll_at = meta.get("next_poll_at")
+    if not next_poll_at:
+        return True
+    return datetime.fromisoformat(next_poll_at) <= now
+
+
+def is_batch_expired(meta: dict[str, Any], now: datetime) -> bool:
+    """Проверить, превышено ли max_wait_time для job."""
+    return get_batch_age(meta, now) > float(meta.get("max_wait_time") or 3600.0)
+
+
+def schedule_next_poll(meta: dict[str, Any], now: datetime, status: str) -> dict[str, Any]:
+    """
+    Обновить stage_meta после очередной проверки статуса.
+
+    Args:
+        meta: Текущий stage_meta
+        now: Время проверки
+        status: Статус, полученный от Fireworks
+
+    Returns:
+        Новый stage_meta (исходный словарь не изменяется)
+    """
+    delay = compute_poll_delay(get_batch_age(meta, now), float(meta.get("poll_interval") or 10.0))
+    return {
+        **meta,
+        "batch_status": status,
+        "last_polled_at": now.isoformat(),
+        "next_poll_at": (now + timedelta(seconds=delay)).isoformat(),
+        "poll_attempts": int(meta.get("poll_attempts") or 0) + 1,
+    }
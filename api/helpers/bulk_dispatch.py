@@ -0,0 +1,162 @@
+"""Helper для bulk операций над recordings.
+
+Вместо цикла "get_by_id → проверка → .delay()" на каждую запись:
+- все записи загружаются одним запросом (RecordingAsyncRepository.get_by_ids),
+- допустимость операции проверяется в памяти (should_allow_* из status_manager),
+- изменения статусов пишутся одним UPDATE в одной транзакции,
+- задачи публикуются одним Celery group через один producer (без round trip на задачу),
+  приоритет каждой задачи рассчитывает api.tasks.scheduling (хвост большой bulk операции
+  уступает задачам других пользователей).
+
+Group сохраняется в result backend, его id (bulk_id) отслеживается как одно целое:
+GET /api/v1/tasks/bulk/{bulk_id}.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+from celery import group
+from celery.result import GroupResult
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.celery_app import celery_app
+from api.repositories.recording_repos import RecordingAsyncRepository
+from api.tasks.scheduling import refresh_tenant_profile, schedule, unschedule
+from logger import get_logger
+
+logger = get_logger()
+
+
+@dataclass
+class BulkDispatch:
+    """
+    Накопитель результатов bulk операции.
+
+    Каждый вызов add/skip/error добавляет элемент в `tasks` (формат ответа bulk endpoints),
+    задачи отправляются только в dispatch().
+    """
+
+    user_id: int
+    tasks: list[dict[str, Any]] = field(default_factory=list)
+    bulk_id: str | None = None
+    _signatures: list[tuple[dict[str, Any], Any]] = field(default_factory=list)
+    _reset_failed_ids: set[int] = field(default_factory=set)
+
+    def add(
+        self,
+        task_name: str,
+        recording_id: int,
+        *,
+        reset_failed: bool = False,
+        info: dict[str, Any] | None = None,
+        **task_kwargs: Any,
+    ) -> None:
+        """
+        Запланировать задачу для записи.
+
+        Args:
+            task_name: Имя задачи (api.tasks.signatures)
+            recording_id: ID записи
+            reset_failed: Сбросить флаг failed записи перед запуском (повторная попытка)
+            info: Дополнительные поля элемента ответа (platform, mode, ...)
+            **task_kwargs: Аргументы задачи (user_id подставляется автоматически)
+        """
+        item = {"recording_id": recording_id, **(info or {}), "status": "queued", "task_id": None}
+        signature = celery_app.signature(
+            task_name,
+            kwargs={"recording_id": recording_id, "user_id": self.user_id, **task_kwargs},
+        )
+        self.tasks.append(item)
+        self._signatures.append((item, signature))
+        if reset_failed:
+            self._reset_failed_ids.add(recording_id)
+
+    def skip(self, recording_id: int, reason: str, **info: Any) -> None:
+        """Пропустить запись (операция для нее не нужна или не разрешена)."""
+        self.tasks.append(
+            {"recording_id": recording_id, **info, "status": "skipped", "reason": reason, "task_id": None}
+        )
+
+    def error(self, recording_id: int, error: str, **info: Any) -> None:
+        """Отметить запись как ошибочную (не найдена, нет файлов и т.п.)."""
+        self.tasks.append({"recording_id": recording_id, **info, "status": "error", "error": error, "task_id": None})
+
+    def count(self, status: str) -> int:
+        return sum(1 for item in self.tasks if item["status"] == status)
+
+    async def dispatch(self, session: AsyncSession) -> str | None:
+        """
+        Записать изменения в БД одной транзакцией и опубликовать все задачи одним group.
+
+        БД коммитится до публикации: воркер не должен увидеть запись в старом состоянии.
+
+        Args:
+            session: DB session запроса
+
+        Returns:
+            bulk_id (id Celery group) или None, если ставить нечего
+        """
+        if self._reset_failed_ids:
+            recording_repo = RecordingAsyncRepository(session)
+            reset_count = await recording_repo.reset_failed_flags(list(self._reset_failed_ids), self.user_id)
+            logger.debug(f"Bulk dispatch: reset failed flag for {reset_count} recordings")
+        await session.commit()
+
+        if not self._signatures:
+            return None
+
+        await refresh_tenant_profile(session, self.user_id)
+        # Учет backlog и публикация - синхронные вызовы Redis, вне event loop
+        group_result = await run_in_threadpool(self._publish)
+        if group_result is None:
+            return None
+
+        for (item, _), result in zip(self._signatures, group_result.results, strict=True):
+            item["task_id"] = result.id
+            item["check_status_url"] = f"/api/v1/tasks/{result.id}"
+
+        self.bulk_id = group_result.id
+        logger.info(f"Bulk dispatch {self.bulk_id}: {len(self._signatures)} tasks queued for user {self.user_id}")
+        return self.bulk_id
+
+    def _publish(self) -> GroupResult | None:
+        """Проставить приоритеты, опубликовать group и сохранить его в result backend (синхронно)."""
+        self._apply_scheduling()
+
+        try:
+            group_result = group([signature for _, signature in self._signatures]).apply_async()
+        except Exception as e:
+            logger.error(f"Bulk dispatch: failed to publish {len(self._signatures)} tasks: {e}")
+            for task_name, count in Counter(signature.task for _, signature in self._signatures).items():
+                unschedule(task_name, self.user_id, count)
+            for item, _ in self._signatures:
+                item["status"] = "error"
+                item["error"] = "Failed to queue task"
+            return None
+
+        group_result.save()
+        return group_result
+
+    def _apply_scheduling(self) -> None:
+        """Проставить priority и заголовки планировщика в сигнатуры (по типу задачи)."""
+        by_task: dict[str, list[Any]] = {}
+        for _, signature in self._signatures:
+            by_task.setdefault(signature.task, []).append(signature)
+        for task_name, signatures in by_task.items():
+            for signature, options in zip(signatures, schedule(task_name, self.user_id, len(signatures)), strict=True):
+                signature.set(**options)
+
+    def build_response(self, total: int | None = None, **extra: Any) -> dict[str, Any]:
+        """Ответ в формате RecordingBulkOperationResponse."""
+        return {
+            "bulk_id": self.bulk_id,
+            "check_status_url": f"/api/v1/tasks/bulk/{self.bulk_id}" if self.bulk_id else None,
+            "total": total,
+            "queued_count": self.count("queued"),
+            "skipped_count": self.count("skipped"),
+            "error_count": self.count("error"),
+            "tasks": self.tasks,
+            **extra,
+        }
@@ -0,0 +1,171 @@
+"""Dry-run bulk process без запроса на запись.
+
+Раньше dry-run bulk операции загружал каждую запись отдельным get_by_id
+(со всеми связями), а конфиги записи резолвились запросами user_config и
+шаблона на каждую запись - dry-run фильтра на тысячи записей занимал минуты.
+
+BulkDryRun:
+- нужные колонки всех записей (без связей) читаются одним запросом
+  (DRY_RUN_COLUMNS: фильтры bulk endpoint или WHERE id IN (...)),
+- user_config и шаблоны - по одному запросу (ConfigResolver.load_layers),
+  слияние user + шаблон считается один раз на шаблон,
+- would-run, причина пропуска и шаги pipeline считаются в памяти (plan_steps -
+  та же логика, что у dry-run одной записи),
+- ответ: агрегированные счетчики (причины пропуска, шаги) и страница деталей.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.services.config_resolver import ConfigLayers, ConfigResolver
+from database.models import RecordingModel
+
+SKIP_NOT_FOUND = "Recording not found or no access"
+SKIP_BLANK = "Blank record (too short or too small)"
+
+# Колонки записи, которых достаточно для dry-run (без relationships)
+DRY_RUN_COLUMNS = (
+    RecordingModel.id,
+    RecordingModel.display_name,
+    RecordingModel.status,
+    RecordingModel.blank_record,
+    RecordingModel.template_id,
+    RecordingModel.processing_preferences,
+    RecordingModel.local_video_path,
+)
+
+
+def plan_steps(
+    local_video_path: str | None,
+    processing_config: dict[str, Any],
+    output_config: dict[str, Any],
+) -> list[dict[str, Any]]:
+    """Шаги pipeline, которые выполнит process для записи с такими конфигами."""
+    steps = []
+
+    # Download step
+    if not local_video_path:
+        steps.append({"name": "download", "enabled": True})
+    else:
+        steps.append({"name": "download", "enabled": False, "skip_reason": "Already downloaded"})
+
+    # Trim step
+    if processing_config.get("enable_processing", True):
+        steps.append({"name": "trim", "enabled": True})
+    else:
+        steps.append({"name": "trim", "enabled": False, "skip_reason": "Disabled in config"})
+
+    # Transcribe step
+    if processing_config.get("transcription", {}).get("enable_transcription", True):
+        steps.append({"name": "transcribe", "enabled": True})
+    else:
+        steps.append({"name": "transcribe", "enabled": False})
+
+    # Topics step
+    steps.append({"name": "topics", "enabled": True})
+
+    # Upload step
+    auto_upload = output_config.get("auto_upload", False)
+    if auto_upload:
+        platforms = output_config.get("platforms", [])
+        steps.append({"name": "upload", "enabled": True, "platforms": platforms})
+    else:
+        steps.append({"name": "upload", "enabled": False, "skip_reason": "auto_upload is false"})
+
+    return steps
+
+
+@dataclass
+class BulkDryRun:
+    """
+    Результат dry-run bulk process.
+
+    recordings - детали по каждой записи в порядке выборки, skip_reasons и steps -
+    агрегаты (steps: сколько записей выполнят шаг).
+    """
+
+    user_id: int
+    recordings: list[dict[str, Any]] = field(default_factory=list)
+    skip_reasons: Counter[str] = field(default_factory=Counter)
+    steps: Counter[str] = field(default_factory=Counter)
+
+    @classmethod
+    async def evaluate(
+        cls,
+        session: AsyncSession,
+        user_id: int,
+        query: Select,
+        recording_ids: list[int] | None = None,
+    ) -> "BulkDryRun":
+        """
+        Оценить записи выборки.
+
+        Args:
+            session: Сессия БД
+            user_id: ID пользователя
+            query: select(*DRY_RUN_COLUMNS) с условиями выборки (user_id уже учтен)
+            recording_ids: Явный список ID - порядок ответа и "not found" для отсутствующих
+        """
+        rows = (await session.execute(query)).all()
+        template_ids = {row.template_id for row in rows if row.template_id}
+        layers = await ConfigResolver(session).load_layers(user_id, template_ids)
+
+        dry_run = cls(user_id=user_id)
+        if recording_ids is None:
+            for row in rows:
+                dry_run._evaluate(row.id, row, layers)
+        else:
+            rows_by_id = {row.id: row for row in rows}
+            for recording_id in recording_ids:
+                dry_run._evaluate(recording_id, rows_by_id.get(recording_id), layers)
+        return dry_run
+
+    def _evaluate(self, recording_id: int, row: Any, layers: ConfigLayers) -> None:
+        if row is None:
+            self._skip(recording_id, SKIP_NOT_FOUND)
+            return
+        if row.blank_record:
+            self._skip(recording_id, SKIP_BLANK)
+            return
+
+        processing_config = layers.processing_config(row.template_id, row.processing_preferences)
+        output_config = layers.output_config(row.template_id, row.processing_preferences)
+        steps = plan_steps(row.local_video_path, processing_config, output_config)
+        enabled = [step["name"] for step in steps if step["enabled"]]
+        self.steps.update(enabled)
+        self.recordings.append(
+            {
+                "recording_id": recording_id,
+                "will_be_processed": True,
+                "display_name": row.display_name,
+                "current_status": row.status.value,
+                "template_id": row.template_id,
+                "steps": enabled,
+            }
+        )
+
+    def _skip(self, recording_id: int, reason: str) -> None:
+        self.skip_reasons[reason] += 1
+        self.recordings.append({"recording_id": recording_id, "will_be_processed": False, "skip_reason": reason})
+
+    def build_response(self, page: int = 1, per_page: int | None = None) -> dict[str, Any]:
+        """Ответ в формате BulkProcessDryRunResponse (recordings - страница page)."""
+        total = len(self.recordings)
+        skipped_count = sum(self.skip_reasons.values())
+        per_page = per_page or max(total, 1)
+        start = (page - 1) * per_page
+        return {
+            "matched_count": total - skipped_count,
+            "skipped_count": skipped_count,
+            "total": total,
+            "skip_reasons": dict(self.skip_reasons),
+            "steps": dict(self.steps),
+            "page": page,
+            "per_page": per_page,
+            "total_pages": (total + per_page - 1) // per_page if total > 0 else 1,
+            "recordings": self.recordings[start : start + per_page],
+        }
@@ -89,6 +89,9 @@ def update_aggregate_status(recording: RecordingModel) -> ProcessingStatus:
     """
     Обновить агрегированный статус recording.
 
+    Переход учитывается в счетчиках recording_stats при flush той же транзакции
+    (database.recording_stats).
+
     Args:
         recording: RecordingModel
 
@@ -0,0 +1,235 @@
+"""Инкрементальная синхронизация Zoom источников: водяной знак и отпечатки встреч.
+
+Синхронизация запрашивала у Zoom все окно from_date..to_date на каждом запуске,
+для каждой встречи делала get_recording_details и create_or_update - automation
+jobs раз за разом переписывали одни и те же дни.
+
+SyncWatermark (состояние в source_sync_state, строка на источник):
+- start_time - максимальный start_time синхронизированных встреч; плановая
+  синхронизация (incremental) запрашивает окно с водяного знака минус
+  WATERMARK_OVERLAP (Zoom отдает запись после обработки, длинные встречи
+  появляются в списке позже коротких, начавшихся после них); не поднимается
+  выше самой ранней встречи, которую не удалось сохранить, чтобы следующий
+  запуск запросил ее снова;
+- meetings - отпечаток каждой встречи (recording_files, тема, длительность и
+  rules_fingerprint активных шаблонов пользователя) по uuid: неизменившиеся встречи
+  отбрасываются до запроса деталей и до записи в БД. Отпечаток одинаков для
+  синхронизации источника и automation jobs; изменение правил шаблонов меняет
+  отпечатки всех встреч, и следующий запуск обновляет записи;
+- stats - отчет запуска: fetched / new / changed / unchanged / failed и
+  api_calls_avoided (get_recording_details, которые не понадобились).
+
+Ручная синхронизация (skip_unchanged=False) встречи не отбрасывает: записи,
+удаленные из БД, восстанавливаются, отпечатки обновляются.
+
+Отпечатки хранятся MEETING_HASH_RETENTION от водяного знака: более старые
+встречи проходят обычный путь create_or_update.
+"""
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.repositories.template_repos import RecordingTemplateRepository
+from database.template_models import RecordingTemplateModel, SourceSyncStateModel
+
+WATERMARK_OVERLAP = timedelta(days=1)
+MEETING_HASH_RETENTION = timedelta(days=90)
+
+# Поля recording_files, изменение которых означает новую/переобработанную запись
+_FILE_FIELDS = ("id", "file_type", "recording_type", "file_size", "status", "recording_start", "recording_end")
+
+
+def meeting_key(meeting: dict[str, Any]) -> str:
+    """Ключ встречи (uuid, как source_key в _sync_single_source)."""
+    return str(meeting.get("uuid") or meeting.get("id") or "")
+
+
+def parse_start_time(value: str | None) -> datetime | None:
+    """start_time Zoom (2021-03-18T05:41:36Z) -> datetime с таймзоной."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+    except ValueError:
+        return None
+
+
+def rules_fingerprint(templates: list[RecordingTemplateModel]) -> str:
+    """Отпечаток правил подбора шаблонов (порядок first-match, matching_rules активных шаблонов)."""
+    payload = [[template.id, template.matching_rules or {}] for template in templates]
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def meeting_fingerprint(meeting: dict[str, Any], rules: str | None = None) -> str:
+    """Отпечаток содержимого встречи: recording_files (без URL и токенов), тема, длительность, правила шаблонов."""
+    files = sorted(
+        json.dumps({name: recording_file.get(name) for name in _FILE_FIELDS}, sort_keys=True, default=str)
+        for recording_file in meeting.get("recording_files") or []
+    )
+    payload = {
+        "topic": meeting.get("topic"),
+        "start_time": meeting.get("start_time"),
+        "duration": meeting.get("duration"),
+        "files": files,
+        "rules": rules,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+
+@dataclass
+class SyncStats:
+    """Отчет одного запуска синхронизации источника."""
+
+    fetched: int = 0
+    new: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    api_calls_avoided: int = 0
+    window_from: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class SyncWatermark:
+    """Водяной знак и отпечатки встреч источника (source_id=None - без сохранения состояния)."""
+
+    source_id: int | None
+    rules: str | None = None
+    start_time: datetime | None = None
+    meetings: dict[str, dict[str, str]] = field(default_factory=dict)
+    stats: SyncStats = field(default_factory=SyncStats)
+    _pending: dict[str, dict[str, str]] = field(default_factory=dict, repr=False)
+    _earliest_failed: datetime | None = field(default=None, repr=False)
+
+    @classmethod
+    async def load(cls, session: AsyncSession, source_id: int, user_id: int) -> "SyncWatermark":
+        """Состояние источника и отпечаток текущих правил шаблонов пользователя."""
+        rules = rules_fingerprint(await RecordingTemplateRepository(session).find_active_by_user(user_id))
+        state = await session.get(SourceSyncStateModel, source_id)
+        if state is None:
+            return cls(source_id=source_id, rules=rules)
+        return cls(
+            source_id=source_id,
+            rules=rules,
+            start_time=state.watermark_start_time,
+            meetings=dict(state.meetings or {}),
+        )
+
+    def window_start(self, from_date: str, to_date: str | None = None) -> str:
+        """
+        Начало окна запроса к Zoom для плановой синхронизации.
+
+        Водяной знак минус WATERMARK_OVERLAP, но не раньше from_date (и не позже to_date).
+        Известные встречи, оставшиеся до начала окна, учитываются в api_calls_avoided.
+        """
+        self.stats.window_from = from_date
+        if self.start_time is None:
+            return from_date
+
+        requested = date.fromisoformat(from_date)
+        window = (self.start_time - WATERMARK_OVERLAP).date()
+        if window <= requested or (to_date and window > date.fromisoformat(to_date)):
+            return from_date
+
+        for entry in self.meetings.values():
+            start_time = parse_start_time(entry.get("start_time"))
+            if start_time and requested <= start_time.date() < window:
+                self.stats.api_calls_avoided += 1
+        self.stats.window_from = window.isoformat()
+        return self.stats.window_from
+
+    def select_changed(self, meetings: list[dict[str, Any]], skip_unchanged: bool = True) -> list[dict[str, Any]]:
+        """
+        Встречи, которые нужно синхронизировать (новые или изменившиеся).
+
+        Неизменившиеся учитываются как unchanged и не требуют ни деталей из Zoom, ни записи в БД.
+        skip_unchanged=False - все встречи (ручная синхронизация). Возвращенные встречи ждут
+        mark_synced/mark_failed.
+        """
+        changed = []
+        for meeting in meetings:
+            self.stats.fetched += 1
+            key = meeting_key(meeting)
+            fingerprint = meeting_fingerprint(meeting, self.rules)
+            known = self.meetings.get(key)
+            if skip_unchanged and key and known and known.get("hash") == fingerprint:
+                self.stats.unchanged += 1
+                self.stats.api_calls_avoided += 1  # get_recording_details
+                self._advance(known.get("start_time"))
+                continue
+            self._pending[key] = {"hash": fingerprint, "start_time": meeting.get("start_time") or ""}
+            changed.append(meeting)
+        return changed
+
+    def mark_synced(self, key: str, is_new: bool | None = None) -> None:
+        """Встреча сохранена: запомнить отпечаток (is_new=None - по наличию отпечатка до запуска)."""
+        entry = self._pending.pop(key, None)
+        if entry is None:
+            return  # Не из select_changed или уже отмечена (части одной встречи)
+        if is_new is None:
+            is_new = key not in self.meetings
+        if is_new:
+            self.stats.new += 1
+        else:
+            self.stats.changed += 1
+        self.meetings[key] = entry
+        self._advance(entry["start_time"])
+
+    def mark_failed(self, key: str) -> None:
+        """Встреча не сохранена: отпечаток не запоминается, водяной знак не уходит дальше нее."""
+        entry = self._pending.pop(key, None)
+        if entry is None:
+            return
+        self.stats.failed += 1
+        start_time = parse_start_time(entry["start_time"])
+        if start_time and (self._earliest_failed is None or start_time < self._earliest_failed):
+            self._earliest_failed = start_time
+
+    @property
+    def watermark(self) -> datetime | None:
+        """Сохраняемый водяной знак: start_time, но не позже самой ранней несохраненной встречи."""
+        if self.start_time is None or self._earliest_failed is None:
+            return self.start_time
+        return min(self.start_time, self._earliest_failed)
+
+    def _advance(self, start_time_value: str | None) -> None:
+        start_time = parse_start_time(start_time_value)
+        if start_time and (self.start_time is None or start_time > self.start_time):
+            self.start_time = start_time
+
+    async def save(self, session: AsyncSession) -> None:
+        """Сохранить водяной знак и отпечатки (в транзакции синхронизации, коммитит вызывающий)."""
+        if self.source_id is None:
+            return
+        watermark = self.watermark
+        cutoff = watermark - MEETING_HASH_RETENTION if watermark else None
+        meetings = {
+            key: entry
+            for key, entry in self.meetings.items()
+            if cutoff is None or (parse_start_time(entry.get("start_time")) or cutoff) >= cutoff
+        }
+        stmt = insert(SourceSyncStateModel).values(
+            source_id=self.source_id,
+            watermark_start_time=watermark,
+            meetings=meetings,
+            updated_at=datetime.utcnow(),
+        )
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[SourceSyncStateModel.source_id],
+                set_={
+                    "watermark_start_time": stmt.excluded.watermark_start_time,
+                    "meetings": stmt.excluded.meetings,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            )
+        )
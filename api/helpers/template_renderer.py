@@ -1,14 +1,231 @@
-"""Template renderer for upload metadata"""
+"""Template renderer for upload metadata
 
+Шаблоны ({var} и {var:format}) компилируются один раз в список операций
+(литералы и подстановки с готовым strftime форматом) и кэшируются по строке
+шаблона: в bulk загрузках и dry-run одни и те же title/description шаблоны
+рендерятся для тысяч записей.
+
+Контекст записи (prepare_recording_context) ленивый: темы форматируются
+только если шаблон на них ссылается, вычисленные значения запоминаются
+для записи (id + version) и переиспользуются всеми шаблонами и платформами.
+"""
+
+import json
 import re
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
+from typing import Any
+
+from logger import get_logger
+
+logger = get_logger()
+
+# {variable} или {variable:format}
+PLACEHOLDER_PATTERN = re.compile(r"\{([^{}:]+)(?::([^{}]+))?\}")
+
+TEMPLATE_CACHE_SIZE = 1024
+CONTEXT_CACHE_SIZE = 512
+
+# Токены пользовательского формата даты (длинные раньше: YYYY до YY)
+_DATE_TOKENS = re.compile(r"YYYY|YY|MM|DD|hh|mm|ss")
+_DATE_TOKEN_CODES = {"YYYY": "%Y", "YY": "%y", "MM": "%m", "DD": "%d", "hh": "%H", "mm": "%M", "ss": "%S"}
+_NAMED_DATE_FORMATS = {"date": "%Y-%m-%d", "time": "%H:%M", "datetime": "%Y-%m-%d %H:%M"}
+
+RECORDING_CONTEXT_KEYS = ("display_name", "duration", "record_time", "publish_time", "themes", "topics")
+
+
+@lru_cache(maxsize=256)
+def _strftime_format(format_spec: str) -> str:
+    """Формат даты шаблона (date/time/datetime или DD-MM-YY hh:mm) -> формат strftime."""
+    named = _NAMED_DATE_FORMATS.get(format_spec)
+    if named is not None:
+        return named
+
+    parts = []
+    position = 0
+    for match in _DATE_TOKENS.finditer(format_spec):
+        parts.append(format_spec[position : match.start()].replace("%", "%%"))
+        parts.append(_DATE_TOKEN_CODES[match.group(0)])
+        position = match.end()
+    parts.append(format_spec[position:].replace("%", "%%"))
+    return "".join(parts)
+
+
+@dataclass(frozen=True)
+class Placeholder:
+    """Подстановка {name} / {name:format} в скомпилированном шаблоне"""
+
+    name: str
+    source: str  # исходный текст - остается как есть, если переменной нет в контексте
+    date_format: str | None  # strftime формат для datetime значений
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """Шаблон, разобранный в последовательность литералов и подстановок"""
+
+    ops: tuple[str | Placeholder, ...]
+    variables: frozenset[str]
+
+    def render(self, context: Mapping[str, Any]) -> str:
+        parts = []
+        for op in self.ops:
+            if op.__class__ is str:
+                parts.append(op)
+                continue
+            if op.name not in context:
+                parts.append(op.source)  # Keep original if variable not found
+                continue
+            value = context[op.name]
+            if op.date_format is not None and isinstance(value, datetime):
+                parts.append(value.strftime(op.date_format))
+            else:
+                parts.append(TemplateRenderer._format_value(value))
+        return "".join(parts)
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(template: str) -> CompiledTemplate:
+    """Разобрать шаблон (результат кэшируется по строке шаблона)."""
+    ops: list[str | Placeholder] = []
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(template):
+        if match.start() > position:
+            ops.append(template[position : match.start()])
+        name, format_spec = match.group(1), match.group(2)
+        ops.append(Placeholder(name, match.group(0), _strftime_format(format_spec) if format_spec else None))
+        position = match.end()
+    if position < len(template):
+        ops.append(template[position:])
+    return CompiledTemplate(ops=tuple(ops), variables=frozenset(op.name for op in ops if isinstance(op, Placeholder)))
+
+
+class _RecordingFields:
+    """Значения контекста записи, вычисляемые при первом обращении"""
+
+    def __init__(self, recording: Any, topics_display: dict | None):
+        self.recording = recording
+        self.topics_display = topics_display
+        self.values: dict[str, Any] = {}
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        try:
+            return self.values[key]
+        except KeyError:
+            pass
+        with self.lock:
+            if key not in self.values:
+                self.values[key] = getattr(self, f"_compute_{key}")()
+            return self.values[key]
+
+    def _compute_display_name(self) -> str:
+        return self.recording.display_name or "Recording"
+
+    def _compute_duration(self) -> Any:
+        return getattr(self.recording, "duration", "")
+
+    def _compute_record_time(self) -> Any:
+        return self.recording.start_time  # datetime object for formatting
+
+    def _compute_themes(self) -> str:
+        # Themes - short topics for title (from main_topics): first 3 topics joined with comma
+        main_topics = getattr(self.recording, "main_topics", None)
+        return ", ".join(main_topics[:3]) if main_topics else ""
+
+    def _compute_topics(self) -> str:
+        # Topics - detailed formatted topics for description (from topic_timestamps)
+        recording = self.recording
+        topics_display = self.topics_display
+        topics_for_description = []
+        if getattr(recording, "topic_timestamps", None):
+            # Use topic_timestamps directly (list of dicts with topic, start, end)
+            topics_for_description = recording.topic_timestamps
+            logger.info(f"[TemplateRenderer] Using {len(topics_for_description)} detailed topics from topic_timestamps")
+        elif getattr(recording, "main_topics", None):
+            # Fallback to main_topics if topic_timestamps not available (list of strings)
+            topics_for_description = recording.main_topics
+            logger.info(f"[TemplateRenderer] Using main_topics fallback: {len(topics_for_description)} topics")
+
+        if not topics_for_description:
+            return ""
+        if topics_display:
+            logger.info(
+                f"[TemplateRenderer] Formatting {len(topics_for_description)} topics with config: {topics_display}"
+            )
+            topics = TemplateRenderer._format_topics_list(topics_for_description, topics_display)
+            logger.info(f"[TemplateRenderer] Formatted topics length: {len(topics)} chars")
+            return topics
+        # Default formatting (handle both dict and string topics)
+        if isinstance(topics_for_description[0], dict):
+            return "\n".join(f"{i + 1}. {item['topic']}" for i, item in enumerate(topics_for_description[:10]))
+        return "\n".join(f"{i + 1}. {topic}" for i, topic in enumerate(topics_for_description[:10]))
+
+
+class RecordingContext(Mapping):
+    """
+    Контекст шаблона для записи (Mapping): значения вычисляются лениво.
+
+    publish_time - момент создания контекста, остальные значения общие для
+    всех контекстов той же записи (id, version) и topics_display.
+    """
+
+    def __init__(self, fields: _RecordingFields, publish_time: datetime):
+        self._fields = fields
+        self._publish_time = publish_time
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "publish_time":
+            return self._publish_time
+        if key not in RECORDING_CONTEXT_KEYS:
+            raise KeyError(key)
+        return self._fields.get(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in RECORDING_CONTEXT_KEYS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(RECORDING_CONTEXT_KEYS)
+
+    def __len__(self) -> int:
+        return len(RECORDING_CONTEXT_KEYS)
+
+
+_context_cache: OrderedDict[tuple, _RecordingFields] = OrderedDict()
+_context_cache_lock = threading.Lock()
+
+
+def _recording_fields(recording: Any, topics_display: dict | None) -> _RecordingFields:
+    """Поля контекста записи из кэша (запись без id/version - без кэша)."""
+    recording_id = getattr(recording, "id", None)
+    version = getattr(recording, "version", None)
+    if recording_id is None or version is None:
+        return _RecordingFields(recording, topics_display)
+
+    display_key = json.dumps(topics_display, sort_keys=True, default=str) if topics_display else None
+    key = (type(recording).__name__, recording_id, version, display_key)
+    with _context_cache_lock:
+        fields = _context_cache.get(key)
+        if fields is not None:
+            _context_cache.move_to_end(key)
+            # Ленивые значения дочитываются из переданного объекта (прежний может быть отсоединен от сессии)
+            fields.recording = recording
+            return fields
+        fields = _context_cache[key] = _RecordingFields(recording, topics_display)
+        while len(_context_cache) > CONTEXT_CACHE_SIZE:
+            _context_cache.popitem(last=False)
+    return fields
 
 
 class TemplateRenderer:
     """Renders templates with variable substitution and flexible topics formatting."""
 
     @staticmethod
-    def render(template: str, context: dict, topics_display: dict | None = None) -> str:
+    def render(template: str, context: Mapping[str, Any], topics_display: dict | None = None) -> str:
         """
         Render template with context variables.
 
@@ -24,7 +241,7 @@ class TemplateRenderer:
 
         Args:
             template: Template string with {variable} or {variable:format} placeholders
-            context: Dict with variable values
+            context: Dict (or RecordingContext) with variable values
             topics_display: Optional topics display configuration
 
         Returns:
@@ -36,25 +253,29 @@ class TemplateRenderer:
         """
         if not template:
             return ""
+        return compile_template(template).render(context)
 
-        # Pattern to match {variable} or {variable:format}
-        pattern = r"\{([^{}:]+)(?::([^{}]+))?\}"
-
-        def replace_placeholder(match):
-            var_name = match.group(1)
-            format_spec = match.group(2)  # Can be None
-
-            if var_name not in context:
-                return match.group(0)  # Keep original if variable not found
-
-            value = context[var_name]
+    @staticmethod
+    def render_many(template: str, recordings: Iterable[Any], topics_display: dict | None = None) -> list[str]:
+        """
+        Render one template for many recordings (template is compiled once).
 
-            # Apply format if specified
-            if format_spec and isinstance(value, datetime):
-                return TemplateRenderer._format_datetime(value, format_spec)
-            return TemplateRenderer._format_value(value)
+        Args:
+            template: Template string
+            recordings: Recording model instances (or objects with the same attributes)
+            topics_display: Optional topics display configuration for {topics}
 
-        return re.sub(pattern, replace_placeholder, template)
+        Returns:
+            Rendered strings in the order of recordings
+        """
+        if not template:
+            return ["" for _ in recordings]
+        compiled = compile_template(template)
+        publish_time = datetime.utcnow()
+        return [
+            compiled.render(RecordingContext(_recording_fields(recording, topics_display), publish_time))
+            for recording in recordings
+        ]
 
     @staticmethod
     def _format_value(value) -> str:
@@ -105,30 +326,7 @@ class TemplateRenderer:
             >>> _format_datetime(datetime(2026, 1, 11, 14, 30), "date")
             "2026-01-11"
         """
-        if format_spec == "date":
-            return dt.strftime("%Y-%m-%d")
-        if format_spec == "time":
-            return dt.strftime("%H:%M")
-        if format_spec == "datetime":
-            return dt.strftime("%Y-%m-%d %H:%M")
-
-        # Custom format with replacements
-        result = format_spec
-        replacements = {
-            "YYYY": dt.strftime("%Y"),
-            "YY": dt.strftime("%y"),
-            "MM": dt.strftime("%m"),
-            "DD": dt.strftime("%d"),
-            "hh": dt.strftime("%H"),
-            "mm": dt.strftime("%M"),
-            "ss": dt.strftime("%S"),
-        }
-
-        # Replace in order (longest first to avoid conflicts)
-        for key in sorted(replacements.keys(), key=len, reverse=True):
-            result = result.replace(key, replacements[key])
-
-        return result
+        return dt.strftime(_strftime_format(format_spec))
 
     @staticmethod
     def _format_topics_list(topics: list[str] | list[dict], config: dict) -> str:
@@ -239,9 +437,9 @@ class TemplateRenderer:
         return f"{hours:02d}:{minutes:02d}:{secs:02d}"
 
     @staticmethod
-    def prepare_recording_context(recording, topics_display: dict | None = None) -> dict:
+    def prepare_recording_context(recording, topics_display: dict | None = None) -> RecordingContext:
         """
-        Prepare context dict from recording object.
+        Prepare context from recording object.
 
         Available variables:
         - {display_name} - recording name
@@ -256,61 +454,14 @@ class TemplateRenderer:
         - {publish_time:date}
         - {record_time:time}
 
+        Values are computed on first use and shared by all contexts of the same
+        recording version, so {topics} is formatted only if a template references it.
+
         Args:
             recording: Recording model instance
             topics_display: Optional topics display configuration for {topics}
 
         Returns:
-            Dict with template variables
+            Read-only mapping with template variables
         """
-        from logger import get_logger
-
-        logger = get_logger()
-
-        # Basic info
-        context = {
-            "display_name": recording.display_name or "Recording",
-            "duration": getattr(recording, "duration", ""),
-            "record_time": recording.start_time,  # datetime object for formatting
-            "publish_time": datetime.utcnow(),  # current time
-        }
-
-        # Themes - short topics for title (from main_topics)
-        if hasattr(recording, "main_topics") and recording.main_topics:
-            # Join first 3 topics with comma for title
-            context["themes"] = ", ".join(recording.main_topics[:3])
-        else:
-            context["themes"] = ""
-
-        # Topics - detailed formatted topics for description (from topic_timestamps)
-        topics_for_description = []
-        if hasattr(recording, "topic_timestamps") and recording.topic_timestamps:
-            # Use topic_timestamps directly (list of dicts with topic, start, end)
-            topics_for_description = recording.topic_timestamps
-            logger.info(f"[TemplateRenderer] Using {len(topics_for_description)} detailed topics from topic_timestamps")
-        elif hasattr(recording, "main_topics") and recording.main_topics:
-            # Fallback to main_topics if topic_timestamps not available (list of strings)
-            topics_for_description = recording.main_topics
-            logger.info(f"[TemplateRenderer] Using main_topics fallback: {len(topics_for_description)} topics")
-
-        # Format topics for description
-        if topics_for_description:
-            if topics_display:
-                logger.info(
-                    f"[TemplateRenderer] Formatting {len(topics_for_description)} topics with config: {topics_display}"
-                )
-                context["topics"] = TemplateRenderer._format_topics_list(topics_for_description, topics_display)
-                logger.info(f"[TemplateRenderer] Formatted topics length: {len(context['topics'])} chars")
-            # Default formatting (handle both dict and string topics)
-            elif topics_for_description and isinstance(topics_for_description[0], dict):
-                context["topics"] = "\n".join(
-                    f"{i + 1}. {item['topic']}" for i, item in enumerate(topics_for_description[:10])
-                )
-            else:
-                context["topics"] = "\n".join(
-                    f"{i + 1}. {topic}" for i, topic in enumerate(topics_for_description[:10])
-                )
-        else:
-            context["topics"] = ""
-
-        return context
+        return RecordingContext(_recording_fields(recording, topics_display), datetime.utcnow())
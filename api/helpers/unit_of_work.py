@@ -0,0 +1,198 @@
+"""Unit of work для Celery задач обработки записей.
+
+Задачи (download, process, transcribe, upload) выполняют минуты внешних вызовов:
+скачивание, ffmpeg, Fireworks API, загрузку на платформы. Если держать одну
+сессию на всю задачу, соединение из пула и открытая транзакция (с блокировками
+строк) удерживаются все это время, и при десятках воркеров пул Postgres кончается.
+
+Задача делится на три фазы:
+
+1. load() - короткая транзакция: запись + resolved config в plain snapshot
+2. долгий I/O без сессии
+3. save() - короткая транзакция: свежая запись, применение результата, commit
+
+Конкурентные изменения записи выявляются по RecordingModel.version (растет при
+каждом изменении записи): save() блокирует строку (SELECT ... FOR UPDATE) на время
+короткой транзакции и сравнивает версию со snapshot: по умолчанию результат задачи,
+перезаписывающий статус, отклоняется (StaleRecordingError), reapply применяет его к
+свежей записи. Остальные writer'ы версию не проверяют.
+
+Время удержания соединений задачей пишется в метрику
+(api.tasks.scheduling.record_db_hold, GET /api/v1/admin/stats/queues).
+"""
+
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Literal
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.helpers.config_resolution_helper import resolve_full_config
+from api.repositories.recording_repos import RecordingAsyncRepository
+from database.config import DatabaseConfig
+from database.manager import DatabaseManager
+from database.models import RecordingModel
+from logger import get_logger
+
+logger = get_logger()
+
+
+class StaleRecordingError(Exception):
+    """Запись изменена конкурентно, результат задачи не сохранен."""
+
+    def __init__(self, recording_id: int, expected_version: int, actual_version: int | None = None):
+        self.recording_id = recording_id
+        self.expected_version = expected_version
+        self.actual_version = actual_version
+        super().__init__(
+            f"Recording {recording_id} was modified concurrently "
+            f"(expected version {expected_version}, got {actual_version})"
+        )
+
+
+@dataclass(frozen=True)
+class RecordingSnapshot:
+    """Plain копия записи для фазы I/O (без сессии и lazy loading)."""
+
+    id: int
+    user_id: int
+    version: int
+    display_name: str
+    start_time: datetime
+    duration: int | None
+    status: Any
+    template_id: int | None
+    local_video_path: str | None
+    processed_video_path: str | None
+    processed_audio_path: str | None
+    transcription_dir: str | None
+    source_key: str | None
+    source_meta: dict[str, Any] = field(default_factory=dict)
+    media_info: dict[str, Any] | None = None
+
+    @classmethod
+    def from_model(cls, recording: RecordingModel) -> "RecordingSnapshot":
+        source = recording.source
+        return cls(
+            id=recording.id,
+            user_id=recording.user_id,
+            version=recording.version,
+            display_name=recording.display_name,
+            start_time=recording.start_time,
+            duration=recording.duration,
+            status=recording.status,
+            template_id=recording.template_id,
+            local_video_path=recording.local_video_path,
+            processed_video_path=recording.processed_video_path,
+            processed_audio_path=recording.processed_audio_path,
+            transcription_dir=recording.transcription_dir,
+            source_key=source.source_key if source else None,
+            source_meta=dict(source.meta or {}) if source else {},
+            media_info=recording.media_info,
+        )
+
+
+class TaskUnitOfWork:
+    """
+    Короткие транзакции задачи над одной записью.
+
+    Usage:
+        async with TaskUnitOfWork("transcribe", recording_id, user_id) as uow:
+            config, snapshot = await uow.load(manual_override)
+            result = await long_external_call(snapshot)
+            await uow.save(snapshot, lambda recording: apply(recording, result))
+    """
+
+    def __init__(self, task_name: str, recording_id: int, user_id: int):
+        self.task_name = task_name
+        self.recording_id = recording_id
+        self.user_id = user_id
+        self.db_manager = DatabaseManager(DatabaseConfig.from_env())
+        self.hold_seconds = 0.0
+        self.transactions = 0
+        self.conflicts = 0
+
+    async def __aenter__(self) -> "TaskUnitOfWork":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """Сессия одной короткой транзакции; время удержания учитывается в метрике."""
+        started = time.perf_counter()
+        try:
+            async with self.db_manager.async_session() as session:
+                yield session
+        finally:
+            self.hold_seconds += time.perf_counter() - started
+            self.transactions += 1
+
+    async def load(self, manual_override: dict | None = None) -> tuple[dict[str, Any], RecordingSnapshot]:
+        """Прочитать resolved config и snapshot записи (транзакция закрывается сразу)."""
+        async with self.session() as session:
+            full_config, recording = await resolve_full_config(
+                session, self.recording_id, self.user_id, manual_override
+            )
+            return full_config, RecordingSnapshot.from_model(recording)
+
+    async def save(
+        self,
+        snapshot: RecordingSnapshot,
+        apply: Callable[[RecordingModel], Any],
+        on_conflict: Literal["reapply", "fail"] = "fail",
+    ) -> Any:
+        """
+        Применить результат к свежей записи и закоммитить.
+
+        Args:
+            snapshot: Snapshot из load() (ожидаемая версия)
+            apply: Изменения записи (вызывается под блокировкой строки)
+            on_conflict: fail - StaleRecordingError (apply перезаписывает статус или stage state),
+                reapply - применить к актуальной версии записи (результат задачи не зависит
+                от полей, которые меняют другие)
+
+        Returns:
+            Результат apply
+        """
+        async with self.session() as session:
+            # Блокировка строки до commit: версия не изменится между проверкой и записью
+            await session.execute(
+                select(RecordingModel.id)
+                .where(RecordingModel.id == self.recording_id, RecordingModel.user_id == self.user_id)
+                .with_for_update()
+            )
+            recording_repo = RecordingAsyncRepository(session)
+            recording = await recording_repo.get_by_id(self.recording_id, self.user_id)
+            if not recording:
+                raise ValueError(f"Recording {self.recording_id} not found")
+
+            if recording.version != snapshot.version:
+                self.conflicts += 1
+                logger.warning(
+                    f"[{self.task_name}] Recording {self.recording_id} changed during task "
+                    f"(version {snapshot.version} -> {recording.version}), on_conflict={on_conflict}"
+                )
+                if on_conflict == "fail":
+                    raise StaleRecordingError(self.recording_id, snapshot.version, recording.version)
+
+            result = apply(recording)
+            await recording_repo.update(recording)
+            await session.commit()
+            return result
+
+    async def close(self) -> None:
+        """Закрыть engine задачи и записать метрику удержания соединений."""
+        from api.tasks.scheduling import record_db_hold
+
+        await self.db_manager.close()
+        record_db_hold(self.task_name, self.hold_seconds)
+        logger.debug(
+            f"[{self.task_name}] Recording {self.recording_id}: DB held {self.hold_seconds:.3f}s "
+            f"in {self.transactions} transactions, conflicts={self.conflicts}"
+        )
@@ -1,17 +1,8 @@
-import subprocess
-
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError, ResponseValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.exc import SQLAlchemyError
 
-# Явно импортируем Celery задачи чтобы они зарегистрировались в API сервере
-import api.tasks.automation
-import api.tasks.maintenance
-import api.tasks.processing
-import api.tasks.sync_tasks
-import api.tasks.template
-import api.tasks.upload  # noqa: F401
 from api.config import get_settings
 from api.middleware.error_handler import (
     api_exception_handler,
@@ -39,12 +30,10 @@ from api.routers import (
     users,
 )
 from api.shared.exceptions import APIException
-from database.config import DatabaseConfig
-from database.manager import DatabaseManager
-from logger import get_logger
 
+# Celery задачи здесь не импортируются: роутеры ставят их в очередь по имени
+# (api.tasks.signatures), а БД и миграции готовит `python -m api.preflight`
 settings = get_settings()
-logger = get_logger()
 
 app = FastAPI(
     title=settings.api_title,
@@ -55,39 +44,6 @@ app = FastAPI(
     openapi_url=settings.openapi_url,
 )
 
-
-@app.on_event("startup")
-async def startup_event():
-    """Инициализация БД при запуске приложения."""
-    try:
-        logger.info("🚀 Инициализация базы данных...")
-
-        # Создаем БД, если её нет
-        db_config = DatabaseConfig.from_env()
-        db_manager = DatabaseManager(db_config)
-        await db_manager.create_database_if_not_exists()
-        await db_manager.close()
-
-        logger.info("✅ База данных создана (если не существовала)")
-
-        # Применяем миграции Alembic
-        logger.info("🔄 Применение миграций Alembic...")
-        result = subprocess.run(
-            ["alembic", "upgrade", "head"],
-            check=False,
-            capture_output=True,
-            text=True,
-        )
-
-        if result.returncode == 0:
-            logger.info("✅ Миграции применены успешно")
-        else:
-            logger.error(f"❌ Ошибка применения миграций: {result.stderr}")
-
-    except Exception as e:
-        logger.error(f"❌ Ошибка инициализации БД: {e}")
-
-
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -2,34 +2,55 @@
 
 import time
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from logger import get_logger
 
 logger = get_logger()
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware для логирования HTTP запросов."""
+class LoggingMiddleware:
+    """
+    Middleware для логирования HTTP запросов (чистый ASGI).
 
-    async def dispatch(self, request: Request, call_next):
-        """Обработка запроса с логированием."""
-        start_time = time.time()
+    Сообщения ответа (включая тело и streaming chunks) передаются дальше без копирования,
+    из http.response.start читается только статус. Сообщения форматируются лениво
+    (loguru "{}"), поэтому при выключенном DEBUG строки не собираются.
+    """
 
-        # Логируем запрос
-        logger.debug(
-            f"Request: {request.method} {request.url.path} | "
-            f"client={request.client.host if request.client else 'unknown'}"
-        )
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        # Выполняем запрос
-        response = await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Обработка запроса с логированием."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        # Логируем ответ
-        process_time = time.time() - start_time
-        logger.debug(
-            f"Response: {request.method} {request.url.path} | status={response.status_code} | time={process_time:.3f}s"
-        )
+        start_time = time.perf_counter()
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
+        status_code = 500
 
-        return response
+        # Логируем запрос
+        logger.debug("Request: {} {} | client={}", method, path, client[0] if client else "unknown")
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            # Выполняем запрос
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Логируем ответ
+            logger.debug(
+                "Response: {} {} | status={} | time={:.3f}s",
+                method,
+                path,
+                status_code,
+                time.perf_counter() - start_time,
+            )
@@ -1,14 +1,15 @@
 """User quota check middleware"""
 
-from fastapi import HTTPException, Request, status
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from api.services.quota_service import QuotaService
 
 
-class QuotaMiddleware(BaseHTTPMiddleware):
-    """Middleware для проверки квот перед выполнением операций."""
+class QuotaMiddleware:
+    """Middleware для проверки квот перед выполнением операций (чистый ASGI)."""
 
     # Эндпоинты, требующие проверки квот
     QUOTA_ENDPOINTS = {
@@ -17,23 +18,32 @@ class QuotaMiddleware(BaseHTTPMiddleware):
         "/api/v1/recordings/{id}/process": "tasks",
     }
 
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Проверка квот перед обработкой запроса."""
         # Проверяем только POST запросы к защищенным эндпоинтам
-        if request.method == "POST":
-            path = request.url.path
-
+        if scope["type"] == "http" and scope["method"] == "POST":
             # Проверяем нужна ли проверка квот для этого эндпоинта
-            quota_type = self._get_quota_type(path)
+            quota_type = self._get_quota_type(scope["path"])
             if quota_type:
                 # Получаем пользователя из request.state (устанавливается в auth middleware)
+                request = Request(scope)
                 user = getattr(request.state, "user", None)
 
                 if user:
                     # Проверяем квоты
-                    await self._check_quotas(request, user.id, quota_type)
+                    error_msg = await self._check_quotas(request, user.id, quota_type)
+                    if error_msg:
+                        response = JSONResponse(
+                            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                            content={"detail": error_msg},
+                        )
+                        await response(scope, receive, send)
+                        return
 
-        return await call_next(request)
+        await self.app(scope, receive, send)
 
     def _get_quota_type(self, path: str) -> str | None:
         """Определить тип квоты для пути."""
@@ -43,8 +53,13 @@ class QuotaMiddleware(BaseHTTPMiddleware):
                 return quota_type
         return None
 
-    async def _check_quotas(self, request: Request, user_id: int, quota_type: str):
-        """Проверить квоты пользователя."""
+    async def _check_quotas(self, request: Request, user_id: int, quota_type: str) -> str | None:
+        """
+        Проверить квоты пользователя.
+
+        Returns:
+            Сообщение об ошибке или None, если квота не превышена
+        """
         # Получаем сессию БД
         session: AsyncSession = request.state.db_session
         quota_service = QuotaService(session)
@@ -53,17 +68,14 @@ class QuotaMiddleware(BaseHTTPMiddleware):
         if quota_type == "recordings":
             allowed, error_msg = await quota_service.check_recordings_quota(user_id)
             if not allowed:
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail=error_msg or "Monthly recordings quota exceeded",
-                )
+                return error_msg or "Monthly recordings quota exceeded"
 
         elif quota_type == "tasks":
             allowed, error_msg = await quota_service.check_concurrent_tasks_quota(user_id)
             if not allowed:
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=error_msg or "Concurrent tasks quota exceeded"
-                )
+                return error_msg or "Concurrent tasks quota exceeded"
+
+        return None
 
 
 async def check_storage_quota(session: AsyncSession, user_id: int, required_bytes: int) -> bool:
@@ -1,12 +1,12 @@
 """Rate limiting middleware"""
 
 import time
-from collections import defaultdict
-from collections.abc import Callable
+from collections import defaultdict, deque
 
-from fastapi import Request, Response, status
+from fastapi import status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from api.config import get_settings
 from logger import get_logger
@@ -15,68 +15,72 @@ logger = get_logger()
 settings = get_settings()
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+class RateLimitMiddleware:
     """
-    Middleware для ограничения частоты запросов (rate limiting).
+    Middleware для ограничения частоты запросов (rate limiting, чистый ASGI).
 
     Использует простой in-memory счетчик запросов по IP адресу.
     Для production лучше использовать Redis.
     """
 
-    def __init__(self, app, per_minute: int = 60, per_hour: int = 1000):
+    def __init__(self, app: ASGIApp, per_minute: int = 60, per_hour: int = 1000):
         """
         Инициализация middleware.
 
         Args:
-            app: FastAPI приложение
+            app: ASGI приложение
             per_minute: Максимум запросов в минуту
             per_hour: Максимум запросов в час
         """
-        super().__init__(app)
+        self.app = app
         self.per_minute = per_minute
         self.per_hour = per_hour
-        self.minute_requests = defaultdict(list)
-        self.hour_requests = defaultdict(list)
+        # Временные метки запросов в порядке поступления - старые удаляются с начала
+        self.minute_requests: defaultdict[str, deque[float]] = defaultdict(deque)
+        self.hour_requests: defaultdict[str, deque[float]] = defaultdict(deque)
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Обработка запроса с проверкой rate limit.
 
         Args:
-            request: HTTP запрос
-            call_next: Следующий обработчик
-
-        Returns:
-            HTTP ответ
+            scope: ASGI scope
+            receive: ASGI receive
+            send: ASGI send
         """
-        if not settings.rate_limit_enabled:
-            return await call_next(request)
+        if scope["type"] != "http" or not settings.rate_limit_enabled:
+            await self.app(scope, receive, send)
+            return
 
         # Пропускаем health check
-        if request.url.path == "/health":
-            return await call_next(request)
+        if scope["path"] == "/health":
+            await self.app(scope, receive, send)
+            return
 
         # Получаем IP клиента
-        client_ip = request.client.host if request.client else "unknown"
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
 
         # Текущее время
         current_time = time.time()
-        minute_ago = current_time - 60
-        hour_ago = current_time - 3600
+        minute_requests = self.minute_requests[client_ip]
+        hour_requests = self.hour_requests[client_ip]
 
         # Очистка старых записей
-        self.minute_requests[client_ip] = [t for t in self.minute_requests[client_ip] if t > minute_ago]
-        self.hour_requests[client_ip] = [t for t in self.hour_requests[client_ip] if t > hour_ago]
+        while minute_requests and minute_requests[0] <= current_time - 60:
+            minute_requests.popleft()
+        while hour_requests and hour_requests[0] <= current_time - 3600:
+            hour_requests.popleft()
 
         # Проверка лимитов
-        minute_count = len(self.minute_requests[client_ip])
-        hour_count = len(self.hour_requests[client_ip])
+        minute_count = len(minute_requests)
+        hour_count = len(hour_requests)
 
         if minute_count >= self.per_minute:
             logger.warning(
                 f"Rate limit exceeded (per minute): ip={client_ip} | requests={minute_count}/{self.per_minute}"
             )
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 content={
                     "detail": f"Rate limit exceeded: {self.per_minute} requests per minute",
@@ -84,10 +88,12 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 },
                 headers={"Retry-After": "60"},
             )
+            await response(scope, receive, send)
+            return
 
         if hour_count >= self.per_hour:
             logger.warning(f"Rate limit exceeded (per hour): ip={client_ip} | requests={hour_count}/{self.per_hour}")
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 content={
                     "detail": f"Rate limit exceeded: {self.per_hour} requests per hour",
@@ -95,18 +101,27 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 },
                 headers={"Retry-After": "3600"},
             )
+            await response(scope, receive, send)
+            return
 
         # Добавляем текущий запрос
-        self.minute_requests[client_ip].append(current_time)
-        self.hour_requests[client_ip].append(current_time)
+        minute_requests.append(current_time)
+        hour_requests.append(current_time)
+
+        rate_limit_headers = (
+            ("X-RateLimit-Limit-Minute", str(self.per_minute)),
+            ("X-RateLimit-Remaining-Minute", str(max(0, self.per_minute - minute_count - 1))),
+            ("X-RateLimit-Limit-Hour", str(self.per_hour)),
+            ("X-RateLimit-Remaining-Hour", str(max(0, self.per_hour - hour_count - 1))),
+        )
+
+        async def send_with_headers(message: Message) -> None:
+            # Добавляем заголовки с информацией о лимитах, тело ответа проходит без изменений
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in rate_limit_headers:
+                    headers.append(name, value)
+            await send(message)
 
         # Выполняем запрос
-        response = await call_next(request)
-
-        # Добавляем заголовки с информацией о лимитах
-        response.headers["X-RateLimit-Limit-Minute"] = str(self.per_minute)
-        response.headers["X-RateLimit-Remaining-Minute"] = str(max(0, self.per_minute - minute_count - 1))
-        response.headers["X-RateLimit-Limit-Hour"] = str(self.per_hour)
-        response.headers["X-RateLimit-Remaining-Hour"] = str(max(0, self.per_hour - hour_count - 1))
-
-        return response
+        await self.app(scope, receive, send_with_headers)
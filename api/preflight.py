@@ -0,0 +1,59 @@
+"""Preflight: создание БД и применение миграций перед запуском API.
+
+Запускается отдельной командой до старта uvicorn (entrypoint.sh, make preflight),
+чтобы API под не выполнял миграции в startup hook и быстрее становился ready:
+
+    python -m api.preflight
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+from alembic.config import Config
+
+from alembic import command
+from database.config import DatabaseConfig
+from database.manager import DatabaseManager
+from logger import get_logger
+
+logger = get_logger()
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+
+async def ensure_database() -> None:
+    """Создать БД, если её нет."""
+    db_manager = DatabaseManager(DatabaseConfig.from_env())
+    try:
+        await db_manager.create_database_if_not_exists()
+    finally:
+        await db_manager.close()
+
+
+def run_migrations(revision: str = "head") -> None:
+    """
+    Применить миграции Alembic.
+
+    Вызывается вне event loop: alembic/env.py сам запускает asyncio.run().
+    """
+    command.upgrade(Config(str(ALEMBIC_INI)), revision)
+
+
+def main() -> int:
+    try:
+        logger.info("🚀 Инициализация базы данных...")
+        asyncio.run(ensure_database())
+        logger.info("✅ База данных создана (если не существовала)")
+
+        logger.info("🔄 Применение миграций Alembic...")
+        run_migrations()
+        logger.info("✅ Миграции применены успешно")
+    except Exception as e:
+        logger.error(f"❌ Ошибка preflight: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
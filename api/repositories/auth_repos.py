@@ -216,10 +216,24 @@ class UserCredentialRepository:
             setattr(db_credential, key, value)
 
         db_credential.last_used_at = datetime.utcnow()
+        # Инкремент в SQL: конкурентные обновления (refresh токена в воркерах) не теряют версию
+        db_credential.version = UserCredentialModel.version + 1
         await self.session.commit()
         await self.session.refresh(db_credential)
         return UserCredentialInDB.model_validate(db_credential)
 
+    async def get_version(self, credential_id: int) -> tuple[int, bool] | None:
+        """Версия и is_active учетных данных (без encrypted_data) для проверки кэша."""
+        result = await self.session.execute(
+            select(UserCredentialModel.version, UserCredentialModel.is_active).where(
+                UserCredentialModel.id == credential_id
+            )
+        )
+        row = result.first()
+        if row is None:
+            return None
+        return row.version, row.is_active
+
     async def delete(self, credential_id: int) -> bool:
         """Удалить учетные данные пользователя."""
         result = await self.session.execute(select(UserCredentialModel).where(UserCredentialModel.id == credential_id))
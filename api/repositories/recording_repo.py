@@ -49,8 +49,8 @@ class RecordingRepository:
         await self.db.update_recording(recording)
         return recording
 
-    async def save_batch(self, recordings: list[MeetingRecording]) -> int:
-        """Save batch of recordings."""
+    async def save_batch(self, recordings: list[MeetingRecording]) -> list[str]:
+        """Save batch of recordings (returns source_key of saved recordings)."""
         return await self.db.save_recordings(recordings)
 
     async def update_preferences(self, recording_id: int, preferences: dict[str, Any]) -> MeetingRecording | None:
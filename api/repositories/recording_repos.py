@@ -1,15 +1,17 @@
 """Async recording repository with multi-tenancy"""
 
+from collections import Counter
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from database.models import OutputTargetModel, RecordingModel, SourceMetadataModel
+from database.models import OutputTargetModel, ProcessingStageModel, RecordingModel, SourceMetadataModel
+from database.recording_stats import METRIC_FAILED, METRIC_RECORDINGS, apply_deltas, get_user_metric, status_metric
 from logger import get_logger
-from models.recording import ProcessingStatus, SourceType
+from models.recording import ProcessingStageStatus, ProcessingStageType, ProcessingStatus, SourceType
 
 logger = get_logger()
 
@@ -54,6 +56,77 @@ class RecordingAsyncRepository:
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
+    async def get_by_ids(self, recording_ids: list[int], user_id: int) -> dict[int, RecordingModel]:
+        """
+        Получить несколько записей пользователя одним запросом (для bulk операций).
+
+        Связи загружаются через selectinload пачками (WHERE ... IN), а не по запросу на запись.
+
+        Args:
+            recording_ids: ID записей
+            user_id: ID пользователя
+
+        Returns:
+            Словарь {recording_id: Recording}; чужие и несуществующие ID отсутствуют
+        """
+        if not recording_ids:
+            return {}
+
+        query = (
+            select(RecordingModel)
+            .options(
+                selectinload(RecordingModel.source),
+                selectinload(RecordingModel.outputs),
+                selectinload(RecordingModel.processing_stages),
+                selectinload(RecordingModel.input_source),
+            )
+            .where(
+                RecordingModel.id.in_(set(recording_ids)),
+                RecordingModel.user_id == user_id,
+            )
+        )
+
+        result = await self.session.execute(query)
+        return {recording.id: recording for recording in result.scalars().all()}
+
+    async def reset_failed_flags(self, recording_ids: list[int], user_id: int) -> int:
+        """
+        Сбросить FSM флаги ошибки (failed, failed_reason, ...) одним UPDATE.
+
+        Используется при повторном запуске обработки пачки записей.
+
+        Args:
+            recording_ids: ID записей
+            user_id: ID пользователя
+
+        Returns:
+            Количество обновленных записей
+        """
+        if not recording_ids:
+            return 0
+
+        result = await self.session.execute(
+            update(RecordingModel)
+            .where(
+                RecordingModel.id.in_(set(recording_ids)),
+                RecordingModel.user_id == user_id,
+                RecordingModel.failed == True,  # noqa: E712
+            )
+            .values(
+                failed=False,
+                failed_at=None,
+                failed_reason=None,
+                failed_at_stage=None,
+                updated_at=datetime.utcnow(),
+                version=RecordingModel.version + 1,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        updated = result.rowcount or 0
+        # UPDATE мимо ORM - счетчик failed обновляется явно
+        await apply_deltas(self.session, Counter({(user_id, METRIC_FAILED): -updated}))
+        return updated
+
     async def list_by_user(
         self,
         user_id: int,
@@ -311,6 +384,30 @@ class RecordingAsyncRepository:
 
         logger.warning(f"Marked output_target {output_target.id} as FAILED: {error_message[:100]}")
 
+    async def mark_output_deferred(
+        self,
+        output_target: OutputTargetModel,
+        retry_at: datetime,
+    ) -> None:
+        """
+        Вернуть output_target в NOT_UPLOADED: загрузка отложена до следующего окна квоты.
+
+        Args:
+            output_target: Output target
+            retry_at: Запланированное время повторной загрузки (UTC)
+        """
+        from models.recording import TargetStatus
+
+        output_target.status = TargetStatus.NOT_UPLOADED
+        output_target.target_meta = {
+            **(output_target.target_meta or {}),
+            "quota_deferred_until": retry_at.isoformat(),
+        }
+        output_target.updated_at = datetime.utcnow()
+        await self.session.flush()
+
+        logger.info(f"Deferred output_target {output_target.id} until {retry_at.isoformat()} (platform quota)")
+
     async def save_upload_result(
         self,
         recording: RecordingModel,
@@ -386,7 +483,7 @@ class RecordingAsyncRepository:
 
     async def count_by_user(self, user_id: int, status: ProcessingStatus | None = None) -> int:
         """
-        Подсчитать количество записей пользователя.
+        Подсчитать количество записей пользователя (материализованный счетчик recording_stats).
 
         Args:
             user_id: ID пользователя
@@ -395,15 +492,62 @@ class RecordingAsyncRepository:
         Returns:
             Количество записей
         """
-        from sqlalchemy import func
+        metric = status_metric(status) if status else METRIC_RECORDINGS
+        return await get_user_metric(self.session, user_id, metric)
 
-        query = select(func.count(RecordingModel.id)).where(RecordingModel.user_id == user_id)
+    async def list_pending_batch_transcriptions(self, limit: int = 500) -> list[dict[str, Any]]:
+        """
+        Получить незавершенные Fireworks batch jobs всех пользователей.
 
-        if status:
-            query = query.where(RecordingModel.status == status)
+        Читает только колонки этапа (без загрузки recording и связей),
+        чтобы поллер мог опрашивать сотни jobs одним запросом.
+
+        Args:
+            limit: Максимальное количество jobs
+
+        Returns:
+            Список dict: stage_id, recording_id, user_id, stage_meta
+        """
+        query = (
+            select(
+                ProcessingStageModel.id,
+                ProcessingStageModel.recording_id,
+                ProcessingStageModel.user_id,
+                ProcessingStageModel.stage_meta,
+            )
+            .where(
+                ProcessingStageModel.stage_type == ProcessingStageType.TRANSCRIBE,
+                ProcessingStageModel.status == ProcessingStageStatus.IN_PROGRESS,
+                ProcessingStageModel.stage_meta.has_key("batch_id"),
+            )
+            .order_by(ProcessingStageModel.updated_at)
+            .limit(limit)
+        )
 
         result = await self.session.execute(query)
-        return result.scalar() or 0
+        return [
+            {
+                "stage_id": row.id,
+                "recording_id": row.recording_id,
+                "user_id": row.user_id,
+                "stage_meta": row.stage_meta or {},
+            }
+            for row in result.all()
+        ]
+
+    async def update_stage_meta(self, stage_id: int, stage_meta: dict[str, Any]) -> None:
+        """
+        Перезаписать stage_meta этапа без загрузки модели.
+
+        Args:
+            stage_id: ID этапа
+            stage_meta: Новые метаданные этапа
+        """
+        await self.session.execute(
+            update(ProcessingStageModel)
+            .where(ProcessingStageModel.id == stage_id)
+            .values(stage_meta=stage_meta, updated_at=datetime.utcnow())
+        )
 
     async def find_by_source_key(
         self,
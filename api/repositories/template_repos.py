@@ -262,6 +262,17 @@ class RecordingTemplateRepository:
         )
         return result.scalar_one_or_none()
 
+    async def find_by_ids(self, template_ids: list[int], user_id: int) -> dict[int, RecordingTemplateModel]:
+        """Получение нескольких шаблонов пользователя одним запросом: {template_id: template}."""
+        if not template_ids:
+            return {}
+        result = await self.session.execute(
+            select(RecordingTemplateModel).where(
+                RecordingTemplateModel.id.in_(template_ids), RecordingTemplateModel.user_id == user_id
+            )
+        )
+        return {template.id: template for template in result.scalars().all()}
+
     async def find_active_by_user(self, user_id: int) -> list[RecordingTemplateModel]:
         """Получение активных шаблонов пользователя, отсортированных по created_at ASC (first-match strategy)."""
         result = await self.session.execute(
@@ -3,26 +3,35 @@
 from datetime import datetime
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from redis import RedisError
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.auth.admin import get_current_admin
+from api.auth.credential_cache import get_credential_cache_metrics
 from api.dependencies import get_db_session
 from api.schemas.admin import (
+    AdminCredentialCacheStats,
     AdminOverviewStats,
+    AdminQueueStats,
     AdminQuotaStats,
     AdminUserStats,
     PlanUsageStats,
     UserQuotaDetails,
 )
 from api.schemas.auth import UserInDB
+from api.schemas.recording import RecordingStatsResponse
+from api.tasks.scheduling import get_queue_metrics
 from database.auth_models import (
     QuotaUsageModel,
     SubscriptionPlanModel,
     UserModel,
     UserSubscriptionModel,
 )
+from database.models import RecordingStatsModel
+from database.recording_stats import METRIC_RECORDINGS, get_global_stats, summarize
 from logger import get_logger
 
 logger = get_logger()
@@ -51,11 +60,8 @@ async def get_overview_stats(
     result = await session.execute(select(func.count(UserModel.id)).where(UserModel.is_active == True))  # noqa: E712
     active_users = result.scalar() or 0
 
-    # Total recordings (need to import RecordingModel)
-    from database.models import RecordingModel
-
-    result = await session.execute(select(func.count(RecordingModel.id)))
-    total_recordings = result.scalar() or 0
+    # Recording counters (materialized, без COUNT по recordings)
+    recordings = RecordingStatsResponse(**summarize(await get_global_stats(session)))
 
     # Total storage from current period
     current_period = int(datetime.now().strftime("%Y%m"))
@@ -82,10 +88,11 @@ async def get_overview_stats(
     return AdminOverviewStats(
         total_users=total_users,
         active_users=active_users,
-        total_recordings=total_recordings,
+        total_recordings=recordings.total_recordings,
         total_storage_gb=round(total_storage_gb, 2),
         total_plans=total_plans,
         users_by_plan=users_by_plan,
+        recordings=recordings,
     )
 
 
@@ -128,6 +135,7 @@ async def get_user_stats(
             QuotaUsageModel.recordings_count,
             QuotaUsageModel.storage_bytes,
             QuotaUsageModel.overage_cost,
+            RecordingStatsModel.value,
         )
         .join(UserSubscriptionModel, UserModel.id == UserSubscriptionModel.user_id)
         .join(SubscriptionPlanModel, UserSubscriptionModel.plan_id == SubscriptionPlanModel.id)
@@ -135,6 +143,10 @@ async def get_user_stats(
             QuotaUsageModel,
             (QuotaUsageModel.user_id == UserModel.id) & (QuotaUsageModel.period == current_period),
         )
+        .outerjoin(
+            RecordingStatsModel,
+            (RecordingStatsModel.user_id == UserModel.id) & (RecordingStatsModel.metric == METRIC_RECORDINGS),
+        )
     )
 
     # Apply filters
@@ -166,6 +178,7 @@ async def get_user_stats(
         recordings_used = row[8] or 0
         storage_bytes_used = row[9] or 0
         overage_cost = row[10] or Decimal("0")
+        total_recordings = row[11] or 0
 
         # Effective limits (custom overrides plan)
         recordings_limit = custom_recordings_limit or plan_recordings_limit
@@ -194,6 +207,7 @@ async def get_user_stats(
                 is_exceeding=is_exceeding,
                 overage_enabled=overage_enabled,
                 overage_cost=overage_cost,
+                total_recordings=total_recordings,
             )
         )
 
@@ -277,3 +291,47 @@ async def get_quota_stats(
         total_overage_cost=total_overage_cost,
         plans=plans,
     )
+
+
+@router.get("/stats/queues", response_model=AdminQueueStats)
+async def get_queue_stats(
+    _admin: UserInDB = Depends(get_current_admin),
+):
+    """
+    Получить состояние очередей Celery: длины очередей, backlog/ожидание по пользователям
+    и время удержания DB соединений задачами.
+
+    Требует роль: admin
+
+    Returns:
+        AdminQueueStats: Длины очередей в broker и метрики fair share по пользователям
+    """
+    try:
+        metrics = await run_in_threadpool(get_queue_metrics)
+    except RedisError as e:
+        logger.error(f"Failed to read queue metrics: {e}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Queue metrics unavailable") from e
+    return AdminQueueStats(**metrics)
+
+
+@router.get("/stats/credentials", response_model=AdminCredentialCacheStats)
+async def get_credential_cache_stats(
+    _admin: UserInDB = Depends(get_current_admin),
+):
+    """
+    Получить счетчики кэша расшифрованных credentials: расшифровки, попадания,
+    refresh токенов и refresh collisions (все процессы, текущий и предыдущий час).
+
+    Требует роль: admin
+
+    Returns:
+        AdminCredentialCacheStats: Счетчики кэша credentials
+    """
+    try:
+        metrics = await run_in_threadpool(get_credential_cache_metrics)
+    except RedisError as e:
+        logger.error(f"Failed to read credential cache metrics: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Credential cache metrics unavailable"
+        ) from e
+    return AdminCredentialCacheStats(**metrics)
@@ -12,7 +12,7 @@ from api.schemas.automation import (
     TriggerJobResponse,
 )
 from api.services.automation_service import AutomationService
-from api.tasks.automation import dry_run_automation_job_task, run_automation_job_task
+from api.tasks.signatures import DRY_RUN_AUTOMATION_JOB, RUN_AUTOMATION_JOB, enqueue
 
 router = APIRouter(prefix="/api/v1/automation/jobs", tags=["Automation"])
 
@@ -105,13 +105,13 @@ async def trigger_job(
         raise HTTPException(404, "Automation job not found")
 
     if dry_run:
-        task = dry_run_automation_job_task.delay(job_id, ctx.user_id)
+        task = await enqueue(DRY_RUN_AUTOMATION_JOB, job_id=job_id, user_id=ctx.user_id)
         return TriggerJobResponse(
             task_id=str(task.id),
             mode="dry_run",
             message="Preview mode - no changes will be made",
         )
-    task = run_automation_job_task.delay(job_id, ctx.user_id)
+    task = await enqueue(RUN_AUTOMATION_JOB, job_id=job_id, user_id=ctx.user_id)
     return TriggerJobResponse(
         task_id=str(task.id),
         mode="execute",
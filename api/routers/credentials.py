@@ -19,6 +19,7 @@ from api.schemas.credentials import (
     CredentialUpdateRequest,
     VKCredentialsManual,
     YouTubeCredentialsManual,
+    YouTubeQuotaResponse,
     ZoomCredentialsManual,
 )
 from logger import get_logger
@@ -104,6 +105,28 @@ async def check_credentials_status(
     )
 
 
+@router.get("/quota/youtube", response_model=list[YouTubeQuotaResponse])
+async def get_youtube_quota(
+    current_user: UserInDB = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> list[YouTubeQuotaResponse]:
+    """
+    Квота YouTube Data API по каналам пользователя.
+
+    Остаток текущего окна, время сброса и прогноз, когда будут выгружены
+    загрузки, отложенные из-за исчерпанной квоты.
+    """
+    from video_upload_module.platforms.youtube.quota import get_quota_ledger
+
+    cred_repo = UserCredentialRepository(session)
+    credentials = await cred_repo.list_by_platform(current_user.id, "youtube")
+
+    ledger = get_quota_ledger()
+    return [
+        YouTubeQuotaResponse(account_name=cred.account_name, **ledger.status(cred.id).to_dict()) for cred in credentials
+    ]
+
+
 @router.get("/{credential_id}", response_model=CredentialResponse)
 async def get_credential_by_id(
     credential_id: int,
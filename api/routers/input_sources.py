@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.auth.dependencies import get_current_active_user
 from api.dependencies import get_db_session
+from api.helpers.sync_watermark import SyncStats, SyncWatermark, meeting_key
 from api.repositories.auth_repos import UserCredentialRepository
 from api.repositories.recording_repos import RecordingAsyncRepository
 from api.repositories.template_repos import InputSourceRepository, RecordingTemplateRepository
@@ -16,6 +17,7 @@ from api.schemas.template import (
     InputSourceResponse,
     InputSourceUpdate,
 )
+from api.tasks.signatures import BATCH_SYNC_SOURCES, SYNC_SINGLE_SOURCE, enqueue_with_options
 from api.zoom_api import ZoomAPI
 from config.settings import ZoomConfig
 from database.auth_models import UserModel
@@ -32,12 +34,22 @@ async def _sync_single_source(
     to_date: str | None,
     session: AsyncSession,
     user_id: int,
+    incremental: bool = False,
 ) -> dict:
     """
     Синхронизация одного источника (внутренняя функция для DRY).
 
+    Отпечатки встреч (recording_files и правила шаблонов) сохраняются в source_sync_state.
+
+    Args:
+        incremental: Плановая синхронизация - окно с водяного знака источника минус перекрытие
+            (не раньше from_date), неизменившиеся встречи пропускаются до запроса деталей и записи
+            в БД, см. api.helpers.sync_watermark. Ручная синхронизация обрабатывает все встречи
+            (восстанавливает удаленные записи).
+
     Returns:
-        dict с ключами: status, recordings_found, recordings_saved, recordings_updated, error (опционально)
+        dict с ключами: status, recordings_found, recordings_saved, recordings_updated,
+        recordings_unchanged, api_calls_avoided, window_from, error (опционально)
     """
     repo = InputSourceRepository(session)
     source = await repo.find_by_id(source_id, user_id)
@@ -79,6 +91,7 @@ async def _sync_single_source(
     meetings = []
     saved_count = 0
     updated_count = 0
+    stats = SyncStats()
 
     if source.source_type == "ZOOM":
         try:
@@ -100,22 +113,29 @@ async def _sync_single_source(
                     client_secret=credentials["client_secret"],
                 )
 
+            watermark = await SyncWatermark.load(session, source_id, user_id)
+            stats = watermark.stats
+            if incremental:
+                from_date = watermark.window_start(from_date, to_date)
+
             zoom_api = ZoomAPI(zoom_config)
             recordings_data = await zoom_api.get_recordings(from_date=from_date, to_date=to_date)
             meetings = recordings_data.get("meetings", [])
 
-            logger.info(f"Found {len(meetings)} recordings from Zoom source {source_id}")
+            logger.info(f"Found {len(meetings)} recordings from Zoom source {source_id} (from={from_date})")
 
             # Получаем шаблоны
             template_repo = RecordingTemplateRepository(session)
             templates = await template_repo.find_active_by_user(user_id)
 
+            changed_meetings = watermark.select_changed(meetings, skip_unchanged=incremental)
+
             # Сохраняем recordings
             recording_repo = RecordingAsyncRepository(session)
 
-            for meeting in meetings:
+            for meeting in changed_meetings:
                 try:
-                    meeting_id = meeting.get("uuid", meeting.get("id", ""))
+                    meeting_id = meeting_key(meeting)
                     display_name = meeting.get("topic", "Untitled")
                     start_time_str = meeting.get("start_time", "")
                     duration = meeting.get("duration", 0)
@@ -126,6 +146,7 @@ async def _sync_single_source(
                         start_time = datetime.fromisoformat(start_time_str)
                     else:
                         logger.warning(f"Meeting {meeting_id} has no start_time, skipping")
+                        watermark.mark_failed(meeting_id)
                         continue
 
                     # Получаем видео файл
@@ -216,13 +237,19 @@ async def _sync_single_source(
                         saved_count += 1
                     else:
                         updated_count += 1
+                    watermark.mark_synced(meeting_id, is_new)
 
                 except Exception as e:
                     logger.warning(f"Failed to save recording {meeting.get('id')}: {e}")
+                    watermark.mark_failed(meeting_key(meeting))
                     continue
 
+            await watermark.save(session)
+
             logger.info(
-                f"Synced {saved_count + updated_count} recordings from source {source_id} (new={saved_count}, updated={updated_count})"
+                f"Synced {saved_count + updated_count} recordings from source {source_id} "
+                f"(new={saved_count}, updated={updated_count}) | "
+                f"unchanged={stats.unchanged} | api_calls_avoided={stats.api_calls_avoided}"
             )
 
         except Exception as e:
@@ -260,6 +287,9 @@ async def _sync_single_source(
         "recordings_found": recordings_found,
         "recordings_saved": recordings_saved,
         "recordings_updated": recordings_updated,
+        "recordings_unchanged": stats.unchanged,
+        "api_calls_avoided": stats.api_calls_avoided,
+        "window_from": stats.window_from,
     }
 
 
@@ -435,15 +465,15 @@ async def bulk_sync_sources(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Sources not found: {invalid_sources}")
 
     # Start Celery task
-    from api.tasks.sync_tasks import bulk_sync_sources_task
-
-    task = bulk_sync_sources_task.apply_async(
+    task = await enqueue_with_options(
+        BATCH_SYNC_SOURCES,
         kwargs={
             "source_ids": data.source_ids,
             "user_id": current_user.id,
             "from_date": data.from_date,
             "to_date": data.to_date,
-        }
+            "incremental": data.incremental,
+        },
     )
 
     logger.info(f"Started batch sync task {task.id} for {len(data.source_ids)} sources (user {current_user.id})")
@@ -534,6 +564,7 @@ async def sync_source(
     source_id: int,
     from_date: str = "2024-01-01",
     to_date: str | None = None,
+    incremental: bool = Query(False, description="Only request meetings since the last sync watermark"),
     session: AsyncSession = Depends(get_db_session),
     current_user: UserModel = Depends(get_current_active_user),
 ):
@@ -544,6 +575,7 @@ async def sync_source(
         source_id: Source ID
         from-date: Start date in format YYYY-MM-DD
         to-date: End date in format YYYY-MM-DD (optional)
+        incremental: Request only the window since the source sync watermark (minus overlap)
 
     Returns:
         task_id for tracking progress via GET /api/v1/tasks/{task_id}
@@ -559,15 +591,15 @@ async def sync_source(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Source is not active")
 
     # Start Celery task
-    from api.tasks.sync_tasks import sync_single_source_task
-
-    task = sync_single_source_task.apply_async(
+    task = await enqueue_with_options(
+        SYNC_SINGLE_SOURCE,
         kwargs={
             "source_id": source_id,
             "user_id": current_user.id,
             "from_date": from_date,
             "to_date": to_date,
-        }
+            "incremental": incremental,
+        },
     )
 
     logger.info(f"Started sync task {task.id} for source {source_id} (user {current_user.id})")
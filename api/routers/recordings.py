@@ -4,12 +4,14 @@ from __future__ import annotations
 
 from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
 from pydantic import BaseModel
 
 from api.core.context import ServiceContext
 from api.core.dependencies import get_service_context
+from api.helpers.bulk_dispatch import BulkDispatch
 from api.repositories.recording_repos import RecordingAsyncRepository
 from api.schemas.recording.filters import RecordingFilters as RecordingFiltersSchema
 from api.schemas.recording.operations import (
@@ -38,11 +40,27 @@ from api.schemas.recording.response import (
     RecordingResponse,
     SourceInfo,
     SourceResponse,
+    TranscriptSearchResponse,
     UploadInfo,
 )
+from api.tasks.signatures import (
+    BATCH_TRANSCRIBE_RECORDING,
+    DOWNLOAD_RECORDING,
+    EXTRACT_TOPICS,
+    GENERATE_SUBTITLES,
+    PROCESS_RECORDING,
+    TRANSCRIBE_RECORDING,
+    TRIM_VIDEO,
+    UPLOAD_RECORDING_TO_PLATFORM,
+    enqueue,
+)
 from logger import get_logger
 from models import ProcessingStatus
-from models.recording import TargetStatus
+from models.recording import ProcessingStageType, TargetStatus
+from video_upload_module.platforms.youtube.quota import UPLOAD_PRIORITY_MANUAL
+
+if TYPE_CHECKING:
+    from sqlalchemy import Select
 
 router = APIRouter(prefix="/api/v1/recordings", tags=["Recordings"])
 logger = get_logger()
@@ -165,7 +183,27 @@ async def _query_recordings_by_filters(
 
     from database.models import RecordingModel
 
-    query = select(RecordingModel.id).where(RecordingModel.user_id == ctx.user_id)
+    query = _apply_recording_filters(select(RecordingModel.id), filters, ctx).limit(limit)
+
+    result = await ctx.session.execute(query)
+    return [row[0] for row in result.all()]
+
+
+def _apply_recording_filters(query: Select, filters: RecordingFiltersSchema, ctx: ServiceContext) -> Select:
+    """
+    Apply bulk filters and sorting to a select over RecordingModel columns.
+
+    Args:
+        query: select(...) of RecordingModel columns
+        filters: Filters for selection
+        ctx: Service context
+
+    Returns:
+        Query restricted to user's recordings matching filters
+    """
+    from database.models import RecordingModel
+
+    query = query.where(RecordingModel.user_id == ctx.user_id)
 
     # Apply filters
     if filters.template_id:
@@ -224,14 +262,8 @@ async def _query_recordings_by_filters(
     # Sorting
     order_column = getattr(RecordingModel, filters.order_by, RecordingModel.created_at)
     if filters.order == "desc":
-        query = query.order_by(order_column.desc())
-    else:
-        query = query.order_by(order_column.asc())
-
-    query = query.limit(limit)
-
-    result = await ctx.session.execute(query)
-    return [row[0] for row in result.all()]
+        return query.order_by(order_column.desc())
+    return query.order_by(order_column.asc())
 
 
 async def _execute_dry_run_single(
@@ -252,6 +284,7 @@ async def _execute_dry_run_single(
     Returns:
         Information about steps that will be executed
     """
+    from api.helpers.bulk_dry_run import plan_steps
     from api.services.config_resolver import ConfigResolver
 
     recording_repo = RecordingAsyncRepository(ctx.session)
@@ -266,36 +299,7 @@ async def _execute_dry_run_single(
     output_config = await resolver.resolve_output_config(recording, ctx.user_id)
 
     # Define which steps will be executed
-    steps = []
-
-    # Download step
-    if not recording.local_video_path:
-        steps.append({"name": "download", "enabled": True})
-    else:
-        steps.append({"name": "download", "enabled": False, "skip_reason": "Already downloaded"})
-
-    # Trim step
-    if processing_config.get("enable_processing", True):
-        steps.append({"name": "trim", "enabled": True})
-    else:
-        steps.append({"name": "trim", "enabled": False, "skip_reason": "Disabled in config"})
-
-    # Transcribe step
-    if processing_config.get("transcription", {}).get("enable_transcription", True):
-        steps.append({"name": "transcribe", "enabled": True})
-    else:
-        steps.append({"name": "transcribe", "enabled": False})
-
-    # Topics step
-    steps.append({"name": "topics", "enabled": True})
-
-    # Upload step
-    auto_upload = output_config.get("auto_upload", False)
-    if auto_upload:
-        platforms = output_config.get("platforms", [])
-        steps.append({"name": "upload", "enabled": True, "platforms": platforms})
-    else:
-        steps.append({"name": "upload", "enabled": False, "skip_reason": "auto_upload is false"})
+    steps = plan_steps(recording.local_video_path, processing_config, output_config)
 
     return DryRunResponse(
         dry_run=True,
@@ -308,64 +312,45 @@ async def _execute_dry_run_bulk(
     recording_ids: list[int] | None,
     filters: RecordingFiltersSchema | None,
     limit: int,
+    page: int,
+    per_page: int,
     ctx: ServiceContext,
 ) -> BulkProcessDryRunResponse:
     """
     Dry-run for bulk process endpoint.
 
-    Shows which recordings will be processed with checking blank_record.
+    Shows which recordings will be processed (blank_record check) and which pipeline steps
+    will run. All matched recordings are evaluated with one query over the needed columns
+    and shared config layers (api.helpers.bulk_dry_run), not a query per recording.
 
     Args:
         recording_ids: Explicit list of IDs
         filters: Filters for selection
         limit: Maximum number
+        page: Page of recording details
+        per_page: Recording details per page
         ctx: Service context
 
     Returns:
-        BulkProcessDryRunResponse with detailed information about recordings
+        BulkProcessDryRunResponse with aggregated counts and a page of recording details
     """
-    resolved_ids = await _resolve_recording_ids(recording_ids, filters, limit, ctx)
-
-    recording_repo = RecordingAsyncRepository(ctx.session)
-    recordings_info = []
-    skipped_count = 0
-
-    for rec_id in resolved_ids:
-        recording = await recording_repo.get_by_id(rec_id, ctx.user_id)
-
-        if not recording:
-            recordings_info.append(
-                {"recording_id": rec_id, "will_be_processed": False, "skip_reason": "Recording not found or no access"}
-            )
-            skipped_count += 1
-            continue
+    from sqlalchemy import select
 
-        if recording.blank_record:
-            recordings_info.append(
-                {
-                    "recording_id": rec_id,
-                    "will_be_processed": False,
-                    "skip_reason": "Blank record (too short or too small)",
-                }
-            )
-            skipped_count += 1
-            continue
+    from api.helpers.bulk_dry_run import DRY_RUN_COLUMNS, BulkDryRun
+    from database.models import RecordingModel
 
-        recordings_info.append(
-            {
-                "recording_id": rec_id,
-                "will_be_processed": True,
-                "display_name": recording.display_name,
-                "current_status": recording.status.value,
-            }
+    if recording_ids:
+        query = select(*DRY_RUN_COLUMNS).where(
+            RecordingModel.user_id == ctx.user_id,
+            RecordingModel.id.in_(recording_ids),
         )
+    elif filters:
+        query = _apply_recording_filters(select(*DRY_RUN_COLUMNS), filters, ctx).limit(limit)
+    else:
+        raise ValueError("Either recording_ids or filters must be specified")
 
-    return BulkProcessDryRunResponse(
-        matched_count=len(resolved_ids) - skipped_count,
-        skipped_count=skipped_count,
-        total=len(resolved_ids),
-        recordings=recordings_info,
-    )
+    dry_run = await BulkDryRun.evaluate(ctx.session, ctx.user_id, query, recording_ids or None)
+    return BulkProcessDryRunResponse(**dry_run.build_response(page=page, per_page=per_page))
 
 
 # ============================================================================
@@ -507,6 +492,50 @@ async def list_recordings(
     )
 
 
+@router.get("/search", response_model=TranscriptSearchResponse)
+async def search_recordings(
+    q: str = Query(..., min_length=2, max_length=200, description='Search query (words, "phrase", -exclude, or)'),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=50),
+    matches_per_recording: int = Query(5, ge=1, le=20, description="Best matches with snippets per recording"),
+    ctx: ServiceContext = Depends(get_service_context),
+) -> TranscriptSearchResponse:
+    """
+    Full-text search over transcripts and topics of user's recordings.
+
+    Uses the transcript_segments index (database.transcript_search), transcription files are not read.
+
+    Args:
+        q: Search query (websearch syntax, Russian and English stemming)
+        page: Page number
+        per_page: Number of recordings per page
+        matches_per_recording: Number of matched fragments (timestamps + snippet) per recording
+        ctx: Service context
+
+    Returns:
+        Recordings ordered by relevance with matched segment timestamps and snippets
+    """
+    from database.transcript_search import search_transcripts
+
+    total, items = await search_transcripts(
+        ctx.session,
+        ctx.user_id,
+        q,
+        limit=per_page,
+        offset=(page - 1) * per_page,
+        matches_per_recording=matches_per_recording,
+    )
+
+    return TranscriptSearchResponse(
+        query=q,
+        total=total,
+        page=page,
+        per_page=per_page,
+        total_pages=(total + per_page - 1) // per_page if total > 0 else 1,
+        items=items,
+    )
+
+
 @router.get("/{recording_id}")
 async def get_recording(
     recording_id: int,
@@ -903,7 +932,6 @@ async def download_recording(
     """
     from api.helpers.config_resolver import get_allow_skipped_flag
     from api.helpers.status_manager import should_allow_download
-    from api.tasks.processing import download_recording_task
 
     recording_repo = RecordingAsyncRepository(ctx.session)
     recording = await recording_repo.get_by_id(recording_id, ctx.user_id)
@@ -948,7 +976,8 @@ async def download_recording(
             }
 
     # Start async task
-    task = download_recording_task.delay(
+    task = await enqueue(
+        DOWNLOAD_RECORDING,
         recording_id=recording_id,
         user_id=ctx.user_id,
         force=force,
@@ -995,7 +1024,6 @@ async def trim_recording(
     """
     from api.helpers.config_resolver import get_allow_skipped_flag
     from api.helpers.status_manager import should_allow_processing
-    from api.tasks.processing import trim_video_task
 
     recording_repo = RecordingAsyncRepository(ctx.session)
     recording = await recording_repo.get_by_id(recording_id, ctx.user_id)
@@ -1041,7 +1069,8 @@ async def trim_recording(
     }
 
     # Start async task
-    task = trim_video_task.delay(
+    task = await enqueue(
+        TRIM_VIDEO,
         recording_id=recording_id,
         user_id=ctx.user_id,
         manual_override=manual_override,
@@ -1063,6 +1092,8 @@ async def trim_recording(
 async def bulk_process_recordings(
     data: BulkProcessRequest,
     dry_run: bool = Query(False, description="Dry-run: show which recordings will be processed"),
+    page: int = Query(1, ge=1, description="Dry-run: page of recording details"),
+    per_page: int = Query(200, ge=1, le=1000, description="Dry-run: recording details per page"),
     ctx: ServiceContext = Depends(get_service_context),
 ) -> RecordingBulkOperationResponse | BulkProcessDryRunResponse:
     """
@@ -1075,31 +1106,34 @@ async def bulk_process_recordings(
     Dry-run mode:
     - dry_run=true: Show which recordings will be processed without actual execution
     - Useful for checking filters before bulk processing
+    - Counts (matched, skip reasons, pipeline steps) cover all recordings,
+      details are paginated (page, per_page)
 
     Args:
         data: BulkProcessRequest with recording_ids or filters + configuration override
         dry_run: Dry-run mode (only checking, without execution)
+        page: Dry-run: page of recording details
+        per_page: Dry-run: recording details per page
         ctx: Service context
 
     Returns:
         List of task_id for each recording or dry-run information
 
     Note:
-        Each recording is processed in a separate task.
-        Use GET /api/v1/tasks/{task_id} to check the status of each task.
+        Each recording is processed in a separate task, all tasks are queued as one group.
+        Use GET /api/v1/tasks/bulk/{bulk_id} for overall progress
+        or GET /api/v1/tasks/{task_id} for a single task.
     """
 
     # Handle dry-run mode
     if dry_run:
-        return await _execute_dry_run_bulk(data.recording_ids, data.filters, data.limit, ctx)
-
-    from api.tasks.processing import process_recording_task
+        return await _execute_dry_run_bulk(data.recording_ids, data.filters, data.limit, page, per_page, ctx)
 
     # Resolve recording IDs
     recording_ids = await _resolve_recording_ids(data.recording_ids, data.filters, data.limit, ctx)
 
-    recording_repo = RecordingAsyncRepository(ctx.session)
-    tasks = []
+    recordings = await RecordingAsyncRepository(ctx.session).get_by_ids(recording_ids, ctx.user_id)
+    bulk = BulkDispatch(user_id=ctx.user_id)
 
     # Build manual override from config_override
     manual_override = {}
@@ -1111,71 +1145,28 @@ async def bulk_process_recordings(
         manual_override["output_config"] = data.output_config
 
     for recording_id in recording_ids:
-        try:
-            # Check if recording exists
-            recording = await recording_repo.get_by_id(recording_id, ctx.user_id)
-
-            if not recording:
-                tasks.append(
-                    {
-                        "recording_id": recording_id,
-                        "status": "error",
-                        "error": "Recording not found or no access",
-                        "task_id": None,
-                    }
-                )
-                continue
+        recording = recordings.get(recording_id)
 
-            # Skip blank records
-            if recording.blank_record:
-                tasks.append(
-                    {
-                        "recording_id": recording_id,
-                        "status": "skipped",
-                        "error": "Blank record (too short or too small)",
-                        "task_id": None,
-                    }
-                )
-                continue
+        if not recording:
+            bulk.error(recording_id, "Recording not found or no access")
+            continue
 
-            # Start task for this recording (template-driven + manual override)
-            task = process_recording_task.delay(
-                recording_id=recording_id,
-                user_id=ctx.user_id,
-                manual_override=manual_override if manual_override else None,
-            )
+        # Skip blank records
+        if recording.blank_record:
+            bulk.skip(recording_id, "Blank record (too short or too small)")
+            continue
 
-            tasks.append(
-                {
-                    "recording_id": recording_id,
-                    "status": "queued",
-                    "task_id": task.id,
-                    "check_status_url": f"/api/v1/tasks/{task.id}",
-                }
-            )
+        # Full pipeline (template-driven + manual override), re-run resets failed flag
+        bulk.add(
+            PROCESS_RECORDING,
+            recording_id,
+            reset_failed=True,
+            manual_override=manual_override if manual_override else None,
+        )
 
-            logger.info(f"Batch task {task.id} created for recording {recording_id}, user {ctx.user_id}")
+    await bulk.dispatch(ctx.session)
 
-        except Exception as e:
-            logger.error(f"Failed to create task for recording {recording_id}: {e}")
-            tasks.append(
-                {
-                    "recording_id": recording_id,
-                    "status": "error",
-                    "error": str(e),
-                    "task_id": None,
-                }
-            )
-
-    queued_count = len([t for t in tasks if t["status"] == "queued"])
-    skipped_count = len([t for t in tasks if t["status"] == "skipped"])
-
-    return RecordingBulkOperationResponse(
-        total=len(recording_ids),
-        queued_count=queued_count,
-        skipped_count=skipped_count,
-        tasks=tasks,
-    )
+    return bulk.build_response(total=len(recording_ids))
 
 
 @router.post("/{recording_id}/process", response_model=RecordingOperationResponse)
@@ -1227,8 +1218,6 @@ async def process_recording(
     if dry_run:
         return await _execute_dry_run_single(recording_id, config, ctx)
 
-    from api.tasks.processing import process_recording_task
-
     recording_repo = RecordingAsyncRepository(ctx.session)
     recording = await recording_repo.get_by_id(recording_id, ctx.user_id)
 
@@ -1241,7 +1230,8 @@ async def process_recording(
     # Build manual override from flexible config
     manual_override = _build_override_from_flexible(config)
 
-    task = process_recording_task.delay(
+    task = await enqueue(
+        PROCESS_RECORDING,
         recording_id=recording_id,
         user_id=ctx.user_id,
         manual_override=manual_override,
@@ -1288,16 +1278,17 @@ async def transcribe_recording(
 
         Batch API (use_batch_api=true):
         - Cheaper ~50% than synchronous API
-        - Requires polling to get result
+        - No task is queued: the batch job is polled by the shared poller
+          and the result is saved automatically (track via recording status)
         - Waiting time: usually several minutes
         - Documentation: https://docs.fireworks.ai/api-reference/create-batch-request
 
         This is an async operation. Use GET /api/v1/tasks/{task_id}
         to check status of execution and get results.
     """
+    from api.helpers.batch_transcription import build_batch_meta
     from api.helpers.config_resolver import get_allow_skipped_flag
-    from api.helpers.status_manager import should_allow_transcription
-    from api.tasks.processing import batch_transcribe_recording_task, transcribe_recording_task
+    from api.helpers.status_manager import should_allow_transcription, update_aggregate_status
 
     # Get recording from DB
     recording_repo = RecordingAsyncRepository(ctx.session)
@@ -1368,28 +1359,23 @@ async def transcribe_recording(
                 f"Batch transcription submitted | batch_id={batch_id} | recording={recording_id} | user={ctx.user_id}"
             )
 
-            # Start polling task
-            task = batch_transcribe_recording_task.delay(
-                recording_id=recording_id,
-                user_id=ctx.user_id,
-                batch_id=batch_id,
-                poll_interval=10.0,  # 10 seconds
-                max_wait_time=3600.0,  # 1 hour
-            )
-
-            logger.info(
-                f"Batch polling task {task.id} created | batch_id={batch_id} | recording={recording_id} | user={ctx.user_id}"
+            # Register batch job for the shared poller (no per-recording polling task)
+            recording.mark_stage_in_progress(
+                ProcessingStageType.TRANSCRIBE,
+                meta=build_batch_meta(batch_id, language=fireworks_config.language, audio_path=audio_path),
             )
+            update_aggregate_status(recording)
+            await recording_repo.update(recording)
+            await ctx.session.commit()
 
             return {
                 "success": True,
-                "task_id": task.id,
+                "task_id": None,
                 "recording_id": recording_id,
                 "batch_id": batch_id,
                 "mode": "batch_api",
-                "status": "queued",
-                "message": "Batch transcription submitted. Polling task queued.",
-                "check_status_url": f"/api/v1/tasks/{task.id}",
+                "status": "submitted",
+                "message": "Batch transcription submitted. Result will be saved automatically when the job completes.",
             }
 
         except Exception as e:
@@ -1400,7 +1386,8 @@ async def transcribe_recording(
             )
     else:
         # Synchronous API mode
-        task = transcribe_recording_task.delay(
+        task = await enqueue(
+            TRANSCRIBE_RECORDING,
             recording_id=recording_id,
             user_id=ctx.user_id,
         )
@@ -1450,7 +1437,6 @@ async def upload_recording(
     """
     from api.helpers.config_resolver import get_allow_skipped_flag
     from api.helpers.status_manager import should_allow_upload
-    from api.tasks.upload import upload_recording_to_platform
     from models.recording import TargetType
 
     # Get recording from DB
@@ -1498,11 +1484,13 @@ async def upload_recording(
         )
 
     # Start async task
-    task = upload_recording_to_platform.delay(
+    task = await enqueue(
+        UPLOAD_RECORDING_TO_PLATFORM,
         recording_id=recording_id,
         user_id=ctx.user_id,
         platform=platform,
         preset_id=preset_id,
+        upload_priority=UPLOAD_PRIORITY_MANUAL,
     )
 
     logger.info(f"Upload task {task.id} created for recording {recording_id} to {platform}, user {ctx.user_id}")
@@ -1551,7 +1539,6 @@ async def extract_topics(
         This is an async operation. Use GET /api/v1/tasks/{task_id}
         to check status of execution.
     """
-    from api.tasks.processing import extract_topics_task
 
     # Get recording from DB
     recording_repo = RecordingAsyncRepository(ctx.session)
@@ -1574,7 +1561,8 @@ async def extract_topics(
         )
 
     # Start async task
-    task = extract_topics_task.delay(
+    task = await enqueue(
+        EXTRACT_TOPICS,
         recording_id=recording_id,
         user_id=ctx.user_id,
         granularity=granularity,
@@ -1619,7 +1607,6 @@ async def generate_subtitles(
         This is an async operation. Use GET /api/v1/tasks/{task_id}
         to check the status of execution.
     """
-    from api.tasks.processing import generate_subtitles_task
 
     # Get recording from DB
     recording_repo = RecordingAsyncRepository(ctx.session)
@@ -1642,7 +1629,8 @@ async def generate_subtitles(
         )
 
     # Start async task
-    task = generate_subtitles_task.delay(
+    task = await enqueue(
+        GENERATE_SUBTITLES,
         recording_id=recording_id,
         user_id=ctx.user_id,
         formats=formats,
@@ -1689,10 +1677,12 @@ async def bulk_transcribe_recordings(
         List of task_id for each recording
 
     Note:
-        Each recording is transcribed in a separate task.
-        Use GET /api/v1/tasks/{task_id} to check the status of each task.
+        Each recording is transcribed in a separate task, all tasks are queued as one group.
+        Use GET /api/v1/tasks/bulk/{bulk_id} for overall progress
+        or GET /api/v1/tasks/{task_id} for a single task.
     """
-    from api.tasks.processing import batch_transcribe_recording_task, transcribe_recording_task
+    from api.helpers.config_resolver import get_allow_skipped_flag
+    from api.helpers.status_manager import should_allow_transcription
 
     # Resolve recording IDs
     recording_ids = await _resolve_recording_ids(data.recording_ids, data.filters, data.limit, ctx)
@@ -1706,108 +1696,49 @@ async def bulk_transcribe_recordings(
             "message": "No recordings matched the criteria",
         }
 
-    recording_repo = RecordingAsyncRepository(ctx.session)
-    tasks = []
+    recordings = await RecordingAsyncRepository(ctx.session).get_by_ids(recording_ids, ctx.user_id)
+    allow_skipped = await get_allow_skipped_flag(ctx.session, ctx.user_id)
+    bulk = BulkDispatch(user_id=ctx.user_id)
+    mode = "batch_api" if data.use_batch_api else "sync_api"
 
     for recording_id in recording_ids:
-        try:
-            # Check if recording exists
-            recording = await recording_repo.get_by_id(recording_id, ctx.user_id)
-
-            if not recording:
-                tasks.append(
-                    {
-                        "recording_id": recording_id,
-                        "status": "error",
-                        "error": "Recording not found or no access",
-                        "task_id": None,
-                    }
-                )
-                continue
+        recording = recordings.get(recording_id)
 
-            # Skip blank records
-            if recording.blank_record:
-                tasks.append(
-                    {
-                        "recording_id": recording_id,
-                        "status": "skipped",
-                        "reason": "Blank record (too short or too small)",
-                        "task_id": None,
-                    }
-                )
-                continue
-
-            # Check if file is present
-            if not recording.processed_video_path and not recording.local_video_path:
-                tasks.append(
-                    {
-                        "recording_id": recording_id,
-                        "status": "error",
-                        "error": "No video file available",
-                        "task_id": None,
-                    }
-                )
-                continue
+        if not recording:
+            bulk.error(recording_id, "Recording not found or no access")
+            continue
 
-            # Select mode: Batch API or regular sync API
-            if data.use_batch_api:
-                # Fireworks Batch API mode
-                task = batch_transcribe_recording_task.delay(
-                    recording_id=recording_id,
-                    user_id=ctx.user_id,
-                    batch_id=None,  # Will be set by task
-                    poll_interval=data.poll_interval,
-                    max_wait_time=data.max_wait_time,
-                )
-                task_info = {
-                    "recording_id": recording_id,
-                    "status": "queued",
-                    "task_id": task.id,
-                    "mode": "batch_api",
-                    "check_status_url": f"/api/v1/tasks/{task.id}",
-                }
-            else:
-                # Sync API mode
-                task = transcribe_recording_task.delay(
-                    recording_id=recording_id,
-                    user_id=ctx.user_id,
-                )
-                task_info = {
-                    "recording_id": recording_id,
-                    "status": "queued",
-                    "task_id": task.id,
-                    "mode": "sync_api",
-                    "check_status_url": f"/api/v1/tasks/{task.id}",
-                }
+        # Skip blank records
+        if recording.blank_record:
+            bulk.skip(recording_id, "Blank record (too short or too small)")
+            continue
 
-            tasks.append(task_info)
+        # Check if file is present
+        if not recording.processed_video_path and not recording.local_video_path:
+            bulk.error(recording_id, "No video file available")
+            continue
 
-            logger.info(
-                f"Bulk transcribe task {task.id} created for recording {recording_id}, user {ctx.user_id}, mode={task_info['mode']}"
-            )
+        if not should_allow_transcription(recording, allow_skipped=allow_skipped):
+            bulk.skip(recording_id, f"Transcription not allowed for status {recording.status.value}")
+            continue
 
-        except Exception as e:
-            logger.error(f"Failed to create transcribe task for recording {recording_id}: {e}")
-            tasks.append(
-                {
-                    "recording_id": recording_id,
-                    "status": "error",
-                    "error": str(e),
-                    "task_id": None,
-                }
+        # Select mode: Batch API (task submits audio and registers job for the poller) or sync API
+        if data.use_batch_api:
+            bulk.add(
+                BATCH_TRANSCRIBE_RECORDING,
+                recording_id,
+                reset_failed=True,
+                info={"mode": mode},
+                batch_id=None,
+                poll_interval=data.poll_interval,
+                max_wait_time=data.max_wait_time,
             )
+        else:
+            bulk.add(TRANSCRIBE_RECORDING, recording_id, reset_failed=True, info={"mode": mode})
 
-    queued_count = len([t for t in tasks if t["status"] == "queued"])
-    skipped_count = len([t for t in tasks if t["status"] == "skipped"])
-    error_count = len([t for t in tasks if t["status"] == "error"])
+    await bulk.dispatch(ctx.session)
 
-    return {
-        "queued_count": queued_count,
-        "skipped_count": skipped_count,
-        "error_count": error_count,
-        "mode": "batch_api" if data.use_batch_api else "sync_api",
-        "tasks": tasks,
-    }
+    return bulk.build_response(total=len(recording_ids), mode=mode)
 
 
 @router.post("/{recording_id}/retry-upload", response_model=RetryUploadResponse)
@@ -1831,7 +1762,6 @@ async def retry_failed_uploads(
     Returns:
         List of tasks for retry upload
     """
-    from api.tasks.upload import upload_recording_to_platform
 
     recording_repo = RecordingAsyncRepository(ctx.session)
 
@@ -1862,11 +1792,13 @@ async def retry_failed_uploads(
     tasks = []
     for target in failed_targets:
         try:
-            task = upload_recording_to_platform.delay(
+            task = await enqueue(
+                UPLOAD_RECORDING_TO_PLATFORM,
                 recording_id=recording_id,
                 user_id=ctx.user_id,
                 platform=target.target_type.value.lower(),
                 preset_id=target.preset_id,
+                upload_priority=UPLOAD_PRIORITY_MANUAL,
             )
 
             tasks.append(
@@ -2164,6 +2096,7 @@ async def reset_recording(
 
     # Clear recording metadata
     recording.local_video_path = None
+    recording.media_info = None
     recording.processed_video_path = None
     recording.processed_audio_path = None
     recording.transcription_dir = None
@@ -2218,75 +2151,43 @@ async def bulk_download_recordings(
 
     Supports recording_ids or filters for automatic selection.
     """
-    from api.tasks.processing import download_recording_task
+    from api.helpers.status_manager import should_allow_download
 
     # Resolve recording IDs
     recording_ids = await _resolve_recording_ids(data.recording_ids, data.filters, data.limit, ctx)
 
-    recording_repo = RecordingAsyncRepository(ctx.session)
-    tasks = []
+    recordings = await RecordingAsyncRepository(ctx.session).get_by_ids(recording_ids, ctx.user_id)
+    bulk = BulkDispatch(user_id=ctx.user_id)
 
     for recording_id in recording_ids:
-        try:
-            recording = await recording_repo.get_by_id(recording_id, ctx.user_id)
-            if not recording:
-                tasks.append(
-                    {
-                        "recording_id": recording_id,
-                        "status": "error",
-                        "error": "Recording not found",
-                        "task_id": None,
-                    }
-                )
-                continue
-
-            if recording.blank_record:
-                tasks.append(
-                    {
-                        "recording_id": recording_id,
-                        "status": "skipped",
-                        "error": "Blank record",
-                        "task_id": None,
-                    }
-                )
-                continue
+        recording = recordings.get(recording_id)
+        if not recording:
+            bulk.error(recording_id, "Recording not found")
+            continue
 
-            task = download_recording_task.delay(
-                recording_id=recording_id,
-                user_id=ctx.user_id,
-                force=data.force,
-                manual_override=None,
-            )
+        if recording.blank_record:
+            bulk.skip(recording_id, "Blank record")
+            continue
 
-            tasks.append(
-                {
-                    "recording_id": recording_id,
-                    "status": "queued",
-                    "task_id": task.id,
-                    "check_status_url": f"/api/v1/tasks/{task.id}",
-                }
-            )
+        if not should_allow_download(recording, allow_skipped=data.allow_skipped):
+            bulk.skip(recording_id, f"Download not allowed for status {recording.status.value}")
+            continue
 
-            logger.info(f"Bulk download task {task.id} for recording {recording_id}, user {ctx.user_id}")
+        if not (recording.source and recording.source.meta and recording.source.meta.get("download_url")):
+            bulk.error(recording_id, "No download URL available")
+            continue
 
-        except Exception as e:
-            logger.error(f"Failed to queue download for recording {recording_id}: {e}")
-            tasks.append(
-                {
-                    "recording_id": recording_id,
-                    "status": "error",
-                    "error": str(e),
-                    "task_id": None,
-                }
-            )
+        bulk.add(
+            DOWNLOAD_RECORDING,
+            recording_id,
+            reset_failed=True,
+            force=data.force,
+            manual_override=None,
+        )
 
-    queued_count = len([t for t in tasks if t["status"] == "queued"])
+    await bulk.dispatch(ctx.session)
 
-    return RecordingBulkOperationResponse(
-        queued_count=queued_count,
-        skipped_count=len([t for t in tasks if t["status"] == "skipped"]),
-        tasks=tasks,
-    )
+    return bulk.build_response(total=len(recording_ids))
 
 
 @router.post("/bulk/trim", response_model=RecordingBulkOperationResponse)
@@ -2299,7 +2200,8 @@ async def bulk_trim_recordings(
 
     Supports recording_ids or filters for automatic selection.
     """
-    from api.tasks.processing import trim_video_task
+    from api.helpers.config_resolver import get_allow_skipped_flag
+    from api.helpers.status_manager import should_allow_processing
 
     # Resolve recording IDs
     recording_ids = await _resolve_recording_ids(data.recording_ids, data.filters, data.limit, ctx)
@@ -2314,40 +2216,33 @@ async def bulk_trim_recordings(
         }
     }
 
-    recording_repo = RecordingAsyncRepository(ctx.session)
-    tasks = []
+    recordings = await RecordingAsyncRepository(ctx.session).get_by_ids(recording_ids, ctx.user_id)
+    allow_skipped = await get_allow_skipped_flag(ctx.session, ctx.user_id)
+    bulk = BulkDispatch(user_id=ctx.user_id)
 
     for recording_id in recording_ids:
-        try:
-            recording = await recording_repo.get_by_id(recording_id, ctx.user_id)
-            if not recording or recording.blank_record:
-                continue
+        recording = recordings.get(recording_id)
+        if not recording:
+            bulk.error(recording_id, "Recording not found")
+            continue
 
-            task = trim_video_task.delay(
-                recording_id=recording_id,
-                user_id=ctx.user_id,
-                manual_override=manual_override,
-            )
+        if recording.blank_record:
+            bulk.skip(recording_id, "Blank record")
+            continue
 
-            tasks.append(
-                {
-                    "recording_id": recording_id,
-                    "status": "queued",
-                    "task_id": task.id,
-                }
-            )
+        if not should_allow_processing(recording, allow_skipped=allow_skipped):
+            bulk.skip(recording_id, f"Processing not allowed for status {recording.status.value}")
+            continue
 
-        except Exception as e:
-            logger.error(f"Failed to queue trim for recording {recording_id}: {e}")
+        if not recording.local_video_path:
+            bulk.error(recording_id, "No video file available")
+            continue
 
-    queued_count = len([t for t in tasks if t["status"] == "queued"])
-    skipped_count = len([t for t in tasks if t["status"] == "skipped"])
+        bulk.add(TRIM_VIDEO, recording_id, reset_failed=True, manual_override=manual_override)
 
-    return {
-        "queued_count": queued_count,
-        "skipped_count": skipped_count,
-        "tasks": tasks,
-    }
+    await bulk.dispatch(ctx.session)
+
+    return bulk.build_response(total=len(recording_ids))
 
 
 @router.post("/bulk/topics", response_model=RecordingBulkOperationResponse)
@@ -2360,46 +2255,39 @@ async def bulk_extract_topics(
 
     Supports recording_ids or filters for automatic selection.
     """
-    from api.tasks.processing import extract_topics_task
+    from transcription_module.manager import get_transcription_manager
 
     # Resolve recording IDs
     recording_ids = await _resolve_recording_ids(data.recording_ids, data.filters, data.limit, ctx)
 
-    recording_repo = RecordingAsyncRepository(ctx.session)
-    tasks = []
+    recordings = await RecordingAsyncRepository(ctx.session).get_by_ids(recording_ids, ctx.user_id)
+    transcription_manager = get_transcription_manager()
+    bulk = BulkDispatch(user_id=ctx.user_id)
 
     for recording_id in recording_ids:
-        try:
-            recording = await recording_repo.get_by_id(recording_id, ctx.user_id)
-            if not recording or recording.blank_record:
-                continue
+        recording = recordings.get(recording_id)
+        if not recording:
+            bulk.error(recording_id, "Recording not found")
+            continue
 
-            task = extract_topics_task.delay(
-                recording_id=recording_id,
-                user_id=ctx.user_id,
-                granularity=data.granularity,
-                version_id=data.version_id,
-            )
+        if recording.blank_record:
+            bulk.skip(recording_id, "Blank record")
+            continue
 
-            tasks.append(
-                {
-                    "recording_id": recording_id,
-                    "status": "queued",
-                    "task_id": task.id,
-                }
-            )
+        if not transcription_manager.has_master(recording_id, user_id=ctx.user_id):
+            bulk.skip(recording_id, "No transcription found")
+            continue
 
-        except Exception as e:
-            logger.error(f"Failed to queue topics for recording {recording_id}: {e}")
+        bulk.add(
+            EXTRACT_TOPICS,
+            recording_id,
+            granularity=data.granularity,
+            version_id=data.version_id,
+        )
 
-    queued_count = len([t for t in tasks if t["status"] == "queued"])
-    skipped_count = len([t for t in tasks if t["status"] == "skipped"])
+    await bulk.dispatch(ctx.session)
 
-    return {
-        "queued_count": queued_count,
-        "skipped_count": skipped_count,
-        "tasks": tasks,
-    }
+    return bulk.build_response(total=len(recording_ids))
 
 
 @router.post("/bulk/subtitles", response_model=RecordingBulkOperationResponse)
@@ -2412,44 +2300,34 @@ async def bulk_generate_subtitles(
 
     Supports recording_ids or filters for automatic selection.
     """
-    from api.tasks.processing import generate_subtitles_task
+    from transcription_module.manager import get_transcription_manager
 
     # Resolve recording IDs
     recording_ids = await _resolve_recording_ids(data.recording_ids, data.filters, data.limit, ctx)
 
-    recording_repo = RecordingAsyncRepository(ctx.session)
-    tasks = []
+    recordings = await RecordingAsyncRepository(ctx.session).get_by_ids(recording_ids, ctx.user_id)
+    transcription_manager = get_transcription_manager()
+    bulk = BulkDispatch(user_id=ctx.user_id)
 
     for recording_id in recording_ids:
-        try:
-            recording = await recording_repo.get_by_id(recording_id, ctx.user_id)
-            if not recording or recording.blank_record:
-                continue
+        recording = recordings.get(recording_id)
+        if not recording:
+            bulk.error(recording_id, "Recording not found")
+            continue
 
-            task = generate_subtitles_task.delay(
-                recording_id=recording_id,
-                user_id=ctx.user_id,
-            )
+        if recording.blank_record:
+            bulk.skip(recording_id, "Blank record")
+            continue
 
-            tasks.append(
-                {
-                    "recording_id": recording_id,
-                    "status": "queued",
-                    "task_id": task.id,
-                }
-            )
+        if not transcription_manager.has_master(recording_id, user_id=ctx.user_id):
+            bulk.skip(recording_id, "No transcription found")
+            continue
 
-        except Exception as e:
-            logger.error(f"Failed to queue subtitles for recording {recording_id}: {e}")
+        bulk.add(GENERATE_SUBTITLES, recording_id, formats=data.formats)
 
-    queued_count = len([t for t in tasks if t["status"] == "queued"])
-    skipped_count = len([t for t in tasks if t["status"] == "skipped"])
+    await bulk.dispatch(ctx.session)
 
-    return {
-        "queued_count": queued_count,
-        "skipped_count": skipped_count,
-        "tasks": tasks,
-    }
+    return bulk.build_response(total=len(recording_ids))
 
 
 @router.post("/bulk/upload", response_model=RecordingBulkOperationResponse)
@@ -2462,49 +2340,49 @@ async def bulk_upload_recordings(
 
     Supports recording_ids or filters for automatic selection.
     """
-    from api.tasks.upload import upload_recording_to_platform
+    from api.helpers.config_resolver import get_allow_skipped_flag
+    from api.helpers.status_manager import should_allow_upload
+    from models.recording import TargetType
 
     # Resolve recording IDs
     recording_ids = await _resolve_recording_ids(data.recording_ids, data.filters, data.limit, ctx)
 
-    recording_repo = RecordingAsyncRepository(ctx.session)
-    tasks = []
+    recordings = await RecordingAsyncRepository(ctx.session).get_by_ids(recording_ids, ctx.user_id)
+    allow_skipped = await get_allow_skipped_flag(ctx.session, ctx.user_id)
+    platforms = data.platforms if data.platforms else ["youtube", "vk"]
+    bulk = BulkDispatch(user_id=ctx.user_id)
 
     for recording_id in recording_ids:
-        try:
-            recording = await recording_repo.get_by_id(recording_id, ctx.user_id)
-            if not recording or recording.blank_record:
-                continue
+        recording = recordings.get(recording_id)
+        if not recording:
+            bulk.error(recording_id, "Recording not found")
+            continue
 
-            platforms = data.platforms if data.platforms else ["youtube", "vk"]
+        if recording.blank_record:
+            bulk.skip(recording_id, "Blank record")
+            continue
 
-            for platform in platforms:
-                # Use preset_id from request, or let upload task auto-select from template
-                # (auto-select logic is in upload_recording_to_platform task)
-                task = upload_recording_to_platform.delay(
-                    recording_id=recording_id,
-                    user_id=ctx.user_id,
-                    platform=platform,
-                    preset_id=data.preset_id,  # Can be None - task will auto-select from template
-                )
+        for platform in platforms:
+            try:
+                target_type = TargetType[platform.upper()]
+            except KeyError:
+                bulk.error(recording_id, f"Invalid platform: {platform}", platform=platform)
+                continue
 
-                tasks.append(
-                    {
-                        "recording_id": recording_id,
-                        "platform": platform,
-                        "status": "queued",
-                        "task_id": task.id,
-                    }
-                )
+            if not should_allow_upload(recording, target_type.value, allow_skipped=allow_skipped):
+                bulk.skip(recording_id, "Upload already completed/in progress or not ready", platform=platform)
+                continue
 
-        except Exception as e:
-            logger.error(f"Failed to queue upload for recording {recording_id}: {e}")
+            # Use preset_id from request, or let upload task auto-select from template
+            # (auto-select logic is in upload_recording_to_platform task)
+            bulk.add(
+                UPLOAD_RECORDING_TO_PLATFORM,
+                recording_id,
+                info={"platform": platform},
+                platform=platform,
+                preset_id=data.preset_id,  # Can be None - task will auto-select from template
+            )
 
-    queued_count = len([t for t in tasks if t["status"] == "queued"])
-    skipped_count = len([t for t in tasks if t["status"] == "skipped"])
+    await bulk.dispatch(ctx.session)
 
-    return {
-        "queued_count": queued_count,
-        "skipped_count": skipped_count,
-        "tasks": tasks,
-    }
+    return bulk.build_response(total=len(recording_ids))
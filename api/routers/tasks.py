@@ -3,13 +3,59 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from api.auth.dependencies import get_current_user
-from api.schemas.task import TaskCancelResponse, TaskStatusResponse
+from api.schemas.task import BulkTaskStatusResponse, TaskCancelResponse, TaskStatusResponse
 from api.services.task_access_service import TaskAccessService
+from api.tasks.cancellation import COOPERATIVE_STEPS, request_cancel
 from database.auth_models import UserModel
 
 router = APIRouter(prefix="/api/v1/tasks", tags=["Tasks"])
 
 
+@router.get("/bulk/{bulk_id}", response_model=BulkTaskStatusResponse)
+async def get_bulk_task_status(
+    bulk_id: str,
+    current_user: UserModel = Depends(get_current_user),
+) -> BulkTaskStatusResponse:
+    """
+    Get aggregated status of a bulk job (all tasks queued by one bulk request).
+
+    Args:
+        bulk_id: bulk_id from the response of /api/v1/recordings/bulk/* endpoints
+        current_user: Current authenticated user
+
+    Returns:
+        Task counts by state and overall progress
+
+    Security:
+        Validates that the bulk job tasks belong to the current user
+    """
+    group_result = TaskAccessService.validate_group_access(bulk_id, current_user.id)
+
+    task_states = {task.id: task.state for task in group_result.results}
+    counts = {"PENDING": 0, "PROCESSING": 0, "SUCCESS": 0, "FAILURE": 0}
+    for state in task_states.values():
+        if state in ("STARTED", "RETRY"):
+            state = "PROCESSING"
+        elif state == "REVOKED":
+            state = "FAILURE"
+        counts[state] = counts.get(state, 0) + 1
+
+    total = len(task_states)
+    finished = counts["SUCCESS"] + counts["FAILURE"]
+
+    return BulkTaskStatusResponse(
+        bulk_id=bulk_id,
+        total=total,
+        pending=counts["PENDING"],
+        processing=counts["PROCESSING"],
+        succeeded=counts["SUCCESS"],
+        failed=counts["FAILURE"],
+        progress=int(finished * 100 / total) if total else 100,
+        completed=finished == total,
+        task_states=task_states,
+    )
+
+
 @router.get("/{task_id}", response_model=TaskStatusResponse)
 async def get_task_status(
     task_id: str,
@@ -123,8 +169,10 @@ async def cancel_task(
         Result of cancellation
 
     Note:
-        - Tasks that are already being executed may not be cancelled immediately
         - PENDING tasks will be cancelled
+        - Tasks running ffmpeg (trim/process) are cancelled cooperatively: the worker
+          terminates the ffmpeg process group and fails the task without retries
+        - Other running tasks are terminated
 
     Security:
         Validates that the task belongs to the current user
@@ -138,11 +186,21 @@ async def cancel_task(
             detail=f"Cannot cancel task in state {task.state}",
         )
 
-    # Cancel task
-    task.revoke(terminate=True, signal="SIGKILL")
+    info = task.info if isinstance(task.info, dict) else {}
+    cooperative = task.state == "PROCESSING" and info.get("step") in COOPERATIVE_STEPS
+
+    # Флаг ставится всегда: задачу мог взять воркер между чтением state и revoke
+    flag_set = request_cancel(task_id)
+    if cooperative and flag_set:
+        # Revoke без terminate: воркер сам остановит ffmpeg, повтор задачи отбрасывается
+        task.revoke()
+        message = "Task cancellation requested, ffmpeg will be stopped"
+    else:
+        task.revoke(terminate=True, signal="SIGKILL")
+        message = "Task cancellation requested"
 
     return TaskCancelResponse(
         task_id=task_id,
         status="cancelled",
-        message="Task cancellation requested",
+        message=message,
     )
@@ -11,6 +11,7 @@ from api.schemas.template import (
     RecordingTemplateResponse,
     RecordingTemplateUpdate,
 )
+from api.tasks.signatures import REMATCH_RECORDINGS, enqueue
 from database.auth_models import UserModel
 from logger import get_logger
 from models.recording import ProcessingStatus
@@ -88,10 +89,8 @@ async def create_template(
     )
 
     if auto_rematch and not template.is_draft and template.is_active:
-        # Import rematch task
-        from api.tasks.template import rematch_recordings_task
-
-        task = rematch_recordings_task.delay(
+        task = await enqueue(
+            REMATCH_RECORDINGS,
             template_id=template.id,
             user_id=current_user.id,
             only_unmapped=True,
@@ -286,6 +285,7 @@ async def delete_template(
             .values(
                 template_id=None,
                 is_mapped=False,
+                version=RecordingModel.version + 1,
             )
         )
         await session.execute(update_query)
@@ -552,9 +552,8 @@ async def rematch_template_recordings(
         )
 
     # Start background task
-    from api.tasks.template import rematch_recordings_task
-
-    task = rematch_recordings_task.delay(
+    task = await enqueue(
+        REMATCH_RECORDINGS,
         template_id=template_id,
         user_id=current_user.id,
         only_unmapped=only_unmapped,
@@ -13,6 +13,7 @@ from api.repositories.auth_repos import (
 )
 from api.schemas.auth import QuotaStatusResponse, QuotaUsageResponse, UserInDB, UserResponse, UserUpdate
 from api.schemas.auth.response import UserMeResponse
+from api.schemas.recording import RecordingStatsResponse
 from api.schemas.user import (
     AccountDeleteResponse,
     ChangePasswordRequest,
@@ -33,6 +34,7 @@ from database.models import (
     RecordingModel,
     SourceMetadataModel,
 )
+from database.recording_stats import get_user_stats, summarize
 from database.template_models import (
     InputSourceModel,
     OutputPresetModel,
@@ -114,6 +116,26 @@ async def get_my_quota(
         )
 
 
+@router.get("/me/stats", response_model=RecordingStatsResponse)
+async def get_my_stats(
+    current_user: UserInDB = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+):
+    """
+    Get recording counters of the current user (by status, by platform, storage, transcribed minutes).
+
+    Counters are materialized (recording_stats) and read without aggregating recordings.
+
+    Args:
+        current_user: Current user (from JWT token)
+        session: Database session
+
+    Returns:
+        RecordingStatsResponse: Recording counters
+    """
+    return RecordingStatsResponse(**summarize(await get_user_stats(session, current_user.id)))
+
+
 @router.get("/me/quota/history", response_model=list[QuotaUsageResponse])
 async def get_my_quota_history(
     current_user: UserInDB = Depends(get_current_user),
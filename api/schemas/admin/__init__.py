@@ -1,17 +1,27 @@
 """Admin endpoint schemas"""
 
 from .stats import (
+    AdminCredentialCacheStats,
     AdminOverviewStats,
+    AdminQueueStats,
     AdminQuotaStats,
     AdminUserStats,
     PlanUsageStats,
+    QueueLengthStats,
+    TaskDbHoldStats,
+    TenantQueueStats,
     UserQuotaDetails,
 )
 
 __all__ = [
+    "AdminCredentialCacheStats",
     "AdminOverviewStats",
+    "AdminQueueStats",
     "AdminQuotaStats",
     "AdminUserStats",
     "PlanUsageStats",
+    "QueueLengthStats",
+    "TaskDbHoldStats",
+    "TenantQueueStats",
     "UserQuotaDetails",
 ]
@@ -4,6 +4,8 @@ from decimal import Decimal
 
 from pydantic import BaseModel, Field
 
+from api.schemas.recording.response import RecordingStatsResponse
+
 
 class AdminOverviewStats(BaseModel):
     """Общая статистика платформы."""
@@ -14,6 +16,7 @@ class AdminOverviewStats(BaseModel):
     total_storage_gb: float = Field(..., description="Всего использовано хранилища (GB)")
     total_plans: int = Field(..., description="Всего тарифных планов")
     users_by_plan: dict[str, int] = Field(..., description="Распределение пользователей по планам")
+    recordings: RecordingStatsResponse | None = Field(None, description="Счетчики записей платформы")
 
 
 class UserQuotaDetails(BaseModel):
@@ -29,6 +32,7 @@ class UserQuotaDetails(BaseModel):
     is_exceeding: bool = Field(..., description="Превышены ли квоты")
     overage_enabled: bool
     overage_cost: Decimal = Field(default=Decimal("0"))
+    total_recordings: int = Field(0, description="Всего записей пользователя")
 
 
 class AdminUserStats(BaseModel):
@@ -59,3 +63,51 @@ class AdminQuotaStats(BaseModel):
     total_storage_gb: float
     total_overage_cost: Decimal
     plans: list[PlanUsageStats]
+
+
+class QueueLengthStats(BaseModel):
+    """Длина очереди в broker (все приоритеты)."""
+
+    queue: str
+    length: int
+
+
+class TenantQueueStats(BaseModel):
+    """Backlog и время ожидания задач пользователя в очереди."""
+
+    user_id: int
+    queue: str
+    queued: int = Field(..., description="Задач в очереди")
+    started_count: int = Field(..., description="Задач запущено за текущий и предыдущий час")
+    avg_wait_seconds: float | None = Field(None, description="Среднее ожидание в очереди (сек)")
+    max_wait_seconds: float | None = Field(None, description="Максимальное ожидание в очереди (сек)")
+
+
+class TaskDbHoldStats(BaseModel):
+    """Время удержания DB соединения задачами одного типа."""
+
+    task_name: str
+    count: int = Field(..., description="Задач за текущий и предыдущий час")
+    avg_seconds: float | None = Field(None, description="Среднее удержание соединения (сек)")
+    max_seconds: float | None = Field(None, description="Максимальное удержание соединения (сек)")
+
+
+class AdminQueueStats(BaseModel):
+    """Состояние очередей Celery по пользователям."""
+
+    queues: list[QueueLengthStats]
+    tenants: list[TenantQueueStats]
+    db_hold: list[TaskDbHoldStats] = Field(default_factory=list)
+
+
+class AdminCredentialCacheStats(BaseModel):
+    """Кэш расшифрованных credentials (все процессы) за текущий и предыдущий час."""
+
+    decrypts: int = Field(..., description="Расшифровок credentials (Fernet)")
+    hits: int = Field(..., description="Обращений, обслуженных из кэша")
+    misses: int = Field(..., description="Обращений с расшифровкой")
+    version_checks: int = Field(..., description="Проверок version после истечения TTL")
+    refreshes: int = Field(..., description="Refresh токенов через OAuth сервер")
+    refresh_collisions: int = Field(..., description="Refresh, вместо которых использован уже обновленный токен")
+    lock_waits: int = Field(..., description="Ожиданий refresh lock, занятого другой задачей")
+    hit_ratio: float | None = Field(None, description="Доля обращений из кэша")
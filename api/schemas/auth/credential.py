@@ -35,6 +35,7 @@ class UserCredentialInDB(UserCredentialBase):
     is_active: bool = True
     created_at: datetime
     last_used_at: datetime | None = None
+    version: int = 1
 
     class Config:
         from_attributes = True
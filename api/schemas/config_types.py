@@ -25,6 +25,14 @@ class ProcessingConfigData(BaseModel):
     intro_duration: float = Field(30.0, ge=0.0, description="Длительность вступления (сек)")
     outro_duration: float = Field(30.0, ge=0.0, description="Длительность заключения (сек)")
 
+    # Анализ аудио (считается в том же проходе ffmpeg, что и обрезка)
+    generate_waveform: bool = Field(False, description="Сохранять waveform (PNG) обработанного аудио")
+
+    # Пресет кодирования (video_processing_module.encode_presets); "" - системные кодеки ниже
+    encode_preset: Literal["", "auto", "copy", "fast-lecture", "archive-small", "lecture-camera"] = Field(
+        "", description="Пресет кодирования (auto - по типу контента)"
+    )
+
     # Системные настройки (не изменяются пользователем)
     video_codec: str = Field("copy", description="Видео кодек")
     audio_codec: str = Field("copy", description="Аудио кодек")
@@ -6,7 +6,12 @@ from .platform_credentials import (
     ZoomCredentialsManual,
 )
 from .request import CredentialCreateRequest, CredentialUpdateRequest
-from .response import CredentialDeleteResponse, CredentialResponse, CredentialStatusResponse
+from .response import (
+    CredentialDeleteResponse,
+    CredentialResponse,
+    CredentialStatusResponse,
+    YouTubeQuotaResponse,
+)
 
 __all__ = [
     "CredentialCreateRequest",
@@ -16,5 +21,6 @@ __all__ = [
     "CredentialUpdateRequest",
     "VKCredentialsManual",
     "YouTubeCredentialsManual",
+    "YouTubeQuotaResponse",
     "ZoomCredentialsManual",
 ]
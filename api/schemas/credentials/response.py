@@ -1,5 +1,7 @@
 """Response schemas for credentials endpoints."""
 
+from datetime import datetime
+
 from pydantic import BaseModel, Field
 
 
@@ -26,3 +28,17 @@ class CredentialDeleteResponse(BaseModel):
     """Подтверждение удаления."""
 
     message: str
+
+
+class YouTubeQuotaResponse(BaseModel):
+    """Квота YouTube Data API канала (credential)."""
+
+    credential_id: int
+    account_name: str | None = None
+    daily_limit: int = Field(..., description="Дневная квота в units")
+    used: int = Field(..., description="Израсходовано в текущем окне")
+    remaining: int = Field(..., description="Остаток в текущем окне")
+    resets_at: datetime = Field(..., description="Сброс квоты (полночь по тихоокеанскому времени)")
+    pending_uploads: int = Field(..., description="Загрузок, отложенных до следующих окон квоты")
+    pending_units: int = Field(..., description="Units, нужные отложенным загрузкам")
+    projected_drain_at: datetime | None = Field(None, description="Прогноз выгрузки отложенных загрузок")
@@ -22,6 +22,8 @@ from .request import (
 from .response import (
     RecordingListResponse,
     RecordingResponse,
+    RecordingStatsResponse,
+    TranscriptSearchResponse,
 )
 
 __all__ = [
@@ -44,6 +46,8 @@ __all__ = [
     "RecordingOperationResponse",
     # Response schemas
     "RecordingResponse",
+    "RecordingStatsResponse",
     "RetryUploadResponse",
     "TemplateInfoResponse",
+    "TranscriptSearchResponse",
 ]
@@ -25,18 +25,28 @@ class RecordingBulkOperationResponse(BaseModel):
 
     queued_count: int
     skipped_count: int
+    error_count: int | None = None
     total: int | None = None
+    bulk_id: str | None = None
+    check_status_url: str | None = None
     tasks: list[dict]
 
 
 class BulkProcessDryRunResponse(BaseModel):
     """
     Result of dry-run for bulk operation.
+
+    Counts cover all matched recordings, `recordings` is one page of details.
     """
 
     matched_count: int
     skipped_count: int
     total: int
+    skip_reasons: dict[str, int] | None = None
+    steps: dict[str, int] | None = None
+    page: int | None = None
+    per_page: int | None = None
+    total_pages: int | None = None
     recordings: list[dict]
 
 
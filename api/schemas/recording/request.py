@@ -191,7 +191,9 @@ class BulkTranscribeRequest(BulkOperationRequest):
     """Bulk транскрибация записей."""
 
     use_batch_api: bool = Field(False, description="Использовать Fireworks Batch API (экономия ~50%, но дольше)")
-    poll_interval: float = Field(10.0, description="Интервал polling для Batch API (секунды)")
+    poll_interval: float = Field(
+        10.0, description="Базовый интервал polling для Batch API (секунды, растет с возрастом job)"
+    )
     max_wait_time: float = Field(3600.0, description="Максимальное время ожидания Batch API (секунды)")
 
     class Config:
@@ -126,3 +126,44 @@ class ProcessRecordingResponse(BaseModel):
     recording_id: int
     status: ProcessingStatus
     estimated_time: int | None = Field(None, description="Оценка времени в секундах")
+
+
+class RecordingStatsResponse(BaseModel):
+    """Материализованные счетчики записей (пользователя или всей платформы)."""
+
+    total_recordings: int = Field(0, description="Всего записей")
+    failed_recordings: int = Field(0, description="Записей с ошибкой")
+    storage_bytes: int = Field(0, description="Суммарный размер исходных видео (байт)")
+    transcribed_recordings: int = Field(0, description="Записей с транскрипцией")
+    transcribed_minutes: int = Field(0, description="Минут транскрибированных записей")
+    by_status: dict[str, int] = Field(default_factory=dict, description="Записи по статусам")
+    uploads_by_platform: dict[str, int] = Field(default_factory=dict, description="Загруженные видео по платформам")
+
+
+class TranscriptSearchMatch(BaseModel):
+    """Совпадение в транскрипции или топиках записи."""
+
+    kind: str = Field(..., description="segment (транскрипция), topic (топик с таймкодом) или main_topic")
+    start: float | None = Field(None, description="Начало фрагмента (секунды от начала записи)")
+    end: float | None = Field(None, description="Конец фрагмента (секунды)")
+    snippet: str = Field(..., description="Фрагмент текста с выделенными совпадениями (<b>...</b>)")
+    rank: float = Field(..., description="Релевантность фрагмента")
+
+
+class TranscriptSearchItem(BaseModel):
+    """Запись с совпадениями поиска по транскрипциям."""
+
+    recording_id: int
+    display_name: str
+    start_time: datetime
+    duration: int
+    rank: float = Field(..., description="Релевантность записи (лучшее совпадение)")
+    matches_count: int = Field(..., description="Всего совпавших фрагментов")
+    matches: list[TranscriptSearchMatch] = Field(default_factory=list, description="Лучшие совпадения по времени")
+
+
+class TranscriptSearchResponse(PaginatedResponse):
+    """Результат полнотекстового поиска по транскрипциям и топикам."""
+
+    query: str
+    items: list[TranscriptSearchItem]
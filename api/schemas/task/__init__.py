@@ -1,5 +1,5 @@
 """Task-related schemas."""
 
-from .status import TaskCancelResponse, TaskProgressInfo, TaskResult, TaskStatusResponse
+from .status import BulkTaskStatusResponse, TaskCancelResponse, TaskProgressInfo, TaskResult, TaskStatusResponse
 
-__all__ = ["TaskCancelResponse", "TaskProgressInfo", "TaskResult", "TaskStatusResponse"]
+__all__ = ["BulkTaskStatusResponse", "TaskCancelResponse", "TaskProgressInfo", "TaskResult", "TaskStatusResponse"]
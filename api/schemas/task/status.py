@@ -52,3 +52,19 @@ class TaskCancelResponse(BaseModel):
     task_id: str
     status: str
     message: str
+
+
+class BulkTaskStatusResponse(BaseModel):
+    """Сводный статус bulk job (Celery group)."""
+
+    model_config = BASE_MODEL_CONFIG
+
+    bulk_id: str
+    total: int
+    pending: int = 0
+    processing: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    progress: int = Field(0, ge=0, le=100, description="Доля завершенных задач (0-100)")
+    completed: bool = False
+    task_states: dict[str, str] = Field(default_factory=dict, description="task_id → state")
@@ -120,6 +120,7 @@ class BulkSyncRequest(BaseModel):
     )
     from_date: str = Field("2024-01-01", description="Дата начала в формате YYYY-MM-DD")
     to_date: str | None = Field(None, description="Дата окончания в формате YYYY-MM-DD (опционально)")
+    incremental: bool = Field(False, description="Только окно с водяного знака последней синхронизации источника")
 
 
 class SourceSyncResult(BaseModel):
@@ -133,6 +134,9 @@ class SourceSyncResult(BaseModel):
     recordings_found: int | None = None
     recordings_saved: int | None = None
     recordings_updated: int | None = None
+    recordings_unchanged: int | None = None
+    api_calls_avoided: int | None = None
+    window_from: str | None = None
     error: str | None = None
 
 
@@ -10,6 +10,9 @@ class SyncSourceResponse(BaseModel):
     recordings_found: int | None = None
     recordings_saved: int | None = None
     recordings_updated: int | None = None
+    recordings_unchanged: int | None = None
+    api_calls_avoided: int | None = None
+    window_from: str | None = None
     error: str | None = None
 
 
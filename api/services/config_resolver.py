@@ -17,6 +17,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from api.repositories.config_repos import UserConfigRepository
 from api.repositories.template_repos import OutputPresetRepository, RecordingTemplateRepository
 from database.models import RecordingModel
+from database.template_models import OutputPresetModel, RecordingTemplateModel
 from logger import get_logger
 
 logger = get_logger()
@@ -222,11 +223,36 @@ class ConfigResolver:
         Raises:
             ValueError: If preset not found
         """
-        # 1. Get preset metadata (platform defaults)
         preset = await self.preset_repo.find_by_id(preset_id, user_id)
         if not preset:
             raise ValueError(f"Preset {preset_id} not found for user {user_id}")
 
+        template = None
+        if recording.template_id:
+            template = await self.template_repo.find_by_id(recording.template_id, user_id)
+
+        return self.merge_upload_metadata(recording, preset, template)
+
+    def merge_upload_metadata(
+        self,
+        recording: RecordingModel,
+        preset: OutputPresetModel,
+        template: RecordingTemplateModel | None,
+    ) -> dict[str, Any]:
+        """
+        Merge upload metadata from already loaded preset and template (see resolve_upload_metadata).
+
+        Used by batch uploads, which prefetch presets and templates in bulk.
+
+        Args:
+            recording: Recording model instance
+            preset: Output preset
+            template: Recording template (None - recording has no template or it was not found)
+
+        Returns:
+            Final merged metadata dict for upload
+        """
+        # 1. Get preset metadata (platform defaults)
         final_metadata = preset.preset_metadata or {}
         logger.info(
             f"[Metadata Resolution] Base preset '{preset.name}' (platform={preset.platform}) metadata keys: {list(final_metadata.keys())}"
@@ -240,7 +266,6 @@ class ConfigResolver:
 
         # 2. Merge with template metadata if exists (with platform-specific support)
         if recording.template_id:
-            template = await self.template_repo.find_by_id(recording.template_id, user_id)
             if template and template.metadata_config:
                 logger.info(
                     f"[Metadata Resolution] Merging template '{template.name}' metadata_config keys: {list(template.metadata_config.keys())}"
@@ -305,6 +330,17 @@ class ConfigResolver:
             logger.info("[Metadata Resolution] Final metadata does NOT have description_template")
         return final_metadata
 
+    async def load_layers(self, user_id: int, template_ids: set[int]) -> "ConfigLayers":
+        """
+        Load shared config layers for many recordings: user config and templates, one query each.
+
+        Used by bulk dry-run: configs of all recordings are then resolved in memory
+        with the same priority as resolve_processing_config / resolve_output_config.
+        """
+        user_config = await self._get_user_config(user_id)
+        templates = await self.template_repo.find_by_ids(sorted(template_ids), user_id)
+        return ConfigLayers(self, user_config, templates)
+
     async def _get_user_config(self, user_id: int) -> dict[str, Any]:
         """Get user configuration or return empty dict."""
         try:
@@ -350,3 +386,54 @@ class ConfigResolver:
                 result[key] = copy.deepcopy(value)
 
         return result
+
+
+class ConfigLayers:
+    """
+    User config + templates loaded once (ConfigResolver.load_layers).
+
+    The user+template merge is computed once per template_id; only recordings
+    with processing_preferences get an extra merge on top of the shared layer.
+    """
+
+    def __init__(
+        self,
+        resolver: ConfigResolver,
+        user_config: dict[str, Any],
+        templates: dict[int, RecordingTemplateModel],
+    ):
+        self._resolver = resolver
+        self._user_config = user_config
+        self._templates = templates
+        self._processing: dict[int | None, dict[str, Any]] = {}
+        self._output: dict[int | None, dict[str, Any]] = {}
+
+    def template(self, template_id: int | None) -> RecordingTemplateModel | None:
+        return self._templates.get(template_id) if template_id else None
+
+    def processing_config(self, template_id: int | None, preferences: dict[str, Any] | None) -> dict[str, Any]:
+        """Same result as ConfigResolver.resolve_processing_config (do not mutate: layer is shared)."""
+        if template_id not in self._processing:
+            config = self._user_config.get("processing", {})
+            template = self.template(template_id)
+            if template and template.processing_config:
+                config = self._resolver._merge_configs(config, template.processing_config)
+            self._processing[template_id] = config
+
+        config = self._processing[template_id]
+        if preferences:
+            config = self._resolver._merge_configs(config, preferences)
+        return config
+
+    def output_config(self, template_id: int | None, preferences: dict[str, Any] | None) -> dict[str, Any]:
+        """Same result as ConfigResolver.resolve_output_config (do not mutate: layer is shared)."""
+        if preferences and "output_config" in preferences:
+            return preferences["output_config"]
+
+        if template_id not in self._output:
+            config = self._user_config.get("output", {})
+            template = self.template(template_id)
+            if template and template.output_config:
+                config = self._resolver._merge_configs(config, template.output_config)
+            self._output[template_id] = config
+        return self._output[template_id]
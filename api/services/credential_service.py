@@ -8,6 +8,7 @@ from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.auth.credential_cache import get_credential_cache
 from api.auth.encryption import get_encryption
 from api.repositories.auth_repos import UserCredentialRepository
 from logger import get_logger
@@ -28,6 +29,7 @@ class CredentialService:
         self.session = session
         self.repo = UserCredentialRepository(session)
         self.encryption = get_encryption()
+        self.cache = get_credential_cache()
 
     async def get_decrypted_credentials(
         self, user_id: int, platform: str, account_name: str | None = None, raise_if_not_found: bool = True
@@ -63,7 +65,7 @@ class CredentialService:
             return None
 
         try:
-            decrypted = self.encryption.decrypt_credentials(credential.encrypted_data)
+            decrypted = self.cache.decrypt(credential, self.encryption)
             account_str = f" (account: {account_name})" if account_name else ""
             logger.debug(
                 f"Successfully decrypted credentials for platform '{platform}'{account_str} for user {user_id}"
@@ -121,7 +123,7 @@ class CredentialService:
             raise ValueError(f"Credential {credential_id} is inactive")
 
         try:
-            decrypted = self.encryption.decrypt_credentials(credential.encrypted_data)
+            decrypted = self.cache.decrypt(credential, self.encryption)
             logger.debug(f"Successfully decrypted credential {credential_id} (platform: {credential.platform})")
             return decrypted
         except Exception as e:
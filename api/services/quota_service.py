@@ -73,6 +73,25 @@ class QuotaService:
             or plan.min_automation_interval_hours,
         }
 
+    async def get_scheduling_profile(self, user_id: int) -> tuple[str, int | None]:
+        """
+        Получить план и лимит одновременных задач для планировщика очередей.
+
+        Returns:
+            (plan_name, max_concurrent_tasks), max_concurrent_tasks=None - без лимита
+        """
+        subscription = await self.subscription_repo.get_by_user_id(user_id)
+        plan = (
+            await self.plan_repo.get_by_id(subscription.plan_id)
+            if subscription
+            else await self.plan_repo.get_by_name("free")
+        )
+        if not plan:
+            raise ValueError(f"Plan for user {user_id} not found")
+
+        custom_limit = subscription.custom_max_concurrent_tasks if subscription else None
+        return plan.name, custom_limit or plan.max_concurrent_tasks
+
     # ========================================
     # QUOTA CHECKS
     # ========================================
@@ -5,16 +5,18 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any
 
+from api.helpers.sync_watermark import SyncWatermark
 from api.repositories.recording_repo import RecordingRepository
 from api.schemas.common.pagination import PaginationParams
 from api.schemas.recording.request import ProcessRecordingRequest, UpdateRecordingRequest
 from api.schemas.recording.response import RecordingListResponse, RecordingResponse
 from api.shared.exceptions import NotFoundError
-from api.tasks.processing import (
-    generate_subtitles as generate_subtitles_task,
-    process_single_recording,
+from api.tasks.signatures import (
+    BATCH_UPLOAD_RECORDINGS,
+    GENERATE_SUBTITLES,
+    PROCESS_RECORDING,
+    enqueue_with_options,
 )
-from api.tasks.upload import batch_upload_recordings as upload_to_platforms
 from api.zoom_api import ZoomAPI
 from config.unified_config import AppConfig, load_app_config
 from logger import get_logger
@@ -133,7 +135,8 @@ class RecordingService:
         recording.processing_preferences = prefs
         await self.repo.save(recording)
 
-        task = process_single_recording.apply_async(
+        task = await enqueue_with_options(
+            PROCESS_RECORDING,
             args=[recording_id],
             kwargs={
                 "enable_transcription": enable_transcription,
@@ -143,7 +146,6 @@ class RecordingService:
                 "topic_model": request.topic_model,
                 "granularity": request.granularity,
             },
-            priority=7,  # Высокий приоритет для одиночных задач
         )
 
         return {
@@ -172,9 +174,9 @@ class RecordingService:
             return {"message": "No recordings specified", "count": 0}
 
         # Запускаем через Celery (асинхронно)
-        task = generate_subtitles_task.apply_async(
+        task = await enqueue_with_options(
+            GENERATE_SUBTITLES,
             args=[recording_ids],
-            priority=6,  # Высокий приоритет
         )
 
         return {
@@ -205,13 +207,13 @@ class RecordingService:
             return {"message": "No recordings specified", "count": 0}
 
         # Запускаем через Celery (асинхронно)
-        task = upload_to_platforms.apply_async(
+        task = await enqueue_with_options(
+            BATCH_UPLOAD_RECORDINGS,
             args=[recording_ids],
             kwargs={
                 "youtube": "youtube" in platforms,
                 "vk": "vk" in platforms,
             },
-            priority=6,  # Высокий приоритет
         )
 
         return {
@@ -382,6 +384,7 @@ class RecordingService:
                 recording.processed_video_path = None
                 recording.processed_audio_path = None
                 recording.downloaded_at = None
+                recording.media_info = None
 
                 recording.transcription_dir = None
                 recording.transcription_info = None
@@ -423,8 +426,20 @@ class RecordingService:
 
         return self._to_response(recording)
 
-    async def _sync_zoom_recordings(self, configs: dict, from_date: str, to_date: str | None = None) -> int:
-        """Sync recordings from Zoom API to database for the specified period."""
+    async def _sync_zoom_recordings(
+        self,
+        configs: dict,
+        from_date: str,
+        to_date: str | None = None,
+        watermark: SyncWatermark | None = None,
+    ) -> int:
+        """
+        Sync recordings from Zoom API to database for the specified period.
+
+        With watermark, meetings unchanged since the previous sync are skipped before details
+        requests and DB writes. A meeting is marked synced only when all its parts were saved;
+        the caller saves the watermark.
+        """
         self.logger.info(f"📥 Syncing Zoom recordings for period {from_date} - {to_date or 'current date'}...")
         all_recordings = []
 
@@ -434,7 +449,7 @@ class RecordingService:
             try:
                 api = ZoomAPI(config)
                 recordings = await get_recordings_by_date_range(
-                    api, start_date=from_date, end_date=to_date, filter_video_only=False
+                    api, start_date=from_date, end_date=to_date, filter_video_only=False, watermark=watermark
                 )
 
                 if recordings:
@@ -451,9 +466,19 @@ class RecordingService:
                 continue
 
         # Sync all recordings to DB (including deduplication)
-        synced_count = 0
+        saved_keys: set[str] = set()
+        failed_keys: set[str] = set()
         if all_recordings:
-            synced_count = await self._sync_recordings_to_db(all_recordings)
+            saved_keys, failed_keys = await self._sync_recordings_to_db(all_recordings)
+        synced_count = len(saved_keys)
+
+        if watermark is not None:
+            failed_meetings = {str(r.meeting_id) for r in all_recordings if r.source_key in failed_keys}
+            for meeting_id in {str(r.meeting_id) for r in all_recordings}:
+                if meeting_id in failed_meetings:
+                    watermark.mark_failed(meeting_id)
+                else:
+                    watermark.mark_synced(meeting_id)
 
         updated_skipped_count = await self._check_and_update_skipped_recordings(from_date, to_date)
 
@@ -463,10 +488,16 @@ class RecordingService:
         self.logger.info("📋 No recordings found")
         return 0
 
-    async def _sync_recordings_to_db(self, recordings: list[MeetingRecording]) -> int:
-        """Sync recordings to database."""
+    async def _sync_recordings_to_db(self, recordings: list[MeetingRecording]) -> tuple[set[str], set[str]]:
+        """
+        Sync recordings to database.
+
+        Returns:
+            (source_key of saved recordings, source_key of recordings that failed to save);
+            recordings filtered out by duration/size are in neither set
+        """
         if not recordings:
-            return 0
+            return set(), set()
 
         filtered_recordings = filter_available_recordings(recordings, min_duration_minutes=25, min_size_mb=30)
         filtered_count = len(recordings) - len(filtered_recordings)
@@ -477,9 +508,10 @@ class RecordingService:
         for recording in filtered_recordings:
             self._check_and_set_mapping(recording)
 
-        synced_count = await self.repo.save_batch(filtered_recordings)
-        self.logger.info(f"Synced recordings: {synced_count}/{len(filtered_recordings)}")
-        return synced_count
+        saved_keys = set(await self.repo.save_batch(filtered_recordings))
+        failed_keys = {recording.source_key for recording in filtered_recordings} - saved_keys
+        self.logger.info(f"Synced recordings: {len(saved_keys)}/{len(filtered_recordings)}")
+        return saved_keys, failed_keys
 
     def _check_and_set_mapping(self, recording: MeetingRecording) -> None:
         """Check recording mapping and set appropriate status."""
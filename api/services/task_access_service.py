@@ -4,7 +4,7 @@
 используя метаданные Celery для проверки владельца задачи.
 """
 
-from celery.result import AsyncResult
+from celery.result import AsyncResult, GroupResult
 from fastapi import HTTPException, status
 
 from api.celery_app import celery_app
@@ -106,3 +106,42 @@ class TaskAccessService:
 
         logger.debug(f"User {user_id} validated access to task {task_id}")
         return task
+
+    @staticmethod
+    def validate_group_access(group_id: str, user_id: int) -> GroupResult:
+        """
+        Проверить доступ пользователя к bulk job (Celery group).
+
+        Владелец определяется по задачам группы: доступ запрещен, если хотя бы одна
+        задача принадлежит другому пользователю. Пока все задачи в очереди (PENDING),
+        проверка невозможна - как и для одиночных задач, доступ разрешается.
+
+        Args:
+            group_id: ID группы (bulk_id)
+            user_id: ID текущего пользователя
+
+        Returns:
+            GroupResult группы
+
+        Raises:
+            HTTPException: Если группа не найдена или доступ запрещен
+        """
+        group_result = GroupResult.restore(group_id, app=celery_app)
+        if group_result is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Bulk job not found or expired",
+            )
+
+        for task in group_result.results:
+            if task.state == "PENDING":
+                continue
+            task_user_id = TaskAccessService._extract_user_id_from_task(task)
+            if task_user_id is not None and task_user_id != user_id:
+                logger.warning(f"User {user_id} attempted to access bulk job {group_id} owned by user {task_user_id}")
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Access denied. This bulk job belongs to another user.",
+                )
+
+        return group_result
@@ -1,14 +1,33 @@
-"""Celery async tasks"""
-
-from .automation import run_automation_job_task
-from .maintenance import cleanup_expired_tokens_task
-from .processing import (
-    download_recording_task,
-    extract_topics_task,
-    generate_subtitles_task,
-    process_recording_task,
-    transcribe_recording_task,
-    trim_video_task,
-)
-from .sync_tasks import bulk_sync_sources_task, sync_single_source_task
-from .upload import batch_upload_recordings, upload_recording_to_platform
+"""Celery async tasks
+
+Модули задач загружаются лениво: `import api.tasks.signatures` не тянет тела задач
+и их зависимости. Для постановки задач из API используйте api.tasks.signatures.
+"""
+
+from importlib import import_module
+
+_LAZY_TASKS = {
+    "run_automation_job_task": "automation",
+    "cleanup_expired_tokens_task": "maintenance",
+    "reconcile_recording_stats_task": "maintenance",
+    "download_recording_task": "processing",
+    "extract_topics_task": "processing",
+    "generate_subtitles_task": "processing",
+    "process_recording_task": "processing",
+    "transcribe_recording_task": "processing",
+    "trim_video_task": "processing",
+    "bulk_sync_sources_task": "sync_tasks",
+    "sync_single_source_task": "sync_tasks",
+    "batch_upload_recordings": "upload",
+    "upload_channel_batch": "upload",
+    "upload_recording_to_platform": "upload",
+}
+
+__all__ = list(_LAZY_TASKS)
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_TASKS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(f"{__name__}.{module_name}"), name)
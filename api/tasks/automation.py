@@ -73,12 +73,21 @@ def run_automation_job_task(self, job_id: int, user_id: int):  # noqa: ARG001
                 to_date = datetime.now().strftime("%Y-%m-%d")
                 from_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
 
+                # Incremental: window since the source sync watermark, unchanged meetings are skipped
+                from api.helpers.sync_watermark import SyncWatermark
+
+                watermark = await SyncWatermark.load(session, source.id, user_id)
+                from_date = watermark.window_start(from_date, to_date)
+
                 # Sync via RecordingService
                 recording_repo = RecordingRepository(session)
                 recording_service = RecordingService(repo=recording_repo)
-                synced_count = await recording_service._sync_zoom_recordings(creds_data, from_date, to_date)
+                synced_count = await recording_service._sync_zoom_recordings(
+                    creds_data, from_date, to_date, watermark=watermark
+                )
+                await watermark.save(session)
 
-                logger.info(f"Job {job_id}: Synced {synced_count} new recordings")
+                logger.info(f"Job {job_id}: Synced {synced_count} new recordings | sync={watermark.stats.as_dict()}")
 
                 # Step 2: Get INITIALIZED recordings (newly synced)
                 recording_repo = RecordingRepository(session)
@@ -97,11 +106,19 @@ def run_automation_job_task(self, job_id: int, user_id: int):  # noqa: ARG001
                     auto_upload = processing_config.get("auto_upload", True)
                     manual_override = {"upload": {"auto_upload": auto_upload}} if auto_upload else None
 
-                    for recording in new_recordings:
-                        task = process_recording_task.delay(
-                            recording_id=recording.id,
-                            user_id=user_id,
-                            manual_override=manual_override,
+                    from api.tasks.scheduling import refresh_tenant_profile, schedule
+
+                    await refresh_tenant_profile(session, user_id)
+                    scheduled = schedule(process_recording_task.name, user_id, len(new_recordings))
+
+                    for recording, options in zip(new_recordings, scheduled, strict=True):
+                        task = process_recording_task.apply_async(
+                            kwargs={
+                                "recording_id": recording.id,
+                                "user_id": user_id,
+                                "manual_override": manual_override,
+                            },
+                            **options,
                         )
 
                         processed_recordings.append({"recording_id": recording.id, "task_id": str(task.id)})
@@ -121,6 +138,7 @@ def run_automation_job_task(self, job_id: int, user_id: int):  # noqa: ARG001
                     "status": "success",
                     "job_id": job_id,
                     "synced_count": synced_count,
+                    "sync_stats": watermark.stats.as_dict(),
                     "processed_count": len(processed_recordings),
                     "processed_recordings": processed_recordings,
                     "next_run_at": next_run.isoformat(),
@@ -4,11 +4,16 @@ Provides common functionality for all Celery tasks:
 - User ID tracking in task metadata
 - Standardized result format
 - Logging hooks
+- ffmpeg progress and cooperative cancellation
 """
 
+from contextlib import AbstractContextManager
+
 from celery import Task
 
+from api.tasks.cancellation import is_cancel_requested
 from logger import get_logger
+from utils.ffmpeg_runner import FFmpegProgress, ffmpeg_hooks
 
 logger = get_logger()
 
@@ -60,6 +65,44 @@ class BaseTask(Task):
 
         self.update_state(state="PROCESSING", meta=meta)
 
+    def ffmpeg_hooks(
+        self,
+        user_id: int,
+        status: str,
+        step: str,
+        start_progress: int,
+        end_progress: int,
+    ) -> AbstractContextManager:
+        """
+        Прогресс и отмена для всех ffmpeg, запущенных внутри блока.
+
+        Прогресс ffmpeg (out_time, speed, fps) отображается на диапазон
+        start_progress..end_progress задачи; флаг отмены DELETE /tasks/{task_id}
+        проверяется через api.tasks.cancellation.
+
+        Usage:
+            with self.ffmpeg_hooks(user_id, "Processing with FFmpeg...", "process", 40, 90):
+                await processor.process_video_with_speech_audio(...)
+        """
+        task_id = self.request.id
+
+        def on_progress(progress: FFmpegProgress) -> None:
+            percent = progress.percent
+            value = start_progress
+            if percent is not None:
+                value += int((end_progress - start_progress) * percent / 100)
+            self.update_progress(
+                user_id,
+                value,
+                status,
+                step=step,
+                out_time=round(progress.out_time, 1),
+                speed=progress.speed,
+                fps=progress.fps,
+            )
+
+        return ffmpeg_hooks(on_progress=on_progress, cancel_check=lambda: is_cancel_requested(task_id))
+
     def build_result(self, user_id: int, status: str = "completed", **data) -> dict:
         """
         Build standardized task result with user_id.
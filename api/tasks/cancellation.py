@@ -0,0 +1,59 @@
+"""Кооперативная отмена выполняющихся задач.
+
+DELETE /api/v1/tasks/{task_id} раньше делал revoke(terminate=True, SIGKILL):
+процесс воркера убивался, а запущенный им ffmpeg оставался сиротой и
+дописывал файл. Теперь для задач на стадии ffmpeg API ставит флаг в Redis,
+а utils.ffmpeg_runner периодически его проверяет (cancel_check из
+BaseTask.ffmpeg_hooks) и завершает группу процессов ffmpeg; задача падает
+с FFmpegCancelledError без повторов. Полный pipeline (process_recording)
+проверяет флаг и перед каждым следующим этапом.
+
+Состояние в Redis (тот же инстанс, что и broker):
+    leap:task:cancel:{task_id} - флаг запроса отмены (TTL)
+"""
+
+from functools import lru_cache
+
+import redis
+
+from api.config import get_settings
+from logger import get_logger
+
+logger = get_logger()
+
+CANCEL_KEY = "leap:task:cancel:{task_id}"
+CANCEL_TTL_SECONDS = 24 * 3600
+
+# Стадии, на которых задача проверяет флаг отмены (ffmpeg через utils.ffmpeg_runner)
+COOPERATIVE_STEPS = frozenset({"trim", "process"})
+
+
+@lru_cache(maxsize=1)
+def _redis() -> redis.Redis:
+    return redis.Redis.from_url(
+        get_settings().celery_broker_url,
+        decode_responses=True,
+        socket_timeout=1,
+        socket_connect_timeout=1,
+    )
+
+
+def request_cancel(task_id: str) -> bool:
+    """Поставить флаг отмены. False - Redis недоступен."""
+    try:
+        _redis().set(CANCEL_KEY.format(task_id=task_id), "1", ex=CANCEL_TTL_SECONDS)
+        return True
+    except redis.RedisError as e:
+        logger.warning(f"Failed to set cancel flag for task {task_id}: {e}")
+        return False
+
+
+def is_cancel_requested(task_id: str | None) -> bool:
+    """Запрошена ли отмена задачи (ошибка Redis - не отменять)."""
+    if not task_id:
+        return False
+    try:
+        return bool(_redis().exists(CANCEL_KEY.format(task_id=task_id)))
+    except redis.RedisError as e:
+        logger.debug(f"Failed to check cancel flag for task {task_id}: {e}")
+        return False
@@ -54,3 +54,76 @@ def cleanup_expired_tokens_task():
     except Exception as e:
         logger.error(f"Failed to cleanup expired tokens: {e}", exc_info=True)
         return {"status": "error", "error": str(e)}
+
+
+@celery_app.task(name="maintenance.gc_artifact_store")
+def gc_artifact_store_task():
+    """
+    Periodic garbage collection of the content-addressed artifact store.
+
+    Drops references to deleted user files and removes artifacts that stayed
+    unreferenced longer than the grace period. Also prunes stale ffprobe and loudness envelope sidecars.
+    Runs daily (configured in Celery Beat).
+    """
+    from utils.artifact_store import get_artifact_store
+    from utils.loudness_envelope import get_envelope_analyzer
+    from utils.media_probe import get_media_probe
+
+    pruned = get_media_probe().prune_sidecars()
+    if pruned:
+        logger.info(f"Pruned {pruned} stale ffprobe sidecars")
+    pruned = get_envelope_analyzer().prune_sidecars()
+    if pruned:
+        logger.info(f"Pruned {pruned} stale loudness envelope sidecars")
+
+    store = get_artifact_store()
+    if store is None:
+        return {"status": "skipped", "message": "Artifact store is disabled"}
+
+    try:
+        stats = store.gc()
+        return {"status": "success", **stats}
+    except Exception as e:
+        logger.error(f"Failed to gc artifact store: {e}", exc_info=True)
+        return {"status": "error", "error": str(e)}
+
+
+@celery_app.task(name="maintenance.reconcile_recording_stats")
+def reconcile_recording_stats_task():
+    """
+    Periodic reconciliation of materialized recording counters (recording_stats).
+
+    Counters are maintained incrementally at flush time; changes made outside the ORM
+    or on partially loaded rows are corrected here. Users are processed in batches,
+    one short transaction per batch. Runs daily (configured in Celery Beat).
+    """
+    import asyncio
+
+    from database.recording_stats import RECONCILE_BATCH_USERS, list_stats_users, reconcile_users
+
+    async def reconcile() -> tuple[int, int]:
+        db_manager = DatabaseManager(DatabaseConfig.from_env())
+        try:
+            async with db_manager.async_session() as session:
+                user_ids = await list_stats_users(session)
+
+            drift = 0
+            for start in range(0, len(user_ids), RECONCILE_BATCH_USERS):
+                batch = user_ids[start : start + RECONCILE_BATCH_USERS]
+                async with db_manager.async_session() as session:
+                    drift += await reconcile_users(session, batch)
+                    await session.commit()
+            return len(user_ids), drift
+        finally:
+            await db_manager.close()
+
+    try:
+        users, drift = asyncio.run(reconcile())
+        if drift:
+            logger.warning(f"Recording stats reconciled: {drift} metrics corrected for {users} users")
+        else:
+            logger.info(f"Recording stats reconciled: {users} users, no drift")
+        return {"status": "success", "users": users, "corrected_metrics": drift}
+    except Exception as e:
+        logger.error(f"Failed to reconcile recording stats: {e}", exc_info=True)
+        return {"status": "error", "error": str(e)}
@@ -6,12 +6,16 @@ from pathlib import Path
 from celery.exceptions import SoftTimeLimitExceeded
 
 from api.celery_app import celery_app
+from api.helpers.unit_of_work import TaskUnitOfWork
 from api.repositories.recording_repos import RecordingAsyncRepository
 from api.tasks.base import ProcessingTask
+from api.tasks.cancellation import is_cancel_requested
+from api.tasks.scheduling import schedule
 from database.config import DatabaseConfig
 from database.manager import DatabaseManager
 from logger import get_logger
 from models import MeetingRecording, ProcessingStageType, ProcessingStatus
+from utils.ffmpeg_runner import FFmpegCancelledError
 from video_download_module.downloader import ZoomDownloader
 from video_processing_module.video_processor import VideoProcessor
 
@@ -77,14 +81,9 @@ async def _async_download_recording(
     manual_override: dict | None = None,
 ) -> dict:
     """Async function for downloading (template-driven)."""
-    from api.helpers.config_resolution_helper import resolve_full_config
-
-    db_config = DatabaseConfig.from_env()
-    db_manager = DatabaseManager(db_config)
-
-    async with db_manager.async_session() as session:
+    async with TaskUnitOfWork("download", recording_id, user_id) as uow:
         # Resolve config
-        full_config, recording = await resolve_full_config(session, recording_id, user_id, manual_override)
+        full_config, recording = await uow.load(manual_override)
 
         download_config = full_config.get("download", {})
 
@@ -97,12 +96,9 @@ async def _async_download_recording(
             f"max_file_size_mb={max_file_size_mb}, retry_attempts={retry_attempts}"
         )
 
-        recording_repo = RecordingAsyncRepository(session)
-
         # Check download_url
-        download_url = None
-        if recording.source and recording.source.meta:
-            download_url = recording.source.meta.get("download_url")
+        source_meta = recording.source_meta
+        download_url = source_meta.get("download_url")
 
         if not download_url:
             raise ValueError("No download URL available. Please sync from Zoom first.")
@@ -111,10 +107,10 @@ async def _async_download_recording(
         if not force and recording.status == ProcessingStatus.DOWNLOADED and recording.local_video_path:
             if Path(recording.local_video_path).exists():
                 return {
-                "success": True,
-                "message": "Already downloaded",
-                "local_video_path": recording.local_video_path,
-            }
+                    "success": True,
+                    "message": "Already downloaded",
+                    "local_video_path": recording.local_video_path,
+                }
 
         task_self.update_progress(
             user_id=user_id,
@@ -128,16 +124,7 @@ async def _async_download_recording(
         downloader = ZoomDownloader(download_dir=user_download_dir)
 
         # Convert to MeetingRecording
-        meeting_id = recording.source.source_key if recording.source else str(recording.id)
-        file_size = recording.source.meta.get("file_size", 0) if recording.source and recording.source.meta else 0
-        download_access_token = (
-            recording.source.meta.get("download_access_token") if recording.source and recording.source.meta else None
-        )
-        passcode = (
-            recording.source.meta.get("recording_play_passcode") if recording.source and recording.source.meta else None
-        )
-        password = recording.source.meta.get("password") if recording.source and recording.source.meta else None
-        account = recording.source.meta.get("account") if recording.source and recording.source.meta else None
+        meeting_id = recording.source_key or str(recording.id)
 
         meeting_recording = MeetingRecording(
             {
@@ -146,38 +133,41 @@ async def _async_download_recording(
                 "topic": recording.display_name,
                 "start_time": recording.start_time.isoformat(),
                 "duration": recording.duration or 0,
-                "account": account or "default",
+                "account": source_meta.get("account") or "default",
                 "recording_files": [
                     {
                         "file_type": "MP4",
-                        "file_size": file_size,
+                        "file_size": source_meta.get("file_size", 0),
                         "download_url": download_url,
                         "recording_type": "shared_screen_with_speaker_view",
-                        "download_access_token": download_access_token,
+                        "download_access_token": source_meta.get("download_access_token"),
                     }
                 ],
-                "password": password,
-                "recording_play_passcode": passcode,
+                "password": source_meta.get("password"),
+                "recording_play_passcode": source_meta.get("recording_play_passcode"),
             }
         )
         meeting_recording.db_id = recording.id
 
         task_self.update_progress(user_id, 50, "Saving video file...", step="download")
 
-        # Download
-        success = await downloader.download_recording(meeting_recording, force_download=force)
+        # Download (без DB сессии)
+        success = await downloader.download_recording(meeting_recording, force_download=force, user_id=user_id)
 
         if success:
             task_self.update_progress(user_id, 90, "Updating database...", step="download")
 
-            recording.local_video_path = meeting_recording.local_video_path
-            recording.status = ProcessingStatus.DOWNLOADED
-            await recording_repo.update(recording)
-            await session.commit()
+            def apply(db_recording):
+                db_recording.local_video_path = meeting_recording.local_video_path
+                db_recording.media_info = meeting_recording.media_info
+                db_recording.status = ProcessingStatus.DOWNLOADED
+
+            # apply перезаписывает статус: при конкурентном изменении записи - StaleRecordingError и retry
+            await uow.save(recording, apply, on_conflict="fail")
 
             return {
                 "success": True,
-                "local_video_path": recording.local_video_path,
+                "local_video_path": meeting_recording.local_video_path,
             }
         raise Exception("Download failed")
 
@@ -230,6 +220,10 @@ def trim_video_task(
         logger.error(f"[Task {self.request.id}] Soft time limit exceeded")
         raise self.retry(countdown=600, exc=SoftTimeLimitExceeded())
 
+    except FFmpegCancelledError:
+        logger.warning(f"[Task {self.request.id}] Cancelled by user request")
+        raise
+
     except Exception as exc:
         logger.error(f"[Task {self.request.id}] Error processing: {exc!r}", exc_info=True)
         raise self.retry(exc=exc)
@@ -242,14 +236,9 @@ async def _async_process_video(
     manual_override: dict | None = None,
 ) -> dict:
     """Async function for processing video (template-driven)."""
-    from api.helpers.config_resolution_helper import resolve_full_config
-
-    db_config = DatabaseConfig.from_env()
-    db_manager = DatabaseManager(db_config)
-
-    async with db_manager.async_session() as session:
+    async with TaskUnitOfWork("process", recording_id, user_id) as uow:
         # Resolve config from hierarchy
-        full_config, recording = await resolve_full_config(session, recording_id, user_id, manual_override)
+        full_config, recording = await uow.load(manual_override)
 
         processing_config = full_config.get("processing", {})
 
@@ -264,8 +253,6 @@ async def _async_process_video(
             f"silence_threshold={silence_threshold}, min_silence_duration={min_silence_duration}"
         )
 
-        recording_repo = RecordingAsyncRepository(session)
-
         if not recording.local_video_path:
             raise ValueError("No video file available. Please download first.")
 
@@ -276,103 +263,78 @@ async def _async_process_video(
 
         # Create processor with ProcessingConfig
         from video_processing_module.config import ProcessingConfig
+        from video_processing_module.media_info import MediaInfo
 
         user_processed_dir = f"media/user_{user_id}/video/processed"
+        # Пресет кодирования из конфига; пусто - системный settings.processing.encode_preset
+        preset_override = {}
+        if processing_config.get("encode_preset"):
+            preset_override["encode_preset"] = processing_config["encode_preset"]
         config = ProcessingConfig(
             silence_threshold=silence_threshold,
             min_silence_duration=min_silence_duration,
             padding_before=padding_before,
             padding_after=padding_after,
             output_dir=user_processed_dir,
+            **preset_override,
         )
         processor = VideoProcessor(config)
+        if recording.media_info:
+            # Media info, полученный при скачивании: без повторных ffprobe исходника
+            processor.register_media_info(recording.local_video_path, MediaInfo.from_dict(recording.media_info))
 
         task_self.update_progress(user_id, 40, "Processing with FFmpeg...", step="process")
 
-        # Process video with audio detection
-        success, processed_path = await processor.process_video_with_audio_detection(
-            video_path=recording.local_video_path,
-            title=recording.display_name,
-            start_time=recording.start_time.isoformat(),
-        )
-
-        # Ensure processed_path is a string (not Path object)
-        if processed_path:
-            processed_path = str(processed_path)
-
-        if success and processed_path:
-            task_self.update_progress(user_id, 60, "Extracting audio from processed video...", step="extract_audio")
+        from utils.formatting import sanitize_filename
 
-            # Extract audio from processed video
-            import subprocess
-
-            from utils.formatting import sanitize_filename
-
-            audio_dir = f"media/user_{user_id}/audio/processed"
-            Path(audio_dir).mkdir(parents=True, exist_ok=True)
-
-            # Generate filename as in old implementation
-            safe_title = sanitize_filename(recording.display_name)
-            date_suffix = ""
-            try:
-                date_obj = recording.start_time
-                date_suffix = f"_{date_obj.strftime('%y-%m-%d_%H-%M')}"
-            except Exception as e:
-                logger.warning(f"⚠️ Error formatting date for audio: {e}")
-
-            audio_filename = f"{safe_title}{date_suffix}_processed.mp3"
-            audio_path = str(Path(audio_dir) / audio_filename)
-
-            logger.info(f"🎵 Extracting audio from processed video: {recording.display_name}")
-
-            # FFmpeg command for extracting audio (64k, 16kHz, mono)
-            extract_cmd = [
-                "ffmpeg",
-                "-i",
-                processed_path,
-                "-vn",  # without video
-                "-acodec",
-                "libmp3lame",
-                "-ab",
-                "64k",
-                "-ar",
-                "16000",
-                "-ac",
-                "1",  # mono
-                "-y",  # overwrite if exists
-                audio_path,
-            ]
-
-            try:
-                extract_process = await asyncio.create_subprocess_exec(
-                    *extract_cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                )
-                _stdout, stderr = await extract_process.communicate()
+        # Имя аудио файла как у обработанного видео: {title}_{yy-mm-dd_HH-MM}_processed.mp3
+        audio_dir = Path(f"media/user_{user_id}/audio/processed")
+        safe_title = sanitize_filename(recording.display_name)
+        date_suffix = ""
+        try:
+            date_suffix = f"_{recording.start_time.strftime('%y-%m-%d_%H-%M')}"
+        except Exception as e:
+            logger.warning(f"⚠️ Error formatting date for audio: {e}")
+        audio_path = str(audio_dir / f"{safe_title}{date_suffix}_processed.mp3")
+        waveform_path = (
+            str(audio_dir / f"{safe_title}{date_suffix}_waveform.png")
+            if processing_config.get("generate_waveform", False)
+            else None
+        )
 
-                if extract_process.returncode == 0 and Path(audio_path).exists():
-                    recording.processed_audio_path = str(audio_path)
-                    logger.info(f"✅ Audio extracted: {audio_path}")
-                else:
-                    logger.warning(f"⚠️ Failed to extract audio: {stderr.decode()}")
-            except Exception as e:
-                logger.warning(f"⚠️ Error extracting audio: {e}")
+        # Trim + speech audio (16kHz mono) + loudness за одно декодирование исходника
+        with task_self.ffmpeg_hooks(user_id, "Processing with FFmpeg...", "process", 40, 90):
+            graph_result = await processor.process_video_with_speech_audio(
+                video_path=recording.local_video_path,
+                title=recording.display_name,
+                speech_output=audio_path,
+                start_time=recording.start_time.isoformat(),
+                waveform_output=waveform_path,
+                loudness=True,
+            )
+        processed_path = graph_result.path("video")
 
+        if graph_result.success and processed_path:
             task_self.update_progress(user_id, 90, "Updating database...", step="process")
 
-            recording.processed_video_path = processed_path
-            recording.status = ProcessingStatus.PROCESSED
-            # VIDEO_PROCESSING - this is part of general ProcessingStatus.PROCESSED, not detailed
-            await recording_repo.update(recording)
-            await session.commit()
+            def apply(db_recording):
+                db_recording.processed_video_path = processed_path
+                db_recording.processed_audio_path = graph_result.path("speech")
+                db_recording.status = ProcessingStatus.PROCESSED
+                # VIDEO_PROCESSING - this is part of general ProcessingStatus.PROCESSED, not detailed
+
+            # apply перезаписывает статус: при конкурентном изменении записи - StaleRecordingError и retry
+            await uow.save(recording, apply, on_conflict="fail")
 
             return {
                 "success": True,
                 "processed_video_path": processed_path,
-                "audio_path": audio_path if Path(audio_path).exists() else None,
+                "audio_path": graph_result.path("speech"),
+                "waveform_path": graph_result.path("waveform"),
+                "outputs": {kind: output.to_dict() for kind, output in graph_result.outputs.items()},
+                "loudness": graph_result.loudness,
             }
-        raise Exception("Processing failed")
+        raise Exception(f"Processing failed: {graph_result.error}")
 
 
 @celery_app.task(
@@ -447,16 +409,11 @@ async def _async_transcribe_recording(
     - transcription.prompt (default: "")
     - transcription.temperature (default: 0.0)
     """
-    from api.helpers.config_resolution_helper import resolve_full_config
     from fireworks_module import FireworksConfig, FireworksTranscriptionService
-    from transcription_module.manager import get_transcription_manager
-
-    db_config = DatabaseConfig.from_env()
-    db_manager = DatabaseManager(db_config)
 
-    async with db_manager.async_session() as session:
+    async with TaskUnitOfWork("transcribe", recording_id, user_id) as uow:
         # Resolve config from hierarchy
-        full_config, recording = await resolve_full_config(session, recording_id, user_id, manual_override)
+        full_config, recording = await uow.load(manual_override)
 
         transcription_config = full_config.get("transcription", {})
 
@@ -470,45 +427,7 @@ async def _async_transcribe_recording(
             f"language={language}, has_prompt={bool(user_prompt)}, temperature={temperature}"
         )
 
-        recording_repo = RecordingAsyncRepository(session)
-
-        # Priority: processed audio > processed video > original video
-        audio_path = None
-
-        # 1. Use saved audio file path
-        if recording.processed_audio_path:
-            audio_path = Path(recording.processed_audio_path)
-            if audio_path.exists():
-                audio_files = [audio_path]
-            else:
-                audio_files = []
-        else:
-            # Fallback: search in directory (for old records without processed_audio_path)
-            audio_dir = (
-                Path(recording.transcription_dir).parent.parent / "audio" / "processed"
-                if recording.transcription_dir
-                else None
-            )
-            audio_files = []
-            if audio_dir and audio_dir.exists():
-                for ext in ("*.mp3", "*.wav", "*.m4a"):
-                    audio_files = sorted(audio_dir.glob(ext))
-                    if audio_files:
-                        audio_path = str(audio_files[0])
-                        logger.info(f"🎵 Use processed audio: {audio_path}")
-                        break
-
-        # 2. Fallback on processed or original video
-        if not audio_path:
-            audio_path = recording.processed_video_path or recording.local_video_path
-            if audio_path:
-                logger.info(f"🎬 Use video file (audio not found): {audio_path}")
-
-        if not audio_path:
-            raise ValueError("No audio or video file available for transcription")
-
-        if not Path(audio_path).exists():
-            raise ValueError(f"Audio/video file not found: {audio_path}")
+        audio_path = _find_transcription_source(recording)
 
         task_self.update_progress(user_id, 20, "Loading transcription service...", step="transcribe")
 
@@ -533,21 +452,6 @@ async def _async_transcribe_recording(
 
         task_self.update_progress(user_id, 70, "Saving transcription...", step="transcribe")
 
-        # Save only master.json (WITHOUT topics.json)
-        transcription_manager = get_transcription_manager()
-        transcription_dir = transcription_manager.get_dir(recording_id, user_id)
-
-        # Prepare data for admin
-        words = transcription_result.get("words", [])
-        segments = transcription_result.get("segments", [])
-        detected_language = transcription_result.get("language", language)
-
-        # Calculate duration from last segment
-        duration = 0.0
-        if segments and len(segments) > 0:
-            last_segment = segments[-1]
-            duration = last_segment.get("end", 0.0)
-
         # Collect metadata for admin (for cost calculation)
         usage_metadata = {
             "model": fireworks_config.model,
@@ -555,69 +459,198 @@ async def _async_transcribe_recording(
             "config": {
                 "temperature": temperature,  # ← from resolved config
                 "language": language,  # ← from resolved config
-                "detected_language": detected_language,
+                "detected_language": transcription_result.get("language", language),
                 "response_format": fireworks_config.response_format,
                 "timestamp_granularities": fireworks_config.timestamp_granularities,
                 "preprocessing": fireworks_config.preprocessing,
             },
-            "audio_file": {
-                "path": str(audio_path),  # Convert Path to string for JSON serialization
-                "duration_seconds": duration,
-            },
             # If Fireworks API returns usage, add here
             "usage": transcription_result.get("usage"),
         }
 
-        # Save master.json
-        transcription_manager.save_master(
-            recording_id=recording_id,
-            words=words,
-            segments=segments,
+        saved = _save_transcription_files(
+            recording_id,
+            user_id,
+            transcription_result,
             language=language,
-            model="fireworks",
-            duration=duration,
+            audio_path=audio_path,
             usage_metadata=usage_metadata,
-            user_id=user_id,
-            raw_response=transcription_result,
         )
-
-        # Generate cache files (segments.txt, words.txt)
-        transcription_manager.generate_cache_files(recording_id, user_id=user_id)
+        transcription_dir = saved["transcription_dir"]
 
         task_self.update_progress(user_id, 90, "Updating database...", step="transcribe")
 
-        # Update recording in DB (without topics)
-        recording.transcription_dir = str(transcription_dir)
-        recording.transcription_info = transcription_result
-
-        # Mark transcription stage as completed
-        recording.mark_stage_completed(
-            ProcessingStageType.TRANSCRIBE,
-            meta={"transcription_dir": str(transcription_dir), "language": language, "model": "fireworks"},
+        # apply перезаписывает статус и stage транскрипции: при конкурентном изменении - StaleRecordingError и retry
+        await uow.save(
+            recording,
+            lambda db_recording: _apply_transcription_result(
+                db_recording, transcription_dir, transcription_result, language
+            ),
+            on_conflict="fail",
         )
 
-        # Update aggregated status based on processing_stages (aggregate status)
-        from api.helpers.status_manager import update_aggregate_status
-
-        update_aggregate_status(recording)
-
-        await recording_repo.update(recording)
-        await session.commit()
-
         logger.info(
             f"✅ Transcription completed for recording {recording_id} (aggregate status): "
-            f"words={len(words)}, segments={len(segments)}, language={language}"
+            f"words={saved['words_count']}, segments={saved['segments_count']}, language={language}"
         )
 
         return {
             "success": True,
-            "transcription_dir": str(transcription_dir),
+            "transcription_dir": transcription_dir,
             "language": language,
-            "words_count": len(words),
-            "segments_count": len(segments),
+            "words_count": saved["words_count"],
+            "segments_count": saved["segments_count"],
         }
 
 
+def _find_transcription_source(recording) -> str:
+    """
+    Find audio/video file for transcription.
+
+    Priority: processed audio > processed video > original video.
+    """
+    # Priority: processed audio > processed video > original video
+    audio_path = None
+
+    # 1. Use saved audio file path
+    if recording.processed_audio_path:
+        if Path(recording.processed_audio_path).exists():
+            audio_path = recording.processed_audio_path
+    else:
+        # Fallback: search in directory (for old records without processed_audio_path)
+        audio_dir = (
+            Path(recording.transcription_dir).parent.parent / "audio" / "processed"
+            if recording.transcription_dir
+            else None
+        )
+        if audio_dir and audio_dir.exists():
+            for ext in ("*.mp3", "*.wav", "*.m4a"):
+                audio_files = sorted(audio_dir.glob(ext))
+                if audio_files:
+                    audio_path = str(audio_files[0])
+                    logger.info(f"🎵 Use processed audio: {audio_path}")
+                    break
+
+    # 2. Fallback on processed or original video
+    if not audio_path:
+        audio_path = recording.processed_video_path or recording.local_video_path
+        if audio_path:
+            logger.info(f"🎬 Use video file (audio not found): {audio_path}")
+
+    if not audio_path:
+        raise ValueError("No audio or video file available for transcription")
+
+    if not Path(audio_path).exists():
+        raise ValueError(f"Audio/video file not found: {audio_path}")
+
+    return str(audio_path)
+
+
+def _save_transcription_files(
+    recording_id: int,
+    user_id: int,
+    transcription_result: dict,
+    language: str,
+    audio_path: str | None,
+    usage_metadata: dict,
+) -> dict:
+    """
+    Save master.json + cache files (segments.txt, words.txt). No DB access.
+    """
+    from transcription_module.manager import get_transcription_manager
+
+    transcription_manager = get_transcription_manager()
+    transcription_dir = transcription_manager.get_dir(recording_id, user_id)
+
+    # Prepare data for admin
+    words = transcription_result.get("words", [])
+    segments = transcription_result.get("segments", [])
+
+    # Calculate duration from last segment
+    duration = 0.0
+    if segments:
+        duration = segments[-1].get("end", 0.0)
+
+    usage_metadata = {
+        **usage_metadata,
+        "audio_file": {
+            "path": str(audio_path) if audio_path else None,  # Convert Path to string for JSON serialization
+            "duration_seconds": duration,
+        },
+    }
+
+    # Save only master.json (WITHOUT topics.json)
+    transcription_manager.save_master(
+        recording_id=recording_id,
+        words=words,
+        segments=segments,
+        language=language,
+        model="fireworks",
+        duration=duration,
+        usage_metadata=usage_metadata,
+        user_id=user_id,
+        raw_response=transcription_result,
+    )
+
+    # Generate cache files (segments.txt, words.txt)
+    transcription_manager.generate_cache_files(recording_id, user_id=user_id)
+
+    return {
+        "transcription_dir": str(transcription_dir),
+        "words_count": len(words),
+        "segments_count": len(segments),
+    }
+
+
+def _apply_transcription_result(
+    recording,
+    transcription_dir: str,
+    transcription_result: dict,
+    language: str,
+    stage_meta: dict | None = None,
+) -> None:
+    """Update recording (without topics) and mark TRANSCRIBE stage as completed. Caller commits."""
+    from api.helpers.status_manager import update_aggregate_status
+
+    recording.transcription_dir = transcription_dir
+    recording.transcription_info = transcription_result
+
+    # Mark transcription stage as completed
+    recording.mark_stage_completed(
+        ProcessingStageType.TRANSCRIBE,
+        meta={
+            "transcription_dir": transcription_dir,
+            "language": language,
+            "model": "fireworks",
+            **(stage_meta or {}),
+        },
+    )
+
+    # Update aggregated status based on processing_stages (aggregate status)
+    update_aggregate_status(recording)
+
+
+def _store_transcription_result(
+    recording,
+    user_id: int,
+    transcription_result: dict,
+    language: str,
+    audio_path: str | None,
+    usage_metadata: dict,
+    stage_meta: dict | None = None,
+) -> dict:
+    """
+    Save master.json + cache files and mark TRANSCRIBE stage as completed.
+
+    Used by Batch API finalization. Caller commits the session.
+    """
+    saved = _save_transcription_files(recording.id, user_id, transcription_result, language, audio_path, usage_metadata)
+    _apply_transcription_result(
+        recording, saved["transcription_dir"], transcription_result, language, stage_meta=stage_meta
+    )
+    return saved
+
+
 @celery_app.task(
     bind=True,
     base=ProcessingTask,
@@ -751,6 +784,11 @@ def process_recording_task(
         total_steps = sum([download, process, transcribe, extract_topics, generate_subs, upload and len(platforms) > 0])
         current_step = 0
 
+        def check_cancelled(step: str) -> None:
+            """Отмена задачи (DELETE /tasks/{task_id}) останавливает весь pipeline, а не только текущий ffmpeg."""
+            if is_cancel_requested(self.request.id):
+                raise FFmpegCancelledError(f"Pipeline cancelled before {step} step")
+
         # STEP 1: Download
         if download:
             try:
@@ -775,6 +813,7 @@ def process_recording_task(
 
         # STEP 2: Process
         if process:
+            check_cancelled("process")
             try:
                 self.update_progress(
                     user_id,
@@ -789,12 +828,15 @@ def process_recording_task(
                 results["steps_completed"].append("process")
                 results["process"] = process_result
                 current_step += 1
+            except FFmpegCancelledError:
+                raise
             except Exception as e:
                 results["errors"].append(f"Processing failed: {e!s}")
                 logger.error(f"Processing step failed: {e}")
 
         # STEP 3: Transcribe
         if transcribe:
+            check_cancelled("transcribe")
             try:
                 self.update_progress(
                     user_id,
@@ -817,6 +859,7 @@ def process_recording_task(
 
         # STEP 4: Extract Topics
         if extract_topics:
+            check_cancelled("extract_topics")
             try:
                 self.update_progress(
                     user_id,
@@ -837,6 +880,7 @@ def process_recording_task(
 
         # STEP 5: Generate Subtitles
         if generate_subs:
+            check_cancelled("generate_subtitles")
             try:
                 self.update_progress(
                     user_id,
@@ -860,6 +904,7 @@ def process_recording_task(
 
         # STEP 6: Upload
         if upload and (platforms or preset_ids_list):
+            check_cancelled("upload")
             # Build platform -> preset_id mapping (presets already loaded at the start)
             preset_map = {preset.platform: preset.id for preset in presets}
 
@@ -886,8 +931,10 @@ def process_recording_task(
                     preset_id = preset_map.get(platform)
 
                     # Launch upload asynchronously without blocking (Celery best practice)
-                    upload_task = upload_recording_to_platform.delay(
-                        recording_id, user_id, platform, preset_id, None, metadata_override
+                    (scheduled,) = schedule(upload_recording_to_platform.name, user_id)
+                    upload_task = upload_recording_to_platform.apply_async(
+                        args=(recording_id, user_id, platform, preset_id, None, metadata_override),
+                        **scheduled,
                     )
 
                     upload_task_ids.append(
@@ -925,6 +972,10 @@ def process_recording_task(
             result=results,
         )
 
+    except FFmpegCancelledError:
+        logger.warning(f"[Task {self.request.id}] Pipeline cancelled by user request")
+        raise
+
     except Exception as exc:
         logger.error(f"[Task {self.request.id}] Full pipeline failed: {exc!r}", exc_info=True)
         raise
@@ -983,6 +1034,23 @@ def extract_topics_task(
         raise self.retry(exc=exc)
 
 
+async def _detect_audio_pauses(
+    audio_path: str | None, silence_threshold: float, min_gap_minutes: float = 8.0
+) -> list[dict]:
+    """Длинные перерывы по тишине в обработанном аудио (огибающая обычно уже в sidecar после обработки)."""
+    if not audio_path or not Path(audio_path).exists():
+        return []
+
+    from utils.loudness_envelope import get_envelope_analyzer
+
+    try:
+        envelope = await get_envelope_analyzer().envelope(audio_path)
+    except Exception as e:
+        logger.warning(f"[Topics] Audio pause detection skipped for {audio_path}: {e}")
+        return []
+    return envelope.long_pauses(silence_threshold, min_gap_minutes)
+
+
 async def _async_extract_topics(
     task_self, recording_id: int, user_id: int, granularity: str, version_id: str | None
 ) -> dict:
@@ -993,6 +1061,7 @@ async def _async_extract_topics(
     1. Try with deepseek (primary model)
     2. Fallback on fireworks_deepseek on error
     """
+    from api.helpers.config_resolution_helper import resolve_full_config
     from deepseek_module import DeepSeekConfig, TopicExtractor
     from transcription_module.manager import get_transcription_manager
 
@@ -1016,6 +1085,11 @@ async def _async_extract_topics(
         # Ensure presence of segments.txt
         segments_path = transcription_manager.ensure_segments_txt(recording_id, user_id=user_id)
 
+        # Порог тишины пользователя (template/user config), как при обработке видео
+        full_config, _ = await resolve_full_config(session, recording_id, user_id)
+        silence_threshold = full_config.get("processing", {}).get("silence_threshold", -40.0)
+        audio_pauses = await _detect_audio_pauses(recording.processed_audio_path, silence_threshold)
+
         # Try extracting topics with fallback strategy
         topics_result = None
         model_used = None
@@ -1033,6 +1107,7 @@ async def _async_extract_topics(
                 segments_file_path=str(segments_path),
                 recording_topic=recording.display_name,
                 granularity=granularity,
+                audio_pauses=audio_pauses,
             )
             model_used = "deepseek"
             logger.info(f"[Topics] Successfully extracted with deepseek for recording {recording_id}")
@@ -1053,6 +1128,7 @@ async def _async_extract_topics(
                     segments_file_path=str(segments_path),
                     recording_topic=recording.display_name,
                     granularity=granularity,
+                    audio_pauses=audio_pauses,
                 )
                 model_used = "fireworks_deepseek"
                 logger.info(f"[Topics] Successfully extracted with fireworks_deepseek for recording {recording_id}")
@@ -1229,41 +1305,44 @@ def batch_transcribe_recording_task(
     self,
     recording_id: int,
     user_id: int,
-    batch_id: str,
+    batch_id: str | None = None,
     poll_interval: float = 10.0,
     max_wait_time: float = 3600.0,
+    manual_override: dict | None = None,
 ) -> dict:
     """
-    Polling for Fireworks Batch API transcription.
+    Register transcription in Fireworks Batch API.
 
-    This task is created after submit_batch_transcription() and waits for completion of batch job.
-    Uses polling to check status every poll_interval seconds.
+    Submits audio to Batch API (if batch_id is not passed) and stores batch job in TRANSCRIBE stage.
+    The task does NOT wait for the result: pending jobs are polled in bulk by
+    poll_batch_transcriptions_task, completed ones are saved by finalize_batch_transcription_task.
 
     Args:
         recording_id: ID of recording
         user_id: ID of user
-        batch_id: ID of batch job from Fireworks
-        poll_interval: Status check interval (seconds)
+        batch_id: ID of already submitted batch job (None - submit here)
+        poll_interval: Base status check interval (seconds), grows with job age
         max_wait_time: Maximum waiting time (seconds)
+        manual_override: Optional configuration override
 
     Returns:
-        Result of transcription
+        Submitted batch job info
     """
     try:
         logger.info(
-            f"[Task {self.request.id}] Batch transcription polling | recording={recording_id} | user={user_id} | batch_id={batch_id}"
+            f"[Task {self.request.id}] Batch transcription submit | recording={recording_id} | user={user_id} | batch_id={batch_id}"
         )
 
-        self.update_progress(user_id, 10, "Waiting for batch transcription...", step="batch_transcribe")
+        self.update_progress(user_id, 10, "Submitting batch transcription...", step="batch_transcribe")
 
         result = asyncio.run(
-            _async_poll_batch_transcription(
-                self,
+            _async_submit_batch_transcription(
                 recording_id,
                 user_id,
                 batch_id,
                 poll_interval,
                 max_wait_time,
+                manual_override,
             )
         )
 
@@ -1271,16 +1350,10 @@ def batch_transcribe_recording_task(
             user_id=user_id,
             status="completed",
             recording_id=recording_id,
-            batch_id=batch_id,
+            batch_id=result["batch_id"],
             result=result,
         )
 
-    except TimeoutError as exc:
-        logger.error(
-            f"[Task {self.request.id}] Batch transcription timeout | batch_id={batch_id} | max_wait={max_wait_time}s"
-        )
-        raise self.retry(countdown=600, exc=exc)
-
     except SoftTimeLimitExceeded:
         logger.error(f"[Task {self.request.id}] Soft time limit exceeded")
         raise self.retry(countdown=900, exc=SoftTimeLimitExceeded())
@@ -1290,132 +1363,304 @@ def batch_transcribe_recording_task(
         raise self.retry(exc=exc)
 
 
-async def _async_poll_batch_transcription(
-    task_self,
+async def _async_submit_batch_transcription(
     recording_id: int,
     user_id: int,
-    batch_id: str,
+    batch_id: str | None,
     poll_interval: float,
     max_wait_time: float,
+    manual_override: dict | None = None,
 ) -> dict:
-    """Async function for polling batch transcription."""
-    import time
-
+    """Async function for submitting batch job and registering it for the shared poller."""
+    from api.helpers.batch_transcription import build_batch_meta
+    from api.helpers.config_resolution_helper import resolve_full_config
+    from api.helpers.status_manager import update_aggregate_status
     from fireworks_module import FireworksConfig, FireworksTranscriptionService
-    from transcription_module.manager import TranscriptionManager
+    from transcription_module.service import TranscriptionService
 
     db_config = DatabaseConfig.from_env()
     db_manager = DatabaseManager(db_config)
-    session = await db_manager.async_session()
 
-    try:
+    async with db_manager.async_session() as session:
+        full_config, recording = await resolve_full_config(session, recording_id, user_id, manual_override)
+
+        transcription_config = full_config.get("transcription", {})
+        language = transcription_config.get("language", "ru")
+        fireworks_prompt = TranscriptionService._compose_fireworks_prompt(
+            transcription_config.get("prompt", ""), recording.display_name
+        )
+
+        audio_path = None
+        if not batch_id:
+            audio_path = _find_transcription_source(recording)
+
+            fireworks_config = FireworksConfig.from_file("config/fireworks_creds.json")
+            fireworks_service = FireworksTranscriptionService(fireworks_config)
+
+            batch_result = await fireworks_service.submit_batch_transcription(
+                audio_path=audio_path,
+                language=language,
+                prompt=fireworks_prompt,
+            )
+            batch_id = batch_result.get("batch_id")
+
+            if not batch_id:
+                raise ValueError("Batch API did not return batch_id")
+
+        recording.mark_stage_in_progress(
+            ProcessingStageType.TRANSCRIBE,
+            meta=build_batch_meta(
+                batch_id,
+                poll_interval=poll_interval,
+                max_wait_time=max_wait_time,
+                language=language,
+                prompt=fireworks_prompt,
+                audio_path=audio_path,
+            ),
+        )
+        update_aggregate_status(recording)
+
         recording_repo = RecordingAsyncRepository(session)
-        recording_db = await recording_repo.find_by_id(recording_id, user_id)
+        await recording_repo.update(recording)
+        await session.commit()
+
+        logger.info(f"[Batch Transcription] Registered | batch_id={batch_id} | recording={recording_id}")
+
+        return {
+            "success": True,
+            "batch_id": batch_id,
+            "status": "submitted",
+        }
 
-        if not recording_db:
-            raise ValueError(f"Recording {recording_id} not found for user {user_id}")
 
-        recording = MeetingRecording.from_db_model(recording_db)
+@celery_app.task(name="api.tasks.processing.poll_batch_transcriptions")
+def poll_batch_transcriptions_task() -> dict:
+    """
+    Periodic poller for all pending Fireworks batch jobs (Celery Beat).
+
+    Lists pending jobs from processing_stages in one query, checks statuses in bulk
+    with bounded concurrency and adaptive per-job intervals, then hands completed
+    jobs over to finalize_batch_transcription_task.
+
+    Returns:
+        Poll statistics
+    """
+    try:
+        return asyncio.run(_async_poll_batch_transcriptions())
+    except Exception as exc:
+        logger.error(f"[Batch Poller] Failed: {exc!r}", exc_info=True)
+        return {"status": "error", "error": str(exc)}
+
+
+async def _async_poll_batch_transcriptions() -> dict:
+    """Async function for single poller pass."""
+    from datetime import datetime
+
+    from api.helpers.batch_transcription import (
+        BATCH_STATUS_FINALIZING,
+        BATCH_TERMINAL_FAILURE_STATUSES,
+        POLL_BATCH_LIMIT,
+        POLL_MAX_CONCURRENCY,
+        is_batch_expired,
+        is_poll_due,
+        schedule_next_poll,
+    )
+    from api.helpers.status_manager import update_aggregate_status
+    from fireworks_module import FireworksConfig, FireworksTranscriptionService
 
-        # Initialize Fireworks service
+    db_config = DatabaseConfig.from_env()
+    db_manager = DatabaseManager(db_config)
+
+    async with db_manager.async_session() as session:
+        pending = await RecordingAsyncRepository(session).list_pending_batch_transcriptions(limit=POLL_BATCH_LIMIT)
+
+    now = datetime.utcnow()
+    due = [job for job in pending if is_poll_due(job["stage_meta"], now)]
+    expired = [job for job in due if is_batch_expired(job["stage_meta"], now)]
+    expired_ids = {job["stage_id"] for job in expired}
+    to_check = [job for job in due if job["stage_id"] not in expired_ids]
+
+    stats = {
+        "status": "success",
+        "pending": len(pending),
+        "checked": len(to_check),
+        "completed": 0,
+        "failed": 0,
+        "expired": len(expired),
+    }
+
+    if not due:
+        return stats
+
+    # Network calls without an open DB session
+    statuses = {}
+    if to_check:
         fireworks_config = FireworksConfig.from_file("config/fireworks_creds.json")
         fireworks_service = FireworksTranscriptionService(fireworks_config)
+        statuses = await fireworks_service.check_batch_statuses(
+            [job["stage_meta"]["batch_id"] for job in to_check],
+            max_concurrency=POLL_MAX_CONCURRENCY,
+        )
 
-        # Polling loop
-        start_time = time.time()
-        attempt = 0
+    completed_jobs = []
+    failed_jobs = [(job, "Batch job timeout exceeded") for job in expired]
 
-        while True:
-            attempt += 1
-            elapsed = time.time() - start_time
+    async with db_manager.async_session() as session:
+        recording_repo = RecordingAsyncRepository(session)
 
-            if elapsed > max_wait_time:
-                raise TimeoutError(
-                    f"Batch transcription {batch_id} not completed after {max_wait_time}s (attempts: {attempt})"
-                )
+        for job in to_check:
+            meta = job["stage_meta"]
+            status_response = statuses.get(meta["batch_id"], {})
+            batch_status = status_response.get("status", "unknown")
 
-            # Check status
-            status_response = await fireworks_service.check_batch_status(batch_id)
-            status = status_response.get("status", "unknown")
+            if batch_status in BATCH_TERMINAL_FAILURE_STATUSES:
+                failed_jobs.append((job, f"Batch job {batch_status}: {status_response.get('message') or ''}".strip()))
+                continue
 
-            # Update progress (approximately)
-            progress = min(20 + int((elapsed / max_wait_time) * 60), 80)
-            task_self.update_progress(
-                user_id,
-                progress,
-                f"Batch transcribing... ({status}, {elapsed:.0f}s)",
-                step="batch_transcribe",
-                batch_id=batch_id,
-                attempt=attempt,
-            )
+            new_meta = schedule_next_poll(meta, now, batch_status)
+            if batch_status == "completed":
+                new_meta["batch_status"] = BATCH_STATUS_FINALIZING
+                completed_jobs.append(job)
 
-            if status == "completed":
-                logger.info(
-                    f"[Batch Transcription] Completed ✅ | batch_id={batch_id} | elapsed={elapsed:.1f}s | attempts={attempt}"
-                )
+            await recording_repo.update_stage_meta(job["stage_id"], new_meta)
 
-                task_self.update_progress(user_id, 85, "Parsing batch result...", step="batch_transcribe")
+        for job, reason in failed_jobs:
+            recording = await recording_repo.get_by_id(job["recording_id"], job["user_id"])
+            if not recording:
+                continue
+            recording.mark_stage_failed(ProcessingStageType.TRANSCRIBE, reason)
+            update_aggregate_status(recording)
+            await recording_repo.update(recording)
+            logger.warning(f"[Batch Poller] batch_id={job['stage_meta']['batch_id']} failed: {reason}")
 
-                # Get result
-                transcription_result = await fireworks_service.get_batch_result(batch_id)
+        await session.commit()
 
-                # Save transcription (as usual)
-                transcription_manager = TranscriptionManager()
+    for job in completed_jobs:
+        finalize_batch_transcription_task.delay(job["recording_id"], job["user_id"], job["stage_meta"]["batch_id"])
 
-                task_self.update_progress(user_id, 90, "Saving transcription...", step="batch_transcribe")
+    stats["completed"] = len(completed_jobs)
+    stats["failed"] = len(failed_jobs) - len(expired)
 
-                # Save master.json
-                words = transcription_result.get("words", [])
-                segments = transcription_result.get("segments", [])
-                language = transcription_result.get("language", "ru")
+    logger.info(
+        f"[Batch Poller] pending={stats['pending']} | checked={stats['checked']} | "
+        f"completed={stats['completed']} | failed={stats['failed']} | expired={stats['expired']}"
+    )
+    return stats
 
-                master_data = {
-                    "text": transcription_result.get("text", ""),
-                    "segments": segments,
-                    "words": words,
-                    "language": language,
-                }
 
-                transcription_manager.save_master(
-                    recording_id=recording_id,
-                    master_data=master_data,
-                    user_id=user_id,
-                )
+@celery_app.task(
+    bind=True,
+    base=ProcessingTask,
+    name="api.tasks.processing.finalize_batch_transcription",
+    max_retries=3,
+    default_retry_delay=60,
+)
+def finalize_batch_transcription_task(
+    self,
+    recording_id: int,
+    user_id: int,
+    batch_id: str,
+) -> dict:
+    """
+    Save result of completed Fireworks batch job.
 
-                # Update recording in DB
-                recording.transcription_path = transcription_manager.get_dir(recording_id, user_id=user_id)
-                recording.mark_stage_completed(
-                    ProcessingStageType.TRANSCRIBE,
-                    meta={
-                        "batch_id": batch_id,
-                        "language": language,
-                        "words_count": len(words),
-                        "segments_count": len(segments),
-                        "elapsed_seconds": elapsed,
-                    },
-                )
+    Launched by poll_batch_transcriptions_task, never waits for the job itself.
 
-                # Update aggregated status
-                from api.helpers.status_manager import update_aggregate_status
+    Args:
+        recording_id: ID of recording
+        user_id: ID of user
+        batch_id: ID of completed batch job
 
-                update_aggregate_status(recording)
+    Returns:
+        Result of transcription
+    """
+    try:
+        logger.info(
+            f"[Task {self.request.id}] Finalizing batch transcription | recording={recording_id} | batch_id={batch_id}"
+        )
 
-                await recording_repo.update(recording)
-                await session.commit()
+        result = asyncio.run(_async_finalize_batch_transcription(recording_id, user_id, batch_id))
 
-                return {
-                    "success": True,
-                    "batch_id": batch_id,
-                    "language": language,
-                    "elapsed_seconds": elapsed,
-                    "attempts": attempt,
-                }
+        return self.build_result(
+            user_id=user_id,
+            status="completed",
+            recording_id=recording_id,
+            batch_id=batch_id,
+            result=result,
+        )
 
-            logger.debug(
-                f"[Batch Transcription] Polling | batch_id={batch_id} | status={status} | attempt={attempt} | elapsed={elapsed:.1f}s"
-            )
+    except Exception as exc:
+        logger.error(f"[Task {self.request.id}] Error finalizing batch transcription: {exc!r}", exc_info=True)
+        raise self.retry(exc=exc)
+
+
+async def _async_finalize_batch_transcription(recording_id: int, user_id: int, batch_id: str) -> dict:
+    """Async function for saving batch job result."""
+    from fireworks_module import FireworksConfig, FireworksTranscriptionService
+
+    fireworks_config = FireworksConfig.from_file("config/fireworks_creds.json")
+    fireworks_service = FireworksTranscriptionService(fireworks_config)
 
-            await asyncio.sleep(poll_interval)
+    # Fetch result before opening DB session
+    transcription_result = await fireworks_service.get_batch_result(batch_id)
+
+    db_config = DatabaseConfig.from_env()
+    db_manager = DatabaseManager(db_config)
+
+    async with db_manager.async_session() as session:
+        recording_repo = RecordingAsyncRepository(session)
+        recording = await recording_repo.get_by_id(recording_id, user_id)
+
+        if not recording:
+            raise ValueError(f"Recording {recording_id} not found for user {user_id}")
+
+        stage = next(
+            (s for s in recording.processing_stages if s.stage_type == ProcessingStageType.TRANSCRIBE),
+            None,
+        )
+        stage_meta = (stage.stage_meta or {}) if stage else {}
+
+        # Recording was reset or resubmitted while the job was running
+        if stage_meta.get("batch_id") != batch_id:
+            logger.warning(f"[Batch Transcription] Stale batch_id={batch_id} for recording {recording_id}, skipping")
+            return {"success": False, "batch_id": batch_id, "reason": "stale_batch"}
+
+        language = stage_meta.get("language") or transcription_result.get("language") or "ru"
+        usage_metadata = {
+            "model": fireworks_config.model,
+            "prompt_used": stage_meta.get("prompt"),
+            "config": {
+                "language": language,
+                "detected_language": transcription_result.get("language", language),
+                "response_format": fireworks_config.response_format,
+                "timestamp_granularities": fireworks_config.timestamp_granularities,
+                "preprocessing": fireworks_config.preprocessing,
+                "mode": "batch_api",
+            },
+            "usage": transcription_result.get("usage"),
+        }
+
+        saved = _store_transcription_result(
+            recording,
+            user_id,
+            transcription_result,
+            language=language,
+            audio_path=stage_meta.get("audio_path"),
+            usage_metadata=usage_metadata,
+            stage_meta={"batch_status": "completed"},
+        )
+
+        await recording_repo.update(recording)
+        await session.commit()
 
-    finally:
-        await session.close()
+    logger.info(
+        f"[Batch Transcription] Completed ✅ | batch_id={batch_id} | recording={recording_id} | "
+        f"words={saved['words_count']} | segments={saved['segments_count']}"
+    )
+
+    return {
+        "success": True,
+        "batch_id": batch_id,
+        "language": language,
+        **saved,
+    }
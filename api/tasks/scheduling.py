@@ -0,0 +1,408 @@
+"""Приоритеты задач и fair share между пользователями (tenant'ами).
+
+Очереди Celery общие для всех пользователей, поэтому без планирования один
+пользователь с bulk операцией на сотни записей занимает воркеры на часы, а
+короткие задачи остальных (upload, subtitles) ждут за его trim/process.
+
+Порядок выдачи задач задается приоритетом сообщения (Redis transport,
+priority_steps 0-9, 0 - наивысший):
+
+    importance = важность типа задачи + бонус тарифного плана - штраф за backlog
+    priority = 9 - importance
+
+Штраф за backlog - fair share: пока у пользователя в очереди задач не больше,
+чем его доля (max_concurrent_tasks из квот плана), штрафа нет; дальше приоритет
+понижается логарифмически от глубины его backlog. Новые задачи пользователя с
+пустой очередью обгоняют хвост чужой bulk операции, но сама bulk операция не
+голодает - ее задачи остаются в той же очереди.
+
+Модуль не импортирует тела задач: используется и API (api.tasks.signatures,
+BulkDispatch), и воркером (сигналы в api.celery_app). Клиент Redis синхронный:
+на стороне API функции вызываются через run_in_threadpool.
+
+Состояние в Redis (тот же инстанс, что и broker):
+    leap:sched:profile:{user_id}   - "{plan}:{share}", кэш профиля пользователя (TTL)
+    leap:sched:depth               - hash "{queue}:{user_id}" -> задач в очереди
+    leap:sched:wait:{YYYYmmddHH}   - hash "{queue}:{user_id}:{sum|count|max}" -> время ожидания
+    leap:sched:db_hold:{YYYYmmddHH} - hash "{task_name}:{sum|count|max}" -> удержание DB соединения
+"""
+
+import math
+import time
+from datetime import UTC, datetime, timedelta
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from typing import Any
+
+import redis
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.celery_app import celery_app
+from api.config import get_settings
+from api.tasks import signatures as sig
+from logger import get_logger
+
+logger = get_logger()
+
+MEDIA_QUEUE = "media"
+DEFAULT_QUEUE = "celery"
+
+MAX_PRIORITY = 9
+
+# Важность типа задачи (больше - раньше). Короткие и близкие к результату этапы
+# выше длинных CPU-bound этапов, чтобы не ждать за ними.
+TASK_IMPORTANCE: dict[str, int] = {
+    sig.UPLOAD_RECORDING_TO_PLATFORM: 6,
+    sig.BATCH_UPLOAD_RECORDINGS: 6,
+    sig.UPLOAD_CHANNEL_BATCH: 6,
+    sig.FINALIZE_BATCH_TRANSCRIPTION: 6,
+    sig.POLL_BATCH_TRANSCRIPTIONS: 6,
+    sig.GENERATE_SUBTITLES: 5,
+    sig.EXTRACT_TOPICS: 5,
+    sig.CLEANUP_EXPIRED_TOKENS: 5,
+    sig.RECONCILE_RECORDING_STATS: 2,
+    sig.TRANSCRIBE_RECORDING: 4,
+    sig.BATCH_TRANSCRIBE_RECORDING: 4,
+    sig.DOWNLOAD_RECORDING: 4,
+    sig.SYNC_SINGLE_SOURCE: 4,
+    sig.BATCH_SYNC_SOURCES: 3,
+    sig.REMATCH_RECORDINGS: 3,
+    sig.RUN_AUTOMATION_JOB: 3,
+    sig.DRY_RUN_AUTOMATION_JOB: 5,
+    sig.TRIM_VIDEO: 2,
+    sig.PROCESS_RECORDING: 2,
+}
+DEFAULT_IMPORTANCE = 3
+
+# Бонус важности по тарифному плану (SubscriptionPlanModel.name)
+PLAN_PRIORITY_BOOST: dict[str, int] = {
+    "free": 0,
+    "plus": 1,
+    "pro": 2,
+    "enterprise": 3,
+}
+
+# Доля по умолчанию, пока профиль пользователя не закэширован
+DEFAULT_PLAN = "free"
+DEFAULT_SHARE = 2
+# Доля для планов без лимита одновременных задач (max_concurrent_tasks=NULL)
+UNLIMITED_SHARE = 50
+MAX_BACKLOG_PENALTY = 4
+
+PROFILE_TTL_SECONDS = 600
+BUCKET_TTL_SECONDS = 2 * 3600
+
+PROFILE_KEY = "leap:sched:profile:{user_id}"
+DEPTH_KEY = "leap:sched:depth"
+WAIT_KEY = "leap:sched:wait:{bucket}"
+DB_HOLD_KEY = "leap:sched:db_hold:{bucket}"
+
+# Заголовки сообщения, по которым воркер считает метрики
+HEADER_TENANT = "leap_tenant_id"
+HEADER_QUEUE = "leap_queue"
+HEADER_ENQUEUED_AT = "leap_enqueued_at"
+
+# Уменьшение счетчика без ухода в минус (задачи, поставленные до деплоя, без заголовков)
+_DECREMENT_SCRIPT = """
+local value = redis.call('HINCRBY', KEYS[1], ARGV[1], -1)
+if value <= 0 then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+    return 0
+end
+return value
+"""
+
+_UPDATE_MAX_SCRIPT = """
+local current = tonumber(redis.call('HGET', KEYS[1], ARGV[1]) or '0')
+if tonumber(ARGV[2]) > current then
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+end
+return 1
+"""
+
+
+@lru_cache(maxsize=1)
+def _redis() -> redis.Redis:
+    """Sync Redis client (broker instance). Публикация задач тоже синхронная."""
+    return redis.Redis.from_url(
+        get_settings().celery_broker_url,
+        decode_responses=True,
+        socket_timeout=1,
+        socket_connect_timeout=1,
+    )
+
+
+def resolve_queue(task_name: str) -> str:
+    """Очередь задачи по celery_app.conf.task_routes (точное имя важнее glob шаблона)."""
+    routes = celery_app.conf.task_routes or {}
+    route = routes.get(task_name)
+    if route is None:
+        route = next((value for pattern, value in routes.items() if fnmatchcase(task_name, pattern)), None)
+    return (route or {}).get("queue", DEFAULT_QUEUE)
+
+
+# ========================================
+# TENANT PROFILE
+# ========================================
+
+
+def get_tenant_profile(user_id: int) -> tuple[str, int]:
+    """
+    Профиль пользователя из кэша: (plan_name, share).
+
+    При промахе кэша или недоступности Redis - профиль free плана.
+    """
+    try:
+        cached = _redis().get(PROFILE_KEY.format(user_id=user_id))
+    except redis.RedisError as e:
+        logger.warning(f"Scheduling: failed to read tenant profile for user {user_id}: {e}")
+        cached = None
+    if not cached:
+        return DEFAULT_PLAN, DEFAULT_SHARE
+    plan, _, share = cached.partition(":")
+    return plan, int(share) if share.isdigit() else DEFAULT_SHARE
+
+
+def set_tenant_profile(user_id: int, plan_name: str, max_concurrent_tasks: int | None) -> None:
+    """Закэшировать профиль пользователя (план и долю в очереди)."""
+    share = max_concurrent_tasks if max_concurrent_tasks else UNLIMITED_SHARE
+    try:
+        _redis().set(PROFILE_KEY.format(user_id=user_id), f"{plan_name}:{share}", ex=PROFILE_TTL_SECONDS)
+    except redis.RedisError as e:
+        logger.warning(f"Scheduling: failed to cache tenant profile for user {user_id}: {e}")
+
+
+async def refresh_tenant_profile(session: AsyncSession, user_id: int) -> None:
+    """
+    Обновить кэш профиля из квот пользователя, если кэш истек.
+
+    Вызывается там, где есть DB session (bulk операции, automation);
+    одиночная постановка задач использует закэшированный профиль.
+    """
+    from api.services.quota_service import QuotaService
+
+    try:
+        if await run_in_threadpool(_redis().exists, PROFILE_KEY.format(user_id=user_id)):
+            return
+    except redis.RedisError as e:
+        logger.warning(f"Scheduling: failed to check tenant profile for user {user_id}: {e}")
+        return
+
+    plan_name, max_concurrent_tasks = await QuotaService(session).get_scheduling_profile(user_id)
+    await run_in_threadpool(set_tenant_profile, user_id, plan_name, max_concurrent_tasks)
+
+
+# ========================================
+# PRIORITY
+# ========================================
+
+
+def backlog_penalty(depth: int, share: int) -> int:
+    """Штраф за backlog сверх fair share: 0 в пределах доли, далее log2 от превышения."""
+    if depth <= share:
+        return 0
+    return min(MAX_BACKLOG_PENALTY, int(math.log2(depth / max(share, 1))) + 1)
+
+
+def compute_priority(task_name: str, plan_name: str, depth: int, share: int) -> int:
+    """Приоритет сообщения для Redis transport (0 - наивысший, 9 - низший)."""
+    importance = (
+        TASK_IMPORTANCE.get(task_name, DEFAULT_IMPORTANCE)
+        + PLAN_PRIORITY_BOOST.get(plan_name, 0)
+        - backlog_penalty(depth, share)
+    )
+    return max(0, min(MAX_PRIORITY, MAX_PRIORITY - importance))
+
+
+def schedule(task_name: str, user_id: int | None, count: int = 1) -> list[dict[str, Any]]:
+    """
+    Рассчитать опции публикации для `count` задач пользователя и учесть их в backlog.
+
+    Каждая следующая задача той же пачки видит глубину очереди с учетом предыдущих,
+    поэтому хвост большой bulk операции получает все более низкий приоритет.
+
+    Args:
+        task_name: Имя задачи (api.tasks.signatures)
+        user_id: ID пользователя (None - системная задача, без fair share)
+        count: Количество задач
+
+    Returns:
+        Список опций apply_async/send_task (priority, headers) по одному на задачу
+    """
+    queue = resolve_queue(task_name)
+    enqueued_at = f"{time.time():.3f}"
+
+    if user_id is None:
+        priority = compute_priority(task_name, DEFAULT_PLAN, 0, DEFAULT_SHARE)
+        return [{"priority": priority} for _ in range(count)]
+
+    plan_name, share = get_tenant_profile(user_id)
+    try:
+        depth_after = _redis().hincrby(DEPTH_KEY, f"{queue}:{user_id}", count)
+    except redis.RedisError as e:
+        logger.warning(f"Scheduling: failed to update backlog for user {user_id}: {e}")
+        depth_after = count
+    depth_before = depth_after - count
+
+    headers = {HEADER_TENANT: user_id, HEADER_QUEUE: queue, HEADER_ENQUEUED_AT: enqueued_at}
+    return [
+        {"priority": compute_priority(task_name, plan_name, depth_before + index, share), "headers": headers}
+        for index in range(count)
+    ]
+
+
+def unschedule(task_name: str, user_id: int | None, count: int = 1) -> None:
+    """Откатить учет backlog для задач, которые не удалось опубликовать."""
+    if user_id is None:
+        return
+    try:
+        _redis().hincrby(DEPTH_KEY, f"{resolve_queue(task_name)}:{user_id}", -count)
+    except redis.RedisError as e:
+        logger.warning(f"Scheduling: failed to roll back backlog for user {user_id}: {e}")
+
+
+# ========================================
+# WORKER SIDE (signals)
+# ========================================
+
+
+def _bucket(key_template: str, moment: datetime) -> str:
+    return key_template.format(bucket=moment.strftime("%Y%m%d%H"))
+
+
+def _record_duration(client: redis.Redis, key_template: str, field: str, seconds: float) -> None:
+    """Добавить длительность в часовой bucket (sum/count/max)."""
+    key = _bucket(key_template, datetime.now(UTC))
+    seconds = round(seconds, 3)
+    pipe = client.pipeline()
+    pipe.hincrbyfloat(key, f"{field}:sum", seconds)
+    pipe.hincrby(key, f"{field}:count", 1)
+    pipe.eval(_UPDATE_MAX_SCRIPT, 1, key, f"{field}:max", seconds)
+    pipe.expire(key, BUCKET_TTL_SECONDS)
+    pipe.execute()
+
+
+def _read_durations(client: redis.Redis, key_template: str) -> dict[str, dict[str, float]]:
+    """Длительности за текущий и предыдущий час: field -> {sum, count, max}."""
+    now = datetime.now(UTC)
+    durations: dict[str, dict[str, float]] = {}
+    for key in (_bucket(key_template, now - timedelta(hours=1)), _bucket(key_template, now)):
+        for raw_field, raw_value in client.hgetall(key).items():
+            field, _, metric = raw_field.rpartition(":")
+            stats = durations.setdefault(field, {"sum": 0.0, "count": 0.0, "max": 0.0})
+            value = float(raw_value)
+            stats[metric] = max(stats[metric], value) if metric == "max" else stats[metric] + value
+    return durations
+
+
+def _read_header(request: Any, name: str) -> Any:
+    """Заголовок сообщения из task.request (Context) или worker Request (task_revoked)."""
+    value = getattr(request, name, None)
+    if value is None:
+        value = (getattr(request, "headers", None) or {}).get(name)
+    if value is None:
+        value = (getattr(request, "request_dict", None) or {}).get(name)
+    return value
+
+
+def record_task_started(request: Any) -> None:
+    """
+    Учесть старт задачи: уменьшить backlog пользователя и записать время ожидания.
+
+    Повторы (retry) не учитываются - в backlog они не добавлялись.
+    """
+    tenant_id = _read_header(request, HEADER_TENANT)
+    queue = _read_header(request, HEADER_QUEUE)
+    if tenant_id is None or queue is None or getattr(request, "retries", 0):
+        return
+
+    field = f"{queue}:{tenant_id}"
+    client = _redis()
+    try:
+        client.eval(_DECREMENT_SCRIPT, 1, DEPTH_KEY, field)
+
+        enqueued_at = _read_header(request, HEADER_ENQUEUED_AT)
+        if enqueued_at is None:
+            return
+        _record_duration(client, WAIT_KEY, field, max(0.0, time.time() - float(enqueued_at)))
+    except (redis.RedisError, ValueError) as e:
+        logger.warning(f"Scheduling: failed to record start of task for user {tenant_id}: {e}")
+
+
+def record_task_discarded(request: Any) -> None:
+    """Учесть задачу, снятую с очереди без выполнения (revoked/expired)."""
+    tenant_id = _read_header(request, HEADER_TENANT)
+    queue = _read_header(request, HEADER_QUEUE)
+    if tenant_id is None or queue is None or getattr(request, "retries", 0):
+        return
+    try:
+        _redis().eval(_DECREMENT_SCRIPT, 1, DEPTH_KEY, f"{queue}:{tenant_id}")
+    except redis.RedisError as e:
+        logger.warning(f"Scheduling: failed to record discarded task for user {tenant_id}: {e}")
+
+
+def record_db_hold(task_name: str, seconds: float) -> None:
+    """Учесть время удержания DB соединения задачей (api.helpers.unit_of_work)."""
+    try:
+        _record_duration(_redis(), DB_HOLD_KEY, task_name, seconds)
+    except redis.RedisError as e:
+        logger.warning(f"Scheduling: failed to record DB hold time for {task_name}: {e}")
+
+
+# ========================================
+# METRICS
+# ========================================
+
+
+def _broker_queue_length(client: redis.Redis, queue: str) -> int:
+    """Длина очереди в broker с учетом приоритетных подсписков ({queue}:{priority})."""
+    sep = celery_app.conf.broker_transport_options.get("sep", ":")
+    steps = celery_app.conf.broker_transport_options.get("priority_steps", [0])
+    pipe = client.pipeline()
+    for step in steps:
+        pipe.llen(queue if step == 0 else f"{queue}{sep}{step}")
+    return sum(pipe.execute())
+
+
+def get_queue_metrics() -> dict[str, Any]:
+    """
+    Метрики очередей: длины очередей в broker, backlog/ожидание по пользователям и
+    удержание DB соединений задачами за текущий и предыдущий час.
+    """
+    client = _redis()
+    queues = sorted({route["queue"] for route in (celery_app.conf.task_routes or {}).values()})
+
+    wait = _read_durations(client, WAIT_KEY)
+    depth = {field: int(value) for field, value in client.hgetall(DEPTH_KEY).items()}
+
+    tenants = []
+    for field in sorted(set(depth) | set(wait)):
+        queue, _, user_id = field.rpartition(":")
+        stats = wait.get(field, {"sum": 0.0, "count": 0.0, "max": 0.0})
+        tenants.append(
+            {
+                "user_id": int(user_id),
+                "queue": queue,
+                "queued": depth.get(field, 0),
+                "started_count": int(stats["count"]),
+                "avg_wait_seconds": round(stats["sum"] / stats["count"], 2) if stats["count"] else None,
+                "max_wait_seconds": round(stats["max"], 2) if stats["count"] else None,
+            }
+        )
+
+    db_hold = [
+        {
+            "task_name": task_name,
+            "count": int(stats["count"]),
+            "avg_seconds": round(stats["sum"] / stats["count"], 3) if stats["count"] else None,
+            "max_seconds": round(stats["max"], 3) if stats["count"] else None,
+        }
+        for task_name, stats in sorted(_read_durations(client, DB_HOLD_KEY).items())
+    ]
+
+    return {
+        "queues": [{"queue": queue, "length": _broker_queue_length(client, queue)} for queue in queues],
+        "tenants": tenants,
+        "db_hold": db_hold,
+    }
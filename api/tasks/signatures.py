@@ -0,0 +1,106 @@
+"""Имена Celery задач и постановка задач в очередь по имени.
+
+API сервер не импортирует модули задач (а вместе с ними googleapiclient, vk_api,
+fireworks, openai и ffmpeg обертки): задачи отправляются через send_task по имени,
+маршрутизация по очередям работает по тем же шаблонам из celery_app.conf.task_routes.
+Приоритет и заголовки для fair share рассчитывает api.tasks.scheduling.
+Учет backlog и публикация - синхронные вызовы Redis, поэтому enqueue* выполняют их
+в threadpool и не блокируют event loop API.
+
+Имена должны совпадать с name=... в декораторах @celery_app.task.
+"""
+
+from typing import Any
+
+from celery.result import AsyncResult
+from fastapi.concurrency import run_in_threadpool
+
+from api.celery_app import celery_app
+
+# Processing
+DOWNLOAD_RECORDING = "api.tasks.processing.download_recording"
+TRIM_VIDEO = "api.tasks.processing.trim_video"
+TRANSCRIBE_RECORDING = "api.tasks.processing.transcribe_recording"
+PROCESS_RECORDING = "api.tasks.processing.process_recording"
+EXTRACT_TOPICS = "api.tasks.processing.extract_topics"
+GENERATE_SUBTITLES = "api.tasks.processing.generate_subtitles"
+BATCH_TRANSCRIBE_RECORDING = "api.tasks.processing.batch_transcribe_recording"
+POLL_BATCH_TRANSCRIPTIONS = "api.tasks.processing.poll_batch_transcriptions"
+FINALIZE_BATCH_TRANSCRIPTION = "api.tasks.processing.finalize_batch_transcription"
+
+# Upload
+UPLOAD_RECORDING_TO_PLATFORM = "api.tasks.upload.upload_recording_to_platform"
+BATCH_UPLOAD_RECORDINGS = "api.tasks.upload.batch_upload_recordings"
+UPLOAD_CHANNEL_BATCH = "api.tasks.upload.upload_channel_batch"
+
+# Sync
+SYNC_SINGLE_SOURCE = "api.tasks.sync.sync_single_source"
+BATCH_SYNC_SOURCES = "api.tasks.sync.batch_sync_sources"
+
+# Template
+REMATCH_RECORDINGS = "api.tasks.template.rematch_recordings"
+
+# Automation
+RUN_AUTOMATION_JOB = "automation.run_job"
+DRY_RUN_AUTOMATION_JOB = "automation.dry_run"
+
+# Maintenance
+CLEANUP_EXPIRED_TOKENS = "maintenance.cleanup_expired_tokens"
+RECONCILE_RECORDING_STATS = "maintenance.reconcile_recording_stats"
+
+
+async def enqueue(task_name: str, /, *args: Any, **kwargs: Any) -> AsyncResult:
+    """
+    Аналог task.delay(*args, **kwargs) без импорта модуля задачи.
+
+    Приоритет рассчитывается планировщиком по типу задачи и kwargs["user_id"].
+
+    Args:
+        task_name: Имя задачи (константа из этого модуля)
+        *args: Позиционные аргументы задачи
+        **kwargs: Именованные аргументы задачи
+
+    Returns:
+        AsyncResult поставленной задачи
+    """
+    return await enqueue_with_options(task_name, args=args, kwargs=kwargs)
+
+
+async def enqueue_with_options(
+    task_name: str,
+    args: list | tuple | None = None,
+    kwargs: dict[str, Any] | None = None,
+    **options: Any,
+) -> AsyncResult:
+    """
+    Аналог task.apply_async(args, kwargs, **options) без импорта модуля задачи.
+
+    Args:
+        task_name: Имя задачи (константа из этого модуля)
+        args: Позиционные аргументы задачи
+        kwargs: Именованные аргументы задачи
+        **options: Опции отправки (countdown, queue, ...); явный priority
+            заменяет рассчитанный планировщиком
+
+    Returns:
+        AsyncResult поставленной задачи
+    """
+    return await run_in_threadpool(_send_scheduled, task_name, args, kwargs, options)
+
+
+def _send_scheduled(
+    task_name: str,
+    args: list | tuple | None,
+    kwargs: dict[str, Any] | None,
+    options: dict[str, Any],
+) -> AsyncResult:
+    """Рассчитать приоритет, учесть задачу в backlog и опубликовать (синхронно, вне event loop)."""
+    from api.tasks.scheduling import schedule, unschedule
+
+    user_id = (kwargs or {}).get("user_id")
+    (scheduled,) = schedule(task_name, user_id)
+    try:
+        return celery_app.send_task(task_name, args=args, kwargs=kwargs, **{**scheduled, **options})
+    except Exception:
+        unschedule(task_name, user_id)
+        raise
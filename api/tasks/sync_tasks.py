@@ -24,6 +24,7 @@ def sync_single_source_task(
     user_id: int,
     from_date: str = "2024-01-01",
     to_date: str | None = None,
+    incremental: bool = False,
 ) -> dict:
     """
     Syncing one source (Celery task).
@@ -33,6 +34,7 @@ def sync_single_source_task(
         user_id: ID of user
         from_date: Start date in format YYYY-MM-DD
         to_date: End date in format YYYY-MM-DD (optional)
+        incremental: Only request the window since the source sync watermark
 
     Returns:
         Result of syncing
@@ -52,7 +54,9 @@ def sync_single_source_task(
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
 
-        result = loop.run_until_complete(_async_sync_single_source(self, source_id, user_id, from_date, to_date))
+        result = loop.run_until_complete(
+            _async_sync_single_source(self, source_id, user_id, from_date, to_date, incremental)
+        )
         return self.build_result(user_id=user_id, **result)
 
     except Exception as e:
@@ -73,6 +77,7 @@ def bulk_sync_sources_task(
     user_id: int,
     from_date: str = "2024-01-01",
     to_date: str | None = None,
+    incremental: bool = False,
 ) -> dict:
     """
     Batch syncing multiple sources (Celery task).
@@ -82,6 +87,7 @@ def bulk_sync_sources_task(
         user_id: ID of user
         from_date: Start date in format YYYY-MM-DD
         to_date: End date in format YYYY-MM-DD (optional)
+        incremental: Only request the window since the source sync watermark
 
     Returns:
         Results of syncing all sources
@@ -106,7 +112,9 @@ def bulk_sync_sources_task(
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
 
-        result = loop.run_until_complete(_async_batch_sync_sources(self, source_ids, user_id, from_date, to_date))
+        result = loop.run_until_complete(
+            _async_batch_sync_sources(self, source_ids, user_id, from_date, to_date, incremental)
+        )
         return self.build_result(user_id=user_id, **result)
 
     except Exception as e:
@@ -120,6 +128,7 @@ async def _async_sync_single_source(
     user_id: int,
     from_date: str,
     to_date: str | None,
+    incremental: bool = False,
 ) -> dict:
     """Async wrapper for syncing one source."""
     from database.config import DatabaseConfig
@@ -133,7 +142,7 @@ async def _async_sync_single_source(
         # Import here to avoid circular imports
         from api.routers.input_sources import _sync_single_source
 
-        result = await _sync_single_source(source_id, from_date, to_date, session, user_id)
+        result = await _sync_single_source(source_id, from_date, to_date, session, user_id, incremental)
 
         if result["status"] == "success":
             await session.commit()
@@ -152,6 +161,9 @@ async def _async_sync_single_source(
                 "recordings_found": result.get("recordings_found", 0),
                 "recordings_saved": result.get("recordings_saved", 0),
                 "recordings_updated": result.get("recordings_updated", 0),
+                "recordings_unchanged": result.get("recordings_unchanged", 0),
+                "api_calls_avoided": result.get("api_calls_avoided", 0),
+                "window_from": result.get("window_from"),
             }
         return {
             "status": "error",
@@ -166,6 +178,7 @@ async def _async_batch_sync_sources(
     user_id: int,
     from_date: str,
     to_date: str | None,
+    incremental: bool = False,
 ) -> dict:
     """Async wrapper for batch syncing sources."""
     from database.config import DatabaseConfig
@@ -197,7 +210,7 @@ async def _async_batch_sync_sources(
                 # Import here to avoid circular imports
                 from api.routers.input_sources import _sync_single_source
 
-                result = await _sync_single_source(source_id, from_date, to_date, session, user_id)
+                result = await _sync_single_source(source_id, from_date, to_date, session, user_id, incremental)
 
                 if result["status"] == "success":
                     successful += 1
@@ -209,6 +222,9 @@ async def _async_batch_sync_sources(
                             "recordings_found": result.get("recordings_found"),
                             "recordings_saved": result.get("recordings_saved"),
                             "recordings_updated": result.get("recordings_updated"),
+                            "recordings_unchanged": result.get("recordings_unchanged"),
+                            "api_calls_avoided": result.get("api_calls_avoided"),
+                            "window_from": result.get("window_from"),
                         }
                     )
                 else:
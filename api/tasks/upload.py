@@ -1,17 +1,26 @@
 """Celery tasks for uploading videos with multi-tenancy support."""
 
 import asyncio
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
 
 from celery.exceptions import SoftTimeLimitExceeded
 
 from api.celery_app import celery_app
-from api.core.context import ServiceContext
 from api.services.config_resolver import ConfigResolver
 from api.shared.exceptions import CredentialError, ResourceNotFoundError
 from api.tasks.base import UploadTask
-from database.config import DatabaseConfig
-from database.manager import DatabaseManager
+from api.tasks.scheduling import schedule
+from config.settings import settings
 from logger import get_logger
+from video_upload_module.platforms.youtube.quota import (
+    UPLOAD_PRIORITY_PIPELINE,
+    QuotaExhaustedError,
+    get_quota_ledger,
+    pending_entry,
+)
 from video_upload_module.platforms.youtube.token_handler import TokenRefreshError
 from video_upload_module.uploader_factory import create_uploader_from_db
 
@@ -33,6 +42,7 @@ def upload_recording_to_platform(
     preset_id: int | None = None,
     credential_id: int | None = None,
     metadata_override: dict | None = None,
+    upload_priority: int = UPLOAD_PRIORITY_PIPELINE,
 ) -> dict:
     """
     Upload one recording to platform with user credentials.
@@ -44,6 +54,7 @@ def upload_recording_to_platform(
         preset_id: ID of output preset (optional)
         credential_id: ID of credential (optional)
         metadata_override: Override for preset metadata (playlist_id, album_id, etc.)
+        upload_priority: Order among uploads deferred by platform quota (higher - earlier)
 
     Returns:
         Dictionary with upload results
@@ -78,6 +89,31 @@ def upload_recording_to_platform(
         logger.error(f"[Task {self.request.id}] Soft time limit exceeded")
         raise self.retry(countdown=900, exc=SoftTimeLimitExceeded())
 
+    except QuotaExhaustedError as exc:
+        # Квота канала исчерпана - откладываем до окна, в которое загрузка помещается (не ошибка)
+        # Задача завершается, загрузку заново ставит release_deferred_uploads (лимит повторов не расходуется)
+        retry_at = _park_upload(
+            exc,
+            recording_id=recording_id,
+            user_id=user_id,
+            platform=platform,
+            preset_id=preset_id,
+            credential_id=credential_id,
+            upload_priority=upload_priority,
+            metadata_override=metadata_override,
+        )
+        logger.info(
+            f"[Task {self.request.id}] YouTube quota exhausted for credential {exc.credential_id}, "
+            f"upload deferred until {retry_at.isoformat()}"
+        )
+        return self.build_result(
+            user_id=user_id,
+            status="deferred",
+            recording_id=recording_id,
+            platform=platform,
+            retry_at=retry_at.isoformat(),
+        )
+
     except TokenRefreshError as exc:
         # Token refresh failed (YouTube or VK)
         logger.warning(
@@ -115,6 +151,447 @@ def upload_recording_to_platform(
         raise self.retry(exc=exc)
 
 
+TARGET_TYPE_MAP = {
+    "youtube": "YOUTUBE",
+    "vk": "VK",
+}
+# Платформа пресета -> платформа uploader_factory
+UPLOAD_PLATFORM_MAP = {"YOUTUBE": "youtube", "VK": "vk_video", "VK_VIDEO": "vk_video"}
+
+
+class UploadLookup:
+    """
+    Пресеты, шаблоны и credentials пользователя для подготовки загрузок.
+
+    Одиночная загрузка читает их по мере надобности, пакетная - prefetch()
+    двумя запросами на всю пачку; прочитанное кэшируется в пределах сессии.
+    """
+
+    def __init__(self, session: Any, user_id: int):
+        self.session = session
+        self.user_id = user_id
+        self._presets: dict[int, Any] = {}
+        self._templates: dict[int, Any] = {}
+        self._default_credentials: dict[str, int | None] = {}
+        self._prefetched = False
+
+    async def prefetch(self) -> None:
+        """Все пресеты и шаблоны пользователя (для пачки записей)."""
+        from api.repositories.template_repos import OutputPresetRepository, RecordingTemplateRepository
+
+        presets = await OutputPresetRepository(self.session).find_by_user(self.user_id)
+        templates = await RecordingTemplateRepository(self.session).find_by_user(self.user_id, include_drafts=True)
+        self._presets = {preset.id: preset for preset in presets}
+        self._templates = {template.id: template for template in templates}
+        self._prefetched = True
+
+    async def preset(self, preset_id: int) -> Any:
+        if preset_id not in self._presets and not self._prefetched:
+            from api.repositories.template_repos import OutputPresetRepository
+
+            self._presets[preset_id] = await OutputPresetRepository(self.session).find_by_id(preset_id, self.user_id)
+        return self._presets.get(preset_id)
+
+    async def template(self, template_id: int) -> Any:
+        if template_id not in self._templates and not self._prefetched:
+            from api.repositories.template_repos import RecordingTemplateRepository
+
+            self._templates[template_id] = await RecordingTemplateRepository(self.session).find_by_id(
+                template_id, self.user_id
+            )
+        return self._templates.get(template_id)
+
+    async def default_credential_id(self, platform: str) -> int | None:
+        """Первый активный credential платформы."""
+        if platform not in self._default_credentials:
+            from api.repositories.auth_repos import UserCredentialRepository
+
+            credentials = await UserCredentialRepository(self.session).list_by_platform(self.user_id, platform)
+            self._default_credentials[platform] = credentials[0].id if credentials else None
+        return self._default_credentials[platform]
+
+
+@dataclass
+class UploadJob:
+    """Подготовленная загрузка записи: все, что нужно фазе загрузки без сессии"""
+
+    recording_id: int
+    platform: str
+    target_type: str
+    preset_id: int | None  # выбранный пресет (в том числе автоматически из шаблона)
+    output_target_id: int
+    upload_platform: str
+    upload_credential_id: int
+    upload_params: dict[str, Any]
+    snapshot_version: int
+    quota_entry: str  # ключ в очереди отложенных по квоте - по исходным аргументам задачи
+
+
+async def _prepare_upload(
+    session: Any,
+    lookup: UploadLookup,
+    recording: Any,
+    user_id: int,
+    platform: str,
+    preset_id: int | None,
+    credential_id: int | None,
+    metadata_override: dict | None,
+) -> UploadJob:
+    """
+    Phase 1 одной записи: output_target (UPLOADING), пресет, метаданные и параметры загрузки.
+
+    Изменения только flush-атся, commit - за вызывающим.
+    """
+    from pathlib import Path
+
+    from api.helpers.template_renderer import TemplateRenderer
+    from api.repositories.recording_repos import RecordingAsyncRepository
+
+    recording_id = recording.id
+    target_type = TARGET_TYPE_MAP.get(platform.lower(), platform.upper())
+    quota_entry = pending_entry(recording_id, platform, preset_id)
+    recording_repo = RecordingAsyncRepository(session)
+
+    if not recording.processed_video_path:
+        raise ResourceNotFoundError("processed video", recording_id)
+
+    video_path = recording.processed_video_path
+    if not Path(video_path).exists():
+        raise ResourceNotFoundError("video file", video_path)
+
+    # Create or get output_target and mark as UPLOADING (commit до загрузки)
+    output_target = await recording_repo.get_or_create_output_target(
+        recording=recording,
+        target_type=target_type,
+        preset_id=preset_id,
+    )
+    await recording_repo.mark_output_uploading(output_target)
+
+    # Initialize preset metadata
+    preset_metadata = {}
+    upload_credential_id = None
+    upload_platform = platform
+
+    # If preset_id not provided but recording has template, try to get preset from template
+    if not preset_id and recording.template_id:
+        template = await lookup.template(recording.template_id)
+
+        if template and template.output_config:
+            preset_ids = template.output_config.get("preset_ids", [])
+            # Find preset matching the platform
+            for pid in preset_ids:
+                candidate_preset = await lookup.preset(pid)
+                if candidate_preset and candidate_preset.platform.lower() == platform.lower():
+                    preset_id = pid
+                    logger.info(
+                        f"[Upload] Auto-selected preset {preset_id} ('{candidate_preset.name}') "
+                        f"from template '{template.name}' for platform {platform}"
+                    )
+                    break
+
+    if preset_id:
+        # Get preset to extract platform and credential_id
+        preset = await lookup.preset(preset_id)
+
+        if not preset:
+            raise ValueError(f"Output preset {preset_id} not found for user {user_id}")
+
+        if not preset.credential_id:
+            raise ValueError(f"Output preset {preset_id} has no credential configured")
+
+        # Resolve upload metadata (preset + template + manual override for platform-specific fields like playlist_id, album_id, etc.)
+        config_resolver = ConfigResolver(session)
+        template = await lookup.template(recording.template_id) if recording.template_id else None
+        preset_metadata = config_resolver.merge_upload_metadata(recording, preset, template)
+        logger.info(f"Resolved metadata from preset '{preset.name}' + template: {list(preset_metadata.keys())}")
+
+        # Apply metadata_override if provided (only for platform-specific fields like playlist_id, album_id, etc.)
+        if metadata_override:
+            logger.info(f"Applying metadata_override for platform-specific fields: {metadata_override}")
+            # Deep merge to preserve existing preset_metadata fields
+            preset_metadata = config_resolver._merge_configs(preset_metadata, metadata_override)
+            logger.info(f"After override - preset_metadata has keys: {list(preset_metadata.keys())}")
+
+        upload_platform = UPLOAD_PLATFORM_MAP.get(preset.platform.upper(), preset.platform.lower())
+        upload_credential_id = preset.credential_id
+    elif credential_id:
+        # Use specified credential
+        upload_credential_id = credential_id
+    else:
+        # No credential specified - use first available credential
+        upload_credential_id = await lookup.default_credential_id(platform)
+        if upload_credential_id is None:
+            raise ValueError(f"No credentials found for platform {platform}")
+
+    # Prepare template context from recording with topics_display config
+    topics_display = preset_metadata.get("topics_display") if preset_metadata else None
+    template_context = TemplateRenderer.prepare_recording_context(recording, topics_display)
+
+    logger.info(
+        f"[Upload {platform}] Preset metadata keys: {list(preset_metadata.keys()) if preset_metadata else 'None'}"
+    )
+    logger.info(f"[Upload {platform}] Template context keys: {list(template_context.keys())}")
+    main_topics = list(recording.main_topics or [])
+    if main_topics:
+        logger.info(f"[Upload {platform}] main_topics: {main_topics}")
+
+    upload_params = _build_upload_params(
+        platform=platform,
+        video_path=video_path,
+        preset_metadata=preset_metadata,
+        template_context=template_context,
+        display_name=recording.display_name,
+        main_topics=main_topics,
+    )
+
+    return UploadJob(
+        recording_id=recording_id,
+        platform=platform,
+        target_type=target_type,
+        preset_id=preset_id,
+        output_target_id=output_target.id,
+        upload_platform=upload_platform,
+        upload_credential_id=upload_credential_id,
+        upload_params=upload_params,
+        snapshot_version=recording.version,
+        quota_entry=quota_entry,
+    )
+
+
+def _build_upload_params(
+    platform: str,
+    video_path: str,
+    preset_metadata: dict[str, Any],
+    template_context: dict[str, Any],
+    display_name: str | None,
+    main_topics: list[str],
+) -> dict[str, Any]:
+    """Заголовок и описание по шаблонам пресета + платформенные параметры uploader.upload_video()."""
+    from pathlib import Path
+
+    from api.helpers.template_renderer import TemplateRenderer
+
+    topics_display = preset_metadata.get("topics_display") if preset_metadata else None
+
+    # Prepare title and description from templates or defaults
+    title_template = preset_metadata.get("title_template", "{display_name}")
+    description_template = preset_metadata.get("description_template", "Uploaded on {record_time:date}")
+
+    logger.info(f"[Upload {platform}] title_template: {title_template[:100]}...")
+    logger.info(f"[Upload {platform}] description_template: {description_template[:200]}...")
+
+    title = TemplateRenderer.render(title_template, template_context, topics_display)
+    description = TemplateRenderer.render(description_template, template_context, topics_display)
+
+    logger.info(f"[Upload {platform}] Rendered title: {title[:100] if title else 'EMPTY'}")
+    logger.info(f"[Upload {platform}] Rendered description length: {len(description)} chars")
+    logger.info(
+        f"[Upload {platform}] Rendered description preview: {description[:200] if description else 'EMPTY'}"
+    )
+
+    # Fallback if templates produced empty strings
+    if not title:
+        logger.warning(f"[Upload {platform}] Title is empty, using fallback")
+        title = display_name or "Recording"
+    if not description:
+        logger.warning(f"[Upload {platform}] Description is empty, using fallback")
+        # Use consistent formatting
+        fallback_desc = TemplateRenderer.render("Uploaded on {record_time:date}", template_context, topics_display)
+        description = fallback_desc or "Uploaded"
+        if main_topics:
+            # Use topics_display for fallback if configured
+            if topics_display and topics_display.get("enabled", True):
+                topics_str = TemplateRenderer._format_topics_list(main_topics, topics_display)
+            else:
+                topics_str = ", ".join(main_topics[:5])
+            description += f"\n\n{topics_str}"
+
+    logger.info(f"[Upload {platform}] Final title: {title[:50]}...")
+    logger.info(f"[Upload {platform}] Final description length: {len(description)}")
+
+    # Prepare upload parameters from preset_metadata
+    upload_params = {
+        "video_path": video_path,
+        "title": title,
+        "description": description,
+    }
+
+    # Add platform-specific parameters from preset
+    if platform.lower() in ["youtube"]:
+        # YouTube-specific parameters
+        if "tags" in preset_metadata:
+            upload_params["tags"] = preset_metadata["tags"]
+
+        if "category_id" in preset_metadata:
+            upload_params["category_id"] = preset_metadata["category_id"]
+
+        if "privacy" in preset_metadata:
+            upload_params["privacy_status"] = preset_metadata["privacy"]
+
+        # Check both top-level and youtube-specific playlist_id
+        playlist_id = preset_metadata.get("playlist_id") or preset_metadata.get("youtube", {}).get("playlist_id")
+        logger.info(
+            f"[Upload YouTube] Playlist lookup: top-level={preset_metadata.get('playlist_id')}, youtube={preset_metadata.get('youtube', {}).get('playlist_id')}"
+        )
+        if playlist_id:
+            upload_params["playlist_id"] = playlist_id
+            logger.info(f"[Upload YouTube] Using playlist_id: {playlist_id}")
+        else:
+            logger.warning("[Upload YouTube] No playlist_id found in metadata")
+
+        if "publish_at" in preset_metadata:
+            upload_params["publish_at"] = preset_metadata["publish_at"]
+
+        # Check for thumbnail_path in multiple locations (platform-specific has priority)
+        thumbnail_path_str = preset_metadata.get("youtube", {}).get("thumbnail_path") or preset_metadata.get(
+            "thumbnail_path"
+        )
+        logger.info(
+            f"[Upload YouTube] Thumbnail lookup: youtube-specific={preset_metadata.get('youtube', {}).get('thumbnail_path')}, common={preset_metadata.get('thumbnail_path')}"
+        )
+        if thumbnail_path_str:
+            thumbnail_path = Path(thumbnail_path_str)
+            if thumbnail_path.exists():
+                upload_params["thumbnail_path"] = str(thumbnail_path)
+                logger.info(f"[Upload YouTube] Using thumbnail: {thumbnail_path}")
+            else:
+                logger.warning(f"[Upload YouTube] Thumbnail not found: {thumbnail_path}")
+        else:
+            logger.warning("[Upload YouTube] No thumbnail_path found in metadata")
+
+        # Additional YouTube params
+        for key in ["made_for_kids", "embeddable", "license", "public_stats_viewable"]:
+            if key in preset_metadata:
+                upload_params[key] = preset_metadata[key]
+
+    elif platform.lower() in ["vk", "vk_video"]:
+        # VK-specific parameters - check both top-level and nested 'vk' key
+        album_id = preset_metadata.get("album_id") or preset_metadata.get("vk", {}).get("album_id")
+        if album_id:
+            upload_params["album_id"] = str(album_id)
+            logger.info(f"[Upload VK] Using album_id: {album_id}")
+        else:
+            logger.warning("[Upload VK] No album_id found in metadata")
+
+        # Thumbnail - check both top-level and nested 'vk' key (platform-specific has priority)
+        thumbnail_path_str = preset_metadata.get("vk", {}).get("thumbnail_path") or preset_metadata.get(
+            "thumbnail_path"
+        )
+        if thumbnail_path_str:
+            thumbnail_path = Path(thumbnail_path_str)
+            if thumbnail_path.exists():
+                upload_params["thumbnail_path"] = str(thumbnail_path)
+                logger.info(f"[Upload VK] Using thumbnail: {thumbnail_path}")
+            else:
+                logger.warning(f"[Upload VK] Thumbnail not found: {thumbnail_path}")
+        else:
+            logger.warning("[Upload VK] No thumbnail_path found in metadata")
+
+        # VK privacy and other settings (including group_id for group uploads)
+        for key in ["group_id", "privacy_view", "privacy_comment", "no_comments", "repeat", "wallpost"]:
+            if key in preset_metadata:
+                upload_params[key] = preset_metadata[key]
+
+    return upload_params
+
+
+async def _authenticate_uploader(uow: Any, platform: str, upload_platform: str, upload_credential_id: int) -> Any:
+    """
+    Uploader с пройденной аутентификацией.
+
+    Отдельная сессия credential provider нужна только для чтения/обновления токена:
+    после authenticate() соединение возвращается в пул, при refresh во время загрузки
+    provider берет его заново на короткое время.
+    """
+    credential_session = uow.db_manager.async_session()
+    try:
+        uploader = await create_uploader_from_db(
+            platform=upload_platform,
+            credential_id=upload_credential_id,
+            session=credential_session,
+        )
+
+        # Authentication
+        auth_success = await uploader.authenticate()
+        if not auth_success:
+            raise CredentialError(
+                platform=platform,
+                reason="Token validation failed or expired. Please re-authenticate via OAuth.",
+            )
+    finally:
+        await credential_session.close()
+    return uploader
+
+
+async def _upload_job(uploader: Any, job: UploadJob) -> Any:
+    """Phase 2: загрузка без удерживаемой транзакции."""
+    upload_result = await uploader.upload_video(**job.upload_params)
+
+    if not upload_result or upload_result.error_message:
+        error_message = upload_result.error_message if upload_result else "Unknown error"
+        raise Exception(f"Upload failed: {error_message}")
+    return upload_result
+
+
+async def _mark_job_deferred(uow: Any, job: UploadJob, retry_at: datetime) -> None:
+    """Phase 3 (квота): загрузка отложена, output_target возвращается в NOT_UPLOADED."""
+    from api.repositories.recording_repos import RecordingAsyncRepository
+    from database.models import OutputTargetModel
+
+    async with uow.session() as session:
+        output_target = await session.get(OutputTargetModel, job.output_target_id)
+        if output_target:
+            await RecordingAsyncRepository(session).mark_output_deferred(output_target, retry_at)
+            await session.commit()
+
+
+async def _mark_job_failed(uow: Any, job: UploadJob, error: Exception) -> None:
+    """Phase 3 (ошибка): короткая транзакция - пометить output_target как FAILED."""
+    from api.repositories.recording_repos import RecordingAsyncRepository
+    from database.models import OutputTargetModel
+
+    async with uow.session() as session:
+        output_target = await session.get(OutputTargetModel, job.output_target_id)
+        if output_target and output_target.status != "FAILED":
+            await RecordingAsyncRepository(session).mark_output_failed(output_target, str(error))
+            await session.commit()
+    if job.upload_platform == "youtube":
+        get_quota_ledger().complete(job.upload_credential_id, job.quota_entry)
+
+
+async def _save_job_result(uow: Any, job: UploadJob, user_id: int, upload_result: Any) -> None:
+    """Phase 3: короткая транзакция - сохранить результат загрузки (status UPLOADED)."""
+    from api.repositories.recording_repos import RecordingAsyncRepository
+
+    if job.upload_platform == "youtube":
+        get_quota_ledger().complete(job.upload_credential_id, job.quota_entry)
+
+    async with uow.session() as session:
+        recording_repo = RecordingAsyncRepository(session)
+        recording = await recording_repo.get_by_id(job.recording_id, user_id)
+        if not recording:
+            raise ValueError(f"Recording {job.recording_id} not found for user {user_id}")
+        # Конфликт не отклоняет результат: видео уже опубликовано (без сохранения video_id retry загрузил бы
+        # дубликат), а save_upload_result пишет только output_target этой платформы - статус записи и
+        # stage state, которые меняют другие writer'ы, не перезаписываются.
+        if recording.version != job.snapshot_version:
+            logger.warning(
+                f"[Upload {job.platform}] Recording {job.recording_id} changed during upload "
+                f"(version {job.snapshot_version} -> {recording.version}), saving result to current version"
+            )
+
+        await recording_repo.save_upload_result(
+            recording=recording,
+            target_type=job.target_type,
+            preset_id=job.preset_id,
+            video_id=upload_result.video_id,
+            video_url=upload_result.video_url,
+            target_meta={"platform": job.platform, "uploaded_by_task": True},
+        )
+
+        await session.commit()
+
+
 async def _async_upload_recording(
     recording_id: int,
     user_id: int,
@@ -136,330 +613,344 @@ async def _async_upload_recording(
     Returns:
         Upload results
     """
-    from pathlib import Path
-
-    from api.helpers.template_renderer import TemplateRenderer
+    from api.helpers.unit_of_work import TaskUnitOfWork
     from api.repositories.recording_repos import RecordingAsyncRepository
 
-    db_config = DatabaseConfig.from_env()
-    db_manager = DatabaseManager(db_config)
-
-    async with db_manager.async_session() as session:
-        ctx = ServiceContext.create(session=session, user_id=user_id)
-        recording_repo = RecordingAsyncRepository(session)
+    async with TaskUnitOfWork("upload", recording_id, user_id) as uow:
+        # Phase 1: короткая транзакция - запись, output_target (UPLOADING), метаданные и параметры загрузки
+        async with uow.session() as session:
+            # Get recording from DB
+            recording = await RecordingAsyncRepository(session).get_by_id(recording_id, user_id)
+            if not recording:
+                raise ValueError(f"Recording {recording_id} not found for user {user_id}")
+
+            logger.info(f"[Upload] Recording {recording_id} loaded from DB")
+
+            job = await _prepare_upload(
+                session,
+                UploadLookup(session, user_id),
+                recording,
+                user_id,
+                platform,
+                preset_id,
+                credential_id,
+                metadata_override,
+            )
+            await session.commit()
 
-        # Get recording from DB
-        recording = await recording_repo.get_by_id(recording_id, user_id)
-        if not recording:
-            raise ValueError(f"Recording {recording_id} not found for user {user_id}")
+        try:
+            # Phase 2: аутентификация и загрузка без удерживаемой транзакции
+            uploader = await _authenticate_uploader(uow, platform, job.upload_platform, job.upload_credential_id)
+            upload_result = await _upload_job(uploader, job)
 
-        # DEBUG: Check what data is loaded from DB for debugging
-        logger.info(f"[Upload] Recording {recording_id} loaded from DB")
-        logger.info(
-            f"[Upload] Recording has main_topics: {hasattr(recording, 'main_topics')} = {getattr(recording, 'main_topics', None)}"
-        )
-        logger.info(
-            f"[Upload] Recording has topic_timestamps: {hasattr(recording, 'topic_timestamps')} = {type(getattr(recording, 'topic_timestamps', None))}"
-        )
-        if hasattr(recording, "topic_timestamps") and recording.topic_timestamps:
-            logger.info(
-                f"[Upload] topic_timestamps is list: {isinstance(recording.topic_timestamps, list)}, length: {len(recording.topic_timestamps) if isinstance(recording.topic_timestamps, list) else 'N/A'}"
-            )
+        except QuotaExhaustedError as e:
+            await _mark_job_deferred(uow, job, e.retry_at)
+            raise
 
-        if not recording.processed_video_path:
-            raise ResourceNotFoundError("processed video", recording_id)
+        except Exception as e:
+            await _mark_job_failed(uow, job, e)
+            raise
 
-        video_path = recording.processed_video_path
-        if not Path(video_path).exists():
-            raise ResourceNotFoundError("video file", video_path)
+        await _save_job_result(uow, job, user_id, upload_result)
 
-        # Create or get output_target and mark as UPLOADING
-        target_type_map = {
-            "youtube": "YOUTUBE",
-            "vk": "VK",
+        return {
+            "success": True,
+            "video_id": upload_result.video_id,
+            "video_url": upload_result.video_url,
         }
-        target_type = target_type_map.get(platform.lower(), platform.upper())
 
-        output_target = await recording_repo.get_or_create_output_target(
-            recording=recording,
-            target_type=target_type,
-            preset_id=preset_id,
-        )
 
-        await recording_repo.mark_output_uploading(output_target)
-
-        # Initialize preset metadata
-        preset_metadata = {}
-        preset = None
-
-        # If preset_id not provided but recording has template, try to get preset from template
-        if not preset_id and recording.template_id:
-            from api.repositories.template_repos import OutputPresetRepository, RecordingTemplateRepository
-
-            template_repo = RecordingTemplateRepository(ctx.session)
-            template = await template_repo.find_by_id(recording.template_id, user_id)
-
-            if template and template.output_config:
-                preset_ids = template.output_config.get("preset_ids", [])
-                if preset_ids:
-                    # Find preset matching the platform
-                    preset_repo = OutputPresetRepository(ctx.session)
-                    for pid in preset_ids:
-                        candidate_preset = await preset_repo.find_by_id(pid, user_id)
-                        if candidate_preset and candidate_preset.platform.lower() == platform.lower():
-                            preset_id = pid
-                            logger.info(
-                                f"[Upload] Auto-selected preset {preset_id} ('{candidate_preset.name}') "
-                                f"from template '{template.name}' for platform {platform}"
-                            )
-                            break
-
-        # Create uploader with new factory
-        if preset_id:
-            # Get preset to extract platform and credential_id
-            from api.repositories.template_repos import OutputPresetRepository
-
-            preset_repo = OutputPresetRepository(ctx.session)
-            preset = await preset_repo.find_by_id(preset_id, user_id)
+@celery_app.task(
+    bind=True,
+    base=UploadTask,
+    name="api.tasks.upload.upload_channel_batch",
+    max_retries=0,
+    soft_time_limit=4 * 3600,
+    time_limit=4 * 3600 + 300,
+)
+def upload_channel_batch(
+    self,
+    recording_ids: list[int],
+    user_id: int,
+    platform: str,
+    preset_id: int | None = None,
+    credential_id: int | None = None,
+    upload_priority: int = UPLOAD_PRIORITY_PIPELINE,
+) -> dict:
+    """
+    Upload several recordings to one platform in one worker.
 
-            if not preset:
-                raise ValueError(f"Output preset {preset_id} not found for user {user_id}")
+    Recordings, presets and templates are loaded in bulk, each channel (credential)
+    is authenticated once and uploads run with bounded parallelism
+    (settings.upload.batch_concurrency). Every output target gets its own status;
+    a failed recording does not stop the batch.
 
-            if not preset.credential_id:
-                raise ValueError(f"Output preset {preset_id} has no credential configured")
+    Args:
+        recording_ids: IDs of recordings
+        user_id: ID of user
+        platform: Platform (youtube, vk)
+        preset_id: ID of output preset (optional, otherwise auto-selected from template per recording)
+        credential_id: ID of credential (optional)
+        upload_priority: Order among uploads deferred by platform quota (higher - earlier)
 
-            # Resolve upload metadata using ConfigResolver (preset + template + manual override for platform-specific fields like playlist_id, album_id, etc.)
-            config_resolver = ConfigResolver(ctx.session)
-            preset_metadata = await config_resolver.resolve_upload_metadata(
-                recording=recording, user_id=user_id, preset_id=preset.id
-            )
-            logger.info(f"Resolved metadata from preset '{preset.name}' + template: {list(preset_metadata.keys())}")
-
-            # Apply metadata_override if provided (only for platform-specific fields like playlist_id, album_id, etc.)
-            if metadata_override:
-                logger.info(f"Applying metadata_override for platform-specific fields: {metadata_override}")
-                # Deep merge to preserve existing preset_metadata fields
-                preset_metadata = config_resolver._merge_configs(preset_metadata, metadata_override)
-                logger.info(f"After override - preset_metadata has keys: {list(preset_metadata.keys())}")
-
-            # Map platform names
-            platform_map = {"YOUTUBE": "youtube", "VK": "vk_video", "VK_VIDEO": "vk_video"}
-            mapped_platform = platform_map.get(preset.platform.upper(), preset.platform.lower())
-
-            uploader = await create_uploader_from_db(
-                platform=mapped_platform,
-                credential_id=preset.credential_id,
-                session=ctx.session,
-            )
-        elif credential_id:
-            # Use specified credential
-            uploader = await create_uploader_from_db(
+    Returns:
+        Dictionary with per-recording results
+    """
+    results: dict[int, dict] = {}
+    try:
+        logger.info(
+            f"[Task {self.request.id}] Channel batch upload of {len(recording_ids)} recordings "
+            f"for user {user_id} to {platform}"
+        )
+        asyncio.run(
+            _async_upload_channel_batch(
+                recording_ids=recording_ids,
+                user_id=user_id,
                 platform=platform,
+                preset_id=preset_id,
                 credential_id=credential_id,
-                session=ctx.session,
+                upload_priority=upload_priority,
+                results=results,
             )
-        else:
-            # No credential specified - need to find default
-            from api.repositories.auth_repos import UserCredentialRepository
+        )
 
-            cred_repo = UserCredentialRepository(ctx.session)
-            credentials = await cred_repo.list_by_platform(user_id, platform)
+    except SoftTimeLimitExceeded:
+        # Незавершенные записи догружаются одиночными задачами
+        remaining = [recording_id for recording_id in recording_ids if recording_id not in results]
+        logger.error(
+            f"[Task {self.request.id}] Soft time limit exceeded, "
+            f"{len(remaining)} recordings rescheduled as single uploads"
+        )
+        for recording_id in remaining:
+            task = _schedule_single_upload(recording_id, user_id, platform, preset_id, credential_id, upload_priority)
+            results[recording_id] = {"recording_id": recording_id, "status": "rescheduled", "task_id": task.id}
 
-            if not credentials:
-                raise ValueError(f"No credentials found for platform {platform}")
+    except Exception as exc:
+        logger.error(f"[Task {self.request.id}] Error in channel batch upload: {exc}", exc_info=True)
+        raise
 
-            # Use first available credential
-            uploader = await create_uploader_from_db(
-                platform=platform,
-                credential_id=credentials[0].id,
-                session=ctx.session,
-            )
+    items = [results[recording_id] for recording_id in recording_ids if recording_id in results]
+    counts = Counter(item["status"] for item in items)
+    logger.info(f"[Task {self.request.id}] Channel batch upload to {platform} finished: {dict(counts)}")
+    return self.build_result(
+        user_id=user_id,
+        status="completed",
+        platform=platform,
+        uploaded=counts["uploaded"],
+        failed=counts["failed"],
+        deferred=counts["deferred"],
+        results=items,
+    )
+
+
+def _schedule_single_upload(
+    recording_id: int,
+    user_id: int,
+    platform: str,
+    preset_id: int | None,
+    credential_id: int | None,
+    upload_priority: int,
+    countdown: int | None = None,
+    metadata_override: dict | None = None,
+) -> Any:
+    (scheduled,) = schedule(upload_recording_to_platform.name, user_id)
+    return upload_recording_to_platform.apply_async(
+        kwargs={
+            "recording_id": recording_id,
+            "user_id": user_id,
+            "platform": platform,
+            "preset_id": preset_id,
+            "credential_id": credential_id,
+            "metadata_override": metadata_override,
+            "upload_priority": upload_priority,
+        },
+        countdown=countdown,
+        **scheduled,
+    )
+
+
+def _park_upload(
+    error: QuotaExhaustedError,
+    recording_id: int,
+    user_id: int,
+    platform: str,
+    preset_id: int | None,
+    credential_id: int | None,
+    upload_priority: int,
+    metadata_override: dict | None = None,
+) -> datetime:
+    """
+    Отложить загрузку до окна квоты и вернуть время ее запуска.
 
-        # Prepare template context from recording with topics_display config
-        topics_display = preset_metadata.get("topics_display") if preset_metadata else None
-        template_context = TemplateRenderer.prepare_recording_context(recording, topics_display)
+    Задача не публикуется с countdown до окна (до суток и больше): ETA дольше visibility_timeout
+    Redis broker доставляется повторно и загружает видео дважды. Аргументы паркуются в ledger,
+    в очередь загрузку ставит release_deferred_uploads незадолго до запуска.
+    """
+    ledger = get_quota_ledger()
+    entry = pending_entry(recording_id, platform, preset_id)
+    retry_at = ledger.defer(error.credential_id, entry, error.units, upload_priority)
+    ledger.park(
+        error.credential_id,
+        entry,
+        {
+            "recording_id": recording_id,
+            "user_id": user_id,
+            "platform": platform,
+            "preset_id": preset_id,
+            "credential_id": credential_id,
+            "upload_priority": upload_priority,
+            "metadata_override": metadata_override,
+        },
+    )
+    return retry_at
+
+
+@celery_app.task(name="api.tasks.upload.release_deferred_uploads")
+def release_deferred_uploads_task() -> dict:
+    """
+    Periodic release of uploads deferred by YouTube quota (Celery Beat).
 
-        # DEBUG: Log context and preset metadata
-        logger.info(
-            f"[Upload {platform}] Preset metadata keys: {list(preset_metadata.keys()) if preset_metadata else 'None'}"
-        )
-        logger.info(f"[Upload {platform}] Template context keys: {list(template_context.keys())}")
-        logger.info(
-            f"[Upload {platform}] Has topic_timestamps: {hasattr(recording, 'topic_timestamps') and recording.topic_timestamps is not None}"
-        )
-        if hasattr(recording, "topic_timestamps") and recording.topic_timestamps:
-            logger.info(f"[Upload {platform}] topic_timestamps count: {len(recording.topic_timestamps)}")
-        logger.info(
-            f"[Upload {platform}] Has main_topics: {hasattr(recording, 'main_topics') and recording.main_topics is not None}"
-        )
-        if hasattr(recording, "main_topics") and recording.main_topics:
-            logger.info(f"[Upload {platform}] main_topics: {recording.main_topics}")
+    Uploads parked in the quota ledger are enqueued shortly before their planned start
+    (countdown of at most RELEASE_AHEAD_SECONDS), in the ledger's priority order.
 
+    Returns:
+        Release statistics
+    """
+    ledger = get_quota_ledger()
+    try:
+        released = ledger.release_due()
+    except Exception as exc:
+        logger.error(f"[Deferred uploads] Failed to read parked uploads: {exc!r}", exc_info=True)
+        return {"status": "error", "error": str(exc)}
+
+    failed = 0
+    for parked_credential_id, entry, task_kwargs, countdown in released:
         try:
-            # Authentication
-            auth_success = await uploader.authenticate()
-            if not auth_success:
-                raise CredentialError(
-                    platform=platform,
-                    reason="Token validation failed or expired. Please re-authenticate via OAuth.",
-                )
+            _schedule_single_upload(**task_kwargs, countdown=countdown)
+        except Exception as exc:
+            logger.error(f"[Deferred uploads] Failed to enqueue {entry}, parked again: {exc}")
+            ledger.park(parked_credential_id, entry, task_kwargs)
+            failed += 1
 
-            # Prepare title and description from templates or defaults
-            title_template = preset_metadata.get("title_template", "{display_name}")
-            description_template = preset_metadata.get("description_template", "Uploaded on {record_time:date}")
+    if released:
+        logger.info(f"[Deferred uploads] Released {len(released) - failed} uploads, failed to enqueue {failed}")
+    return {"status": "success", "released": len(released) - failed, "failed": failed}
 
-            logger.info(f"[Upload {platform}] title_template: {title_template[:100]}...")
-            logger.info(f"[Upload {platform}] description_template: {description_template[:200]}...")
 
-            title = TemplateRenderer.render(title_template, template_context, topics_display)
-            description = TemplateRenderer.render(description_template, template_context, topics_display)
+async def _async_upload_channel_batch(
+    recording_ids: list[int],
+    user_id: int,
+    platform: str,
+    preset_id: int | None,
+    credential_id: int | None,
+    upload_priority: int,
+    results: dict[int, dict],
+) -> None:
+    """
+    Async body of upload_channel_batch; results are filled in as recordings finish.
 
-            logger.info(f"[Upload {platform}] Rendered title: {title[:100] if title else 'EMPTY'}")
-            logger.info(f"[Upload {platform}] Rendered description length: {len(description)} chars")
-            logger.info(
-                f"[Upload {platform}] Rendered description preview: {description[:200] if description else 'EMPTY'}"
-            )
+    Phase 1 - одна транзакция на пачку (savepoint на запись), Phase 2 - загрузки
+    без транзакции через общий uploader канала, Phase 3 - короткая транзакция на запись.
+    """
+    from api.helpers.unit_of_work import TaskUnitOfWork
+    from api.repositories.recording_repos import RecordingAsyncRepository
 
-            # Fallback if templates produced empty strings
-            if not title:
-                logger.warning(f"[Upload {platform}] Title is empty, using fallback")
-                title = recording.display_name or "Recording"
-            if not description:
-                logger.warning(f"[Upload {platform}] Description is empty, using fallback")
-                # Use consistent formatting
-                fallback_desc = TemplateRenderer.render(
-                    "Uploaded on {record_time:date}", template_context, topics_display
-                )
-                description = fallback_desc or "Uploaded"
-                if recording.main_topics:
-                    # Use topics_display for fallback if configured
-                    if topics_display and topics_display.get("enabled", True):
-                        topics_str = TemplateRenderer._format_topics_list(recording.main_topics, topics_display)
-                    else:
-                        topics_str = ", ".join(recording.main_topics[:5])
-                    description += f"\n\n{topics_str}"
-
-            logger.info(f"[Upload {platform}] Final title: {title[:50]}...")
-            logger.info(f"[Upload {platform}] Final description length: {len(description)}")
-
-            # Prepare upload parameters from preset_metadata
-            upload_params = {
-                "video_path": video_path,
-                "title": title,
-                "description": description,
-            }
-
-            # Add platform-specific parameters from preset
-            if platform.lower() in ["youtube"]:
-                # YouTube-specific parameters
-                if "tags" in preset_metadata:
-                    upload_params["tags"] = preset_metadata["tags"]
-
-                if "category_id" in preset_metadata:
-                    upload_params["category_id"] = preset_metadata["category_id"]
-
-                if "privacy" in preset_metadata:
-                    upload_params["privacy_status"] = preset_metadata["privacy"]
-
-                # Check both top-level and youtube-specific playlist_id
-                playlist_id = preset_metadata.get("playlist_id") or preset_metadata.get("youtube", {}).get(
-                    "playlist_id"
-                )
-                logger.info(
-                    f"[Upload YouTube] Playlist lookup: top-level={preset_metadata.get('playlist_id')}, youtube={preset_metadata.get('youtube', {}).get('playlist_id')}"
-                )
-                if playlist_id:
-                    upload_params["playlist_id"] = playlist_id
-                    logger.info(f"[Upload YouTube] Using playlist_id: {playlist_id}")
-                else:
-                    logger.warning("[Upload YouTube] No playlist_id found in metadata")
-
-                if "publish_at" in preset_metadata:
-                    upload_params["publish_at"] = preset_metadata["publish_at"]
-
-                # Check for thumbnail_path in multiple locations (platform-specific has priority)
-                thumbnail_path_str = preset_metadata.get("youtube", {}).get("thumbnail_path") or preset_metadata.get(
-                    "thumbnail_path"
-                )
-                logger.info(
-                    f"[Upload YouTube] Thumbnail lookup: youtube-specific={preset_metadata.get('youtube', {}).get('thumbnail_path')}, common={preset_metadata.get('thumbnail_path')}"
-                )
-                if thumbnail_path_str:
-                    thumbnail_path = Path(thumbnail_path_str)
-                    if thumbnail_path.exists():
-                        upload_params["thumbnail_path"] = str(thumbnail_path)
-                        logger.info(f"[Upload YouTube] Using thumbnail: {thumbnail_path}")
-                    else:
-                        logger.warning(f"[Upload YouTube] Thumbnail not found: {thumbnail_path}")
-                else:
-                    logger.warning("[Upload YouTube] No thumbnail_path found in metadata")
-
-                # Additional YouTube params
-                for key in ["made_for_kids", "embeddable", "license", "public_stats_viewable"]:
-                    if key in preset_metadata:
-                        upload_params[key] = preset_metadata[key]
-
-            elif platform.lower() in ["vk", "vk_video"]:
-                # VK-specific parameters - check both top-level and nested 'vk' key
-                album_id = preset_metadata.get("album_id") or preset_metadata.get("vk", {}).get("album_id")
-                if album_id:
-                    upload_params["album_id"] = str(album_id)
-                    logger.info(f"[Upload VK] Using album_id: {album_id}")
-                else:
-                    logger.warning("[Upload VK] No album_id found in metadata")
-
-                # Thumbnail - check both top-level and nested 'vk' key (platform-specific has priority)
-                thumbnail_path_str = preset_metadata.get("vk", {}).get("thumbnail_path") or preset_metadata.get(
-                    "thumbnail_path"
-                )
-                if thumbnail_path_str:
-                    thumbnail_path = Path(thumbnail_path_str)
-                    if thumbnail_path.exists():
-                        upload_params["thumbnail_path"] = str(thumbnail_path)
-                        logger.info(f"[Upload VK] Using thumbnail: {thumbnail_path}")
-                    else:
-                        logger.warning(f"[Upload VK] Thumbnail not found: {thumbnail_path}")
-                else:
-                    logger.warning("[Upload VK] No thumbnail_path found in metadata")
-
-                # VK privacy and other settings (including group_id for group uploads)
-                for key in ["group_id", "privacy_view", "privacy_comment", "no_comments", "repeat", "wallpost"]:
-                    if key in preset_metadata:
-                        upload_params[key] = preset_metadata[key]
-
-            # Upload
-            upload_result = await uploader.upload_video(**upload_params)
-
-            if not upload_result or upload_result.error_message:
-                error_message = upload_result.error_message if upload_result else "Unknown error"
-                await recording_repo.mark_output_failed(output_target, f"Upload failed: {error_message}")
-                await session.commit()
-                raise Exception(f"Upload failed: {error_message}")
-
-            # Save results to DB (update status to UPLOADED)
-            await recording_repo.save_upload_result(
-                recording=recording,
-                target_type=target_type,
-                preset_id=preset_id,
-                video_id=upload_result.video_id,
-                video_url=upload_result.video_url,
-                target_meta={"platform": platform, "uploaded_by_task": True},
-            )
+    def failed(recording_id: int, error: Exception | str) -> None:
+        results[recording_id] = {"recording_id": recording_id, "status": "failed", "error": str(error)}
+
+    # Метрика удержания соединений - на всю пачку (под ID первой записи)
+    async with TaskUnitOfWork("upload_batch", recording_ids[0], user_id) as uow:
+        jobs: list[UploadJob] = []
+        async with uow.session() as session:
+            recordings = await RecordingAsyncRepository(session).get_by_ids(recording_ids, user_id)
+            lookup = UploadLookup(session, user_id)
+            await lookup.prefetch()
+
+            for recording_id in recording_ids:
+                recording = recordings.get(recording_id)
+                if not recording:
+                    failed(recording_id, f"Recording {recording_id} not found for user {user_id}")
+                    continue
+                try:
+                    async with session.begin_nested():
+                        job = await _prepare_upload(
+                            session, lookup, recording, user_id, platform, preset_id, credential_id, None
+                        )
+                except Exception as e:
+                    logger.warning(f"[Upload batch] Recording {recording_id} skipped: {e}")
+                    failed(recording_id, e)
+                    continue
+                jobs.append(job)
 
             await session.commit()
 
-            return {
-                "success": True,
-                "video_id": upload_result.video_id,
-                "video_url": upload_result.video_url,
-            }
-
-        except Exception as e:
-            # Mark as failed if not already marked
-            if output_target.status != "FAILED":
-                await recording_repo.mark_output_failed(output_target, str(e))
-                await session.commit()
-            raise
+        # Одна аутентификация на канал (credential); пачка обычно - один канал
+        uploaders: dict[tuple[str, int], Any] = {}
+        for job in jobs:
+            channel = (job.upload_platform, job.upload_credential_id)
+            if channel in uploaders:
+                continue
+            try:
+                uploaders[channel] = await _authenticate_uploader(
+                    uow, platform, job.upload_platform, job.upload_credential_id
+                )
+            except Exception as e:
+                logger.warning(f"[Upload batch] Authentication for credential {job.upload_credential_id} failed: {e}")
+                uploaders[channel] = e
+
+        semaphore = asyncio.Semaphore(settings.upload.batch_concurrency)
+
+        async def run(job: UploadJob) -> None:
+            uploader = uploaders[(job.upload_platform, job.upload_credential_id)]
+            async with semaphore:
+                try:
+                    if isinstance(uploader, Exception):
+                        raise uploader
+                    upload_result = await _upload_job(uploader, job)
+
+                except QuotaExhaustedError as e:
+                    # Квота канала исчерпана - запись догружается отложенной одиночной задачей
+                    await _mark_job_deferred(uow, job, e.retry_at)
+                    retry_at = _park_upload(
+                        e,
+                        recording_id=job.recording_id,
+                        user_id=user_id,
+                        platform=platform,
+                        preset_id=preset_id,
+                        credential_id=credential_id,
+                        upload_priority=upload_priority,
+                    )
+                    results[job.recording_id] = {
+                        "recording_id": job.recording_id,
+                        "status": "deferred",
+                        "retry_at": retry_at.isoformat(),
+                        "task_id": None,
+                    }
+                    return
+
+                except Exception as e:
+                    logger.warning(f"[Upload batch] Recording {job.recording_id} to {platform} failed: {e}")
+                    try:
+                        await _mark_job_failed(uow, job, e)
+                    except Exception as mark_error:
+                        logger.error(f"[Upload batch] Cannot mark output target {job.output_target_id}: {mark_error}")
+                    failed(job.recording_id, e)
+                    return
+
+                try:
+                    await _save_job_result(uow, job, user_id, upload_result)
+                except Exception as e:
+                    logger.error(f"[Upload batch] Recording {job.recording_id} uploaded but result not saved: {e}")
+                    failed(job.recording_id, e)
+                    return
+                results[job.recording_id] = {
+                    "recording_id": job.recording_id,
+                    "status": "uploaded",
+                    "video_id": upload_result.video_id,
+                    "video_url": upload_result.video_url,
+                }
+
+        await asyncio.gather(*(run(job) for job in jobs))
 
 
 @celery_app.task(
@@ -474,27 +965,67 @@ def batch_upload_recordings(
     user_id: int,
     platforms: list[str],
     preset_ids: dict[str, int] | None = None,
+    batched: bool = True,
 ) -> dict:
     """
     Batch uploading recordings to platforms.
+
+    batched=True - upload_channel_batch per platform and chunk of settings.upload.batch_size
+    recordings (one authentication and bulk prefetch per chunk); False - a task per recording.
     """
     try:
         logger.info(
             f"[Task {self.request.id}] Batch uploading {len(recording_ids)} recordings "
-            f"for user {user_id} to {platforms}"
+            f"for user {user_id} to {platforms} (batched={batched})"
         )
 
         results = []
+        if batched:
+            size = settings.upload.batch_size
+            for platform in platforms:
+                preset_id = preset_ids.get(platform) if preset_ids else None
+                for start in range(0, len(recording_ids), size):
+                    chunk = recording_ids[start : start + size]
+                    (scheduled,) = schedule(upload_channel_batch.name, user_id)
+                    batch_result = upload_channel_batch.apply_async(
+                        kwargs={
+                            "recording_ids": chunk,
+                            "user_id": user_id,
+                            "platform": platform,
+                            "preset_id": preset_id,
+                        },
+                        **scheduled,
+                    )
+                    results.extend(
+                        {
+                            "recording_id": recording_id,
+                            "platform": platform,
+                            "task_id": batch_result.id,
+                            "status": "queued",
+                        }
+                        for recording_id in chunk
+                    )
+
+            return self.build_result(
+                user_id=user_id,
+                status="dispatched",
+                subtasks=results,
+            )
+
         for recording_id in recording_ids:
             for platform in platforms:
                 # Create subtask for each combination of recording+platform
                 preset_id = preset_ids.get(platform) if preset_ids else None
 
-                subtask_result = upload_recording_to_platform.delay(
-                    recording_id=recording_id,
-                    user_id=user_id,
-                    platform=platform,
-                    preset_id=preset_id,
+                (scheduled,) = schedule(upload_recording_to_platform.name, user_id)
+                subtask_result = upload_recording_to_platform.apply_async(
+                    kwargs={
+                        "recording_id": recording_id,
+                        "user_id": user_id,
+                        "platform": platform,
+                        "preset_id": preset_id,
+                    },
+                    **scheduled,
                 )
 
                 results.append(
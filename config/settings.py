@@ -52,6 +52,9 @@ class ProcessingSettings(BaseSettings):
     audio_bitrate: str = Field(default="original", description="Битрейт аудио (original = не изменять)")
     fps: int = Field(default=0, description="FPS (0 = не изменять)")
     resolution: str = Field(default="original", description="Разрешение (original = не изменять)")
+    encode_preset: str = Field(
+        default="", description="Пресет кодирования (auto, copy, fast-lecture, ...; пусто = поля выше)"
+    )
 
     # Настройки детекции звука
     silence_threshold: float = Field(default=-40.0, description="Порог тишины в дБ")
@@ -68,6 +71,29 @@ class ProcessingSettings(BaseSettings):
     # Дополнительные настройки
     keep_temp_files: bool = Field(default=False, description="Сохранять временные файлы")
 
+    # Content-addressed store артефактов (dedup скачиваний, обрезки, транскрибаций)
+    artifact_store_enabled: bool = Field(default=True, description="Переиспользовать артефакты по хешу содержимого")
+    artifact_store_dir: str = Field(default=f"{MEDIA_ROOT}/.artifacts", description="Директория store артефактов")
+
+    # Параллельное кодирование сегментов
+    encode_threads: int = Field(default=0, ge=0, description="Потоков ffmpeg на задачу (0 = авто)")
+    max_parallel_encodes: int = Field(default=0, ge=0, description="Максимум параллельных ffmpeg (0 = по CPU)")
+    audio_split_concurrency: int = Field(
+        default=2, ge=1, description="Одновременных ffmpeg при разбиении аудио для транскрибации"
+    )
+    encode_load_threshold: float = Field(
+        default=1.5, ge=0.0, description="Load average на CPU, выше которого новые задачи ждут (0 = выкл)"
+    )
+    encode_min_free_disk_mb: int = Field(
+        default=2048, ge=0, description="Минимум свободного места для запуска новой задачи (0 = выкл)"
+    )
+
+    # Лимиты одного запуска ffmpeg
+    ffmpeg_timeout_seconds: int = Field(default=4 * 3600, ge=0, description="Wall-clock лимит ffmpeg (0 = без лимита)")
+    ffmpeg_stall_timeout_seconds: int = Field(
+        default=300, ge=0, description="Остановить ffmpeg без прогресса дольше N секунд (0 = выкл)"
+    )
+
 
 class ZoomSettings(BaseSettings):
     """Настройки Zoom API"""
@@ -85,6 +111,11 @@ class UploadSettings(BaseSettings):
         default="config/youtube_creds.json", description="Путь к файлу конфигурации YouTube"
     )
     vk_config_file: str = Field(default="config/vk_creds.json", description="Путь к файлу конфигурации VK")
+    youtube_daily_quota: int = Field(
+        default=10000, ge=1, description="Дневная квота YouTube Data API в units на credential"
+    )
+    batch_size: int = Field(default=20, ge=1, le=200, description="Записей в одной пакетной загрузке на канал")
+    batch_concurrency: int = Field(default=2, ge=1, le=10, description="Параллельных загрузок в пакете")
 
 
 class ZoomConfig:
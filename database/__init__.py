@@ -1,3 +1,8 @@
+# Модули с listeners сессии: импорт регистрирует их для всех сессий
+from . import (
+    recording_stats,  # before_flush: учет материализованных счетчиков записей
+    transcript_search,  # after_flush: индекс полнотекстового поиска по транскрипциям
+)
 from .auth_models import (
     QuotaChangeHistoryModel,
     QuotaUsageModel,
@@ -15,13 +20,16 @@ from .models import (
     OutputTargetModel,
     ProcessingStageModel,
     RecordingModel,
+    RecordingStatsModel,
     SourceMetadataModel,
+    TranscriptSegmentModel,
 )
 from .template_models import (
     BaseConfigModel,
     InputSourceModel,
     OutputPresetModel,
     RecordingTemplateModel,
+    SourceSyncStateModel,
 )
 
 __all__ = [
@@ -39,11 +47,14 @@ __all__ = [
     "QuotaChangeHistoryModel",
     "QuotaUsageModel",
     "RecordingModel",
+    "RecordingStatsModel",
     "RecordingTemplateModel",
     "RefreshTokenModel",
     "SourceMetadataModel",
+    "SourceSyncStateModel",
     # Subscription models
     "SubscriptionPlanModel",
+    "TranscriptSegmentModel",
     # Config models
     "UserConfigModel",
     "UserCredentialModel",
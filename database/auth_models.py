@@ -75,6 +75,7 @@ class UserCredentialModel(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     last_used_at = Column(DateTime, nullable=True)
+    version = Column(Integer, default=1, server_default="1", nullable=False)  # инвалидация кэша credentials
     user = relationship("UserModel", back_populates="credentials")
 
     def __repr__(self):
@@ -185,38 +185,44 @@ class DatabaseManager:
             logger.error(f"Error creating tables: error={e}")
             raise
 
-    async def save_recordings(self, recordings: list[MeetingRecording]) -> int:
-        """Save recordings to the database."""
+    async def save_recordings(self, recordings: list[MeetingRecording]) -> list[str]:
+        """
+        Save recordings to the database.
+
+        Каждая запись сохраняется в своем savepoint: ошибка одной не откатывает уже сохраненные.
+
+        Returns:
+            source_key сохраненных записей
+        """
         if not recordings:
-            return 0
+            return []
 
-        saved_count = 0
+        saved_keys = []
         async with self.async_session() as session:
             try:
                 for recording in recordings:
                     try:
-                        existing = await self._find_existing_recording(session, recording)
-                        if existing:
-                            await self._update_existing_recording(session, existing, recording)
-                        else:
-                            await self._create_new_recording(session, recording)
-                        saved_count += 1
+                        async with session.begin_nested():
+                            existing = await self._find_existing_recording(session, recording)
+                            if existing:
+                                await self._update_existing_recording(session, existing, recording)
+                            else:
+                                await self._create_new_recording(session, recording)
+                        saved_keys.append(recording.source_key)
                     except IntegrityError as e:
                         logger.warning(
                             f"Recording already exists: recording={recording.display_name} | recording_id={recording.db_id} | error={e}"
                         )
-                        await session.rollback()
                         continue
                     except Exception as e:
                         logger.error(
                             f"Error saving recording: recording={recording.display_name} | recording_id={recording.db_id} | error={e}"
                         )
-                        await session.rollback()
                         continue
 
                 await session.commit()
-                logger.info(f"Saved recordings: {saved_count}/{len(recordings)}")
-                return saved_count
+                logger.info(f"Saved recordings: {len(saved_keys)}/{len(recordings)}")
+                return saved_keys
 
             except Exception as e:
                 await session.rollback()
@@ -276,6 +282,7 @@ class DatabaseManager:
         existing.main_topics = recording.main_topics
         existing.processing_preferences = recording.processing_preferences
         existing.downloaded_at = recording.downloaded_at
+        existing.media_info = recording.media_info
 
         existing.failed = recording.failed
         existing.failed_at = recording.failed_at
@@ -378,6 +385,7 @@ class DatabaseManager:
             main_topics=recording.main_topics,
             processing_preferences=recording.processing_preferences,
             downloaded_at=recording.downloaded_at,
+            media_info=recording.media_info,
             failed=recording.failed,
             failed_at=recording.failed_at,
             failed_reason=recording.failed_reason,
@@ -618,6 +626,7 @@ class DatabaseManager:
             "main_topics": db_recording.main_topics,
             "processing_preferences": db_recording.processing_preferences,
             "downloaded_at": db_recording.downloaded_at,
+            "media_info": db_recording.media_info,
             "output_targets": outputs,
             "processing_stages": processing_stages,
             "failed": db_recording.failed,
@@ -742,6 +751,7 @@ class DatabaseManager:
                     db_recording.processed_video_path = None
                     db_recording.processed_audio_path = None
                     db_recording.downloaded_at = None
+                    db_recording.media_info = None
 
                     # Сбрасываем транскрипцию и темы
                     db_recording.transcription_dir = None
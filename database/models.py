@@ -2,17 +2,24 @@ from datetime import datetime
 from typing import TYPE_CHECKING, Any
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
+    Computed,
     DateTime,
     Enum,
+    Float,
     ForeignKey,
     Identity,
+    Index,
     Integer,
     String,
+    Text,
     UniqueConstraint,
+    event,
+    text,
 )
-from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, object_session, relationship
 
 from models.recording import (
     ProcessingStageStatus,
@@ -61,6 +68,7 @@ class RecordingModel(Base):
     transcription_dir: Mapped[str | None] = mapped_column(String(1000))
     downloaded_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     video_file_size: Mapped[int | None] = mapped_column(Integer)
+    media_info: Mapped[Any | None] = mapped_column(JSONB, nullable=True)
     transcription_info: Mapped[Any | None] = mapped_column(JSONB)
     topic_timestamps: Mapped[Any | None] = mapped_column(JSONB, nullable=True)
     main_topics: Mapped[Any | None] = mapped_column(JSONB, nullable=True)
@@ -70,11 +78,30 @@ class RecordingModel(Base):
     failed_reason: Mapped[str | None] = mapped_column(String(1000))
     failed_at_stage: Mapped[str | None] = mapped_column(String(50))
     retry_count: Mapped[int] = mapped_column(Integer, default=0)
+    # Версия записи: растет при каждом изменении (_bump_recording_version, bulk UPDATE),
+    # TaskUnitOfWork.save() сравнивает ее со snapshot задачи
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow
     )
 
+    # Индексы горячих запросов (миграция 024): список/фильтры записей пользователя, bulk выборки, поиск
+    __table_args__ = (
+        Index("ix_recordings_user_start_time", "user_id", text("start_time DESC")),
+        Index("ix_recordings_user_status_start_time", "user_id", "status", text("start_time DESC")),
+        Index("ix_recordings_user_source_start_time", "user_id", "input_source_id", text("start_time DESC")),
+        Index("ix_recordings_user_template_created_at", "user_id", "template_id", "created_at"),
+        Index("ix_recordings_user_created_at", "user_id", "created_at"),
+        Index("ix_recordings_user_failed_created_at", "user_id", "created_at", postgresql_where=text("failed")),
+        Index(
+            "ix_recordings_display_name_trgm",
+            "display_name",
+            postgresql_using="gin",
+            postgresql_ops={"display_name": "gin_trgm_ops"},
+        ),
+    )
+
     owner: Mapped["UserModel"] = relationship("UserModel", back_populates="recordings", lazy="selectin")
     input_source: Mapped["InputSourceModel"] = relationship(
         "InputSourceModel",
@@ -136,10 +163,56 @@ class RecordingModel(Base):
             if meta:
                 stage.stage_meta = {**(stage.stage_meta or {}), **meta}
 
+    def mark_stage_in_progress(self, stage_type: ProcessingStageType, meta: dict[str, Any] | None = None) -> None:
+        """Пометить этап как выполняющийся."""
+        stage = next((s for s in self.processing_stages if s.stage_type == stage_type), None)
+
+        if stage is None:
+            stage = ProcessingStageModel(
+                recording_id=self.id,
+                user_id=self.user_id,
+                stage_type=stage_type,
+                status=ProcessingStageStatus.IN_PROGRESS,
+                stage_meta=meta or {},
+            )
+            self.processing_stages.append(stage)
+        else:
+            stage.status = ProcessingStageStatus.IN_PROGRESS
+            stage.failed = False
+            if meta:
+                stage.stage_meta = {**(stage.stage_meta or {}), **meta}
+
+    def mark_stage_failed(self, stage_type: ProcessingStageType, reason: str) -> None:
+        """Пометить этап как провалившийся."""
+        stage = next((s for s in self.processing_stages if s.stage_type == stage_type), None)
+
+        if stage is None:
+            stage = ProcessingStageModel(
+                recording_id=self.id,
+                user_id=self.user_id,
+                stage_type=stage_type,
+                stage_meta={},
+            )
+            self.processing_stages.append(stage)
+
+        stage.status = ProcessingStageStatus.FAILED
+        stage.failed = True
+        stage.failed_at = datetime.utcnow()
+        stage.failed_reason = reason[:1000]
+        stage.retry_count = (stage.retry_count or 0) + 1
+
     def __repr__(self) -> str:
         return f"<Recording(id={self.id}, display_name='{self.display_name}', status={self.status})>"
 
 
+@event.listens_for(RecordingModel, "before_update")
+def _bump_recording_version(_mapper: Any, _connection: Any, target: RecordingModel) -> None:
+    # Без version_id_col: UPDATE не проверяет версию и не падает StaleDataError у остальных writer'ов
+    session = object_session(target)
+    if session is not None and session.is_modified(target, include_collections=False):
+        target.version = (target.version or 0) + 1
+
+
 class SourceMetadataModel(Base):
     """Метаданные источника записи."""
 
@@ -248,3 +321,57 @@ class ProcessingStageModel(Base):
             f"<ProcessingStage(id={self.id}, recording_id={self.recording_id}, "
             f"stage_type={self.stage_type}, status={self.status})>"
         )
+
+
+class RecordingStatsModel(Base):
+    """
+    Материализованный счетчик записей пользователя (database.recording_stats).
+
+    Одна строка на (user_id, metric): recordings, status:<STATUS>, failed, storage_bytes,
+    transcribed, transcribed_minutes, uploads:<TARGET_TYPE>. Глобальные значения - сумма по пользователям.
+    """
+
+    __tablename__ = "recording_stats"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    metric: Mapped[str] = mapped_column(String(100), primary_key=True, index=True)
+    value: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default="0")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    def __repr__(self) -> str:
+        return f"<RecordingStats(user_id={self.user_id}, metric={self.metric}, value={self.value})>"
+
+
+class TranscriptSegmentModel(Base):
+    """
+    Строка полнотекстового индекса транскрипций (database.transcript_search).
+
+    kind: segment (сегмент master.json), topic (topic_timestamps), main_topic (main_topics, без таймкодов).
+    search_vector вычисляется Postgres (конфигурация russian: русские слова - russian_stem, латиница - english_stem).
+    """
+
+    __tablename__ = "transcript_segments"
+
+    id: Mapped[int] = mapped_column(Integer, Identity(), primary_key=True)
+    recording_id: Mapped[int] = mapped_column(Integer, ForeignKey("recordings.id", ondelete="CASCADE"), nullable=False)
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)
+    position: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    start_sec: Mapped[float | None] = mapped_column(Float, nullable=True)
+    end_sec: Mapped[float | None] = mapped_column(Float, nullable=True)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    search_vector: Mapped[Any] = mapped_column(
+        TSVECTOR, Computed("to_tsvector('russian'::regconfig, text)", persisted=True)
+    )
+
+    __table_args__ = (
+        Index("ix_transcript_segments_recording_kind", "recording_id", "kind"),
+        Index("ix_transcript_segments_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<TranscriptSegment(recording_id={self.recording_id}, kind={self.kind}, position={self.position})>"
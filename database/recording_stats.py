@@ -0,0 +1,323 @@
+"""Материализованные счетчики записей пользователей (таблица recording_stats).
+
+Дашборды, count_by_user и admin статистика считали COUNT(*)/SUM(...) по
+recordings и output_targets на каждый запрос - время ответа росло вместе с
+таблицами. Теперь счетчики хранятся готовыми: строка на (user_id, metric),
+глобальные значения - сумма по пользователям (строк на порядки меньше, чем записей).
+
+Метрики:
+    recordings            - всего записей
+    status:<STATUS>       - записи по ProcessingStatus
+    failed                - записи с флагом failed
+    storage_bytes         - сумма video_file_size
+    transcribed           - записи с транскрипцией (transcription_dir задан)
+    transcribed_minutes   - сумма duration записей с транскрипцией
+    uploads:<TARGET_TYPE> - output_targets в статусе UPLOADED по платформам
+
+Обновление - в той же транзакции, что и изменение: before_flush сессии
+сравнивает старые и новые значения колонок RecordingModel/OutputTargetModel
+(переходы update_aggregate_status, save_upload_result, создание и удаление
+записей) и пишет дельты одним INSERT ... ON CONFLICT DO UPDATE value = value + delta.
+Откат транзакции откатывает и дельты. Массовые UPDATE мимо ORM передают
+дельты явно (apply_deltas).
+
+Изменения, которые нельзя посчитать (колонка не была загружена, прямой SQL),
+исправляет периодическая сверка reconcile_users (maintenance.reconcile_recording_stats).
+"""
+
+from collections import Counter
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import delete, event, func, inspect, select, union
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database.models import OutputTargetModel, RecordingModel, RecordingStatsModel
+from logger import get_logger
+from models.recording import ProcessingStatus, TargetStatus
+
+logger = get_logger()
+
+METRIC_RECORDINGS = "recordings"
+METRIC_FAILED = "failed"
+METRIC_STORAGE_BYTES = "storage_bytes"
+METRIC_TRANSCRIBED = "transcribed"
+METRIC_TRANSCRIBED_MINUTES = "transcribed_minutes"
+STATUS_PREFIX = "status:"
+UPLOADS_PREFIX = "uploads:"
+
+RECONCILE_BATCH_USERS = 500
+
+_RECORDING_COLUMNS = ("user_id", "status", "failed", "video_file_size", "transcription_dir", "duration")
+_OUTPUT_COLUMNS = ("user_id", "status", "target_type")
+
+StatsDeltas = Counter[tuple[int, str]]
+
+
+def _enum_value(value: Any) -> str:
+    return value.value if hasattr(value, "value") else str(value)
+
+
+def status_metric(status: ProcessingStatus | str) -> str:
+    return f"{STATUS_PREFIX}{_enum_value(status)}"
+
+
+def uploads_metric(target_type: Any) -> str:
+    return f"{UPLOADS_PREFIX}{_enum_value(target_type)}"
+
+
+# ---------- вклад строк в метрики ----------
+
+
+def _recording_metrics(values: dict[str, Any]) -> Counter[str]:
+    metrics: Counter[str] = Counter()
+    metrics[METRIC_RECORDINGS] = 1
+    metrics[status_metric(values["status"] or ProcessingStatus.INITIALIZED)] = 1
+    if values["failed"]:
+        metrics[METRIC_FAILED] = 1
+    if values["video_file_size"]:
+        metrics[METRIC_STORAGE_BYTES] = values["video_file_size"]
+    if values["transcription_dir"]:
+        metrics[METRIC_TRANSCRIBED] = 1
+        metrics[METRIC_TRANSCRIBED_MINUTES] = values["duration"] or 0
+    return metrics
+
+
+def _output_metrics(values: dict[str, Any]) -> Counter[str]:
+    metrics: Counter[str] = Counter()
+    if values["status"] == TargetStatus.UPLOADED and values["target_type"]:
+        metrics[uploads_metric(values["target_type"])] = 1
+    return metrics
+
+
+def _column_values(obj: Any, columns: Iterable[str]) -> tuple[dict[str, Any], dict[str, Any], bool] | None:
+    """
+    Значения колонок до и после flush по истории атрибутов: (до, после, есть ли изменения).
+
+    None - значение колонки неизвестно (не было загружено).
+    """
+    state = inspect(obj)
+    before: dict[str, Any] = {}
+    after: dict[str, Any] = {}
+    changed = False
+    for name in columns:
+        history = state.attrs[name].history
+        if history.unchanged:
+            before[name] = after[name] = history.unchanged[0]
+        elif history.deleted:
+            before[name] = history.deleted[0]
+            after[name] = history.added[0] if history.added else None
+            changed = True
+        else:
+            return None
+    return before, after, changed
+
+
+def _object_deltas(obj: Any, columns: tuple[str, ...], metrics_of: Any, new: bool, deleted: bool) -> StatsDeltas:
+    deltas: StatsDeltas = Counter()
+    if new:
+        state = inspect(obj)
+        after = {name: state.dict.get(name) for name in columns}
+        if after["user_id"] is not None:
+            for metric, value in metrics_of(after).items():
+                deltas[(after["user_id"], metric)] += value
+        return deltas
+
+    values = _column_values(obj, columns)
+    if values is None:
+        if deleted or inspect(obj).modified:
+            logger.debug(f"Recording stats: cannot compute delta for {obj!r}, left to reconciliation")
+        return deltas
+    before, after, changed = values
+    if not changed and not deleted:
+        return deltas
+
+    if before["user_id"] is not None:
+        for metric, value in metrics_of(before).items():
+            deltas[(before["user_id"], metric)] -= value
+    if not deleted and after["user_id"] is not None:
+        for metric, value in metrics_of(after).items():
+            deltas[(after["user_id"], metric)] += value
+    return deltas
+
+
+def collect_deltas(new: Iterable[Any], dirty: Iterable[Any], deleted: Iterable[Any]) -> StatsDeltas:
+    """Дельты счетчиков для объектов сессии перед flush."""
+    deltas: StatsDeltas = Counter()
+    for objects, is_new, is_deleted in ((new, True, False), (dirty, False, False), (deleted, False, True)):
+        for obj in objects:
+            if isinstance(obj, RecordingModel):
+                deltas.update(_object_deltas(obj, _RECORDING_COLUMNS, _recording_metrics, is_new, is_deleted))
+            elif isinstance(obj, OutputTargetModel):
+                deltas.update(_object_deltas(obj, _OUTPUT_COLUMNS, _output_metrics, is_new, is_deleted))
+    return Counter({key: value for key, value in deltas.items() if value})
+
+
+# ---------- запись ----------
+
+
+def _upsert_statement(deltas: StatsDeltas) -> Any:
+    # Одинаковый порядок строк во всех транзакциях - без взаимных блокировок
+    rows = [
+        {"user_id": user_id, "metric": metric, "value": value} for (user_id, metric), value in sorted(deltas.items())
+    ]
+    stmt = insert(RecordingStatsModel).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[RecordingStatsModel.user_id, RecordingStatsModel.metric],
+        set_={"value": RecordingStatsModel.value + stmt.excluded.value, "updated_at": func.now()},
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _track_recording_stats(session: Session, _flush_context: Any, _instances: Any) -> None:
+    deltas = collect_deltas(session.new, session.dirty, session.deleted)
+    if deltas:
+        session.connection().execute(_upsert_statement(deltas))
+
+
+async def apply_deltas(session: AsyncSession, deltas: StatsDeltas) -> None:
+    """Применить дельты в транзакции сессии (для UPDATE мимо ORM)."""
+    deltas = Counter({key: value for key, value in deltas.items() if value})
+    if deltas:
+        await session.execute(_upsert_statement(deltas))
+
+
+# ---------- чтение ----------
+
+
+def summarize(values: dict[str, int]) -> dict[str, Any]:
+    """Плоские метрики → by_status / uploads_by_platform и скалярные счетчики."""
+    return {
+        "total_recordings": values.get(METRIC_RECORDINGS, 0),
+        "failed_recordings": values.get(METRIC_FAILED, 0),
+        "storage_bytes": values.get(METRIC_STORAGE_BYTES, 0),
+        "transcribed_recordings": values.get(METRIC_TRANSCRIBED, 0),
+        "transcribed_minutes": values.get(METRIC_TRANSCRIBED_MINUTES, 0),
+        "by_status": {
+            metric.removeprefix(STATUS_PREFIX): value
+            for metric, value in values.items()
+            if metric.startswith(STATUS_PREFIX) and value
+        },
+        "uploads_by_platform": {
+            metric.removeprefix(UPLOADS_PREFIX): value
+            for metric, value in values.items()
+            if metric.startswith(UPLOADS_PREFIX) and value
+        },
+    }
+
+
+async def get_user_stats(session: AsyncSession, user_id: int) -> dict[str, int]:
+    """Метрики пользователя {metric: value}."""
+    result = await session.execute(
+        select(RecordingStatsModel.metric, RecordingStatsModel.value).where(RecordingStatsModel.user_id == user_id)
+    )
+    return dict(result.all())
+
+
+async def get_user_metric(session: AsyncSession, user_id: int, metric: str) -> int:
+    result = await session.execute(
+        select(RecordingStatsModel.value).where(
+            RecordingStatsModel.user_id == user_id, RecordingStatsModel.metric == metric
+        )
+    )
+    return result.scalar() or 0
+
+
+async def get_global_stats(session: AsyncSession) -> dict[str, int]:
+    """Метрики всех пользователей {metric: sum(value)}."""
+    result = await session.execute(
+        select(RecordingStatsModel.metric, func.sum(RecordingStatsModel.value)).group_by(RecordingStatsModel.metric)
+    )
+    return {metric: int(value or 0) for metric, value in result.all()}
+
+
+# ---------- сверка ----------
+
+
+async def list_stats_users(session: AsyncSession) -> list[int]:
+    """Пользователи с записями или со строками счетчиков."""
+    query = union(
+        select(RecordingModel.user_id).where(RecordingModel.user_id.isnot(None)),
+        select(RecordingStatsModel.user_id),
+    )
+    result = await session.execute(query)
+    return sorted(row[0] for row in result.all())
+
+
+async def _compute_users(session: AsyncSession, user_ids: list[int]) -> dict[int, Counter[str]]:
+    transcribed = RecordingModel.transcription_dir.isnot(None)
+    recordings = await session.execute(
+        select(
+            RecordingModel.user_id,
+            RecordingModel.status,
+            func.count(),
+            func.count().filter(RecordingModel.failed),
+            func.coalesce(func.sum(RecordingModel.video_file_size), 0),
+            func.count().filter(transcribed),
+            func.coalesce(func.sum(RecordingModel.duration).filter(transcribed), 0),
+        )
+        .where(RecordingModel.user_id.in_(user_ids))
+        .group_by(RecordingModel.user_id, RecordingModel.status)
+    )
+    uploads = await session.execute(
+        select(OutputTargetModel.user_id, OutputTargetModel.target_type, func.count())
+        .where(OutputTargetModel.user_id.in_(user_ids), OutputTargetModel.status == TargetStatus.UPLOADED)
+        .group_by(OutputTargetModel.user_id, OutputTargetModel.target_type)
+    )
+
+    computed: dict[int, Counter[str]] = {user_id: Counter() for user_id in user_ids}
+    for user_id, status, count, failed, storage_bytes, transcribed_count, minutes in recordings.all():
+        metrics = computed[user_id]
+        metrics[METRIC_RECORDINGS] += count
+        metrics[status_metric(status)] += count
+        metrics[METRIC_FAILED] += failed
+        metrics[METRIC_STORAGE_BYTES] += int(storage_bytes)
+        metrics[METRIC_TRANSCRIBED] += transcribed_count
+        metrics[METRIC_TRANSCRIBED_MINUTES] += int(minutes)
+    for user_id, target_type, count in uploads.all():
+        computed[user_id][uploads_metric(target_type)] += count
+    return computed
+
+
+async def reconcile_users(session: AsyncSession, user_ids: list[int]) -> int:
+    """
+    Пересчитать счетчики пользователей по recordings/output_targets.
+
+    Строки счетчиков блокируются (FOR UPDATE) до пересчета: инкременты параллельных
+    транзакций ждут commit сверки и ложатся поверх пересчитанных значений.
+    Commit - за вызывающим кодом.
+
+    Returns:
+        Количество исправленных метрик (расхождение инкрементального учета)
+    """
+    if not user_ids:
+        return 0
+
+    stored = await session.execute(
+        select(RecordingStatsModel.user_id, RecordingStatsModel.metric, RecordingStatsModel.value)
+        .where(RecordingStatsModel.user_id.in_(user_ids))
+        .order_by(RecordingStatsModel.user_id, RecordingStatsModel.metric)
+        .with_for_update()
+    )
+    current: dict[tuple[int, str], int] = {(user_id, metric): value for user_id, metric, value in stored.all()}
+    computed = await _compute_users(session, user_ids)
+
+    expected = {
+        (user_id, metric): value for user_id, metrics in computed.items() for metric, value in metrics.items() if value
+    }
+    drift = sum(1 for key in current.keys() | expected.keys() if current.get(key, 0) != expected.get(key, 0))
+    if not drift:
+        return 0
+
+    await session.execute(delete(RecordingStatsModel).where(RecordingStatsModel.user_id.in_(user_ids)))
+    if expected:
+        await session.execute(
+            insert(RecordingStatsModel),
+            [
+                {"user_id": user_id, "metric": metric, "value": value}
+                for (user_id, metric), value in sorted(expected.items())
+            ],
+        )
+    return drift
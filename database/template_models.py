@@ -60,6 +60,25 @@ class InputSourceModel(Base):
         return f"<InputSource(id={self.id}, name='{self.name}', type={self.source_type}, user_id={self.user_id})>"
 
 
+class SourceSyncStateModel(Base):
+    """
+    Водяной знак инкрементальной синхронизации источника (api.helpers.sync_watermark).
+
+    watermark_start_time - максимальный start_time встреч, увиденных синхронизацией,
+    meetings - {uuid встречи: {"hash": отпечаток recording_files, "start_time": ISO}} за окно хранения.
+    """
+
+    __tablename__ = "source_sync_state"
+
+    source_id = Column(Integer, ForeignKey("input_sources.id", ondelete="CASCADE"), primary_key=True)
+    watermark_start_time = Column(DateTime(timezone=True), nullable=True)
+    meetings = Column(JSONB, nullable=False, default=dict, server_default="{}")
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<SourceSyncState(source_id={self.source_id}, watermark={self.watermark_start_time})>"
+
+
 class OutputPresetModel(Base):
     """Пресет для выгрузки на платформу."""
 
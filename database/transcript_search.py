@@ -0,0 +1,276 @@
+"""Полнотекстовый поиск по транскрипциям и топикам (таблица transcript_segments).
+
+Найти лекцию, в которой звучал термин, можно было только открывая master.json и
+topics.json каждой записи через TranscriptionManager. Теперь сегменты и топики
+лежат в Postgres построчно с вычисляемым tsvector и GIN индексом - поиск не читает
+JSON файлы и отвечает за миллисекунды.
+
+Индексируются:
+    segment    - сегменты транскрипции (transcription_info["segments"], те же, что в master.json)
+    topic      - топики активной версии с таймкодами (topic_timestamps, как в topics.json)
+    main_topic - основные темы записи (main_topics)
+
+Обновление - в той же транзакции, что и запись результата: после save_master и
+add_topics_version задачи транскрибации/топиков сохраняют transcription_info и
+topic_timestamps в RecordingModel, after_flush сессии видит изменение колонки и
+переиндексирует только этот kind записи (DELETE + INSERT). Сброс транскрипции
+(значение None) удаляет строки, удаление записи - ON DELETE CASCADE.
+
+Конфигурация russian: русские слова стеммятся russian_stem, латиница - english_stem,
+поэтому один tsvector покрывает и русские, и английские транскрипции.
+"""
+
+from collections.abc import Iterable
+from itertools import chain
+from typing import Any
+
+from sqlalchemy import delete, desc, event, func, insert, inspect, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database.models import RecordingModel, TranscriptSegmentModel
+from logger import get_logger
+
+logger = get_logger()
+
+KIND_SEGMENT = "segment"
+KIND_TOPIC = "topic"
+KIND_MAIN_TOPIC = "main_topic"
+
+SEARCH_CONFIG = literal_column("'russian'::regconfig")
+SNIPPET_OPTIONS = "StartSel=<b>, StopSel=</b>, MinWords=10, MaxWords=25, ShortWord=2, MaxFragments=1"
+
+
+# ---------- строки индекса ----------
+
+
+def _seconds(value: Any) -> float | None:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _timed_row(item: dict[str, Any], text_key: str) -> dict[str, Any]:
+    return {"start_sec": _seconds(item.get("start")), "end_sec": _seconds(item.get("end")), "text": item.get(text_key)}
+
+
+def _segment_rows(transcription_info: Any) -> list[dict[str, Any]]:
+    segments = transcription_info.get("segments") if isinstance(transcription_info, dict) else None
+    return [_timed_row(segment, "text") for segment in segments or [] if isinstance(segment, dict)]
+
+
+def _topic_rows(topic_timestamps: Any) -> list[dict[str, Any]]:
+    return [_timed_row(topic, "topic") for topic in topic_timestamps or [] if isinstance(topic, dict)]
+
+
+def _main_topic_rows(main_topics: Any) -> list[dict[str, Any]]:
+    return [{"start_sec": None, "end_sec": None, "text": topic} for topic in main_topics or []]
+
+
+# Колонка RecordingModel -> (kind, извлечение строк индекса)
+_SOURCES = {
+    "transcription_info": (KIND_SEGMENT, _segment_rows),
+    "topic_timestamps": (KIND_TOPIC, _topic_rows),
+    "main_topics": (KIND_MAIN_TOPIC, _main_topic_rows),
+}
+
+
+def build_rows(recording_id: int, user_id: int, kind: str, items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Строки transcript_segments (пустые тексты пропускаются, position - порядок в исходном списке)."""
+    rows = []
+    for position, item in enumerate(items):
+        text = item["text"].strip() if isinstance(item["text"], str) else ""
+        if text:
+            rows.append(
+                {
+                    "recording_id": recording_id,
+                    "user_id": user_id,
+                    "kind": kind,
+                    "position": position,
+                    **item,
+                    "text": text,
+                }
+            )
+    return rows
+
+
+def _changed_sources(obj: RecordingModel) -> dict[str, Any]:
+    """Индексируемые колонки записи, значение которых изменилось в этом flush (колонка -> новое значение)."""
+    state = inspect(obj)
+    changed = {}
+    for name in _SOURCES:
+        history = state.attrs[name].history
+        if not history.added:
+            continue
+        # Повторное присваивание того же значения (синхронизация) не переиндексирует запись
+        if history.deleted and history.deleted[0] == history.added[0]:
+            continue
+        changed[name] = history.added[0]
+    return changed
+
+
+@event.listens_for(Session, "after_flush")
+def _index_transcripts(session: Session, _flush_context: Any) -> None:
+    # after_flush: id новых записей уже известен, история атрибутов еще не сброшена
+    for obj in chain(session.new, session.dirty):
+        if not isinstance(obj, RecordingModel) or obj in session.deleted:
+            continue
+        changed = _changed_sources(obj)
+        if changed:
+            state = inspect(obj)
+            reindex(session.connection(), state.dict.get("id"), state.dict.get("user_id"), changed)
+
+
+def reindex(connection: Any, recording_id: int | None, user_id: int | None, values: dict[str, Any]) -> None:
+    """Переиндексировать kinds записи по новым значениям колонок RecordingModel."""
+    if recording_id is None:
+        return
+    kinds = [_SOURCES[name][0] for name in values]
+    connection.execute(
+        delete(TranscriptSegmentModel).where(
+            TranscriptSegmentModel.recording_id == recording_id,
+            TranscriptSegmentModel.kind.in_(kinds),
+        )
+    )
+    if user_id is None:
+        return
+    rows = list(
+        chain.from_iterable(
+            build_rows(recording_id, user_id, _SOURCES[name][0], _SOURCES[name][1](value))
+            for name, value in values.items()
+        )
+    )
+    if rows:
+        connection.execute(insert(TranscriptSegmentModel), rows)
+    logger.debug(f"Transcript search: reindexed recording {recording_id} | kinds={kinds} | rows={len(rows)}")
+
+
+# ---------- поиск ----------
+
+
+def _ts_query(query: str) -> Any:
+    # websearch_to_tsquery: синтаксис поисковиков ("фраза", -исключение, or), не падает на пользовательском вводе
+    return func.websearch_to_tsquery(SEARCH_CONFIG, query)
+
+
+def _matches(user_id: int, ts_query: Any, recording_ids: Iterable[int] | None = None) -> Any:
+    query = select(
+        TranscriptSegmentModel.recording_id,
+        TranscriptSegmentModel.kind,
+        TranscriptSegmentModel.start_sec,
+        TranscriptSegmentModel.end_sec,
+        TranscriptSegmentModel.text,
+        func.ts_rank_cd(TranscriptSegmentModel.search_vector, ts_query).label("rank"),
+    ).where(
+        TranscriptSegmentModel.user_id == user_id,
+        TranscriptSegmentModel.search_vector.op("@@")(ts_query),
+    )
+    if recording_ids is not None:
+        query = query.where(TranscriptSegmentModel.recording_id.in_(list(recording_ids)))
+    return query.subquery("matches")
+
+
+async def search_transcripts(
+    session: AsyncSession,
+    user_id: int,
+    query: str,
+    limit: int = 20,
+    offset: int = 0,
+    matches_per_recording: int = 5,
+) -> tuple[int, list[dict[str, Any]]]:
+    """
+    Найти записи пользователя по тексту транскрипций и топиков.
+
+    Args:
+        session: Сессия БД
+        user_id: ID пользователя
+        query: Поисковый запрос (websearch синтаксис)
+        limit: Записей на странице
+        offset: Смещение по записям
+        matches_per_recording: Сколько лучших совпадений (со сниппетами) вернуть на запись
+
+    Returns:
+        (всего записей с совпадениями, записи страницы по убыванию релевантности с совпадениями)
+    """
+    ts_query = _ts_query(query)
+
+    matches = _matches(user_id, ts_query)
+    per_recording = (
+        select(
+            matches.c.recording_id,
+            func.max(matches.c.rank).label("rank"),
+            func.count().label("matches_count"),
+            func.count().over().label("total"),
+        )
+        .group_by(matches.c.recording_id)
+        .subquery("per_recording")
+    )
+    page = (
+        await session.execute(
+            select(
+                per_recording,
+                RecordingModel.display_name,
+                RecordingModel.start_time,
+                RecordingModel.duration,
+            )
+            .join(RecordingModel, RecordingModel.id == per_recording.c.recording_id)
+            .order_by(desc(per_recording.c.rank), desc(per_recording.c.recording_id))
+            .limit(limit)
+            .offset(offset)
+        )
+    ).all()
+    if not page:
+        if not offset:
+            return 0, []
+        # Страница за пределами выдачи - total отдельным запросом
+        total = await session.scalar(select(func.count(func.distinct(matches.c.recording_id))))
+        return total or 0, []
+
+    # Сниппеты (ts_headline) - только для лучших совпадений записей страницы
+    page_matches = _matches(user_id, ts_query, [row.recording_id for row in page])
+    ranked = select(
+        page_matches,
+        func.row_number()
+        .over(
+            partition_by=page_matches.c.recording_id,
+            order_by=(desc(page_matches.c.rank), page_matches.c.start_sec),
+        )
+        .label("match_rank"),
+    ).subquery("ranked")
+    hits = await session.execute(
+        select(
+            ranked.c.recording_id,
+            ranked.c.kind,
+            ranked.c.start_sec,
+            ranked.c.end_sec,
+            ranked.c.rank,
+            func.ts_headline(SEARCH_CONFIG, ranked.c.text, ts_query, SNIPPET_OPTIONS).label("snippet"),
+        )
+        .where(ranked.c.match_rank <= matches_per_recording)
+        .order_by(ranked.c.recording_id, ranked.c.start_sec.nulls_first())
+    )
+    hits_by_recording: dict[int, list[dict[str, Any]]] = {}
+    for hit in hits:
+        hits_by_recording.setdefault(hit.recording_id, []).append(
+            {
+                "kind": hit.kind,
+                "start": hit.start_sec,
+                "end": hit.end_sec,
+                "snippet": hit.snippet,
+                "rank": hit.rank,
+            }
+        )
+
+    return page[0].total, [
+        {
+            "recording_id": row.recording_id,
+            "display_name": row.display_name,
+            "start_time": row.start_time,
+            "duration": row.duration,
+            "rank": row.rank,
+            "matches_count": row.matches_count,
+            "matches": hits_by_recording.get(row.recording_id, []),
+        }
+        for row in page
+    ]
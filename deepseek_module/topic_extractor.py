@@ -5,7 +5,6 @@ from pathlib import Path
 from typing import Any
 
 import httpx
-from openai import AsyncOpenAI
 
 from logger import format_log, get_logger
 
@@ -42,7 +41,9 @@ class TopicExtractor:
             self.api_key = config.api_key
             self.base_url = config.base_url
         else:
-            # Для DeepSeek используем AsyncOpenAI (OpenAI-compatible API)
+            # Для DeepSeek используем AsyncOpenAI (OpenAI-compatible API), SDK импортируется лениво
+            from openai import AsyncOpenAI
+
             self.client = AsyncOpenAI(
                 api_key=config.api_key,
                 base_url=config.base_url,
@@ -70,6 +71,7 @@ class TopicExtractor:
         segments: list[dict] | None = None,
         recording_topic: str | None = None,
         granularity: str = "long",  # "short" | "long"
+        audio_pauses: list[dict] | None = None,
     ) -> dict[str, Any]:
         """
         Извлечение тем из транскрипции через DeepSeek.
@@ -78,6 +80,8 @@ class TopicExtractor:
             transcription_text: Полный текст транскрипции
             segments: Список сегментов с временными метками (обязательно)
             recording_topic: Название курса/предмета для контекста (опционально)
+            audio_pauses: Перерывы по тишине в аудио (LoudnessEnvelope.long_pauses), объединяются
+                с паузами между сегментами (опционально)
 
         Returns:
             Словарь с темами:
@@ -90,7 +94,7 @@ class TopicExtractor:
                 'long_pauses': [
                     {'start': float, 'end': float, 'duration_minutes': float},
                     ...
-                ]  # Паузы >=8 минут между сегментами
+                ]  # Паузы >=8 минут между сегментами и по тишине в аудио
             }
         """
         if not segments or len(segments) == 0:
@@ -140,6 +144,7 @@ class TopicExtractor:
                 max_topics,
                 granularity=granularity,
                 segments=segments,
+                audio_pauses=audio_pauses,
             )
 
             main_topics = result.get("main_topics", [])
@@ -177,6 +182,7 @@ class TopicExtractor:
         segments_file_path: str,
         recording_topic: str | None = None,
         granularity: str = "long",  # "short" | "long"
+        audio_pauses: list[dict] | None = None,
     ) -> dict[str, Any]:
         """
         Извлечение тем из файла segments.txt.
@@ -185,6 +191,7 @@ class TopicExtractor:
             segments_file_path: Путь к файлу segments.txt с форматом [HH:MM:SS - HH:MM:SS] текст
             recording_topic: Название курса/предмета для контекста (опционально)
             granularity: Режим извлечения тем: "short" или "long"
+            audio_pauses: Перерывы по тишине в аудио (см. extract_topics)
 
         Returns:
             Словарь с темами (аналогично extract_topics)
@@ -253,6 +260,7 @@ class TopicExtractor:
             segments=segments,
             recording_topic=recording_topic,
             granularity=granularity,
+            audio_pauses=audio_pauses,
         )
 
     def _format_transcript_with_timestamps(self, segments: list[dict]) -> str:
@@ -360,6 +368,7 @@ class TopicExtractor:
         max_topics: int = 30,
         granularity: str = "long",  # "short" | "long"
         segments: list[dict] | None = None,
+        audio_pauses: list[dict] | None = None,
     ) -> dict[str, Any]:
         """
         Анализ полной транскрипции через DeepSeek.
@@ -381,7 +390,8 @@ class TopicExtractor:
         else:  # granularity == "long"
             min_spacing_minutes = max(4, min(6, total_duration / 60 * 0.05))
 
-        long_pauses = self._detect_long_pauses(segments or [], min_gap_minutes=8)
+        transcript_pauses = self._detect_long_pauses(segments or [], min_gap_minutes=8)
+        long_pauses = self._merge_pauses(transcript_pauses + (audio_pauses or []))
         pauses_instruction = ""
         if long_pauses:
             pauses_lines = [
@@ -668,6 +678,19 @@ class TopicExtractor:
 
         return pauses
 
+    @staticmethod
+    def _merge_pauses(pauses: list[dict]) -> list[dict]:
+        """Объединение пересекающихся пауз (из транскрипции и из аудио) в отсортированный список."""
+        merged: list[dict] = []
+        for pause in sorted(pauses, key=lambda p: p["start"]):
+            if merged and pause["start"] <= merged[-1]["end"]:
+                last = merged[-1]
+                last["end"] = max(last["end"], pause["end"])
+                last["duration_minutes"] = (last["end"] - last["start"]) / 60
+            else:
+                merged.append(dict(pause))
+        return merged
+
     @staticmethod
     def _format_time(seconds: float) -> str:
         """Форматирование секунд в HH:MM:SS"""
@@ -1,6 +1,7 @@
 """Audio transcription service via Fireworks Audio Inference API"""
 
 import asyncio
+import hashlib
 import json
 import os
 import re
@@ -8,15 +9,6 @@ import time
 from collections import Counter
 from typing import Any
 
-try:
-    from fireworks.client.audio import AudioInference
-except ImportError as exc:  # pragma: no cover - среда без зависимости
-    raise ImportError(
-        "Не установлен пакет 'fireworks-ai'. Установите его командой "
-        "`pip install fireworks-ai` или добавьте в requirements, "
-        "чтобы использовать Fireworks транскрибацию."
-    ) from exc
-
 try:
     import httpx
 except ImportError as exc:  # pragma: no cover - среда без зависимости
@@ -27,18 +19,33 @@ except ImportError as exc:  # pragma: no cover - среда без зависи
 from pathlib import Path
 
 from logger import get_logger
+from utils.artifact_store import fingerprint, get_artifact_store
 
 from .config import FireworksConfig
 
 logger = get_logger()
 
 
+def _load_audio_inference():
+    """Ленивый импорт Fireworks SDK (тяжелый, нужен только при создании клиента)."""
+    try:
+        from fireworks.client.audio import AudioInference
+    except ImportError as exc:  # pragma: no cover - среда без зависимости
+        raise ImportError(
+            "Не установлен пакет 'fireworks-ai'. Установите его командой "
+            "`pip install fireworks-ai` или добавьте в requirements, "
+            "чтобы использовать Fireworks транскрибацию."
+        ) from exc
+    return AudioInference
+
+
 class FireworksTranscriptionService:
     """Асинхронная обертка над Fireworks AudioInference API."""
 
     def __init__(self, config: FireworksConfig):
         self.config = config
-        self._client = AudioInference(
+        audio_inference_cls = _load_audio_inference()
+        self._client = audio_inference_cls(
             model=self.config.model,
             base_url=self.config.base_url,
             api_key=self.config.api_key,
@@ -79,6 +86,24 @@ class FireworksTranscriptionService:
         with Path(audio_path).open("rb") as audio_file:
             audio_bytes = audio_file.read()
 
+        # Идентичное аудио с теми же параметрами уже транскрибировалось - результат из artifact store
+        store = get_artifact_store()
+        cache_key = None
+        if store is not None:
+            safe_params = {k: v for k, v in params.items() if k != "api_key"}
+            cache_key = fingerprint(
+                "transcription", hashlib.sha256(audio_bytes).hexdigest(), self.config.model, safe_params
+            )
+            cached = store.lookup("transcription", cache_key)
+            if cached:
+                store.add_ref(cache_key, audio_path)
+                logger.info(
+                    "Fireworks | Reused transcription from artifact store | file={file} | key={key}",
+                    file=Path(audio_path).name,
+                    key=cache_key[:12],
+                )
+                return json.loads(cached.file("result.json").read_text())
+
         last_error: Exception | None = None
 
         for attempt in range(1, retry_attempts + 1):
@@ -122,6 +147,17 @@ class FireworksTranscriptionService:
                         ratio=ratio,
                     )
 
+                if cache_key:
+                    try:
+                        store.put(
+                            "transcription",
+                            cache_key,
+                            data={"result.json": json.dumps(normalized, ensure_ascii=False).encode()},
+                            refs=[audio_path],
+                        )
+                    except OSError as e:
+                        logger.warning(f"Fireworks | Artifact store unavailable: {e}")
+
                 return normalized
 
             except Exception as exc:
@@ -890,7 +926,7 @@ class FireworksTranscriptionService:
                 )
                 return result
 
-    async def check_batch_status(self, batch_id: str) -> dict[str, Any]:
+    async def check_batch_status(self, batch_id: str, client: httpx.AsyncClient | None = None) -> dict[str, Any]:
         """
         Проверяет статус batch job.
 
@@ -898,6 +934,7 @@ class FireworksTranscriptionService:
 
         Args:
             batch_id: ID batch job (из submit_batch_transcription)
+            client: Переиспользуемый HTTP клиент (для массовых проверок)
 
         Returns:
             Dict со статусом:
@@ -912,25 +949,67 @@ class FireworksTranscriptionService:
         if not self.config.account_id:
             raise ValueError("account_id не настроен для Batch API")
 
+        if client is None:
+            async with httpx.AsyncClient(timeout=30.0) as own_client:
+                return await self.check_batch_status(batch_id, client=own_client)
+
         url = f"{self.config.batch_base_url}/v1/accounts/{self.config.account_id}/batch_job/{batch_id}"
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                url,
-                headers={"Authorization": self.config.api_key},
+        response = await client.get(
+            url,
+            headers={"Authorization": self.config.api_key},
+        )
+
+        if response.status_code != 200:
+            error_text = response.text
+            logger.error(
+                f"Fireworks Batch | Status Check Error | batch_id={batch_id} | status={response.status_code} | error={error_text[:500]}"
             )
+            raise RuntimeError(f"Ошибка проверки статуса Batch API: {response.status_code} - {error_text[:200]}")
 
-            if response.status_code != 200:
-                error_text = response.text
-                logger.error(
-                    f"Fireworks Batch | Status Check Error | batch_id={batch_id} | status={response.status_code} | error={error_text[:500]}"
-                )
-                raise RuntimeError(f"Ошибка проверки статуса Batch API: {response.status_code} - {error_text[:200]}")
+        result = response.json()
+        status = result.get("status", "unknown")
+        logger.debug(f"Fireworks Batch | Status Check | batch_id={batch_id} | status={status}")
+        return result
+
+    async def check_batch_statuses(
+        self,
+        batch_ids: list[str],
+        max_concurrency: int = 10,
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Массовая проверка статусов batch jobs через один HTTP клиент.
+
+        Ошибка по одному job не прерывает проверку остальных: для него возвращается
+        {"status": "error", "error": "..."}.
 
-            result = response.json()
-            status = result.get("status", "unknown")
-            logger.debug(f"Fireworks Batch | Status Check | batch_id={batch_id} | status={status}")
-            return result
+        Args:
+            batch_ids: Список ID batch jobs
+            max_concurrency: Максимальное число одновременных запросов
+
+        Returns:
+            Dict batch_id -> ответ статуса
+        """
+        if not batch_ids:
+            return {}
+
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        limits = httpx.Limits(
+            max_connections=max(1, max_concurrency), max_keepalive_connections=max(1, max_concurrency)
+        )
+
+        async with httpx.AsyncClient(timeout=30.0, limits=limits) as client:
+
+            async def _check(batch_id: str) -> tuple[str, dict[str, Any]]:
+                async with semaphore:
+                    try:
+                        return batch_id, await self.check_batch_status(batch_id, client=client)
+                    except Exception as exc:
+                        return batch_id, {"status": "error", "batch_id": batch_id, "error": str(exc)}
+
+            results = await asyncio.gather(*(_check(batch_id) for batch_id in batch_ids))
+
+        return dict(results)
 
     async def get_batch_result(self, batch_id: str) -> dict[str, Any]:
         """
@@ -946,7 +1025,22 @@ class FireworksTranscriptionService:
             RuntimeError: Если job еще не завершен
         """
         status_response = await self.check_batch_status(batch_id)
+        return self.parse_batch_result(batch_id, status_response)
 
+    def parse_batch_result(self, batch_id: str, status_response: dict[str, Any]) -> dict[str, Any]:
+        """
+        Разбирает результат batch job из уже полученного ответа статуса.
+
+        Args:
+            batch_id: ID batch job
+            status_response: Ответ check_batch_status
+
+        Returns:
+            Normalized результат (аналогично transcribe_audio)
+
+        Raises:
+            RuntimeError: Если job еще не завершен или body пустой
+        """
         if status_response.get("status") != "completed":
             raise RuntimeError(f"Batch job {batch_id} еще не завершен. Статус: {status_response.get('status')}")
 
@@ -987,6 +1081,9 @@ class FireworksTranscriptionService:
         """
         Ожидает завершения batch job с polling.
 
+        Блокирует вызывающего на всё время ожидания. В Celery воркерах не используется:
+        незавершенные jobs опрашивает общий поллер (api.tasks.processing.poll_batch_transcriptions).
+
         Args:
             batch_id: ID batch job
             poll_interval: Интервал проверки в секундах
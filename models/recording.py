@@ -206,6 +206,8 @@ class MeetingRecording:
         self.processed_audio_path: str | None = meeting_data.get("processed_audio_path")
         self.transcription_dir: str | None = meeting_data.get("transcription_dir")
         self.downloaded_at: datetime | None = meeting_data.get("downloaded_at")
+        # Media info скачанного файла (длительность, потоки, кодеки), см. video_processing_module.media_info
+        self.media_info: dict[str, Any] | None = meeting_data.get("media_info")
 
         # Доп. инфо по файлам и скачиванию (для источников типа Zoom)
         self.video_file_size: int | None = meeting_data.get("video_file_size")
@@ -800,6 +802,7 @@ class MeetingRecording:
         self.processed_video_path = None
         self.processed_audio_path = None
         self.downloaded_at = None
+        self.media_info = None
         self.transcription_dir = None
         self.topic_timestamps = None
         self.main_topics = None
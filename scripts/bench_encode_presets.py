@@ -0,0 +1,218 @@
+"""Benchmark encode presets: speed, output size and quality (VMAF or PSNR).
+
+Each preset from video_processing_module.encode_presets encodes the same
+reference clip (a window of --input, or a generated slide-like clip with
+--generate). For every preset the harness records:
+
+- encode time and speed (x realtime)
+- output size and average bitrate
+- quality against the reference window: VMAF (ffmpeg built with libvmaf),
+  otherwise PSNR; both are measured at the reference resolution and fps
+
+Results are printed as a table and optionally written to --json, so preset
+defaults can be chosen from measurements on real lecture recordings.
+
+Usage:
+    uv run python scripts/bench_encode_presets.py --input lecture.mp4 --start 600 --duration 120
+    uv run python scripts/bench_encode_presets.py --generate --duration 60 --json bench.json
+"""
+
+import argparse
+import json
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from video_processing_module.encode_presets import ENCODE_PRESETS, EncodePreset  # noqa: E402
+
+VMAF_SCORE = re.compile(r"VMAF score[:=]\s*([\d.]+)")
+PSNR_AVERAGE = re.compile(r"PSNR .*?average:([\d.]+|inf)")
+
+# Full paths from PATH: argv of every call below is this executable plus local file names and numbers
+FFMPEG = shutil.which("ffmpeg") or "ffmpeg"
+FFPROBE = shutil.which("ffprobe") or "ffprobe"
+
+
+def run(cmd: list[str]) -> subprocess.CompletedProcess:
+    proc = subprocess.run(cmd, capture_output=True, text=True, check=False)  # noqa: S603 - FFMPEG/FFPROBE argv
+    if proc.returncode != 0:
+        tail = "\n".join(proc.stderr.splitlines()[-15:])
+        raise RuntimeError(f"{cmd[0]} failed ({proc.returncode}):\n{tail}")
+    return proc
+
+
+def probe(path: Path) -> dict:
+    proc = run([FFPROBE, "-v", "error", "-print_format", "json", "-show_format", "-show_streams", str(path)])
+    info = json.loads(proc.stdout)
+    video = next(s for s in info["streams"] if s["codec_type"] == "video")
+    num, den = video["r_frame_rate"].split("/")
+    return {
+        "width": int(video["width"]),
+        "height": int(video["height"]),
+        "fps": int(num) / int(den) if int(den) else 0.0,
+        "duration": float(info["format"]["duration"]),
+    }
+
+
+def has_libvmaf() -> bool:
+    proc = subprocess.run(  # noqa: S603 - fixed argv
+        [FFMPEG, "-hide_banner", "-filters"], capture_output=True, text=True, check=False
+    )
+    return "libvmaf" in proc.stdout
+
+
+def generate_reference(path: Path, duration: float) -> None:
+    """Slide-like clip: a new 1080p frame every 10 seconds at 30 fps, with a tone."""
+    run(
+        [
+            FFMPEG,
+            "-hide_banner",
+            "-f",
+            "lavfi",
+            "-i",
+            f"testsrc2=s=1920x1080:r=0.1:d={duration}",
+            "-f",
+            "lavfi",
+            "-i",
+            f"sine=frequency=440:d={duration}",
+            "-r",
+            "30",
+            "-c:v",
+            "libx264",
+            "-crf",
+            "12",
+            "-preset",
+            "veryfast",
+            "-pix_fmt",
+            "yuv420p",
+            "-c:a",
+            "aac",
+            "-shortest",
+            "-y",
+            str(path),
+        ]
+    )
+
+
+def measure_quality(encoded: Path, reference: Path, start: float, duration: float, ref: dict, vmaf: bool) -> dict:
+    """Compare encoded clip with the reference window (scaled/resampled to the reference)."""
+    distorted = f"[0:v]scale={ref['width']}:{ref['height']}:flags=bicubic,fps={ref['fps']},setpts=PTS-STARTPTS[d]"
+    original = f"[1:v]fps={ref['fps']},setpts=PTS-STARTPTS[r]"
+    metric = "libvmaf" if vmaf else "psnr"
+    cmd = [
+        FFMPEG,
+        "-hide_banner",
+        "-i",
+        str(encoded),
+        "-ss",
+        f"{start:.3f}",
+        "-t",
+        f"{duration:.3f}",
+        "-i",
+        str(reference),
+        "-lavfi",
+        f"{distorted};{original};[d][r]{metric}",
+        "-f",
+        "null",
+        "-",
+    ]
+    stderr = run(cmd).stderr
+    pattern = VMAF_SCORE if vmaf else PSNR_AVERAGE
+    match = pattern.search(stderr)
+    value = match.group(1) if match else None
+    score = float(value) if value and value != "inf" else None
+    return {"metric": "vmaf" if vmaf else "psnr", "score": score}
+
+
+def bench_preset(
+    preset: EncodePreset, reference: Path, start: float, duration: float, ref: dict, workdir: Path, vmaf: bool
+) -> dict:
+    output = workdir / f"{preset.name}.mp4"
+    cmd = [FFMPEG, "-hide_banner", "-ss", f"{start:.3f}", "-t", f"{duration:.3f}", "-i", str(reference)]
+    cmd.extend([*preset.output_args(source_fps=ref["fps"]), "-y", str(output)])
+
+    started = time.perf_counter()
+    run(cmd)
+    elapsed = time.perf_counter() - started
+
+    size = output.stat().st_size
+    result = {
+        "preset": preset.name,
+        "encode_seconds": round(elapsed, 2),
+        "speed_x": round(duration / elapsed, 1) if elapsed else None,
+        "size_mb": round(size / 1024 / 1024, 2),
+        "bitrate_kbps": round(size * 8 / duration / 1000, 1),
+        "metric": None,
+        "score": None,
+    }
+    if not preset.stream_copy:
+        result.update(measure_quality(output, reference, start, duration, ref, vmaf))
+    return result
+
+
+def print_table(results: list[dict]) -> None:
+    header = f"{'preset':<16} {'time, s':>8} {'speed':>8} {'size, MB':>9} {'kbps':>9} {'quality':>14}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        quality = f"{r['metric']} {r['score']:.2f}" if r["score"] is not None else "-"
+        print(
+            f"{r['preset']:<16} {r['encode_seconds']:>8.2f} {r['speed_x'] or 0:>7.1f}x "
+            f"{r['size_mb']:>9.2f} {r['bitrate_kbps']:>9.1f} {quality:>14}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", type=Path, help="Reference recording")
+    source.add_argument("--generate", action="store_true", help="Generate a slide-like reference clip")
+    parser.add_argument("--start", type=float, default=0.0, help="Window start in the reference (seconds)")
+    parser.add_argument("--duration", type=float, default=60.0, help="Window duration (seconds)")
+    parser.add_argument("--presets", nargs="*", default=list(ENCODE_PRESETS), help="Presets to benchmark")
+    parser.add_argument("--json", type=Path, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.presets if name not in ENCODE_PRESETS]
+    if unknown:
+        parser.error(f"unknown presets: {', '.join(unknown)}")
+
+    with tempfile.TemporaryDirectory(prefix="bench_presets_") as tmp:
+        workdir = Path(tmp)
+        reference = args.input
+        if args.generate:
+            reference = workdir / "reference.mp4"
+            generate_reference(reference, args.start + args.duration)
+
+        ref = probe(reference)
+        duration = min(args.duration, ref["duration"] - args.start)
+        if duration <= 0:
+            parser.error(f"--start {args.start} is beyond the reference duration {ref['duration']:.1f}s")
+
+        vmaf = has_libvmaf()
+        print(
+            f"Reference: {reference.name} {ref['width']}x{ref['height']} @ {ref['fps']:.2f} fps, "
+            f"window {args.start:.0f}s + {duration:.0f}s, quality metric: {'VMAF' if vmaf else 'PSNR'}\n"
+        )
+
+        results = [
+            bench_preset(ENCODE_PRESETS[name], reference, args.start, duration, ref, workdir, vmaf)
+            for name in args.presets
+        ]
+
+    print_table(results)
+    if args.json:
+        payload = {"reference": str(reference), "window": [args.start, duration], "reference_info": ref}
+        args.json.write_text(json.dumps({**payload, "results": results}, indent=2))
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""Benchmark HTTP middleware stack overhead (legacy BaseHTTPMiddleware vs pure ASGI).
+
+Runs in-process through httpx.ASGITransport, without network, DB or auth, so only the
+middleware stack differs between runs. Endpoints mirror the shape of real responses:
+
+- GET /health                 - small JSON
+- GET /recordings             - paginated list of 50 recordings
+- GET /recordings/1/video     - 8 MB StreamingResponse in 64 KB chunks
+
+Usage:
+    uv run python scripts/bench_middleware.py --requests 2000 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from fastapi import FastAPI, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from api.config import get_settings
+from api.middleware.logging import LoggingMiddleware
+from api.middleware.rate_limit import RateLimitMiddleware
+from logger import get_logger
+
+logger = get_logger()
+settings = get_settings()
+
+RECORDINGS_PAGE = {
+    "items": [
+        {
+            "id": i,
+            "display_name": f"Лекция {i}",
+            "start_time": "2026-01-12T10:00:00+00:00",
+            "duration": 90,
+            "status": "TRANSCRIBED",
+            "outputs": [{"target_type": "YOUTUBE", "status": "UPLOADED"}],
+        }
+        for i in range(50)
+    ],
+    "total": 50,
+    "page": 1,
+    "per_page": 50,
+}
+
+STREAM_CHUNK = b"\0" * 64 * 1024
+STREAM_CHUNKS = 128  # 8 MB
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    """Baseline LoggingMiddleware (BaseHTTPMiddleware) as it was before the pure ASGI rewrite."""
+
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+
+        logger.debug(
+            f"Request: {request.method} {request.url.path} | "
+            f"client={request.client.host if request.client else 'unknown'}"
+        )
+
+        response = await call_next(request)
+
+        process_time = time.time() - start_time
+        logger.debug(
+            f"Response: {request.method} {request.url.path} | status={response.status_code} | time={process_time:.3f}s"
+        )
+
+        return response
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    """Baseline RateLimitMiddleware (BaseHTTPMiddleware, list-based counters) as it was before the rewrite."""
+
+    def __init__(self, app, per_minute: int = 60, per_hour: int = 1000):
+        super().__init__(app)
+        self.per_minute = per_minute
+        self.per_hour = per_hour
+        self.minute_requests = defaultdict(list)
+        self.hour_requests = defaultdict(list)
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        if not settings.rate_limit_enabled:
+            return await call_next(request)
+
+        if request.url.path == "/health":
+            return await call_next(request)
+
+        client_ip = request.client.host if request.client else "unknown"
+
+        current_time = time.time()
+        minute_ago = current_time - 60
+        hour_ago = current_time - 3600
+
+        self.minute_requests[client_ip] = [t for t in self.minute_requests[client_ip] if t > minute_ago]
+        self.hour_requests[client_ip] = [t for t in self.hour_requests[client_ip] if t > hour_ago]
+
+        minute_count = len(self.minute_requests[client_ip])
+        hour_count = len(self.hour_requests[client_ip])
+
+        if minute_count >= self.per_minute:
+            logger.warning(
+                f"Rate limit exceeded (per minute): ip={client_ip} | requests={minute_count}/{self.per_minute}"
+            )
+            return JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={
+                    "detail": f"Rate limit exceeded: {self.per_minute} requests per minute",
+                    "retry_after": 60,
+                },
+                headers={"Retry-After": "60"},
+            )
+
+        if hour_count >= self.per_hour:
+            logger.warning(f"Rate limit exceeded (per hour): ip={client_ip} | requests={hour_count}/{self.per_hour}")
+            return JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={
+                    "detail": f"Rate limit exceeded: {self.per_hour} requests per hour",
+                    "retry_after": 3600,
+                },
+                headers={"Retry-After": "3600"},
+            )
+
+        self.minute_requests[client_ip].append(current_time)
+        self.hour_requests[client_ip].append(current_time)
+
+        response = await call_next(request)
+
+        response.headers["X-RateLimit-Limit-Minute"] = str(self.per_minute)
+        response.headers["X-RateLimit-Remaining-Minute"] = str(max(0, self.per_minute - minute_count - 1))
+        response.headers["X-RateLimit-Limit-Hour"] = str(self.per_hour)
+        response.headers["X-RateLimit-Remaining-Hour"] = str(max(0, self.per_hour - hour_count - 1))
+
+        return response
+
+
+def build_app(stack: str) -> FastAPI:
+    """Build app with the requested middleware stack ("legacy" or "asgi")."""
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/recordings")
+    async def recordings():
+        return RECORDINGS_PAGE
+
+    @app.get("/recordings/{recording_id}/video")
+    async def video(recording_id: int):
+        async def chunks():
+            for _i in range(STREAM_CHUNKS):
+                yield STREAM_CHUNK
+
+        return StreamingResponse(
+            chunks(),
+            media_type="video/mp4",
+            headers={"Content-Disposition": f'inline; filename="recording_{recording_id}.mp4"'},
+        )
+
+    if stack == "legacy":
+        app.add_middleware(LegacyRateLimitMiddleware, per_minute=10**9, per_hour=10**9)
+        app.add_middleware(LegacyLoggingMiddleware)
+    else:
+        app.add_middleware(RateLimitMiddleware, per_minute=10**9, per_hour=10**9)
+        app.add_middleware(LoggingMiddleware)
+
+    return app
+
+
+async def run_case(app: FastAPI, path: str, total: int, concurrency: int) -> dict:
+    """Send `total` requests with `concurrency` workers and collect latencies."""
+    latencies: list[float] = []
+    transport = httpx.ASGITransport(app=app)
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warmup
+        for _ in range(min(50, total)):
+            await client.get(path)
+
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.get(path)
+                await response.aread()
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "rps": total / elapsed,
+    }
+
+
+async def main(total: int, concurrency: int) -> None:
+    """Run all cases for both stacks and print a comparison table."""
+    cases = [("/health", total), ("/recordings", total), ("/recordings/1/video", max(1, total // 20))]
+
+    print(f"{'endpoint':<24} {'stack':<7} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>10}")
+    for path, count in cases:
+        for stack in ("legacy", "asgi"):
+            result = await run_case(build_app(stack), path, count, concurrency)
+            print(f"{path:<24} {stack:<7} {result['p50_ms']:>9.3f} {result['p99_ms']:>9.3f} {result['rps']:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent clients")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,124 @@
+"""Benchmark API cold start: import cost of api.main and time-to-first-request.
+
+Two measurements, each in a fresh interpreter:
+
+1. `python -X importtime -c "import api.main"` - total import time and the top
+   modules by cumulative time. Heavy SDKs (googleapiclient, vk_api, fireworks,
+   openai) must not show up here: routers enqueue tasks by name.
+2. Time-to-first-request - starts uvicorn on a free port (without reload/workers)
+   and polls GET /api/v1/health until the first 200 response.
+
+Migrations are not part of API startup anymore (`python -m api.preflight`), so
+the run does not need a migrated DB; /api/v1/health only touches the app itself.
+
+Usage:
+    uv run python scripts/bench_startup.py --runs 5 --top 25
+"""
+
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ("googleapiclient", "google.oauth2", "vk_api", "fireworks", "openai", "ffmpeg")
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_importtime() -> list[tuple[str, int, int]]:
+    """Run `-X importtime` and return (module, self_us, cumulative_us) rows."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api.main"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=False,
+        env={**os.environ, "PYTHONPATH": str(PROJECT_ROOT)},
+    )
+    if proc.returncode != 0:
+        tail = "\n".join(proc.stderr.splitlines()[-20:])
+        raise RuntimeError(f"import api.main failed:\n{tail}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            rows.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return rows
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_request(timeout: float) -> float:
+    """Start uvicorn and return seconds until the first successful GET /api/v1/health."""
+    port = free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(  # noqa: S603 - fixed argv, port is an int from argparse
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=PROJECT_ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        url = f"http://127.0.0.1:{port}/api/v1/health"
+        while time.perf_counter() - started < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+            try:
+                if httpx.get(url, timeout=0.5).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                pass
+            time.sleep(0.02)
+        raise RuntimeError(f"/api/v1/health did not respond within {timeout}s")
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main(runs: int, top: int, timeout: float) -> None:
+    rows = run_importtime()
+    total_us = max(cumulative for _, _, cumulative in rows)
+    print(f"import api.main: {total_us / 1000:.1f} ms cumulative ({len(rows)} modules)")
+
+    print(f"\nTop {top} modules by cumulative import time:")
+    for module, self_us, cumulative_us in sorted(rows, key=lambda r: r[2], reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:9.1f} ms  (self {self_us / 1000:7.1f} ms)  {module}")
+
+    heavy = sorted({module for module, _, _ in rows if module.startswith(HEAVY_MODULES)})
+    if heavy:
+        print(f"\n⚠️  Heavy modules imported at startup: {', '.join(heavy)}")
+    else:
+        print("\n✅ No heavy SDK modules imported at startup")
+
+    samples = [time_to_first_request(timeout) for _ in range(runs)]
+    print(
+        f"\nTime to first request over {runs} runs: "
+        f"median {statistics.median(samples) * 1000:.0f} ms, "
+        f"min {min(samples) * 1000:.0f} ms, max {max(samples) * 1000:.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="uvicorn cold starts to measure")
+    parser.add_argument("--top", type=int, default=25, help="Modules to show from -X importtime")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Max seconds to wait for /api/v1/health")
+    args = parser.parse_args()
+    main(args.runs, args.top, args.timeout)
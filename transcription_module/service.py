@@ -4,6 +4,7 @@ import time
 from pathlib import Path
 from typing import Any
 
+from config.settings import settings
 from deepseek_module import DeepSeekConfig, TopicExtractor
 from fireworks_module import FireworksConfig, FireworksTranscriptionService
 from logger import get_logger
@@ -41,6 +42,7 @@ class TranscriptionService:
             target_bitrate=target_bitrate,
             target_sample_rate=target_sample_rate,
             max_file_size_mb=max_file_size_mb,
+            max_concurrency=settings.processing.audio_split_concurrency,
         )
 
     @staticmethod
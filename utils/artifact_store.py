@@ -0,0 +1,354 @@
+"""Content-addressed artifact store (dedup скачиваний, обрезки и транскрибаций).
+
+Одна и та же запись Zoom приходит через несколько источников или пользователей
+(общие встречи), а reset записи ведет к повторному скачиванию, ffmpeg и платной
+транскрибации. Store хранит результаты по ключу от содержимого входа:
+
+    download       sha256(файл)
+    trim           sha256(исходник) + fingerprint(ProcessingConfig, опции графа)
+    transcription  sha256(аудио) + fingerprint(параметры Fireworks)
+
+Раскладка (вне пользовательских директорий media/user_{id}):
+
+    {root}/objects/{key[:2]}/{key}/       файлы артефакта + manifest.json
+    {root}/inodes/{st_dev}-{st_ino}       индекс inode -> sha256 (повторный hash_file бесплатный)
+    {root}/aliases/user_{id}/{digest}     алиас источника -> sha256 (только для своего пользователя)
+    {root}/locks/{key}.lock               flock на изменение manifest
+
+Выдача артефакта в пользовательский путь: reflink (copy-on-write) -> hardlink -> copy.
+
+Изоляция пользователей: по содержимому артефакт выдается только тому, кто сам
+предъявил входные байты (ключ считается от его файла). Алиасы источников
+(пропуск скачивания без чтения байтов) хранятся отдельно для каждого пользователя.
+
+Reference counting: manifest хранит пути, которым выдан артефакт. Удаление
+пользовательского файла (reset, delete, cleanup) не затрагивает других - у каждого
+свой link/копия; gc() убирает ссылки на несуществующие пути и удаляет артефакты,
+оставшиеся без ссылок дольше grace периода (maintenance.gc_artifact_store).
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from config.settings import settings
+from logger import get_logger
+
+logger = get_logger()
+
+HASH_CHUNK_SIZE = 1024 * 1024
+MANIFEST_NAME = "manifest.json"
+FICLONE = 0x40049409  # linux/fs.h: ioctl reflink (btrfs, xfs, ...)
+ORPHAN_GRACE_SECONDS = 7 * 24 * 3600  # артефакт без ссылок живет неделю (reset -> повторная обработка)
+INODE_INDEX_TTL_SECONDS = 30 * 24 * 3600
+
+
+class ContentHasher:
+    """Потоковый sha256 (для хеширования во время скачивания)."""
+
+    def __init__(self):
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def update(self, chunk: bytes) -> None:
+        self._hash.update(chunk)
+        self.size += len(chunk)
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def fingerprint(*parts: Any) -> str:
+    """Стабильный sha256 от JSON-сериализуемых частей ключа."""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@dataclass
+class StoredArtifact:
+    """Артефакт в store"""
+
+    key: str
+    kind: str
+    path: Path
+    files: dict[str, int] = field(default_factory=dict)  # name -> size_bytes
+    meta: dict[str, Any] = field(default_factory=dict)
+
+    def file(self, name: str) -> Path:
+        return self.path / name
+
+
+class ArtifactStore:
+    """Content-addressed store с выдачей артефактов через reflink/hardlink"""
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    # ------------------------------------------------------------------ hashing
+
+    def _inode_entry(self, path: Path) -> Path:
+        stat = path.stat()
+        return self.root / "inodes" / f"{stat.st_dev}-{stat.st_ino}"
+
+    def hash_file(self, path: str | Path) -> str:
+        """sha256 файла; для файлов, выданных store или уже хешированных, без чтения."""
+        path = Path(path)
+        stat = path.stat()
+        entry = self._inode_entry(path)
+        try:
+            digest, size, mtime_ns = entry.read_text().split()
+            if int(size) == stat.st_size and int(mtime_ns) == stat.st_mtime_ns:
+                return digest
+        except (FileNotFoundError, ValueError):
+            pass
+
+        hasher = ContentHasher()
+        with path.open("rb") as f:
+            while chunk := f.read(HASH_CHUNK_SIZE):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+        self.remember_hash(path, digest)
+        return digest
+
+    def remember_hash(self, path: str | Path, digest: str) -> None:
+        """Записать sha256 файла в индекс inode (хеш посчитан потоково снаружи)."""
+        path = Path(path)
+        stat = path.stat()
+        entry = self._inode_entry(path)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        self._write_atomic(entry, f"{digest} {stat.st_size} {stat.st_mtime_ns}")
+
+    # ------------------------------------------------------------------ aliases
+
+    def _alias_entry(self, user_id: int, source: str) -> Path:
+        return self.root / "aliases" / f"user_{user_id}" / fingerprint(source)
+
+    def resolve_alias(self, user_id: int, source: str) -> str | None:
+        """sha256 содержимого, ранее скачанного этим пользователем из источника."""
+        try:
+            return self._alias_entry(user_id, source).read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def set_alias(self, user_id: int, source: str, digest: str) -> None:
+        entry = self._alias_entry(user_id, source)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        self._write_atomic(entry, digest)
+
+    # ------------------------------------------------------------------ artifacts
+
+    def _object_dir(self, key: str) -> Path:
+        return self.root / "objects" / key[:2] / key
+
+    @contextmanager
+    def _lock(self, key: str) -> Iterator[None]:
+        lock_path = self.root / "locks" / f"{key}.lock"
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with lock_path.open("a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_manifest(self, key: str) -> dict[str, Any] | None:
+        try:
+            return json.loads((self._object_dir(key) / MANIFEST_NAME).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_manifest(self, key: str, manifest: dict[str, Any]) -> None:
+        self._write_atomic(self._object_dir(key) / MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False))
+
+    def lookup(self, kind: str, key: str) -> StoredArtifact | None:
+        """Найти целый артефакт (manifest и все файлы с ожидаемым размером)."""
+        manifest = self._read_manifest(key)
+        if not manifest or manifest.get("kind") != kind:
+            return None
+
+        obj_dir = self._object_dir(key)
+        for name, size in manifest["files"].items():
+            path = obj_dir / name
+            if not path.exists() or path.stat().st_size != size:
+                logger.warning(f"Artifact {kind}/{key[:12]} is incomplete ({name}), ignoring")
+                return None
+
+        return StoredArtifact(key=key, kind=kind, path=obj_dir, files=manifest["files"], meta=manifest["meta"])
+
+    def put(
+        self,
+        kind: str,
+        key: str,
+        files: dict[str, str | Path] | None = None,
+        meta: dict[str, Any] | None = None,
+        refs: list[str | Path] | None = None,
+        data: dict[str, bytes] | None = None,
+    ) -> StoredArtifact:
+        """
+        Сохранить артефакт. Файлы забираются из пользовательских путей через
+        reflink/hardlink (без копирования данных, если ФС позволяет); исходные пути
+        становятся ссылками артефакта.
+
+        Args:
+            refs: Дополнительные ссылки (для артефактов без пользовательских файлов -
+                путь входа, от которого посчитан ключ)
+            data: Файлы артефакта из памяти (name -> содержимое)
+        """
+        files = files or {}
+        obj_dir = self._object_dir(key)
+        with self._lock(key):
+            existing = self._read_manifest(key)
+            refs = {str(Path(ref).resolve()) for ref in refs or []} | set(existing["refs"] if existing else [])
+
+            obj_dir.mkdir(parents=True, exist_ok=True)
+            sizes = {}
+            for name, source in files.items():
+                source = Path(source)
+                target = obj_dir / name
+                if not (existing and name in existing["files"] and target.exists()):
+                    self._link_or_copy(source, target)
+                sizes[name] = target.stat().st_size
+                refs.add(str(source.resolve()))
+            for name, content in (data or {}).items():
+                self._write_atomic(obj_dir / name, content)
+                sizes[name] = len(content)
+
+            self._write_manifest(
+                key,
+                {
+                    "key": key,
+                    "kind": kind,
+                    "files": sizes,
+                    "meta": meta or {},
+                    "refs": sorted(refs),
+                    "created_at": existing["created_at"] if existing else time.time(),
+                },
+            )
+
+        logger.info(f"Artifact stored: {kind}/{key[:12]} files={list(sizes)} refs={len(refs)}")
+        return StoredArtifact(key=key, kind=kind, path=obj_dir, files=sizes, meta=meta or {})
+
+    def materialize(self, artifact: StoredArtifact, name: str, dest: str | Path) -> Path:
+        """Выдать файл артефакта в пользовательский путь и учесть ссылку."""
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.unlink(missing_ok=True)
+        self._link_or_copy(artifact.file(name), dest)
+        self.add_ref(artifact.key, dest)
+        return dest
+
+    def add_ref(self, key: str, path: str | Path) -> None:
+        """Учесть ссылку пути на артефакт."""
+        with self._lock(key):
+            manifest = self._read_manifest(key)
+            if manifest:
+                manifest["refs"] = sorted(set(manifest["refs"]) | {str(Path(path).resolve())})
+                manifest["orphaned_at"] = None
+                self._write_manifest(key, manifest)
+
+    def gc(self) -> dict[str, int]:
+        """
+        Убрать ссылки на удаленные пользовательские файлы и артефакты, оставшиеся
+        без ссылок дольше ORPHAN_GRACE_SECONDS (reset записи удаляет файлы, а повторная
+        обработка должна успеть переиспользовать артефакт).
+
+        Ссылка жива, пока существует ее путь (для transcription - аудио файл,
+        от которого посчитан ключ).
+        """
+        now = time.time()
+        removed = 0
+        kept = 0
+        freed_bytes = 0
+        objects_dir = self.root / "objects"
+        if not objects_dir.exists():
+            return {"removed": 0, "kept": 0, "freed_bytes": 0}
+
+        for manifest_path in objects_dir.glob(f"*/*/{MANIFEST_NAME}"):
+            key = manifest_path.parent.name
+            with self._lock(key):
+                manifest = self._read_manifest(key)
+                if not manifest:
+                    continue
+                live_refs = [ref for ref in manifest["refs"] if Path(ref).exists()]
+                orphaned_at = None if live_refs else manifest.get("orphaned_at") or now
+                if live_refs != manifest["refs"] or orphaned_at != manifest.get("orphaned_at"):
+                    manifest["refs"] = live_refs
+                    manifest["orphaned_at"] = orphaned_at
+                    self._write_manifest(key, manifest)
+                if orphaned_at is None or now - orphaned_at < ORPHAN_GRACE_SECONDS:
+                    kept += 1
+                    continue
+
+                freed_bytes += sum(manifest["files"].values())
+                shutil.rmtree(manifest_path.parent, ignore_errors=True)
+                removed += 1
+            (self.root / "locks" / f"{key}.lock").unlink(missing_ok=True)
+
+        # Индекс inode: записи для удаленных файлов уже не совпадут по size/mtime,
+        # но чистим их по возрасту, чтобы директория не росла бесконечно
+        inodes_dir = self.root / "inodes"
+        if inodes_dir.exists():
+            cutoff = now - INODE_INDEX_TTL_SECONDS
+            for entry in inodes_dir.iterdir():
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        entry.unlink()
+                except FileNotFoundError:
+                    continue
+
+        logger.info(f"Artifact store gc: removed={removed} kept={kept} freed={freed_bytes / (1024 * 1024):.1f}MB")
+        return {"removed": removed, "kept": kept, "freed_bytes": freed_bytes}
+
+    # ------------------------------------------------------------------ fs helpers
+
+    @staticmethod
+    def _link_or_copy(source: Path, target: Path) -> str:
+        """reflink -> hardlink -> copy. Возвращает использованный способ."""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        tmp.unlink(missing_ok=True)
+        try:
+            with source.open("rb") as src, tmp.open("wb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            method = "reflink"
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            try:
+                os.link(source, tmp)
+                method = "hardlink"
+            except OSError:
+                shutil.copy2(source, tmp)
+                method = "copy"
+        tmp.replace(target)
+        logger.debug(f"Artifact file {method}: {source} -> {target}")
+        return method
+
+    @staticmethod
+    def _write_atomic(path: Path, content: str | bytes) -> None:
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        if isinstance(content, bytes):
+            tmp.write_bytes(content)
+        else:
+            tmp.write_text(content)
+        tmp.replace(path)
+
+
+_artifact_store: ArtifactStore | None = None
+
+
+def get_artifact_store() -> ArtifactStore | None:
+    """Глобальный store (None, если отключен в настройках)."""
+    global _artifact_store
+    if not settings.processing.artifact_store_enabled:
+        return None
+    if _artifact_store is None:
+        _artifact_store = ArtifactStore(settings.processing.artifact_store_dir)
+    return _artifact_store
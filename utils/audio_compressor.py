@@ -1,13 +1,24 @@
 """Audio compression and processing"""
 
 import asyncio
+import glob
+import math
 import os
 from pathlib import Path
 
 from logger import get_logger
+from utils.ffmpeg_runner import FFmpegCancelledError, FFmpegError, run_ffmpeg
+from utils.loudness_envelope import get_envelope_analyzer
+from utils.media_probe import get_media_probe
 
 logger = get_logger()
 
+# Параметры разбиения на части
+SPLIT_SILENCE_THRESHOLD_DB = -35.0
+SPLIT_SILENCE_MIN_DURATION = 0.4
+SPLIT_SNAP_WINDOW = 0.1  # Максимальный сдвиг точки разреза (доля длительности части)
+SPLIT_MAX_RESPLIT_DEPTH = 3
+
 
 class AudioCompressor:
     """Audio compression and file splitting"""
@@ -17,11 +28,13 @@ class AudioCompressor:
         target_bitrate: str = "64k",
         target_sample_rate: int = 16000,
         max_file_size_mb: int = 25,
+        max_concurrency: int = 2,
     ):
         self.target_bitrate = target_bitrate
         self.target_sample_rate = target_sample_rate
         self.max_file_size_mb = max_file_size_mb
         self.max_file_size_bytes = max_file_size_mb * 1024 * 1024
+        self.max_concurrency = max(1, max_concurrency)  # Одновременных процессов ffmpeg при разбиении
 
     async def compress_audio(self, input_path: str, output_path: str | None = None) -> str:
         """
@@ -78,15 +91,12 @@ class AudioCompressor:
             logger.info(f"🔧 Сжатие аудио: {input_path}")
             logger.info(f"🔧 Параметры: битрейт={self.target_bitrate}, частота={self.target_sample_rate}Hz, моно")
 
-            process = await asyncio.create_subprocess_exec(
-                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-            )
-
-            _stdout, stderr = await process.communicate()
-
-            if process.returncode != 0:
-                error_msg = stderr.decode() if stderr else "Неизвестная ошибка"
-                raise RuntimeError(f"Ошибка сжатия аудио: {error_msg}")
+            try:
+                await run_ffmpeg(cmd)
+            except FFmpegCancelledError:
+                raise
+            except FFmpegError as e:
+                raise RuntimeError(f"Ошибка сжатия аудио: {e.stderr_tail[-2000:] or e}") from e
 
             if not Path(output_path).exists():
                 raise RuntimeError(f"Сжатый файл не был создан: {output_path}")
@@ -111,30 +121,8 @@ class AudioCompressor:
 
     async def get_audio_info(self, audio_path: str) -> dict:
         """Получение информации об аудио файле"""
-        import json
-
-        cmd = [
-            "ffprobe",
-            "-v",
-            "quiet",
-            "-print_format",
-            "json",
-            "-show_format",
-            "-show_streams",
-            audio_path,
-        ]
-
         try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-            )
-
-            stdout, stderr = await process.communicate()
-
-            if process.returncode != 0:
-                raise RuntimeError(f"Ошибка получения информации об аудио: {stderr.decode()}")
-
-            info = json.loads(stdout.decode())
+            info = await get_media_probe().probe(audio_path)
             audio_stream = next((s for s in info["streams"] if s["codec_type"] == "audio"), None)
 
             if not audio_stream:
@@ -153,17 +141,30 @@ class AudioCompressor:
             logger.error(f"❌ Ошибка получения информации об аудио: {e}")
             raise
 
-    async def split_audio(self, audio_path: str, max_size_mb: float = 20.0, output_dir: str | None = None) -> list[str]:
+    async def split_audio(
+        self,
+        audio_path: str,
+        max_size_mb: float = 20.0,
+        output_dir: str | None = None,
+        snap_to_silence: bool = True,
+    ) -> list[str]:
         """
         Разбиение аудио файла на части, если он слишком большой.
 
+        Один проход ffmpeg с segment muxer (без повторного декодирования начала файла
+        для каждой части). Если исходник уже в целевом формате (mp3, target_sample_rate,
+        моно), поток копируется без перекодирования. Точки разреза сдвигаются назад к
+        ближайшей паузе, чтобы не резать слова. Часть, превысившая лимит, переразбивается
+        отдельно (input seeking + stream copy), остальные части не пересоздаются.
+
         Args:
             audio_path: Путь к аудио файлу
             max_size_mb: Максимальный размер одной части в МБ
             output_dir: Директория для сохранения частей (если None, используется та же директория)
+            snap_to_silence: Сдвигать точки разреза к паузам
 
         Returns:
-            Список путей к частям файла
+            Список путей к частям файла (в порядке воспроизведения)
         """
         if not Path(audio_path).exists():
             raise FileNotFoundError(f"Аудио файл не найден: {audio_path}")
@@ -180,56 +181,127 @@ class AudioCompressor:
             logger.info("✅ Файл не требует разбиения")
             return [audio_path]
 
-        # Вычисляем количество частей
-        # Оцениваем размер одной секунды аудио
-        size_per_second = file_size_mb / duration
-        # Вычисляем длительность одной части
-        # (без дополнительного запаса, т.к. max_size_mb уже с запасом)
-        duration_per_part = max_size_mb / size_per_second
+        # Определяем директорию для частей
+        if output_dir is None:
+            output_dir = str(Path(audio_path).parent)
+        else:
+            Path(output_dir).mkdir(parents=True, exist_ok=True)
 
-        # Вычисляем минимальное количество частей
-        num_parts = int(duration / duration_per_part)
-        if num_parts * duration_per_part < duration:
-            num_parts += 1
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        stream_copy = self._is_target_format(audio_info)
+        size_per_second = file_size_mb / duration if stream_copy else self._target_mb_per_second()
 
-        actual_duration_per_part = duration / num_parts
-        estimated_size_per_part = actual_duration_per_part * size_per_second
+        cut_points = self._plan_cut_points(duration, size_per_second, max_size_mb)
+        if snap_to_silence:
+            silences = await self._detect_silences(audio_path, semaphore)
+            cut_points = self._snap_cut_points(cut_points, silences, duration / (len(cut_points) + 1))
 
         logger.info(
-            f"🔪 Разбиение на {num_parts} частей, "
-            f"~{actual_duration_per_part:.1f}с каждая (~{estimated_size_per_part:.1f} МБ каждая)"
+            f"🔪 Разбиение на {len(cut_points) + 1} частей за один проход "
+            f"({'stream copy' if stream_copy else 'перекодирование'}), точки: "
+            + ", ".join(f"{point:.1f}s" for point in cut_points)
         )
 
-        # Определяем директорию для частей
-        if output_dir is None:
-            output_dir = Path(audio_path).parent
-        else:
-            Path(output_dir).mkdir(parents=True, exist_ok=True)
+        parts = await self._segment(audio_path, cut_points, output_dir, Path(audio_path).stem, stream_copy, semaphore)
+        try:
+            parts = await self._enforce_part_size(parts, max_size_mb, semaphore)
+        except Exception:
+            for part in parts:
+                Path(part).unlink(missing_ok=True)
+            raise
+
+        logger.info(f"✅ Аудио разбито на {len(parts)} частей")
+        return parts
+
+    def _is_target_format(self, audio_info: dict) -> bool:
+        """Исходник уже mp3 с целевыми параметрами - можно резать без перекодирования."""
+        return (
+            audio_info["codec"] == "mp3"
+            and audio_info["sample_rate"] == self.target_sample_rate
+            and audio_info["channels"] == 1
+        )
+
+    def _target_mb_per_second(self) -> float:
+        """МБ в секунду при целевом битрейте (после перекодирования)."""
+        bitrate = self.target_bitrate.lower()
+        multiplier = 1000 if bitrate.endswith("k") else 1_000_000 if bitrate.endswith("m") else 1
+        bits_per_second = float(bitrate.rstrip("km")) * multiplier
+        return bits_per_second / 8 / (1024 * 1024)
+
+    @staticmethod
+    def _plan_cut_points(duration: float, size_per_second: float, max_size_mb: float) -> list[float]:
+        """Равномерные точки разреза: минимальное число частей не больше max_size_mb."""
+        duration_per_part = max_size_mb / size_per_second
+        num_parts = max(1, math.ceil(duration / duration_per_part))
+        actual_duration_per_part = duration / num_parts
+        return [actual_duration_per_part * i for i in range(1, num_parts)]
 
-        input_path_obj = Path(audio_path)
-
-        # Асинхронная функция для создания одной части
-        async def create_part(i: int) -> str:
-            """Создание одной части аудио"""
-            start_time = i * actual_duration_per_part
-            part_duration = actual_duration_per_part
-
-            # Для последней части берем оставшееся время
-            if i == num_parts - 1:
-                part_duration = duration - start_time
-
-            part_filename = f"{input_path_obj.stem}_part_{i + 1:03d}.mp3"
-            part_path = Path(output_dir) / part_filename
-
-            cmd = [
-                "ffmpeg",
-                "-i",
-                audio_path,
-                "-ss",
-                str(start_time),
-                "-t",
-                str(part_duration),
-                "-vn",
+    @staticmethod
+    def _snap_cut_points(
+        cut_points: list[float], silences: list[tuple[float, float]], part_duration: float
+    ) -> list[float]:
+        """
+        Сдвинуть точки разреза к середине ближайшей предшествующей паузы.
+
+        Сдвиг только назад и не дальше SPLIT_SNAP_WINDOW доли длительности части. Следующая
+        часть начинается раньше и может стать длиннее номинальной (последняя - на весь сдвиг
+        последнего разреза); части сверх лимита размера разбиваются повторно.
+        """
+        window = part_duration * SPLIT_SNAP_WINDOW
+        snapped = []
+        previous = 0.0
+        for point in cut_points:
+            candidates = [(start + end) / 2 for start, end in silences if point - window <= (start + end) / 2 <= point]
+            candidate = max(candidates, default=point)
+            snapped.append(candidate if candidate > previous else point)
+            previous = snapped[-1]
+        return snapped
+
+    async def _run_ffmpeg(self, cmd: list[str], semaphore: asyncio.Semaphore) -> str:
+        """Запуск ffmpeg с ограничением параллельности. Возвращает хвост stderr."""
+        async with semaphore:
+            try:
+                result = await run_ffmpeg(cmd)
+            except FFmpegCancelledError:
+                raise
+            except FFmpegError as e:
+                raise RuntimeError(f"Ошибка ffmpeg: {e.stderr_tail[-2000:] or e}") from e
+
+        return result.stderr_tail
+
+    async def _detect_silences(self, audio_path: str, semaphore: asyncio.Semaphore) -> list[tuple[float, float]]:
+        """Паузы в аудио по огибающей громкости (один проход по аудио, повторно - из sidecar)."""
+        try:
+            async with semaphore:
+                envelope = await get_envelope_analyzer().envelope(audio_path)
+        except FFmpegCancelledError:
+            raise
+        except (FFmpegError, OSError) as e:
+            logger.warning(f"⚠️ Не удалось найти паузы, разбиение без привязки к паузам: {e}")
+            return []
+
+        return envelope.silences(SPLIT_SILENCE_THRESHOLD_DB, SPLIT_SILENCE_MIN_DURATION)
+
+    async def _segment(
+        self,
+        audio_path: str,
+        cut_points: list[float],
+        output_dir: str,
+        stem: str,
+        stream_copy: bool,
+        semaphore: asyncio.Semaphore,
+    ) -> list[str]:
+        """Разрезать файл по cut_points одним вызовом ffmpeg (segment muxer)."""
+        pattern = str(Path(output_dir) / f"{stem}_part_%03d.mp3")
+        part_glob = f"{glob.escape(stem)}_part_[0-9][0-9][0-9].mp3"
+
+        # Части от предыдущего запуска с другим числом частей попали бы в результат
+        for stale_part in Path(output_dir).glob(part_glob):
+            stale_part.unlink(missing_ok=True)
+        codec_args = (
+            ["-c:a", "copy"]
+            if stream_copy
+            else [
                 "-acodec",
                 "libmp3lame",
                 "-ab",
@@ -238,80 +310,62 @@ class AudioCompressor:
                 str(self.target_sample_rate),
                 "-ac",
                 "1",
-                "-y",
-                part_path,
             ]
+        )
+        cmd = [
+            "ffmpeg",
+            "-hide_banner",
+            "-i",
+            audio_path,
+            "-vn",
+            "-map",
+            "0:a:0",
+            *codec_args,
+            "-f",
+            "segment",
+            "-segment_times",
+            ",".join(f"{point:.3f}" for point in cut_points),
+            "-segment_start_number",
+            "1",
+            "-reset_timestamps",
+            "1",
+            "-y",
+            pattern,
+        ]
+        await self._run_ffmpeg(cmd, semaphore)
 
-            try:
-                end_time = start_time + part_duration
-                logger.info(f"🔪 Создание части {i + 1}/{num_parts}: {start_time:.1f}s - {end_time:.1f}s")
+        parts = sorted(str(path) for path in Path(output_dir).glob(part_glob))
+        if not parts:
+            raise RuntimeError(f"Части не были созданы: {pattern}")
+        return parts
 
-                process = await asyncio.create_subprocess_exec(
-                    *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-                )
+    async def _enforce_part_size(
+        self, parts: list[str], max_size_mb: float, semaphore: asyncio.Semaphore, depth: int = 0
+    ) -> list[str]:
+        """
+        Гарантия размера части: переразбить только части больше лимита.
 
-                _stdout, stderr = await process.communicate()
-
-                if process.returncode != 0:
-                    error_msg = stderr.decode() if stderr else "Неизвестная ошибка"
-                    raise RuntimeError(f"Ошибка создания части {i + 1}: {error_msg}")
-
-                if not Path(part_path).exists():
-                    raise RuntimeError(f"Часть {i + 1} не была создана: {part_path}")
-
-                part_size_mb = Path(part_path).stat().st_size / (1024 * 1024)
-
-                # Проверяем, что часть не превышает лимит
-                if part_size_mb > self.max_file_size_mb:
-                    error_msg = (
-                        f"Часть {i + 1}/{num_parts} превышает лимит: "
-                        f"{part_size_mb:.2f} МБ > {self.max_file_size_mb} МБ. "
-                        f"Попробуйте уменьшить max_size_mb в конфигурации."
-                    )
-                    logger.error(f"❌ {error_msg}")
-                    raise ValueError(error_msg)
-                if part_size_mb > self.max_file_size_mb * 0.95:
-                    logger.warning(
-                        f"⚠️ Часть {i + 1}/{num_parts} близка к лимиту: "
-                        f"{part_size_mb:.2f} МБ (лимит: {self.max_file_size_mb} МБ)"
-                    )
-
-                logger.info(f"✅ Часть {i + 1}/{num_parts} создана: {part_size_mb:.2f} МБ")
-                return part_path
-
-            except Exception as e:
-                logger.error(f"❌ Ошибка создания части {i + 1}: {e}")
-                raise
+        Части уже в целевом формате, поэтому переразбиение - stream copy одной части.
+        """
+        oversized = [part for part in parts if Path(part).stat().st_size / (1024 * 1024) > max_size_mb]
+        if not oversized:
+            return parts
+        if depth >= SPLIT_MAX_RESPLIT_DEPTH:
+            raise ValueError(
+                f"Части превышают лимит {max_size_mb} МБ после {depth} переразбиений: {', '.join(oversized)}"
+            )
 
-        # Создаем все части параллельно
-        logger.info(f"🚀 Параллельное создание {num_parts} частей...")
-        part_tasks = [create_part(i) for i in range(num_parts)]
-        part_results = await asyncio.gather(*part_tasks, return_exceptions=True)
-
-        # Проверяем результаты
-        parts = []
-        errors = []
-
-        for i, result in enumerate(part_results):
-            if isinstance(result, Exception):
-                errors.append((i + 1, result))
-            else:
-                parts.append(result)
-
-        # Если были ошибки, удаляем созданные части и выбрасываем исключение
-        if errors:
-            logger.error(f"❌ Ошибки при создании {len(errors)} частей из {num_parts}")
-            # Удаляем все созданные части
-            for part in parts:
-                try:
-                    Path(part).unlink()
-                except Exception as e:
-                    logger.warning(f"Ignored exception: {e}")
-            # Выбрасываем первую ошибку
-            raise RuntimeError(f"Ошибки при создании частей: {errors[0][1]}") from errors[0][1]
+        logger.warning(f"⚠️ {len(oversized)} частей превышают {max_size_mb} МБ, переразбиение только этих частей")
 
-        # Сортируем части по номеру (на случай, если порядок нарушен)
-        parts.sort()
+        async def resplit(part: str) -> list[str]:
+            info = await self.get_audio_info(part)
+            part_mb = Path(part).stat().st_size / (1024 * 1024)
+            cut_points = self._plan_cut_points(info["duration"], part_mb / info["duration"], max_size_mb)
+            sub_parts = await self._segment(
+                part, cut_points, str(Path(part).parent), Path(part).stem, self._is_target_format(info), semaphore
+            )
+            Path(part).unlink(missing_ok=True)
+            return await self._enforce_part_size(sub_parts, max_size_mb, semaphore, depth + 1)
 
-        logger.info(f"✅ Аудио разбито на {len(parts)} частей (параллельно)")
-        return parts
+        replaced = dict(zip(oversized, await asyncio.gather(*(resplit(part) for part in oversized)), strict=True))
+        return [sub_part for part in parts for sub_part in replaced.get(part, [part])]
@@ -1,5 +1,5 @@
 from datetime import datetime, time
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from api.zoom_api import ZoomAPI
 from logger import get_logger
@@ -7,6 +7,9 @@ from models.recording import MeetingRecording
 
 from .formatting import normalize_datetime_string
 
+if TYPE_CHECKING:
+    from api.helpers.sync_watermark import SyncWatermark
+
 logger = get_logger()
 
 
@@ -140,12 +143,21 @@ async def get_recordings_by_date_range(
     end_date: str | None = None,
     page_size: int = 30,
     filter_video_only: bool = True,
+    watermark: "SyncWatermark | None" = None,
 ) -> list[MeetingRecording]:
-    """Получение записей по диапазону дат через API."""
+    """
+    Получение записей по диапазону дат через API.
+
+    С watermark встречи, не изменившиеся с прошлой синхронизации, отбрасываются до запроса деталей;
+    встречи, детали которых не получены, отмечаются failed (следующий запуск повторит их).
+    """
     try:
         logger.info(f"Получение записей: {start_date} - {end_date or 'текущая дата'}")
         response = await api.get_recordings(page_size=page_size, from_date=start_date, to_date=end_date)
 
+        if watermark is not None:
+            response = {**response, "meetings": watermark.select_changed(response.get("meetings", []))}
+
         recordings = process_meetings_data(response, filter_video_only)
 
         enhanced_recordings = []
@@ -169,6 +181,8 @@ async def get_recordings_by_date_range(
 
             except Exception as e:
                 logger.warning(f"Failed to get details for recording {recording.meeting_id}: {e}")
+                if watermark is not None:
+                    watermark.mark_failed(str(recording.meeting_id))
                 enhanced_recordings.append(recording)
 
         logger.info(f"Processed recordings: {len(enhanced_recordings)}")
@@ -0,0 +1,315 @@
+"""Общий запуск ffmpeg: прогресс, ограниченный stderr, таймауты и отмена.
+
+Раньше каждый вызов ffmpeg держал stdout/stderr в PIPE: trim_video ждал
+process.wait() без чтения (переполнение буфера - deadlock), остальные
+буферизовали весь stderr через communicate(). run_ffmpeg:
+
+- добавляет `-progress pipe:1 -nostats` и разбирает out_time/speed/fps из stdout
+  (если stdout занят данными - on_stdout - прогресс идет через отдельный pipe)
+- читает stderr построчно, хранит только хвост (STDERR_TAIL_LINES) и строки,
+  нужные вызывающему (collect, например silence_start/silence_end)
+- завершает группу процессов по wall-clock таймауту, зависанию (нет вывода
+  stall_timeout секунд), запросу отмены (cancel_check) и отмене корутины
+
+Колбэки прогресса и проверка отмены задаются для всего стека вызовов через
+ffmpeg_hooks() (ContextVar), поэтому VideoProcessor/MediaGraph/AudioCompressor
+не знают о Celery.
+"""
+
+import asyncio
+import os
+import signal
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from config.settings import settings
+from logger import get_logger
+
+logger = get_logger()
+
+STDERR_TAIL_LINES = 200
+PROGRESS_INTERVAL_SECONDS = 2.0  # не чаще - update_state пишет в result backend
+CANCEL_POLL_SECONDS = 2.0
+TERMINATE_GRACE_SECONDS = 10.0
+STDOUT_CHUNK_SIZE = 256 * 1024
+
+
+class FFmpegError(RuntimeError):
+    """ffmpeg завершился с ошибкой."""
+
+    def __init__(self, message: str, returncode: int | None = None, stderr_tail: str = ""):
+        super().__init__(message)
+        self.returncode = returncode
+        self.stderr_tail = stderr_tail
+
+
+class FFmpegTimeoutError(FFmpegError):
+    """ffmpeg остановлен по wall-clock таймауту или зависанию."""
+
+
+class FFmpegCancelledError(FFmpegError):
+    """ffmpeg остановлен по запросу отмены задачи."""
+
+
+@dataclass
+class FFmpegProgress:
+    """Состояние из -progress"""
+
+    out_time: float = 0.0  # секунд выхода записано
+    speed: float | None = None  # x realtime
+    fps: float | None = None
+    total_size: int = 0
+    duration: float | None = None  # ожидаемая длительность выхода (для процента)
+    finished: bool = False
+
+    @property
+    def percent(self) -> float | None:
+        if not self.duration:
+            return None
+        return min(100.0, self.out_time * 100 / self.duration)
+
+
+@dataclass
+class FFmpegResult:
+    """Успешный запуск ffmpeg"""
+
+    returncode: int
+    stderr_tail: str
+    collected: list[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+@dataclass
+class FFmpegHooks:
+    """Колбэки текущей задачи для всех ffmpeg в контексте"""
+
+    on_progress: Callable[[FFmpegProgress], None] | None = None
+    cancel_check: Callable[[], bool] | None = None
+
+
+_hooks: ContextVar[FFmpegHooks | None] = ContextVar("ffmpeg_hooks", default=None)
+
+
+@contextmanager
+def ffmpeg_hooks(
+    on_progress: Callable[[FFmpegProgress], None] | None = None,
+    cancel_check: Callable[[], bool] | None = None,
+) -> Iterator[FFmpegHooks]:
+    """Прогресс и проверка отмены для всех run_ffmpeg внутри блока (в том числе в дочерних asyncio задачах)."""
+    hooks = FFmpegHooks(on_progress=on_progress, cancel_check=cancel_check)
+    token = _hooks.set(hooks)
+    try:
+        yield hooks
+    finally:
+        _hooks.reset(token)
+
+
+def _parse_time(value: str) -> float | None:
+    """out_time=HH:MM:SS.micro (out_time_us/out_time_ms в микросекундах)."""
+    try:
+        hours, minutes, seconds = value.split(":")
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except ValueError:
+        return None
+
+
+def _parse_float(value: str) -> float | None:
+    try:
+        return float(value.rstrip("x"))
+    except ValueError:
+        return None
+
+
+def _kill_group(process: asyncio.subprocess.Process, sig: int) -> None:
+    with suppress(ProcessLookupError, PermissionError):
+        os.killpg(process.pid, sig)
+
+
+async def _terminate(process: asyncio.subprocess.Process) -> None:
+    """SIGTERM группе процессов (ffmpeg дописывает трейлер), затем SIGKILL."""
+    if process.returncode is not None:
+        return
+    _kill_group(process, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(process.wait(), TERMINATE_GRACE_SECONDS)
+    except TimeoutError:
+        _kill_group(process, signal.SIGKILL)
+        await process.wait()
+
+
+async def run_ffmpeg(
+    cmd: list[str],
+    *,
+    duration: float | None = None,
+    collect: tuple[str, ...] = (),
+    timeout: float | None = None,
+    stall_timeout: float | None = None,
+    on_progress: Callable[[FFmpegProgress], None] | None = None,
+    cancel_check: Callable[[], bool] | None = None,
+    on_stdout: Callable[[bytes], None] | None = None,
+) -> FFmpegResult:
+    """
+    Запустить ffmpeg.
+
+    Args:
+        cmd: Команда (cmd[0] - бинарник ffmpeg)
+        duration: Ожидаемая длительность выхода в секундах (для процента)
+        collect: Подстроки stderr, строки с которыми сохраняются целиком
+        timeout: Wall-clock лимит (None - settings.processing.ffmpeg_timeout_seconds, 0 - без лимита)
+        stall_timeout: Лимит без вывода (None - settings.processing.ffmpeg_stall_timeout_seconds, 0 - без лимита)
+        on_progress: Колбэк прогресса (по умолчанию из ffmpeg_hooks)
+        cancel_check: Проверка запроса отмены (по умолчанию из ffmpeg_hooks)
+        on_stdout: Обработчик данных выхода `pipe:1` (прогресс тогда идет через отдельный pipe)
+
+    Raises:
+        FFmpegError: Ненулевой код возврата
+        FFmpegTimeoutError: Превышен timeout или stall_timeout
+        FFmpegCancelledError: cancel_check вернул True
+    """
+    hooks = _hooks.get()
+    if hooks is not None:
+        on_progress = on_progress or hooks.on_progress
+        cancel_check = cancel_check or hooks.cancel_check
+    processing = settings.processing
+    timeout = processing.ffmpeg_timeout_seconds if timeout is None else timeout
+    stall_timeout = processing.ffmpeg_stall_timeout_seconds if stall_timeout is None else stall_timeout
+
+    progress_read_fd = progress_write_fd = None
+    if on_stdout is not None:
+        # stdout занят данными (PCM и т.п.) - прогресс пишется в отдельный pipe
+        progress_read_fd, progress_write_fd = os.pipe()
+        progress_target = f"pipe:{progress_write_fd}"
+    else:
+        progress_target = "pipe:1"
+
+    full_cmd = [cmd[0], "-progress", progress_target, "-nostats", *cmd[1:]]
+    started = time.monotonic()
+    last_activity = started
+    stderr_tail: deque[str] = deque(maxlen=STDERR_TAIL_LINES)
+    collected: list[str] = []
+    progress = FFmpegProgress(duration=duration)
+
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *full_cmd,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,  # своя группа процессов: killpg не задевает воркер
+            pass_fds=(progress_write_fd,) if progress_write_fd is not None else (),
+        )
+    except BaseException:
+        if progress_read_fd is not None:
+            os.close(progress_read_fd)
+        raise
+    finally:
+        if progress_write_fd is not None:
+            os.close(progress_write_fd)
+
+    progress_stream = process.stdout
+    progress_transport = None
+    if progress_read_fd is not None:
+        progress_stream = asyncio.StreamReader()
+        progress_transport, _ = await asyncio.get_running_loop().connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(progress_stream), os.fdopen(progress_read_fd, "rb", buffering=0)
+        )
+
+    async def read_progress() -> None:
+        nonlocal last_activity
+        last_reported = 0.0
+        async for raw in progress_stream:
+            key, _, value = raw.decode(errors="replace").strip().partition("=")
+            if key == "out_time":
+                out_time = _parse_time(value)
+                if out_time is not None and out_time > progress.out_time:
+                    progress.out_time = out_time
+                    last_activity = time.monotonic()
+            elif key == "speed":
+                progress.speed = _parse_float(value)
+            elif key == "fps":
+                progress.fps = _parse_float(value)
+            elif key == "total_size" and value.isdigit():
+                if int(value) > progress.total_size:
+                    progress.total_size = int(value)
+                    last_activity = time.monotonic()
+            elif key == "progress":
+                progress.finished = value == "end"
+                now = time.monotonic()
+                if on_progress and (progress.finished or now - last_reported >= PROGRESS_INTERVAL_SECONDS):
+                    last_reported = now
+                    try:
+                        on_progress(progress)
+                    except Exception as e:
+                        logger.warning(f"ffmpeg progress callback failed: {e}")
+
+    async def read_stderr() -> None:
+        nonlocal last_activity
+        async for raw in process.stderr:
+            line = raw.decode(errors="replace").rstrip()
+            last_activity = time.monotonic()
+            stderr_tail.append(line)
+            if collect and any(marker in line for marker in collect):
+                collected.append(line)
+
+    async def read_stdout() -> None:
+        nonlocal last_activity
+        while data := await process.stdout.read(STDOUT_CHUNK_SIZE):
+            last_activity = time.monotonic()
+            on_stdout(data)
+
+    readers = [asyncio.create_task(read_progress()), asyncio.create_task(read_stderr())]
+    if on_stdout is not None:
+        readers.append(asyncio.create_task(read_stdout()))
+    waiter = asyncio.create_task(process.wait())
+    stop_error: FFmpegError | None = None
+    last_cancel_check = started
+
+    try:
+        while not waiter.done():
+            await asyncio.wait({waiter}, timeout=1.0)
+            if waiter.done():
+                break
+            now = time.monotonic()
+            if timeout and now - started > timeout:
+                stop_error = FFmpegTimeoutError(f"ffmpeg exceeded wall-clock timeout {timeout:.0f}s")
+            elif stall_timeout and now - last_activity > stall_timeout:
+                stop_error = FFmpegTimeoutError(f"ffmpeg stalled: no progress for {stall_timeout:.0f}s")
+            elif cancel_check and now - last_cancel_check >= CANCEL_POLL_SECONDS:
+                last_cancel_check = now
+                if cancel_check():
+                    stop_error = FFmpegCancelledError("ffmpeg cancelled by task cancellation request")
+            if stop_error is not None:
+                logger.warning(f"⏹️ Stopping ffmpeg (pid {process.pid}): {stop_error}")
+                await _terminate(process)
+                break
+        await waiter
+        await asyncio.gather(*readers)
+    except asyncio.CancelledError:
+        await asyncio.shield(_terminate(process))
+        raise
+    finally:
+        for task in (*readers, waiter):
+            if not task.done():
+                task.cancel()
+        if progress_transport is not None:
+            progress_transport.close()
+
+    tail = "\n".join(stderr_tail)
+    if stop_error is not None:
+        stop_error.returncode = process.returncode
+        stop_error.stderr_tail = tail
+        raise stop_error
+    if process.returncode != 0:
+        raise FFmpegError(
+            f"ffmpeg exited with code {process.returncode}: {tail[-2000:] or 'no stderr'}",
+            returncode=process.returncode,
+            stderr_tail=tail,
+        )
+
+    return FFmpegResult(
+        returncode=process.returncode, stderr_tail=tail, collected=collected, elapsed=time.monotonic() - started
+    )
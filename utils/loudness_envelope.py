@@ -0,0 +1,232 @@
+"""Огибающая громкости аудио (NumPy) вместо текстового silencedetect.
+
+AudioDetector и AudioCompressor запускали ffmpeg silencedetect с одним
+фиксированным порогом и разбирали stderr построчно; другой порог означал
+повторное декодирование файла. Теперь один проход ffmpeg отдает в stdout
+моно PCM низкой частоты (8 kHz s16le), NumPy считает по окнам RMS в dBFS,
+и огибающая сохраняется компактным .npy sidecar (float16, 10 значений в
+секунду: ~70 KB на час записи).
+
+По огибающей без декодирования считаются для любого порога:
+- паузы (silences) - границы звука в AudioDetector, точки разреза AudioCompressor
+- длинные перерывы (long_pauses) для извлечения тем
+- самая тихая точка в окне
+
+Тишина определяется по RMS окна, а не по каждому сэмплу, как в silencedetect:
+одиночные щелчки в паузе не разрывают ее.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from config.settings import MEDIA_ROOT
+from logger import get_logger
+from utils.ffmpeg_runner import run_ffmpeg
+
+logger = get_logger()
+
+ENVELOPE_SAMPLE_RATE = 8000
+ENVELOPE_WINDOW_SECONDS = 0.1
+ENVELOPE_FLOOR_DB = -96.0  # тишина 16-bit PCM
+ENVELOPE_VERSION = 1  # меняется при изменении параметров расчета (часть ключа sidecar)
+MEMORY_CACHE_SIZE = 16
+SIDECAR_TTL_SECONDS = 30 * 24 * 3600
+
+_WINDOW_SAMPLES = int(ENVELOPE_SAMPLE_RATE * ENVELOPE_WINDOW_SECONDS)
+_WINDOW_BYTES = _WINDOW_SAMPLES * 2
+
+
+@dataclass
+class LoudnessEnvelope:
+    """RMS громкость (dBFS) по окнам фиксированной длины"""
+
+    db: np.ndarray  # float16/float32, по значению на окно
+    window: float = ENVELOPE_WINDOW_SECONDS
+
+    @property
+    def duration(self) -> float:
+        return len(self.db) * self.window
+
+    def silences(self, threshold_db: float, min_duration: float) -> list[tuple[float, float]]:
+        """Паузы тише threshold_db длительностью не меньше min_duration: [(start, end), ...]."""
+        quiet = np.concatenate(([False], self.db < threshold_db, [False]))
+        edges = np.flatnonzero(np.diff(quiet.astype(np.int8)))
+        starts, ends = edges[0::2], edges[1::2]
+        keep = (ends - starts) * self.window >= min_duration
+        return [
+            (round(float(start) * self.window, 3), round(float(end) * self.window, 3))
+            for start, end in zip(starts[keep], ends[keep], strict=True)
+        ]
+
+    def long_pauses(self, threshold_db: float, min_gap_minutes: float) -> list[dict]:
+        """Перерывы в формате TopicExtractor: [{"start", "end", "duration_minutes"}, ...]."""
+        return [
+            {"start": start, "end": end, "duration_minutes": (end - start) / 60}
+            for start, end in self.silences(threshold_db, min_gap_minutes * 60)
+        ]
+
+    def quietest_point(self, start: float, end: float) -> float | None:
+        """Середина самого тихого окна в [start, end] (None - интервал пуст)."""
+        first = max(0, int(start / self.window))
+        last = min(len(self.db), int(np.ceil(end / self.window)))
+        if last <= first:
+            return None
+        index = first + int(np.argmin(self.db[first:last]))
+        return round((index + 0.5) * self.window, 3)
+
+
+def envelope_from_pcm(pcm: bytes | bytearray | memoryview) -> np.ndarray:
+    """dBFS по полным окнам s16le PCM (неполный хвост отбрасывается)."""
+    samples = np.frombuffer(pcm, dtype="<i2", count=len(pcm) // _WINDOW_BYTES * _WINDOW_SAMPLES)
+    windows = samples.reshape(-1, _WINDOW_SAMPLES).astype(np.float32)
+    rms = np.sqrt(np.mean(np.square(windows), axis=1)) / 32768.0
+    with np.errstate(divide="ignore"):
+        db = 20.0 * np.log10(rms)
+    return np.maximum(db, ENVELOPE_FLOOR_DB)
+
+
+class EnvelopeAnalyzer:
+    """Расчет огибающей с кешем в памяти и .npy sidecar на диске"""
+
+    def __init__(self, sidecar_dir: str | Path | None = None, memory_size: int = MEMORY_CACHE_SIZE):
+        self.sidecar_dir = Path(sidecar_dir) if sidecar_dir else None
+        self.memory_size = memory_size
+        self._memory: OrderedDict[tuple, LoudnessEnvelope] = OrderedDict()
+        self._locks: dict[tuple, asyncio.Lock] = {}
+
+    @staticmethod
+    def _key(path: str | Path) -> tuple[str, int, int, int]:
+        real_path = os.path.realpath(path)
+        stat = Path(real_path).stat()
+        return real_path, stat.st_size, stat.st_mtime_ns, ENVELOPE_VERSION
+
+    def _sidecar_path(self, key: tuple) -> Path | None:
+        if self.sidecar_dir is None:
+            return None
+        digest = hashlib.sha256(json.dumps(key).encode()).hexdigest()
+        return self.sidecar_dir / digest[:2] / f"{digest}.npy"
+
+    async def envelope(self, path: str | Path) -> LoudnessEnvelope:
+        """
+        Огибающая файла (аудио или видео с аудио дорожкой).
+
+        Raises:
+            FileNotFoundError: Файла нет
+            FFmpegError: ffmpeg не смог декодировать аудио
+        """
+        key = self._key(path)
+        cached = self._memory.get(key)
+        if cached is not None:
+            self._memory.move_to_end(key)
+            return cached
+
+        # Один расчет на файл при параллельных запросах
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                cached = self._memory.get(key)
+                if cached is None:
+                    cached = await self._load(key)
+                    self._remember(key, cached)
+        finally:
+            # И при ошибке ffmpeg/отмене: иначе lock файла остается в словаре навсегда
+            self._locks.pop(key, None)
+        return cached
+
+    async def _load(self, key: tuple) -> LoudnessEnvelope:
+        sidecar = self._sidecar_path(key)
+        if sidecar is not None:
+            try:
+                return LoudnessEnvelope(db=np.load(sidecar, allow_pickle=False))
+            except (FileNotFoundError, ValueError, OSError):
+                pass
+
+        envelope = await self._compute(key[0])
+        if sidecar is not None:
+            try:
+                sidecar.parent.mkdir(parents=True, exist_ok=True)
+                tmp = sidecar.with_name(f".{sidecar.stem}.{os.getpid()}.tmp.npy")
+                np.save(tmp, envelope.db.astype(np.float16), allow_pickle=False)
+                tmp.replace(sidecar)
+            except OSError as e:
+                logger.debug(f"Could not write envelope sidecar {sidecar}: {e}")
+        return envelope
+
+    async def _compute(self, path: str) -> LoudnessEnvelope:
+        """Один проход ffmpeg: моно 8 kHz s16le в stdout, окна считаются по мере поступления."""
+        pending = bytearray()
+        chunks: list[np.ndarray] = []
+
+        def on_stdout(data: bytes) -> None:
+            pending.extend(data)
+            usable = len(pending) // _WINDOW_BYTES * _WINDOW_BYTES
+            if usable:
+                chunks.append(envelope_from_pcm(memoryview(pending)[:usable]))
+                del pending[:usable]
+
+        cmd = [
+            "ffmpeg",
+            "-hide_banner",
+            "-i",
+            path,
+            "-map",
+            "0:a:0",
+            "-ac",
+            "1",
+            "-ar",
+            str(ENVELOPE_SAMPLE_RATE),
+            "-f",
+            "s16le",
+            "-acodec",
+            "pcm_s16le",
+            "pipe:1",
+        ]
+        started = time.monotonic()
+        await run_ffmpeg(cmd, on_stdout=on_stdout)
+
+        db = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+        logger.info(
+            f"📈 Loudness envelope: {path} ({len(db) * ENVELOPE_WINDOW_SECONDS:.0f}s "
+            f"in {time.monotonic() - started:.1f}s)"
+        )
+        return LoudnessEnvelope(db=db)
+
+    def _remember(self, key: tuple, envelope: LoudnessEnvelope) -> None:
+        self._memory[key] = envelope
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def prune_sidecars(self, max_age_seconds: int = SIDECAR_TTL_SECONDS) -> int:
+        """Удалить sidecar файлы старше max_age_seconds."""
+        if self.sidecar_dir is None or not self.sidecar_dir.exists():
+            return 0
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for sidecar in self.sidecar_dir.glob("*/*.npy"):
+            try:
+                if sidecar.stat().st_mtime < cutoff:
+                    sidecar.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+
+_envelope_analyzer: EnvelopeAnalyzer | None = None
+
+
+def get_envelope_analyzer() -> EnvelopeAnalyzer:
+    """Глобальный EnvelopeAnalyzer процесса."""
+    global _envelope_analyzer
+    if _envelope_analyzer is None:
+        _envelope_analyzer = EnvelopeAnalyzer(sidecar_dir=Path(MEDIA_ROOT) / ".envelope")
+    return _envelope_analyzer
@@ -0,0 +1,166 @@
+"""Shared ffprobe service with in-memory and on-disk cache.
+
+VideoProcessor, AudioDetector и AudioCompressor раньше запускали свой ffprobe
+на каждый вызов (process_video - по разу на сегмент). MediaProbe выполняет
+один ffprobe на (path, size, mtime), разбирает JSON один раз и хранит результат:
+
+- в памяти процесса (LRU)
+- в sidecar JSON на диске ({MEDIA_ROOT}/.probe/{key}.json), переживает перезапуск воркера
+  и переиспользуется соседними задачами
+
+Конкурентные запросы одного файла схлопываются в один subprocess.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from config.settings import MEDIA_ROOT
+from logger import get_logger
+
+logger = get_logger()
+
+MEMORY_CACHE_SIZE = 512
+SIDECAR_TTL_SECONDS = 30 * 24 * 3600
+
+
+class ProbeError(RuntimeError):
+    """ffprobe не смог разобрать файл."""
+
+
+class MediaProbe:
+    """Кеширующий async ffprobe"""
+
+    def __init__(self, sidecar_dir: str | Path | None = None, memory_size: int = MEMORY_CACHE_SIZE):
+        self.sidecar_dir = Path(sidecar_dir) if sidecar_dir else None
+        self.memory_size = memory_size
+        self._memory: OrderedDict[tuple, dict[str, Any]] = OrderedDict()
+        self._inflight: dict[tuple, asyncio.Task] = {}
+        self.spawned = 0  # количество запущенных ffprobe (для логов/отладки)
+
+    @staticmethod
+    def _key(path: str | Path) -> tuple[str, int, int]:
+        real_path = os.path.realpath(path)
+        stat = Path(real_path).stat()
+        return real_path, stat.st_size, stat.st_mtime_ns
+
+    def _sidecar_path(self, key: tuple) -> Path | None:
+        if self.sidecar_dir is None:
+            return None
+        digest = hashlib.sha256(json.dumps(key).encode()).hexdigest()
+        return self.sidecar_dir / digest[:2] / f"{digest}.json"
+
+    async def probe(self, path: str | Path) -> dict[str, Any]:
+        """
+        JSON ffprobe (-show_format -show_streams) для файла.
+
+        Raises:
+            FileNotFoundError: Файла нет
+            ProbeError: ffprobe завершился с ошибкой или вернул некорректный JSON
+        """
+        key = self._key(path)
+
+        cached = self._memory.get(key)
+        if cached is not None:
+            self._memory.move_to_end(key)
+            return cached
+
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(self._load(key))
+            self._inflight[key] = task
+        # shield: отмена одного ожидающего не отменяет ffprobe для остальных
+        return await asyncio.shield(task)
+
+    async def _load(self, key: tuple) -> dict[str, Any]:
+        try:
+            return await self._load_uncached(key)
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _load_uncached(self, key: tuple) -> dict[str, Any]:
+        sidecar = self._sidecar_path(key)
+        if sidecar is not None:
+            try:
+                info = json.loads(sidecar.read_text())
+                self._remember(key, info)
+                return info
+            except (FileNotFoundError, json.JSONDecodeError):
+                pass
+
+        info = await self._run_ffprobe(key[0])
+        self._remember(key, info)
+        if sidecar is not None:
+            try:
+                sidecar.parent.mkdir(parents=True, exist_ok=True)
+                tmp = sidecar.with_name(f".{sidecar.name}.{os.getpid()}.tmp")
+                tmp.write_text(json.dumps(info))
+                tmp.replace(sidecar)
+            except OSError as e:
+                logger.debug(f"Could not write probe sidecar {sidecar}: {e}")
+        return info
+
+    def _remember(self, key: tuple, info: dict[str, Any]) -> None:
+        self._memory[key] = info
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    async def _run_ffprobe(self, path: str) -> dict[str, Any]:
+        cmd = ["ffprobe", "-v", "error", "-print_format", "json", "-show_format", "-show_streams", path]
+        self.spawned += 1
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise ProbeError(f"FFprobe error for {path}: {stderr.decode(errors='replace')[-1000:]}")
+
+        try:
+            info = json.loads(stdout.decode())
+        except json.JSONDecodeError as e:
+            raise ProbeError(f"Could not parse ffprobe output for {path}: {e}") from e
+        info.setdefault("format", {})
+        info.setdefault("streams", [])
+        logger.debug(f"ffprobe: {path} (spawned={self.spawned})")
+        return info
+
+    async def duration(self, path: str | Path) -> float:
+        """Длительность файла в секундах."""
+        info = await self.probe(path)
+        try:
+            return float(info["format"]["duration"])
+        except (KeyError, ValueError) as e:
+            raise ProbeError(f"No duration in ffprobe output for {path}") from e
+
+    def prune_sidecars(self, max_age_seconds: int = SIDECAR_TTL_SECONDS) -> int:
+        """Удалить sidecar файлы старше max_age_seconds (файлы, которых уже нет, не пробятся снова)."""
+        if self.sidecar_dir is None or not self.sidecar_dir.exists():
+            return 0
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for sidecar in self.sidecar_dir.glob("*/*.json"):
+            try:
+                if sidecar.stat().st_mtime < cutoff:
+                    sidecar.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+
+_media_probe: MediaProbe | None = None
+
+
+def get_media_probe() -> MediaProbe:
+    """Глобальный MediaProbe процесса."""
+    global _media_probe
+    if _media_probe is None:
+        _media_probe = MediaProbe(sidecar_dir=Path(MEDIA_ROOT) / ".probe")
+    return _media_probe
@@ -7,7 +7,9 @@ import httpx
 
 from logger import get_logger
 from models import MeetingRecording, ProcessingStatus
+from utils.artifact_store import HASH_CHUNK_SIZE, ContentHasher, get_artifact_store
 from utils.formatting import normalize_datetime_string
+from video_processing_module.media_info import MediaInfo, Mp4StreamProbe
 
 logger = get_logger()
 
@@ -18,6 +20,9 @@ class ZoomDownloader:
     def __init__(self, download_dir: str = "media/video/unprocessed"):
         self.download_dir = Path(download_dir)
         self.download_dir.mkdir(parents=True, exist_ok=True)
+        # Результат последнего успешного скачивания: sha256 и media info, посчитанные на потоке
+        self.content_hash: str | None = None
+        self.media_info: MediaInfo | None = None
         logger.debug(f"Downloader initialized: {self.download_dir}")
 
     def _encode_download_url(self, url: str) -> str:
@@ -159,6 +164,15 @@ class ZoomDownloader:
                             f"File size: {total_size} bytes ({total_size / (1024 * 1024):.1f} MB), already downloaded: {downloaded} bytes ({downloaded / (1024 * 1024):.1f} MB)"
                         )
 
+                        # Checksum и разбор MP4 боксов на лету; при resume префикс с диска читается один раз
+                        hasher = ContentHasher()
+                        probe = Mp4StreamProbe()
+                        if mode == "ab":
+                            with open(filepath, "rb") as existing:
+                                while prefix := existing.read(HASH_CHUNK_SIZE):
+                                    hasher.update(prefix)
+                                    probe.feed(prefix)
+
                         # Open file in the needed mode (wb or ab)
                         with open(filepath, mode) as f:
                             chunk_count = 0
@@ -166,6 +180,8 @@ class ZoomDownloader:
 
                             async for chunk in response.aiter_bytes(chunk_size=8192):
                                 f.write(chunk)
+                                hasher.update(chunk)
+                                probe.feed(chunk)
                                 chunk_size = len(chunk)
                                 bytes_in_session += chunk_size
                                 downloaded += chunk_size
@@ -176,7 +192,7 @@ class ZoomDownloader:
                         )
 
                 # Check if the file is correct only on the last iteration or when successful download
-                if not self._validate_downloaded_file(filepath, expected_size, total_size):
+                if not self._validate_downloaded_file(filepath, probe, expected_size, total_size):
                     logger.warning(f"⚠️ Downloaded {description} is incorrect or incomplete")
                     if attempt < max_retries - 1:
                         wait_time = 3 if attempt < 2 else 5  # Fast retry for validation
@@ -190,7 +206,12 @@ class ZoomDownloader:
                         filepath.unlink()
                     return False
 
-                logger.debug(f"File successfully downloaded: description={description} | path={filepath}")
+                self.content_hash = hasher.hexdigest()
+                self.media_info = probe.media_info(size=hasher.size, content_hash=self.content_hash)
+                logger.debug(
+                    f"File successfully downloaded: description={description} | path={filepath} | "
+                    f"sha256={self.content_hash[:12]} | media_info={self.media_info.to_video_info() if self.media_info else None}"
+                )
                 return True
 
             except (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError, httpx.ReadTimeout) as e:
@@ -243,14 +264,21 @@ class ZoomDownloader:
         return False
 
     def _validate_downloaded_file(
-        self, filepath: Path, expected_size: int | None = None, total_size: int | None = None
+        self,
+        filepath: Path,
+        probe: Mp4StreamProbe,
+        expected_size: int | None = None,
+        total_size: int | None = None,
     ) -> bool:
-        """Check if the downloaded file is correct."""
+        """Check if the downloaded file is correct (by stream probe, without re-reading the file)."""
         try:
             if not filepath.exists():
                 return False
 
             file_size = filepath.stat().st_size
+            if file_size != probe.bytes_seen:
+                logger.warning(f"File size on disk differs from streamed bytes: {file_size} != {probe.bytes_seen}")
+                return False
 
             if file_size < 1024:
                 logger.warning(f"File too small: {file_size} bytes")
@@ -276,18 +304,17 @@ class ZoomDownloader:
                         f"({file_size / (1024 * 1024):.1f} > {reference_size / (1024 * 1024):.1f} MB)"
                     )
 
-            with open(filepath, "rb") as f:
-                first_chunk = f.read(1024)
-                if b"<html" in first_chunk.lower() or b"<!doctype html" in first_chunk.lower():
-                    logger.error("Downloaded file is an HTML page (possibly requires a password)")
-                    return False
+            if probe.is_html:
+                logger.error("Downloaded file is an HTML page (possibly requires a password)")
+                return False
 
-                if filepath.suffix.lower() == ".mp4":
-                    if not (
-                        first_chunk.startswith(b"\x00\x00\x00") or b"ftyp" in first_chunk or b"moov" in first_chunk
-                    ):
-                        logger.error("File is not a valid MP4 video")
-                        return False
+            if filepath.suffix.lower() == ".mp4":
+                if not probe.is_mp4 or probe.error:
+                    logger.error(f"File is not a valid MP4 video{f': {probe.error}' if probe.error else ''}")
+                    return False
+                if not probe.moov_seen:
+                    logger.error("MP4 moov atom not found (file truncated or not finalized)")
+                    return False
 
             logger.debug(
                 f"File passed validation: path={filepath} | size={file_size}bytes ({file_size / (1024 * 1024):.1f}MB)"
@@ -298,12 +325,71 @@ class ZoomDownloader:
             logger.error(f"Error during file validation {filepath}: {e}")
             return False
 
+    @staticmethod
+    def _source_alias(recording: MeetingRecording) -> str:
+        """Идентификатор файла источника (ключ алиаса в artifact store)."""
+        url = (recording.video_file_download_url or "").split("?", 1)[0]
+        return f"zoom:{recording.meeting_id}:{url}:{recording.video_file_size or 0}"
+
+    def _reuse_downloaded(self, recording: MeetingRecording, user_id: int, final_path: Path) -> bool:
+        """Выдать ранее скачанный этим пользователем файл из artifact store (без сети)."""
+        store = get_artifact_store()
+        if store is None:
+            return False
+
+        digest = store.resolve_alias(user_id, self._source_alias(recording))
+        artifact = store.lookup("download", digest) if digest else None
+        if artifact is None:
+            return False
+
+        store.materialize(artifact, "video.mp4", final_path)
+        self.content_hash = digest
+        media_info = artifact.meta.get("media_info")
+        self.media_info = MediaInfo.from_dict(media_info) if media_info else None
+        logger.info(f"♻️ Reused downloaded file from artifact store: {final_path} (sha256={digest[:12]})")
+        return True
+
+    def _store_downloaded(self, recording: MeetingRecording, user_id: int | None, final_path: Path) -> None:
+        """Положить скачанный файл в artifact store (идентичный файл заменяется ссылкой)."""
+        store = get_artifact_store()
+        if store is None:
+            return
+
+        try:
+            # sha256 уже посчитан на потоке - только индекс inode, без повторного чтения файла
+            digest = self.content_hash
+            store.remember_hash(final_path, digest)
+            artifact = store.lookup("download", digest)
+            if artifact:
+                store.materialize(artifact, "video.mp4", final_path)
+                logger.info(f"♻️ Identical file already in artifact store, linked: {final_path} (sha256={digest[:12]})")
+            else:
+                store.put(
+                    "download",
+                    digest,
+                    files={"video.mp4": final_path},
+                    meta={
+                        "size": final_path.stat().st_size,
+                        "media_info": self.media_info.to_dict() if self.media_info else None,
+                    },
+                )
+            if user_id is not None:
+                store.set_alias(user_id, self._source_alias(recording), digest)
+        except OSError as e:
+            logger.warning(f"Artifact store unavailable for {final_path}: {e}")
+
     async def download_recording(
         self,
         recording: MeetingRecording,
         force_download: bool = False,
+        user_id: int | None = None,
     ) -> bool:
-        """Download one recording (one MP4)."""
+        """
+        Download one recording (one MP4).
+
+        Если user_id передан и этот пользователь уже скачивал тот же файл источника
+        (reset записи), файл берется из artifact store без скачивания (кроме force_download).
+        """
         logger.debug(f"Starting download of recording: {recording.display_name}")
 
         if not recording.video_file_download_url:
@@ -330,6 +416,14 @@ class ZoomDownloader:
         base_filename = self._get_filename(recording)
         final_path = self.download_dir / base_filename
 
+        if not force_download and user_id is not None and self._reuse_downloaded(recording, user_id, final_path):
+            self._mark_downloaded(recording, final_path)
+            return True
+
+        # Файл, выданный из artifact store (hardlink), нельзя дописывать/перезаписывать на месте
+        if final_path.exists() and final_path.stat().st_nlink > 1:
+            final_path.unlink()
+
         fresh_download_token = None
         if recording.download_access_token:
             try:
@@ -388,13 +482,18 @@ class ZoomDownloader:
             logger.error(f"❌ Error downloading recording {recording.display_name}")
             return False
 
+        self._store_downloaded(recording, user_id, final_path)
+        self._mark_downloaded(recording, final_path)
+        return True
+
+    def _mark_downloaded(self, recording: MeetingRecording, final_path: Path) -> None:
         try:
             recording.local_video_path = str(final_path.relative_to(Path.cwd()))
         except ValueError:
             recording.local_video_path = str(final_path)
+        recording.media_info = self.media_info.to_dict() if self.media_info else None
         recording.update_status(ProcessingStatus.DOWNLOADED)
         recording.downloaded_at = datetime.now()
         logger.debug(
             f"Recording successfully downloaded: recording={recording.display_name} | recording_id={recording.db_id} | path={recording.local_video_path}"
         )
-        return True
@@ -1,10 +1,19 @@
 from .audio_detector import AudioDetector
 from .config import ProcessingConfig
+from .encode_scheduler import EncodeScheduler
+from .media_graph import MediaGraph, MediaGraphResult, MediaOutput
+from .media_info import MediaInfo, Mp4StreamProbe
 from .segments import SegmentProcessor, VideoSegment
 from .video_processor import VideoProcessor
 
 __all__ = [
     "AudioDetector",
+    "EncodeScheduler",
+    "MediaGraph",
+    "MediaGraphResult",
+    "MediaInfo",
+    "MediaOutput",
+    "Mp4StreamProbe",
     "ProcessingConfig",
     "SegmentProcessor",
     "VideoProcessor",
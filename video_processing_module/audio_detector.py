@@ -1,7 +1,12 @@
-import asyncio
-import json
+import os
+from pathlib import Path
 
 from logger import get_logger
+from utils.ffmpeg_runner import FFmpegCancelledError, FFmpegError
+from utils.loudness_envelope import get_envelope_analyzer
+from utils.media_probe import ProbeError, get_media_probe
+
+from .media_info import MediaInfo
 
 logger = get_logger()
 
@@ -12,6 +17,14 @@ class AudioDetector:
     def __init__(self, silence_threshold: float = -30.0, min_silence_duration: float = 2.0):
         self.silence_threshold = silence_threshold
         self.min_silence_duration = min_silence_duration
+        self.known_media: dict[str, MediaInfo] = {}
+
+    def known_media_info(self, video_path: str) -> MediaInfo | None:
+        """Media info, полученный при скачивании (если файл не изменился)."""
+        media_info = self.known_media.get(os.path.realpath(video_path))
+        if media_info and Path(video_path).stat().st_size == media_info.size:
+            return media_info
+        return None
 
     async def detect_audio_boundaries(self, video_path: str) -> tuple[float | None, float | None]:
         """Determine audio boundaries in video."""
@@ -22,25 +35,12 @@ class AudioDetector:
                 logger.error(f"Video file corrupted or inaccessible: {video_path}")
                 return None, None
 
-            cmd = [
-                "ffmpeg",
-                "-i",
-                video_path,
-                "-af",
-                f"silencedetect=noise={self.silence_threshold}dB:d={self.min_silence_duration}",
-                "-f",
-                "null",
-                "-",
-            ]
-
-            process = await asyncio.create_subprocess_exec(
-                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-            )
-
-            _stdout, stderr = await process.communicate()
-
-            if process.returncode != 0:
-                error_msg = stderr.decode()
+            try:
+                envelope = await get_envelope_analyzer().envelope(video_path)
+            except FFmpegCancelledError:
+                raise
+            except FFmpegError as e:
+                error_msg = e.stderr_tail or str(e)
                 logger.error(f"Error detecting audio: {error_msg}")
 
                 # Check specific FFmpeg errors
@@ -53,7 +53,8 @@ class AudioDetector:
 
                 return None, None
 
-            silence_periods = self._parse_silence_detection(stderr.decode())
+            # Порог применяется к готовой огибающей: другой порог не требует повторного декодирования
+            silence_periods = envelope.silences(self.silence_threshold, self.min_silence_duration)
 
             if not silence_periods:
                 logger.info("Sound detected throughout the video")
@@ -65,30 +66,12 @@ class AudioDetector:
             logger.info(f"🎵 Audio boundaries: {first_sound:.1f}s - {last_sound:.1f}s")
             return first_sound, last_sound
 
+        except FFmpegCancelledError:
+            raise
         except Exception as e:
             logger.error(f"Error detecting audio: {e}")
             return None, None
 
-    def _parse_silence_detection(self, ffmpeg_output: str) -> list[tuple[float, float]]:
-        """Parsing ffmpeg output to extract silence periods."""
-        silence_periods = []
-        lines = ffmpeg_output.split("\n")
-
-        for line in lines:
-            if "silence_start" in line:
-                try:
-                    start_time = float(line.split("silence_start: ")[1].split()[0])
-                except (IndexError, ValueError):
-                    continue
-            elif "silence_end" in line:
-                try:
-                    end_time = float(line.split("silence_end: ")[1].split()[0])
-                    silence_periods.append((start_time, end_time))
-                except (IndexError, ValueError, NameError):
-                    continue
-
-        return silence_periods
-
     def _find_first_sound(self, silence_periods: list[tuple[float, float]]) -> float:
         """Finding the time of the first sound."""
         if not silence_periods:
@@ -115,19 +98,12 @@ class AudioDetector:
 
     async def _get_video_duration(self, video_path: str) -> float | None:
         """Getting video duration."""
-        try:
-            cmd = ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_format", video_path]
-
-            process = await asyncio.create_subprocess_exec(
-                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-            )
-
-            stdout, _stderr = await process.communicate()
-
-            if process.returncode == 0:
-                data = json.loads(stdout.decode())
-                return float(data["format"]["duration"])
+        media_info = self.known_media_info(video_path)
+        if media_info and media_info.duration:
+            return media_info.duration
 
+        try:
+            return await get_media_probe().duration(video_path)
         except Exception as e:
             logger.error(f"Error getting video duration: {e}")
 
@@ -138,8 +114,6 @@ class AudioDetector:
         Validate video file before processing.
         """
         try:
-            import os
-
             # Check if file exists
             if not os.path.exists(video_path):
                 logger.error(f"File does not exist: {video_path}")
@@ -151,6 +125,10 @@ class AudioDetector:
                 logger.error(f"File too small: {file_size} bytes")
                 return False
 
+            # Файл проверен при скачивании (HTML, MP4 боксы, moov) - ffprobe не нужен
+            if self.known_media_info(video_path):
+                return True
+
             # Check if file is HTML
             with open(video_path, "rb") as f:
                 first_chunk = f.read(1024)
@@ -158,28 +136,18 @@ class AudioDetector:
                     logger.error("File is an HTML page, not a video")
                     return False
 
-            cmd = ["ffprobe", "-v", "error", "-show_entries", "format=format_name", "-of", "json", video_path]
-
-            process = await asyncio.create_subprocess_exec(
-                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-            )
-
-            stdout, stderr = await process.communicate()
-
-            if process.returncode != 0:
-                logger.error(f"ffprobe could not process file: {stderr.decode()}")
+            try:
+                info = await get_media_probe().probe(video_path)
+            except ProbeError as e:
+                logger.error(f"ffprobe could not process file: {e}")
                 return False
 
             # Check if ffprobe recognized the format
-            try:
-                data = json.loads(stdout.decode())
-                if "format" not in data or "format_name" not in data["format"]:
-                    logger.error("File not recognized as video")
-                    return False
-                logger.info(f"Video format: {data['format']['format_name']}")
-            except json.JSONDecodeError:
-                logger.error("Could not parse ffprobe output")
+            format_name = info["format"].get("format_name")
+            if not format_name:
+                logger.error("File not recognized as video")
                 return False
+            logger.info(f"Video format: {format_name}")
 
             return True
 
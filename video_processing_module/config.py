@@ -49,6 +49,10 @@ class ProcessingConfig(BaseSettings):
         ge=0,
         description="FPS (0 = не изменять)",
     )
+    encode_preset: str = Field(
+        default_factory=lambda: settings.processing.encode_preset,
+        description="Пресет кодирования (encode_presets.ENCODE_PRESETS, auto; пусто = поля выше)",
+    )
 
     # Audio trimming
     audio_detection: bool = Field(
@@ -155,6 +159,12 @@ class ProcessingConfig(BaseSettings):
                 f"segment_duration ({self.segment_duration})"
             )
 
+        if self.encode_preset:
+            from .encode_presets import AUTO_PRESET, get_encode_preset
+
+            if self.encode_preset != AUTO_PRESET:
+                get_encode_preset(self.encode_preset)
+
         # Check trim_end > trim_start
         if self.trim_start is not None and self.trim_end is not None:
             if self.trim_end <= self.trim_start:
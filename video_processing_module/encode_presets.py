@@ -0,0 +1,231 @@
+"""Пресеты кодирования под контент лекций.
+
+Раньше в ffmpeg шли сырые video_codec/video_bitrate/fps/resolution из
+ProcessingConfig. Записи лекций - в основном демонстрация экрана: кадры
+почти статичны, поэтому -tune stillimage, длинный GOP и пониженный fps дают
+заметный выигрыш в размере и скорости кодирования без видимой потери качества.
+
+Пресет выбирается через ProcessingConfig.encode_preset:
+
+- "" (по умолчанию) - сырые поля ProcessingConfig, как раньше
+- имя из ENCODE_PRESETS - фиксированный пресет
+- "auto" - по контенту: detect_content() сэмплирует scene change в нескольких
+  окнах исходника (static -> fast-lecture, dynamic -> lecture-camera)
+
+Скорость/размер/VMAF пресетов меряет scripts/bench_encode_presets.py.
+"""
+
+import re
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from logger import get_logger
+from utils.ffmpeg_runner import FFmpegCancelledError, FFmpegError, run_ffmpeg
+
+from .config import ProcessingConfig
+
+logger = get_logger()
+
+AUTO_PRESET = "auto"
+
+# Детекция контента: окна сэмплирования и порог scene change
+CONTENT_SAMPLE_POSITIONS = (0.2, 0.5, 0.8)  # доли длительности
+CONTENT_SAMPLE_SECONDS = 30.0
+CONTENT_SAMPLE_FPS = 2
+SCENE_THRESHOLD = 0.08
+STATIC_SCENE_CHANGES_PER_MINUTE = 6.0  # ниже - статичный контент (слайды, экран)
+
+_SHOWINFO_PTS = re.compile(r"pts_time:\s*(-?[\d.]+)")
+
+
+@dataclass(frozen=True)
+class EncodePreset:
+    """Параметры кодирования видео выхода"""
+
+    name: str
+    description: str
+    video_codec: str = "libx264"
+    audio_codec: str = "aac"
+    crf: int | None = None
+    video_bitrate: str | None = None
+    speed: str | None = None  # -preset x264/x265
+    tune: str | None = None
+    fps: int = 0  # 0 = не изменять
+    gop_seconds: float | None = None  # keyframe interval
+    max_height: int | None = None  # уменьшать только если выше
+    audio_bitrate: str | None = None
+    audio_channels: int | None = None
+
+    @property
+    def stream_copy(self) -> bool:
+        return self.video_codec == "copy"
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    def output_args(self, source_fps: float | None = None, threads: int | None = None) -> list[str]:
+        """Аргументы ffmpeg для видео выхода (после -map, перед путем)."""
+        args = ["-c:v", self.video_codec, "-c:a", self.audio_codec]
+        if not self.stream_copy:
+            if self.speed:
+                args.extend(["-preset", self.speed])
+            if self.tune:
+                args.extend(["-tune", self.tune])
+            if self.crf is not None:
+                args.extend(["-crf", str(self.crf)])
+            if self.video_bitrate:
+                args.extend(["-b:v", self.video_bitrate])
+
+            fps = source_fps
+            if self.fps and (not source_fps or self.fps < source_fps):  # fps только понижается
+                args.extend(["-r", str(self.fps)])
+                fps = self.fps
+            if self.gop_seconds and fps:
+                gop = max(1, round(fps * self.gop_seconds))
+                args.extend(["-g", str(gop), "-keyint_min", str(min(gop, round(fps)))])
+            if self.max_height:
+                args.extend(["-vf", f"scale=-2:'min({self.max_height},ih)'"])
+            if threads:
+                args.extend(["-threads", str(threads)])
+            args.extend(["-pix_fmt", "yuv420p", "-movflags", "+faststart"])
+
+        if self.audio_codec != "copy":
+            if self.audio_bitrate:
+                args.extend(["-b:a", self.audio_bitrate])
+            if self.audio_channels:
+                args.extend(["-ac", str(self.audio_channels)])
+        return args
+
+
+ENCODE_PRESETS: dict[str, EncodePreset] = {
+    "copy": EncodePreset(
+        name="copy",
+        description="Без перекодирования: только обрезка (быстро, размер как у исходника)",
+        video_codec="copy",
+        audio_codec="copy",
+    ),
+    "fast-lecture": EncodePreset(
+        name="fast-lecture",
+        description="Демонстрация экрана: stillimage, 15 fps, GOP 10с, до 1080p",
+        speed="veryfast",
+        tune="stillimage",
+        crf=28,
+        fps=15,
+        gop_seconds=10.0,
+        max_height=1080,
+        audio_bitrate="96k",
+    ),
+    "archive-small": EncodePreset(
+        name="archive-small",
+        description="Архив минимального размера: stillimage, 10 fps, GOP 20с, до 720p, моно",
+        speed="slow",
+        tune="stillimage",
+        crf=32,
+        fps=10,
+        gop_seconds=20.0,
+        max_height=720,
+        audio_bitrate="64k",
+        audio_channels=1,
+    ),
+    "lecture-camera": EncodePreset(
+        name="lecture-camera",
+        description="Камера/динамичный контент: исходный fps, GOP 4с, до 1080p",
+        speed="veryfast",
+        crf=26,
+        gop_seconds=4.0,
+        max_height=1080,
+        audio_bitrate="128k",
+    ),
+}
+
+# Пресет для "auto" по типу контента
+AUTO_PRESETS = {"static": "fast-lecture", "dynamic": "lecture-camera"}
+
+
+def get_encode_preset(name: str) -> EncodePreset:
+    """Пресет по имени."""
+    try:
+        return ENCODE_PRESETS[name]
+    except KeyError:
+        available = ", ".join([*ENCODE_PRESETS, AUTO_PRESET])
+        raise ValueError(f"Unknown encode preset '{name}'. Available: {available}") from None
+
+
+def legacy_output_args(config: ProcessingConfig, threads: int | None = None) -> list[str]:
+    """Аргументы из сырых полей ProcessingConfig (encode_preset не задан)."""
+    args = ["-c:v", config.video_codec, "-c:a", config.audio_codec]
+    if config.video_bitrate != "original":
+        args.extend(["-b:v", config.video_bitrate])
+    if config.audio_bitrate != "original":
+        args.extend(["-b:a", config.audio_bitrate])
+    if config.video_codec != "copy" and config.fps > 0:
+        args.extend(["-r", str(config.fps)])
+    if config.resolution != "original":
+        args.extend(["-s", config.resolution])
+    if threads and config.video_codec != "copy":
+        args.extend(["-threads", str(threads)])
+    return args
+
+
+@dataclass
+class ContentProfile:
+    """Результат сэмплирования scene change"""
+
+    kind: str  # static | dynamic
+    scene_changes_per_minute: float
+    sampled_seconds: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+async def detect_content(video_path: str, duration: float) -> ContentProfile | None:
+    """
+    Оценить динамичность видео по scene change в нескольких окнах.
+
+    Декодируются только окна CONTENT_SAMPLE_SECONDS (input seeking), кадры
+    прореживаются до CONTENT_SAMPLE_FPS и уменьшаются, поэтому проверка
+    стоит секунды даже для многочасовых записей.
+
+    Returns:
+        ContentProfile или None, если видео потока нет или ffmpeg упал
+    """
+    if duration <= 0:
+        return None
+
+    window = min(CONTENT_SAMPLE_SECONDS, duration)
+    starts = sorted({max(0.0, min(duration - window, duration * pos - window / 2)) for pos in CONTENT_SAMPLE_POSITIONS})
+
+    changes = 0
+    for start in starts:
+        cmd = [
+            "ffmpeg",
+            "-hide_banner",
+            "-ss",
+            f"{start:.3f}",
+            "-t",
+            f"{window:.3f}",
+            "-i",
+            video_path,
+            "-map",
+            "0:v:0",
+            "-vf",
+            f"fps={CONTENT_SAMPLE_FPS},scale=320:-2,select='gt(scene,{SCENE_THRESHOLD})',showinfo",
+            "-f",
+            "null",
+            "-",
+        ]
+        try:
+            result = await run_ffmpeg(cmd, duration=window, collect=("pts_time:",))
+        except FFmpegCancelledError:
+            raise
+        except FFmpegError as e:
+            logger.warning(f"⚠️ Content detection failed for {video_path}: {e}")
+            return None
+        changes += sum(1 for line in result.collected if _SHOWINFO_PTS.search(line))
+
+    sampled = window * len(starts)
+    per_minute = changes * 60 / sampled
+    kind = "static" if per_minute < STATIC_SCENE_CHANGES_PER_MINUTE else "dynamic"
+    logger.info(f"🎞️ Content: {kind} ({per_minute:.1f} scene changes/min over {sampled:.0f}s)")
+    return ContentProfile(kind=kind, scene_changes_per_minute=round(per_minute, 2), sampled_seconds=sampled)
@@ -0,0 +1,191 @@
+"""CPU-aware планировщик параллельных ffmpeg задач.
+
+VideoProcessor.process_video и batch_process кодировали сегменты строго по
+одному, и многоядерный воркер простаивал. EncodeScheduler запускает несколько
+ffmpeg одновременно:
+
+- бюджет CPU: cgroup квота (v2 cpu.max / v1 cfs_quota_us), иначе affinity / cpu_count
+- число слотов = CPU // threads одной задачи (-threads), с ограничением max_jobs
+- новый слот не выдается, пока load average на CPU выше порога или свободного
+  места на диске меньше минимума (одна задача выполняется всегда, чтобы не зависнуть)
+"""
+
+import asyncio
+import math
+import os
+import shutil
+from collections.abc import Awaitable, Callable
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import TypeVar
+
+from config.settings import settings
+from logger import get_logger
+
+from .config import ProcessingConfig
+from .encode_presets import AUTO_PRESET, get_encode_preset
+
+logger = get_logger()
+
+T = TypeVar("T")
+
+CGROUP_V2_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+CGROUP_V1_QUOTA = "/sys/fs/cgroup/cpu/cpu.cfs_quota_us"
+CGROUP_V1_PERIOD = "/sys/fs/cgroup/cpu/cpu.cfs_period_us"
+
+AUTO_THREADS_PER_JOB = 4  # x264/x265 хорошо масштабируются до ~4 потоков на задачу
+POLL_INTERVAL_SECONDS = 2.0
+
+
+def _cgroup_cpu_limit() -> float | None:
+    """Лимит CPU из cgroup квоты (None - квоты нет)."""
+    try:
+        quota, period = Path(CGROUP_V2_CPU_MAX).read_text().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+
+    try:
+        quota = int(Path(CGROUP_V1_QUOTA).read_text())
+        period = int(Path(CGROUP_V1_PERIOD).read_text())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def available_cpus() -> int:
+    """Количество CPU, доступных процессу (affinity и cgroup квота)."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpus = os.cpu_count() or 1
+
+    limit = _cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, max(1, math.floor(limit)))
+    return max(1, cpus)
+
+
+class EncodeScheduler:
+    """Пул слотов для ffmpeg задач с учетом CPU, load average и свободного места."""
+
+    def __init__(
+        self,
+        threads_per_job: int = 0,
+        max_jobs: int = 0,
+        load_threshold: float | None = None,
+        min_free_disk_mb: int | None = None,
+        disk_path: str | Path | None = None,
+        stream_copy: bool = False,
+    ):
+        self.cpus = available_cpus()
+        if stream_copy:
+            # copy упирается в диск, а не в CPU: один поток на задачу
+            self.threads_per_job = 1
+        else:
+            self.threads_per_job = threads_per_job or min(AUTO_THREADS_PER_JOB, self.cpus)
+
+        slots = max(1, self.cpus // self.threads_per_job)
+        self.max_jobs = min(slots, max_jobs) if max_jobs > 0 else slots
+
+        processing = settings.processing
+        self.load_threshold = processing.encode_load_threshold if load_threshold is None else load_threshold
+        min_free_disk_mb = processing.encode_min_free_disk_mb if min_free_disk_mb is None else min_free_disk_mb
+        self.min_free_disk_bytes = min_free_disk_mb * 1024 * 1024
+        self.disk_path = Path(disk_path) if disk_path else None
+
+        self._running = 0
+        self._condition: asyncio.Condition | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @classmethod
+    def from_config(cls, config: ProcessingConfig) -> "EncodeScheduler":
+        """Планировщик для ProcessingConfig (кодеки, выходная директория) и settings.processing."""
+        if config.encode_preset and config.encode_preset != AUTO_PRESET:
+            stream_copy = get_encode_preset(config.encode_preset).stream_copy
+        else:
+            stream_copy = not config.encode_preset and config.video_codec == "copy"
+
+        processing = settings.processing
+        return cls(
+            threads_per_job=processing.encode_threads,
+            max_jobs=processing.max_parallel_encodes,
+            disk_path=config.output_dir,
+            stream_copy=stream_copy,
+        )
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    def _get_condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self._running = 0
+        return self._condition
+
+    def throttle_reason(self) -> str | None:
+        """Причина не выдавать новый слот (None - можно запускать)."""
+        try:
+            load_per_cpu = os.getloadavg()[0] / self.cpus
+            if self.load_threshold > 0 and load_per_cpu > self.load_threshold:
+                return f"load average {load_per_cpu:.2f}/CPU > {self.load_threshold}"
+        except OSError:
+            pass
+
+        if self.disk_path is not None and self.min_free_disk_bytes > 0:
+            try:
+                free = shutil.disk_usage(self.disk_path).free
+                if free < self.min_free_disk_bytes:
+                    return f"free disk {free / 1024 / 1024:.0f} MB < {self.min_free_disk_bytes / 1024 / 1024:.0f} MB"
+            except OSError:
+                pass
+        return None
+
+    @asynccontextmanager
+    async def slot(self):
+        """Занять слот на время одной ffmpeg задачи."""
+        condition = self._get_condition()
+        throttled_logged = False
+        async with condition:
+            while True:
+                if self._running < self.max_jobs:
+                    reason = self.throttle_reason() if self._running else None
+                    if reason is None:
+                        break
+                    if not throttled_logged:
+                        logger.info(f"⏸️ Encode throttled ({self._running} running): {reason}")
+                        throttled_logged = True
+                try:
+                    # Загрузка и диск меняются без уведомлений - перепроверяем периодически
+                    await asyncio.wait_for(condition.wait(), POLL_INTERVAL_SECONDS)
+                except TimeoutError:
+                    pass
+            self._running += 1
+
+        try:
+            yield
+        finally:
+            async with condition:
+                self._running -= 1
+                condition.notify()
+
+    async def run(self, jobs: list[Callable[[], Awaitable[T]]]) -> list[T | BaseException]:
+        """
+        Выполнить задачи через пул слотов.
+
+        Результаты возвращаются в порядке jobs; исключение задачи возвращается
+        на ее месте и не прерывает остальные.
+        """
+
+        async def run_job(job: Callable[[], Awaitable[T]]) -> T:
+            async with self.slot():
+                return await job()
+
+        return await asyncio.gather(*(run_job(job) for job in jobs), return_exceptions=True)
@@ -0,0 +1,262 @@
+"""Single-decode media graph: trimmed video + speech audio in one FFmpeg run.
+
+Раньше обработка записи декодировала исходник несколько раз:
+trim_video (decode + encode видео), затем отдельный ffmpeg по обработанному MP4
+для извлечения аудио (64k, 16kHz, mono), и при транскрибации видео файла еще раз.
+
+MediaGraph декодирует исходник один раз (input seeking по границам обрезки) и
+пишет несколько выходов одного вызова ffmpeg:
+
+    [0:v] [0:a] ─────────────────────────────► trimmed video (video_codec/audio_codec)
+    [0:a] ─ asplit ─ aresample 16k, mono ────► speech audio (libmp3lame 64k)
+                   ├ ebur128 ─ anullsink ────► loudness stats (stderr)
+                   └ showwavespic ───────────► waveform PNG
+
+Декодер каждого входного потока в ffmpeg один; кадры раздаются всем потребителям.
+"""
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from logger import get_logger
+from utils.ffmpeg_runner import FFmpegCancelledError, FFmpegError, run_ffmpeg
+
+from .config import ProcessingConfig
+from .encode_presets import EncodePreset, legacy_output_args
+
+logger = get_logger()
+
+SPEECH_SAMPLE_RATE = 16000
+SPEECH_CHANNELS = 1
+SPEECH_CODEC = "libmp3lame"
+SPEECH_BITRATE = "64k"
+WAVEFORM_SIZE = "1920x240"
+
+_LOUDNESS_PATTERNS = {
+    "integrated_lufs": re.compile(r"Integrated loudness:\s*\n\s*I:\s*(-?[\d.]+|-inf) LUFS"),
+    "loudness_range_lu": re.compile(r"Loudness range:\s*\n\s*LRA:\s*(-?[\d.]+) LU"),
+    "true_peak_dbfs": re.compile(r"True peak:\s*\n\s*Peak:\s*(-?[\d.]+|-inf) dBFS"),
+}
+
+
+@dataclass
+class MediaOutput:
+    """Выход media graph с фактическим размером и битрейтом"""
+
+    kind: str  # video | speech | waveform
+    path: str
+    size_bytes: int = 0
+    bitrate_kbps: float | None = None  # None для не-потоковых выходов (waveform)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "path": self.path,
+            "size_bytes": self.size_bytes,
+            "bitrate_kbps": self.bitrate_kbps,
+        }
+
+
+@dataclass
+class MediaGraphResult:
+    """Результат одного прохода media graph"""
+
+    success: bool
+    duration: float = 0.0
+    outputs: dict[str, MediaOutput] = field(default_factory=dict)
+    loudness: dict[str, float | None] | None = None
+    error: str | None = None
+
+    def path(self, kind: str) -> str | None:
+        output = self.outputs.get(kind)
+        return output.path if output else None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "success": self.success,
+            "duration": self.duration,
+            "outputs": {kind: output.to_dict() for kind, output in self.outputs.items()},
+            "loudness": self.loudness,
+            "error": self.error,
+        }
+
+
+class MediaGraph:
+    """Построение и запуск single-decode FFmpeg графа"""
+
+    def __init__(self, config: ProcessingConfig):
+        self.config = config
+
+    def build_command(
+        self,
+        input_path: str,
+        start_time: float,
+        end_time: float,
+        video_output: str | None,
+        speech_output: str | None,
+        *,
+        waveform_output: str | None = None,
+        loudness: bool = False,
+        preset: EncodePreset | None = None,
+        source_fps: float | None = None,
+    ) -> list[str]:
+        """
+        Собрать команду ffmpeg.
+
+        Args:
+            input_path: Исходный файл
+            start_time: Начало обрезки (сек)
+            end_time: Конец обрезки (сек)
+            video_output: Путь для обрезанного видео (None - не писать видео)
+            speech_output: Путь для речевой дорожки 16kHz mono (None - не писать)
+            waveform_output: Путь для PNG waveform (None - не строить)
+            loudness: Посчитать EBU R128 loudness (результат в stderr)
+            preset: Пресет кодирования видео (None - сырые поля ProcessingConfig)
+            source_fps: FPS исходника (GOP пресета в секундах)
+        """
+        duration = end_time - start_time
+        # Input seeking: декодируется только обрезанный фрагмент
+        cmd = ["ffmpeg", "-hide_banner"]
+        cmd.extend(["-ss", f"{start_time:.3f}", "-t", f"{duration:.3f}", "-i", input_path])
+
+        branches = []
+        if speech_output:
+            branches.append(("speech", f"aresample={SPEECH_SAMPLE_RATE},aformat=sample_fmts=s16p:channel_layouts=mono"))
+        if loudness:
+            branches.append(("loudness", "ebur128=peak=true,anullsink"))
+        if waveform_output:
+            branches.append(("waveform", f"showwavespic=s={WAVEFORM_SIZE}:split_channels=0"))
+
+        if branches:
+            graph = []
+            if len(branches) > 1:
+                graph.append(f"[0:a]asplit={len(branches)}" + "".join(f"[a_{name}]" for name, _ in branches))
+            for name, chain in branches:
+                source = f"[a_{name}]" if len(branches) > 1 else "[0:a]"
+                sink = "" if name == "loudness" else f"[{name}]"
+                graph.append(f"{source}{chain}{sink}")
+            cmd.extend(["-filter_complex", ";".join(graph)])
+
+        if video_output:
+            cmd.extend(["-map", "0:v?", "-map", "0:a?"])
+            if preset is not None:
+                cmd.extend(preset.output_args(source_fps=source_fps))
+            else:
+                cmd.extend(legacy_output_args(self.config))
+            cmd.extend(["-y", video_output])
+
+        if speech_output:
+            cmd.extend(
+                [
+                    "-map",
+                    "[speech]",
+                    "-c:a",
+                    SPEECH_CODEC,
+                    "-b:a",
+                    SPEECH_BITRATE,
+                    "-ar",
+                    str(SPEECH_SAMPLE_RATE),
+                    "-ac",
+                    str(SPEECH_CHANNELS),
+                    "-y",
+                    speech_output,
+                ]
+            )
+
+        if waveform_output:
+            cmd.extend(["-map", "[waveform]", "-frames:v", "1", "-y", waveform_output])
+
+        return cmd
+
+    async def run(
+        self,
+        input_path: str,
+        start_time: float,
+        end_time: float,
+        video_output: str | None,
+        speech_output: str | None,
+        *,
+        waveform_output: str | None = None,
+        loudness: bool = False,
+        preset: EncodePreset | None = None,
+        source_fps: float | None = None,
+    ) -> MediaGraphResult:
+        """
+        Выполнить граф и собрать размеры/битрейты выходов.
+
+        loudness считается только вместе с хотя бы одним файловым выходом.
+
+        Returns:
+            MediaGraphResult (success=False и error при ошибке ffmpeg)
+        """
+        if not (video_output or speech_output or waveform_output):
+            raise ValueError("Media graph has no outputs")
+
+        for output in (video_output, speech_output, waveform_output):
+            if output:
+                Path(output).parent.mkdir(parents=True, exist_ok=True)
+                # ffmpeg -y перезаписывает файл на месте; выход может быть hardlink на artifact store
+                Path(output).unlink(missing_ok=True)
+
+        cmd = self.build_command(
+            str(input_path),
+            start_time,
+            end_time,
+            video_output,
+            speech_output,
+            waveform_output=waveform_output,
+            loudness=loudness,
+            preset=preset,
+            source_fps=source_fps,
+        )
+        logger.info(f"🔧 Команда FFmpeg (media graph): {' '.join(cmd)}")
+
+        try:
+            ffmpeg_result = await run_ffmpeg(cmd, duration=end_time - start_time)
+        except FFmpegCancelledError:
+            raise
+        except FFmpegError as e:
+            logger.error(f"❌ FFmpeg failed: {e}")
+            return MediaGraphResult(success=False, error=str(e)[-2000:])
+        except Exception as e:
+            logger.error(f"❌ Exception during media graph run: {e}")
+            return MediaGraphResult(success=False, error=str(e))
+
+        duration = end_time - start_time
+        result = MediaGraphResult(success=True, duration=duration)
+        for kind, output in (("video", video_output), ("speech", speech_output), ("waveform", waveform_output)):
+            if not output:
+                continue
+            path = Path(output)
+            if not path.exists():
+                logger.error(f"❌ File not created: {output}")
+                return MediaGraphResult(success=False, duration=duration, error=f"Output not created: {output}")
+            size = path.stat().st_size
+            bitrate = round(size * 8 / duration / 1000, 1) if kind != "waveform" and duration > 0 else None
+            result.outputs[kind] = MediaOutput(kind=kind, path=str(path), size_bytes=size, bitrate_kbps=bitrate)
+
+        if loudness:
+            # Сводка ebur128 печатается в конце - она в хвосте stderr
+            result.loudness = self.parse_loudness(ffmpeg_result.stderr_tail)
+
+        for output in result.outputs.values():
+            logger.info(
+                f"✅ {output.kind}: {output.path} ({output.size_bytes} bytes"
+                + (f", {output.bitrate_kbps} kbps)" if output.bitrate_kbps is not None else ")")
+            )
+        return result
+
+    @staticmethod
+    def parse_loudness(ffmpeg_output: str) -> dict[str, float | None]:
+        """Разобрать итоговую сводку ebur128 из stderr ffmpeg."""
+        summary_start = ffmpeg_output.rfind("Summary:")
+        summary = ffmpeg_output[summary_start:] if summary_start != -1 else ffmpeg_output
+
+        stats: dict[str, float | None] = {}
+        for name, pattern in _LOUDNESS_PATTERNS.items():
+            match = pattern.search(summary)
+            value = match.group(1) if match else None
+            stats[name] = float(value) if value and value != "-inf" else None
+        return stats
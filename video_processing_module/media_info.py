@@ -0,0 +1,280 @@
+"""Media info из потока байтов MP4 (без ffprobe).
+
+ZoomDownloader прогоняет скачиваемые чанки через Mp4StreamProbe: парсер
+top-level боксов ISO BMFF запоминает ftyp, буферизует только moov (метаданные,
+обычно сотни KB) и пропускает payload mdat. По moov строится MediaInfo
+(длительность, потоки, кодеки, битрейт), который сохраняется в
+recordings.media_info и используется последующими стадиями вместо ffprobe.
+"""
+
+import struct
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+MAX_MOOV_SIZE = 64 * 1024 * 1024
+HTML_MARKERS = (b"<html", b"<!doctype html")
+
+# fourcc sample entry -> имя кодека как у ffprobe
+CODEC_NAMES = {
+    "avc1": "h264",
+    "avc3": "h264",
+    "hvc1": "hevc",
+    "hev1": "hevc",
+    "av01": "av1",
+    "vp09": "vp9",
+    "mp4v": "mpeg4",
+    "mp4a": "aac",
+    "opus": "opus",
+    "ac-3": "ac3",
+    "ec-3": "eac3",
+    ".mp3": "mp3",
+}
+
+MP4_FORMAT_NAME = "mov,mp4,m4a,3gp,3g2,mj2"  # как format_name у ffprobe
+
+
+@dataclass
+class StreamInfo:
+    """Поток (трек) контейнера"""
+
+    codec_type: str  # video | audio | other
+    codec_name: str | None = None
+    duration: float = 0.0
+    width: int = 0
+    height: int = 0
+    fps: float = 0.0
+    sample_rate: int = 0
+    channels: int = 0
+
+
+@dataclass
+class MediaInfo:
+    """Media info записи (сохраняется в recordings.media_info)"""
+
+    format_name: str
+    duration: float
+    size: int
+    bitrate: int
+    streams: list[StreamInfo] = field(default_factory=list)
+    content_hash: str | None = None
+
+    def stream(self, codec_type: str) -> StreamInfo | None:
+        return next((s for s in self.streams if s.codec_type == codec_type), None)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "MediaInfo":
+        streams = [StreamInfo(**stream) for stream in data.get("streams", [])]
+        return cls(**{**data, "streams": streams})
+
+    def to_video_info(self) -> dict[str, Any]:
+        """Формат VideoProcessor.get_video_info."""
+        video = self.stream("video")
+        audio = self.stream("audio")
+        return {
+            "duration": self.duration,
+            "size": self.size,
+            "width": video.width if video else 0,
+            "height": video.height if video else 0,
+            "fps": video.fps if video else 0,
+            "video_codec": video.codec_name if video else None,
+            "audio_codec": audio.codec_name if audio else None,
+            "bitrate": self.bitrate,
+        }
+
+
+class Mp4StreamProbe:
+    """Инкрементальный разбор top-level боксов MP4 по мере поступления байтов."""
+
+    def __init__(self):
+        self.bytes_seen = 0
+        self.head = b""  # первые байты (sniff HTML)
+        self.major_brand: str | None = None
+        self.moov: bytes | None = None
+        self.moov_seen = False  # moov встретился (даже если больше MAX_MOOV_SIZE и не буферизован)
+        self.error: str | None = None
+
+        self._pending = b""  # незавершенный заголовок бокса
+        self._skip = 0  # байты payload текущего бокса, которые пропускаем
+        self._until_eof = False
+        self._capture: bytearray | None = None  # буфер ftyp/moov
+        self._capture_type: bytes | None = None
+        self._capture_left = 0
+
+    @property
+    def is_html(self) -> bool:
+        head = self.head.lower()
+        return any(marker in head for marker in HTML_MARKERS)
+
+    @property
+    def is_mp4(self) -> bool:
+        return self.major_brand is not None or self.moov_seen
+
+    def feed(self, chunk: bytes) -> None:
+        if len(self.head) < 1024:
+            self.head += chunk[: 1024 - len(self.head)]
+        self.bytes_seen += len(chunk)
+        if self.error or self._until_eof:
+            return
+
+        data = memoryview(chunk)
+        while data:
+            if self._skip:
+                step = min(self._skip, len(data))
+                self._skip -= step
+                data = data[step:]
+                continue
+
+            if self._capture is not None:
+                step = min(self._capture_left, len(data))
+                self._capture += data[:step]
+                self._capture_left -= step
+                data = data[step:]
+                if not self._capture_left:
+                    self._finish_capture()
+                continue
+
+            # Заголовок бокса: size(4) type(4) [largesize(8)], может прийти по частям
+            if len(self._pending) < 8:
+                take = min(8 - len(self._pending), len(data))
+                self._pending += bytes(data[:take])
+                data = data[take:]
+                if len(self._pending) < 8:
+                    continue
+            size, box_type = struct.unpack(">I4s", self._pending[:8])
+            header_size = 8
+            if size == 1:
+                take = min(16 - len(self._pending), len(data))
+                self._pending += bytes(data[:take])
+                data = data[take:]
+                if len(self._pending) < 16:
+                    continue
+                size = struct.unpack(">Q", self._pending[8:16])[0]
+                header_size = 16
+            self._pending = b""
+
+            if size == 0:  # бокс до конца файла (mdat в конце)
+                self._until_eof = True
+                return
+            if size < header_size:
+                self.error = f"Invalid MP4 box size {size} for {box_type!r}"
+                return
+
+            payload = size - header_size
+            if box_type == b"moov":
+                self.moov_seen = True
+            if box_type in (b"ftyp", b"moov") and payload <= MAX_MOOV_SIZE:
+                self._capture = bytearray()
+                self._capture_type = box_type
+                self._capture_left = payload
+                if not payload:
+                    self._finish_capture()
+            else:
+                self._skip = payload
+
+    def _finish_capture(self) -> None:
+        payload = bytes(self._capture)
+        if self._capture_type == b"ftyp" and len(payload) >= 4:
+            self.major_brand = payload[:4].decode("latin-1").strip()
+        elif self._capture_type == b"moov":
+            self.moov = payload
+        self._capture = None
+        self._capture_type = None
+
+    def media_info(self, size: int | None = None, content_hash: str | None = None) -> MediaInfo | None:
+        """MediaInfo по moov (None, если moov не встретился или не разобран)."""
+        if self.moov is None:
+            return None
+        try:
+            return parse_moov(self.moov, size or self.bytes_seen, content_hash)
+        except (struct.error, ValueError, ZeroDivisionError):
+            return None
+
+
+def _iter_boxes(data: bytes):
+    offset = 0
+    while offset + 8 <= len(data):
+        size, box_type = struct.unpack_from(">I4s", data, offset)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", data, offset + 8)[0]
+            header = 16
+        elif size == 0:
+            size = len(data) - offset
+        if size < header:
+            return
+        yield box_type, data[offset + header : offset + size]
+        offset += size
+
+
+def _find(data: bytes, *path: bytes) -> bytes | None:
+    for box_type, payload in _iter_boxes(data):
+        if box_type == path[0]:
+            return payload if len(path) == 1 else _find(payload, *path[1:])
+    return None
+
+
+def _parse_header_duration(payload: bytes) -> tuple[int, int]:
+    """(timescale, duration) из mvhd/mdhd (version 0 и 1)."""
+    if payload[0] == 1:
+        timescale, duration = struct.unpack_from(">IQ", payload, 20)
+    else:
+        timescale, duration = struct.unpack_from(">II", payload, 12)
+    return timescale, duration
+
+
+def _parse_trak(trak: bytes) -> StreamInfo:
+    handler = _find(trak, b"mdia", b"hdlr")
+    handler_type = handler[8:12] if handler else b""
+    codec_type = {b"vide": "video", b"soun": "audio"}.get(handler_type, "other")
+    stream = StreamInfo(codec_type=codec_type)
+
+    mdhd = _find(trak, b"mdia", b"mdhd")
+    timescale = 0
+    if mdhd:
+        timescale, duration = _parse_header_duration(mdhd)
+        stream.duration = duration / timescale if timescale else 0.0
+
+    stsd = _find(trak, b"mdia", b"minf", b"stbl", b"stsd")
+    if stsd and len(stsd) >= 16:
+        entry = stsd[8:]
+        fourcc = entry[4:8].decode("latin-1")
+        stream.codec_name = CODEC_NAMES.get(fourcc, fourcc.strip())
+        body = entry[8:]
+        if codec_type == "video" and len(body) >= 28:
+            stream.width, stream.height = struct.unpack_from(">HH", body, 24)
+        elif codec_type == "audio" and len(body) >= 28:
+            stream.channels = struct.unpack_from(">H", body, 16)[0]
+            stream.sample_rate = struct.unpack_from(">I", body, 24)[0] >> 16
+
+    stts = _find(trak, b"mdia", b"minf", b"stbl", b"stts")
+    if codec_type == "video" and stts and stream.duration:
+        entries = struct.unpack_from(">I", stts, 4)[0]
+        samples = sum(struct.unpack_from(">I", stts, 8 + i * 8)[0] for i in range(entries))
+        stream.fps = round(samples / stream.duration, 3)
+
+    return stream
+
+
+def parse_moov(moov: bytes, size: int, content_hash: str | None = None) -> MediaInfo:
+    """Разобрать payload moov в MediaInfo."""
+    mvhd = _find(moov, b"mvhd")
+    if mvhd is None:
+        raise ValueError("mvhd not found")
+    timescale, duration_units = _parse_header_duration(mvhd)
+    duration = duration_units / timescale if timescale else 0.0
+
+    streams = [_parse_trak(payload) for box_type, payload in _iter_boxes(moov) if box_type == b"trak"]
+    if not duration:
+        duration = max((s.duration for s in streams), default=0.0)
+
+    return MediaInfo(
+        format_name=MP4_FORMAT_NAME,
+        duration=duration,
+        size=size,
+        bitrate=int(size * 8 / duration) if duration else 0,
+        streams=streams,
+        content_hash=content_hash,
+    )
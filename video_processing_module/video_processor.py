@@ -1,5 +1,4 @@
 import asyncio
-import json
 import os
 import shutil
 import traceback
@@ -8,10 +7,24 @@ from pathlib import Path
 from typing import Any
 
 from logger import get_logger
+from utils.artifact_store import ArtifactStore, fingerprint, get_artifact_store
+from utils.ffmpeg_runner import FFmpegCancelledError, FFmpegError, run_ffmpeg
 from utils.formatting import normalize_datetime_string, sanitize_filename
+from utils.media_probe import get_media_probe
 
 from .audio_detector import AudioDetector
 from .config import ProcessingConfig
+from .encode_presets import (
+    AUTO_PRESET,
+    AUTO_PRESETS,
+    EncodePreset,
+    detect_content,
+    get_encode_preset,
+    legacy_output_args,
+)
+from .encode_scheduler import EncodeScheduler
+from .media_graph import MediaGraph, MediaGraphResult, MediaOutput
+from .media_info import MediaInfo
 from .segments import SegmentProcessor, VideoSegment
 
 logger = get_logger()
@@ -27,6 +40,8 @@ class VideoProcessor:
             silence_threshold=config.silence_threshold,
             min_silence_duration=config.min_silence_duration,
         )
+        self.encode_scheduler = EncodeScheduler.from_config(config)
+        self._encode_presets: dict[str, EncodePreset] = {}  # realpath -> пресет, выбранный для auto
         self._ensure_directories()
 
     def _ensure_directories(self):
@@ -34,31 +49,18 @@ class VideoProcessor:
         for directory in [self.config.input_dir, self.config.output_dir, self.config.temp_dir]:
             Path(directory).mkdir(parents=True, exist_ok=True)
 
+    def register_media_info(self, video_path: str, media_info: MediaInfo) -> None:
+        """Использовать media info, полученный при скачивании, вместо ffprobe для этого файла."""
+        self.audio_detector.known_media[os.path.realpath(video_path)] = media_info
 
     async def get_video_info(self, video_path: str) -> dict[str, Any]:
         """Get video information."""
-        cmd = [
-            "ffprobe",
-            "-v",
-            "quiet",
-            "-print_format",
-            "json",
-            "-show_format",
-            "-show_streams",
-            video_path,
-        ]
+        media_info = self.audio_detector.known_media_info(video_path)
+        if media_info:
+            return media_info.to_video_info()
 
         try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-            )
-
-            stdout, stderr = await process.communicate()
-
-            if process.returncode != 0:
-                raise RuntimeError(f"FFprobe error: {stderr.decode()}")
-
-            info = json.loads(stdout.decode())
+            info = await get_media_probe().probe(video_path)
             video_stream = next((s for s in info["streams"] if s["codec_type"] == "video"), None)
             audio_stream = next((s for s in info["streams"] if s["codec_type"] == "audio"), None)
 
@@ -76,56 +78,49 @@ class VideoProcessor:
         except Exception as e:
             raise RuntimeError(f"Error getting video information: {e}") from e
 
-    async def trim_video(self, input_path: str, output_path: str, start_time: float, end_time: float) -> bool:
-        """Trim video by time."""
+    async def resolve_encode_preset(self, video_path: str) -> EncodePreset | None:
+        """Пресет кодирования для файла (None - сырые поля config). auto выбирается по контенту один раз."""
+        name = self.config.encode_preset
+        if not name:
+            return None
+        if name != AUTO_PRESET:
+            return get_encode_preset(name)
+
+        key = os.path.realpath(video_path)
+        if key not in self._encode_presets:
+            video_info = await self.get_video_info(video_path)
+            profile = await detect_content(video_path, video_info["duration"])
+            # Без профиля - пресет без понижения fps, безопасный для любого контента
+            kind = profile.kind if profile else "dynamic"
+            self._encode_presets[key] = get_encode_preset(AUTO_PRESETS[kind])
+            logger.info(f"🎛️ Encode preset (auto, {kind}): {self._encode_presets[key].name}")
+        return self._encode_presets[key]
+
+    async def trim_video(
+        self, input_path: str, output_path: str, start_time: float, end_time: float, threads: int | None = None
+    ) -> bool:
+        """Trim video by time (threads - бюджет потоков ffmpeg при перекодировании)."""
         duration = end_time - start_time
 
         # Ensure paths are strings
         input_path = str(input_path)
         output_path = str(output_path)
 
-        cmd = [
-            "ffmpeg",
-            "-i",
-            input_path,
-            "-ss",
-            str(start_time),
-            "-t",
-            str(duration),
-            "-c:v",
-            self.config.video_codec,
-            "-c:a",
-            self.config.audio_codec,
-        ]
-
-        if self.config.video_bitrate != "original":
-            cmd.extend(["-b:v", self.config.video_bitrate])
-        if self.config.audio_bitrate != "original":
-            cmd.extend(["-b:a", self.config.audio_bitrate])
-        if self.config.video_codec != "copy" and self.config.fps > 0:
-            cmd.extend(["-r", str(self.config.fps)])
-        if self.config.resolution != "original":
-            cmd.extend(["-s", self.config.resolution])
-
-        cmd.extend(["-y", output_path])
-
         try:
-            logger.info(f"🔧 Команда FFmpeg: {' '.join(cmd)}")
-
-            logger.info("🔧 Starting FFmpeg for video processing...")
+            preset = await self.resolve_encode_preset(input_path)
+            if preset is not None:
+                source_fps = (await self.get_video_info(input_path))["fps"] if not preset.stream_copy else None
+                output_args = preset.output_args(source_fps=source_fps, threads=threads)
+            else:
+                output_args = legacy_output_args(self.config, threads=threads)
 
-            process = await asyncio.create_subprocess_exec(
-                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-            )
+            cmd = ["ffmpeg", "-i", input_path, "-ss", str(start_time), "-t", str(duration), *output_args]
+            cmd.extend(["-y", output_path])
 
-            # Wait for the process to complete
-            await process.wait()
+            logger.info(f"🔧 Команда FFmpeg: {' '.join(cmd)}")
 
-            if process.returncode != 0:
-                logger.error(f"❌ FFmpeg finished with code {process.returncode}")
-                stderr_output = await process.stderr.read()
-                logger.error(f"❌ FFmpeg error: {stderr_output.decode()}")
-                return False
+            logger.info("🔧 Starting FFmpeg for video processing...")
+            await run_ffmpeg(cmd, duration=duration)
 
             if Path(output_path).exists():
                 file_size = Path(output_path).stat().st_size
@@ -134,12 +129,18 @@ class VideoProcessor:
             logger.error(f"❌ File not created: {output_path}")
             return False
 
+        except FFmpegCancelledError:
+            raise
+        except FFmpegError as e:
+            logger.error(f"❌ FFmpeg finished with code {e.returncode}")
+            logger.error(f"❌ FFmpeg error: {e.stderr_tail}")
+            return False
         except Exception as e:
             logger.error(f"❌ Exception during video trimming: {e}")
             logger.error(f"❌ Traceback: {traceback.format_exc()}")
             return False
 
-    async def process_segment(self, segment: VideoSegment, input_path: str) -> bool:
+    async def process_segment(self, segment: VideoSegment, input_path: str, threads: int | None = None) -> bool:
         """Process a single segment."""
         try:
             start_time = segment.start_time
@@ -154,7 +155,7 @@ class VideoProcessor:
                 end_time = min(max_time - self.config.outro_duration, end_time)
 
             os.makedirs(Path(segment.output_path).parent, exist_ok=True)
-            success = await self.trim_video(input_path, segment.output_path, start_time, end_time)
+            success = await self.trim_video(input_path, segment.output_path, start_time, end_time, threads=threads)
 
             if success:
                 segment.processed = True
@@ -162,6 +163,8 @@ class VideoProcessor:
                 return True
             return False
 
+        except FFmpegCancelledError:
+            raise
         except Exception as e:
             logger.info(f"Error processing segment {segment.title}: {e}")
             return False
@@ -186,12 +189,30 @@ class VideoProcessor:
 
             logger.info(f"   Created segments: {len(segments)}")
 
-            processed_segments = []
-            for i, segment in enumerate(segments, 1):
-                logger.info(f"   Обработка сегмента {i}/{len(segments)}: {segment.title}")
+            # auto пресет выбирается до параллельного запуска: одна детекция контента на файл
+            await self.resolve_encode_preset(video_path)
+
+            scheduler = self.encode_scheduler
+            logger.info(
+                f"   Parallel encodes: up to {scheduler.max_jobs} "
+                f"({scheduler.cpus} CPU, {scheduler.threads_per_job} threads/job)"
+            )
+
+            def segment_job(index: int, segment: VideoSegment):
+                async def job() -> bool:
+                    logger.info(f"   Обработка сегмента {index}/{len(segments)}: {segment.title}")
+                    return await self.process_segment(segment, video_path, threads=scheduler.threads_per_job)
 
-                success = await self.process_segment(segment, video_path)
-                if success:
+                return job
+
+            results = await scheduler.run([segment_job(i, segment) for i, segment in enumerate(segments, 1)])
+            cancelled = next((r for r in results if isinstance(r, FFmpegCancelledError)), None)
+            if cancelled is not None:
+                raise cancelled
+
+            processed_segments = []
+            for segment, success in zip(segments, results, strict=True):
+                if success is True:
                     processed_segments.append(segment)
                     logger.info(f"   ✅ Segment processed: {segment.output_path}")
                 else:
@@ -200,10 +221,66 @@ class VideoProcessor:
             logger.info(f"✅ Processing completed: {len(processed_segments)}/{len(segments)} segments")
             return processed_segments
 
+        except FFmpegCancelledError:
+            raise
         except Exception as e:
             logger.info(f"❌ Ошибка обработки видео {title}: {e}")
             return []
 
+    async def detect_trim_range(self, video_path: str, title: str) -> tuple[float, float | None] | None:
+        """Границы обрезки по звуку с учетом отступов.
+
+        Returns:
+            (start, end) для обрезки; (0.0, None), если звук на всем протяжении
+            и обрезка не нужна; None, если границы определить не удалось
+        """
+        logger.info(f"🔍 Детекция звука для: {title}")
+        first_sound, last_sound = await self.audio_detector.detect_audio_boundaries(video_path)
+
+        if first_sound is None and last_sound is None:
+            logger.warning(f"⚠️ Не удалось определить границы звука для {title}")
+            return None
+
+        if first_sound is None:
+            logger.warning(f"⚠️ Не удалось определить начало звука для {title}")
+            return None
+
+        # Если звук есть на всем протяжении видео, не обрезаем и используем исходный файл
+        if last_sound is None and first_sound == 0.0:
+            logger.info("🔊 Звук на всем протяжении видео, пропускаем обрезку и используем исходный файл")
+            return 0.0, None
+
+        if last_sound is None:
+            logger.warning(f"⚠️ Не удалось определить конечную границу звука для {title}")
+            return None
+
+        logger.info(f"🎵 Найденные границы звука: {first_sound:.1f}s - {last_sound:.1f}s")
+
+        start_time_trim = max(0, first_sound - self.config.padding_before)
+        end_time = last_sound + self.config.padding_after
+
+        logger.info(
+            f"✂️ Обрезка с {start_time_trim:.1f}s по {end_time:.1f}s (отступы: -{self.config.padding_before}s, +{self.config.padding_after}s)"
+        )
+        return start_time_trim, end_time
+
+    def build_output_path(self, title: str, start_time: str | None = None) -> Path:
+        """Путь обработанного видео: {title}_{yy-mm-dd_HH-MM}_processed.mp4 в output_dir."""
+        safe_title = sanitize_filename(title)
+
+        # Добавляем дату и время в имя файла для уникальности
+        date_suffix = ""
+        if start_time:
+            try:
+                normalized_time = normalize_datetime_string(start_time)
+                date_obj = datetime.fromisoformat(normalized_time)
+                date_suffix = f"_{date_obj.strftime('%y-%m-%d_%H-%M')}"
+            except Exception as e:
+                logger.warning(f"⚠️ Error parsing date '{start_time}' for filename: {e}")
+
+        output_filename = f"{safe_title}{date_suffix}_processed.mp4"
+        return Path(self.config.output_dir) / output_filename
+
     async def process_video_with_audio_detection(
         self, video_path: str, title: str, start_time: str | None = None
     ) -> tuple[bool, str | None]:
@@ -222,49 +299,15 @@ class VideoProcessor:
                 logger.error(f"❌ Файл не найден: {video_path}")
                 return False, None
 
-            logger.info(f"🔍 Детекция звука для: {title}")
-            first_sound, last_sound = await self.audio_detector.detect_audio_boundaries(video_path)
-
-            if first_sound is None and last_sound is None:
-                logger.warning(f"⚠️ Не удалось определить границы звука для {title}")
+            trim_range = await self.detect_trim_range(video_path, title)
+            if trim_range is None:
                 return False, None
 
-            if first_sound is None:
-                logger.warning(f"⚠️ Не удалось определить начало звука для {title}")
-                return False, None
-
-            # Если звук есть на всем протяжении видео, не обрезаем и используем исходный файл
-            if last_sound is None and first_sound == 0.0:
-                logger.info("🔊 Звук на всем протяжении видео, пропускаем обрезку и используем исходный файл")
+            start_time_trim, end_time = trim_range
+            if end_time is None:
                 return True, os.path.abspath(video_path)
 
-            if last_sound is None:
-                logger.warning(f"⚠️ Не удалось определить конечную границу звука для {title}")
-                return False, None
-
-            logger.info(f"🎵 Найденные границы звука: {first_sound:.1f}s - {last_sound:.1f}s")
-
-            start_time_trim = max(0, first_sound - self.config.padding_before)
-            end_time = last_sound + self.config.padding_after
-
-            logger.info(
-                f"✂️ Обрезка с {start_time_trim:.1f}s по {end_time:.1f}s (отступы: -{self.config.padding_before}s, +{self.config.padding_after}s)"
-            )
-
-            safe_title = sanitize_filename(title)
-
-            # Добавляем дату и время в имя файла для уникальности
-            date_suffix = ""
-            if start_time:
-                try:
-                    normalized_time = normalize_datetime_string(start_time)
-                    date_obj = datetime.fromisoformat(normalized_time)
-                    date_suffix = f"_{date_obj.strftime('%y-%m-%d_%H-%M')}"
-                except Exception as e:
-                    logger.warning(f"⚠️ Error parsing date '{start_time}' for filename: {e}")
-
-            output_filename = f"{safe_title}{date_suffix}_processed.mp4"
-            output_path = Path(self.config.output_dir) / output_filename
+            output_path = self.build_output_path(title, start_time)
 
             os.makedirs(Path(output_path).parent, exist_ok=True)
             logger.info("🎬 Запуск FFmpeg для обрезки...")
@@ -276,26 +319,212 @@ class VideoProcessor:
             logger.error(f"❌ Error trimming video: {title}")
             return False, None
 
+        except FFmpegCancelledError:
+            raise
         except Exception as e:
             logger.error(f"❌ Exception during video processing {title}: {e}")
             logger.error(f"❌ Traceback: {traceback.format_exc()}")
             return False, None
 
+    async def process_video_with_speech_audio(
+        self,
+        video_path: str,
+        title: str,
+        speech_output: str,
+        start_time: str | None = None,
+        waveform_output: str | None = None,
+        loudness: bool = False,
+    ) -> MediaGraphResult:
+        """Обрезка по звуку и извлечение речевой дорожки за одно декодирование исходника.
+
+        Обрезанное видео, аудио 16kHz mono для транскрибации и (опционально) waveform/
+        loudness пишутся одним вызовом ffmpeg (MediaGraph). Если обрезка не нужна,
+        видео не перекодируется: исходный файл используется как обработанный,
+        из него извлекается только речевая дорожка.
+
+        Args:
+            video_path: Путь к исходному видео файлу
+            title: Название видео
+            speech_output: Путь для речевой дорожки (mp3)
+            start_time: Дата начала записи (для имени файла)
+            waveform_output: Путь для PNG waveform (None - не строить)
+            loudness: Посчитать EBU R128 loudness
+
+        Returns:
+            MediaGraphResult с выходами "video" и "speech" (и "waveform")
+        """
+        try:
+            logger.info(f"🎬 Обработка видео с детекцией звука (single decode): {title}")
+
+            if not Path(video_path).exists():
+                logger.error(f"❌ Файл не найден: {video_path}")
+                return MediaGraphResult(success=False, error=f"File not found: {video_path}")
+
+            store = get_artifact_store()
+            cache_key = None
+            if store is not None:
+                cache_key = await self._trim_cache_key(store, video_path, waveform_output, loudness)
+                cached = self._reuse_trim(
+                    store, cache_key, video_path, title, start_time, speech_output, waveform_output
+                )
+                if cached:
+                    return cached
+
+            result = await self._run_speech_graph(
+                video_path, title, speech_output, start_time, waveform_output, loudness
+            )
+            if result.success and cache_key:
+                self._store_trim(store, cache_key, video_path, result)
+            return result
+
+        except FFmpegCancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Exception during video processing {title}: {e}")
+            logger.error(f"❌ Traceback: {traceback.format_exc()}")
+            return MediaGraphResult(success=False, error=str(e))
+
+    async def _run_speech_graph(
+        self,
+        video_path: str,
+        title: str,
+        speech_output: str,
+        start_time: str | None,
+        waveform_output: str | None,
+        loudness: bool,
+    ) -> MediaGraphResult:
+        """Детекция границ звука и запуск MediaGraph (без artifact store)."""
+        trim_range = await self.detect_trim_range(video_path, title)
+        if trim_range is None:
+            return MediaGraphResult(success=False, error="Audio boundaries not detected")
+
+        graph = MediaGraph(self.config)
+        start_time_trim, end_time = trim_range
+
+        if end_time is None:
+            video_info = await self.get_video_info(video_path)
+            result = await graph.run(
+                video_path,
+                0.0,
+                video_info["duration"],
+                None,
+                speech_output,
+                waveform_output=waveform_output,
+                loudness=loudness,
+            )
+            if result.success:
+                source = Path(video_path).resolve()
+                result.outputs["video"] = MediaOutput(
+                    kind="video",
+                    path=str(source),
+                    size_bytes=video_info["size"],
+                    bitrate_kbps=round(video_info["bitrate"] / 1000, 1) if video_info["bitrate"] else None,
+                )
+            return result
+
+        output_path = self.build_output_path(title, start_time)
+        preset = await self.resolve_encode_preset(video_path)
+        source_fps = None
+        if preset is not None and not preset.stream_copy:
+            source_fps = (await self.get_video_info(video_path))["fps"]
+        logger.info("🎬 Запуск FFmpeg (trim + speech audio)...")
+        result = await graph.run(
+            video_path,
+            start_time_trim,
+            end_time,
+            str(output_path),
+            speech_output,
+            waveform_output=waveform_output,
+            loudness=loudness,
+            preset=preset,
+            source_fps=source_fps,
+        )
+        if not result.success:
+            logger.error(f"❌ Error trimming video: {title}")
+        return result
+
+    async def _trim_cache_key(
+        self, store: ArtifactStore, video_path: str, waveform_output: str | None, loudness: bool
+    ) -> str:
+        """Ключ артефакта обрезки: содержимое исходника + параметры обработки и графа."""
+        source_hash = await asyncio.to_thread(store.hash_file, video_path)
+        processing_params = self.config.model_dump(
+            mode="json", exclude={"input_dir", "output_dir", "temp_dir", "keep_temp_files"}
+        )
+        return fingerprint("trim", source_hash, processing_params, bool(waveform_output), loudness)
+
+    def _reuse_trim(
+        self,
+        store: ArtifactStore,
+        cache_key: str,
+        video_path: str,
+        title: str,
+        start_time: str | None,
+        speech_output: str,
+        waveform_output: str | None,
+    ) -> MediaGraphResult | None:
+        """Выдать результаты обрезки из artifact store (идентичный исходник и параметры)."""
+        artifact = store.lookup("trim", cache_key)
+        if artifact is None:
+            return None
+
+        meta = artifact.meta
+        destinations = {
+            "video": self.build_output_path(title, start_time),
+            "speech": Path(speech_output),
+            "waveform": Path(waveform_output) if waveform_output else None,
+        }
+        result = MediaGraphResult(success=True, duration=meta["duration"], loudness=meta["loudness"])
+        for kind, info in meta["outputs"].items():
+            if info["file"] is None:
+                # Обрезка не понадобилась: обработанное видео - сам исходник
+                path = Path(video_path).resolve()
+            else:
+                path = store.materialize(artifact, info["file"], destinations[kind])
+            result.outputs[kind] = MediaOutput(
+                kind=kind, path=str(path), size_bytes=info["size_bytes"], bitrate_kbps=info["bitrate_kbps"]
+            )
+
+        logger.info(f"♻️ Reused trim artifact for {title}: {list(result.outputs)} (key={cache_key[:12]})")
+        return result
+
+    @staticmethod
+    def _store_trim(store: ArtifactStore, cache_key: str, video_path: str, result: MediaGraphResult) -> None:
+        """Сохранить выходы media graph в artifact store."""
+        source = Path(video_path).resolve()
+        files = {}
+        outputs = {}
+        for kind, output in result.outputs.items():
+            name = None
+            if Path(output.path).resolve() != source:
+                name = f"{kind}{Path(output.path).suffix}"
+                files[name] = output.path
+            outputs[kind] = {"file": name, "size_bytes": output.size_bytes, "bitrate_kbps": output.bitrate_kbps}
+
+        try:
+            store.put(
+                "trim",
+                cache_key,
+                files=files,
+                meta={"duration": result.duration, "loudness": result.loudness, "outputs": outputs},
+            )
+        except OSError as e:
+            logger.warning(f"Artifact store unavailable for trim of {video_path}: {e}")
+
     async def batch_process(self, video_files: list[str]) -> dict[str, list[VideoSegment]]:
         """Batch processing multiple videos."""
-        results = {}
-
+        existing = []
         for video_path in video_files:
             if not Path(video_path).exists():
                 logger.info(f"❌ File not found: {video_path}")
                 continue
+            existing.append(video_path)
 
-            title = Path(video_path).stem
-
-            segments = await self.process_video(video_path, title)
-            results[video_path] = segments
-
-        return results
+        # Сегменты всех видео делят слоты self.encode_scheduler
+        segments_per_video = await asyncio.gather(
+            *(self.process_video(video_path, Path(video_path).stem) for video_path in existing)
+        )
+        return dict(zip(existing, segments_per_video, strict=True))
 
     def cleanup_temp_files(self):
         """Cleaning up temporary files."""
@@ -1,10 +1,12 @@
 """Credential provider for accessing platform credentials from database or files."""
 
+import asyncio
 import json
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Any
 
+from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 
 from logger import get_logger
@@ -31,6 +33,20 @@ class CredentialProvider(ABC):
     async def update_google_credentials(self, credentials: Credentials) -> bool:
         """Update Google OAuth2 credentials after refresh."""
 
+    async def refresh_google_credentials(self, credentials: Credentials) -> Credentials:
+        """
+        Refresh Google access token and save it.
+
+        Returns the credentials to use from now on (providers may return a token
+        refreshed concurrently by another task instead of refreshing again).
+
+        Raises:
+            google.auth.exceptions.RefreshError: Refresh token rejected
+        """
+        credentials.refresh(Request())
+        await self.update_google_credentials(credentials)
+        return credentials
+
 
 class FileCredentialProvider(CredentialProvider):
     """Credential provider that uses file system."""
@@ -93,7 +109,12 @@ class FileCredentialProvider(CredentialProvider):
 
 
 class DatabaseCredentialProvider(CredentialProvider):
-    """Credential provider that uses database."""
+    """Credential provider that uses database.
+
+    Decrypted data is served from the process credential cache
+    (api.auth.credential_cache); refreshes of one credential are serialized
+    across tasks and processes.
+    """
 
     def __init__(
         self,
@@ -104,16 +125,26 @@ class DatabaseCredentialProvider(CredentialProvider):
         self.credential_id = credential_id
         self.encryption = encryption_service
         self.repo = credential_repository
+        self._version: int | None = None  # version строки, из которой загружены последние данные
+        # Один uploader (и provider) обслуживает параллельные загрузки пакета, а AsyncSession
+        # не допускает конкурентных запросов
+        self._session_lock = asyncio.Lock()
+
+    async def load_credentials(self, revalidate: bool = False) -> dict[str, Any] | None:
+        """Load credentials from database (through the process credential cache)."""
+        from api.auth.credential_cache import get_credential_cache
 
-    async def load_credentials(self) -> dict[str, Any] | None:
-        """Load credentials from database."""
         try:
-            credential = await self.repo.get_by_id(self.credential_id)
-            if not credential or not credential.encrypted_data:
+            async with self._session_lock:
+                cached = await get_credential_cache().load(
+                    self.credential_id, self.repo, self.encryption, revalidate=revalidate
+                )
+            if cached is None:
                 logger.warning(f"Credential {self.credential_id} not found or empty")
                 return None
 
-            return self.encryption.decrypt_credentials(credential.encrypted_data)
+            self._version = cached.version
+            return cached.data
         except Exception as e:
             logger.error(f"Failed to load credential {self.credential_id} from DB: {e}")
             return None
@@ -121,20 +152,28 @@ class DatabaseCredentialProvider(CredentialProvider):
     async def save_credentials(self, credentials_data: dict[str, Any]) -> bool:
         """Save credentials to database."""
         try:
+            from api.auth.credential_cache import get_credential_cache
             from api.schemas.auth import UserCredentialUpdate
 
             encrypted = self.encryption.encrypt_credentials(credentials_data)
             update_data = UserCredentialUpdate(encrypted_data=encrypted)
-            await self.repo.update(self.credential_id, update_data)
+            async with self._session_lock:
+                updated = await self.repo.update(self.credential_id, update_data)
+            if updated is None:
+                logger.error(f"Credential {self.credential_id} not found, cannot save")
+                return False
+
+            get_credential_cache().store(self.credential_id, updated.version, updated.is_active, credentials_data)
+            self._version = updated.version
             logger.info(f"Updated credential {self.credential_id} in database")
             return True
         except Exception as e:
             logger.error(f"Failed to save credential {self.credential_id} to DB: {e}")
             return False
 
-    async def get_google_credentials(self, scopes: list[str]) -> Credentials | None:
+    async def get_google_credentials(self, scopes: list[str] | None, revalidate: bool = False) -> Credentials | None:
         """Get Google OAuth2 Credentials from database."""
-        data = await self.load_credentials()
+        data = await self.load_credentials(revalidate=revalidate)
         if not data:
             return None
 
@@ -149,6 +188,29 @@ class DatabaseCredentialProvider(CredentialProvider):
             logger.error(f"Failed to create Google credentials from DB data: {e}")
             return None
 
+    async def refresh_google_credentials(self, credentials: Credentials) -> Credentials:
+        """Refresh Google token once per credential: concurrent callers reuse the refreshed token."""
+        from api.auth.credential_cache import get_credential_cache
+
+        cache = get_credential_cache()
+        seen_version = self._version
+        async with cache.refresh_lock(self.credential_id):
+            current = await self.get_google_credentials(credentials.scopes, revalidate=True)
+            if (
+                current is not None
+                and self._version != seen_version
+                and current.valid
+                and current.token != credentials.token
+            ):
+                cache.record_refresh(collision=True)
+                logger.info(f"Google token of credential {self.credential_id} already refreshed by another task")
+                return current
+
+            credentials.refresh(Request())
+            cache.record_refresh()
+            await self.update_google_credentials(credentials)
+            return credentials
+
     async def update_google_credentials(self, credentials: Credentials) -> bool:
         """Update Google credentials in database after refresh."""
         try:
@@ -169,9 +231,9 @@ class DatabaseCredentialProvider(CredentialProvider):
             logger.error(f"Failed to update Google credentials in DB: {e}")
             return False
 
-    async def get_vk_credentials(self) -> dict[str, Any] | None:
+    async def get_vk_credentials(self, revalidate: bool = False) -> dict[str, Any] | None:
         """Get VK credentials from database."""
-        data = await self.load_credentials()
+        data = await self.load_credentials(revalidate=revalidate)
         if not data:
             return None
 
@@ -214,11 +276,37 @@ class DatabaseCredentialProvider(CredentialProvider):
             return False
 
     async def refresh_vk_token(self) -> dict[str, Any] | None:
-        """Refresh VK token using VK ID API."""
+        """Refresh VK token using VK ID API (once per credential: concurrent callers reuse the new token)."""
+        from api.auth.credential_cache import get_credential_cache
+
+        cache = get_credential_cache()
+        try:
+            known = await self.get_vk_credentials()
+            seen_version = self._version
+            async with cache.refresh_lock(self.credential_id):
+                creds = await self.get_vk_credentials(revalidate=True)
+                if (
+                    creds
+                    and known
+                    and self._version != seen_version
+                    and creds.get("access_token")
+                    and creds["access_token"] != known.get("access_token")
+                ):
+                    cache.record_refresh(collision=True)
+                    logger.info(f"VK token of credential {self.credential_id} already refreshed by another task")
+                    return {"access_token": creds["access_token"], "expires_in": creds.get("expires_in")}
+
+                return await self._refresh_vk_token(creds)
+        except Exception as e:
+            logger.error(f"Failed to refresh VK token: {e}")
+            return None
+
+    async def _refresh_vk_token(self, creds: dict[str, Any] | None) -> dict[str, Any] | None:
         try:
             import aiohttp
 
-            creds = await self.get_vk_credentials()
+            from api.auth.credential_cache import get_credential_cache
+
             if not creds or not creds.get("refresh_token"):
                 logger.error("No VK refresh token available")
                 return None
@@ -243,6 +331,8 @@ class DatabaseCredentialProvider(CredentialProvider):
                     logger.error(f"VK token refresh error: {token_data['error']}")
                     return None
 
+                get_credential_cache().record_refresh()
+
                 await self.update_vk_credentials(
                     access_token=token_data["access_token"],
                     expires_in=token_data.get("expires_in", 86400),
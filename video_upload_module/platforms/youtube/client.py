@@ -0,0 +1,109 @@
+"""Клиент YouTube Data API: статический discovery документ и общий транспорт.
+
+Раньше каждый YouTubeUploader (а create_uploader_from_db создает его на
+каждую задачу загрузки) вызывал discovery.build("youtube", "v3"): разбор
+discovery документа (~400 KB JSON), сборка Resource и новый httplib2.Http,
+то есть новое TLS соединение к googleapis.com на каждую загрузку.
+
+Теперь в процессе воркера:
+- discovery документ читается один раз из статической копии, поставляемой с
+  google-api-python-client (без сетевого запроса)
+- Resource собирается один раз, коллекции (videos(), playlistItems(), ...)
+  тоже кэшируются
+- credentials привязываются к каждому запросу: youtube_service() возвращает
+  обертку, которая выполняет HttpRequest через AuthorizedHttp поверх общего
+  транспорта потока (keep-alive соединения переиспользуются между загрузками)
+
+Интерфейс обертки совпадает с Resource (service.videos().insert(...).execute()),
+поэтому менеджеры плейлистов и обложек работают с ней без изменений.
+"""
+
+import json
+import threading
+from functools import cache
+from typing import Any
+
+import google_auth_httplib2
+import httplib2
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import Resource, build_from_document
+from googleapiclient.http import HttpRequest, build_http
+
+API_NAME = "youtube"
+API_VERSION = "v3"
+
+_local = threading.local()
+_collections: dict[tuple[str, ...], Resource] = {}
+_collections_lock = threading.Lock()
+
+
+@cache
+def discovery_document(api_name: str = API_NAME, api_version: str = API_VERSION) -> dict[str, Any]:
+    """Discovery документ из статической копии библиотеки (разбирается один раз на процесс)."""
+    document = discovery_cache.get_static_doc(api_name, api_version)
+    if document is None:
+        raise RuntimeError(f"No bundled discovery document for {api_name} {api_version}")
+    return json.loads(document)
+
+
+@cache
+def base_service(api_name: str = API_NAME, api_version: str = API_VERSION) -> Resource:
+    """Resource без credentials; запросы выполняются через http, привязанный в BoundService."""
+    # Собственный (неиспользуемый) http, иначе build_from_document ищет default credentials
+    return build_from_document(discovery_document(api_name, api_version), http=httplib2.Http())
+
+
+def shared_http() -> httplib2.Http:
+    """
+    Транспорт текущего потока.
+
+    httplib2.Http не потокобезопасен, поэтому один экземпляр на поток;
+    build_http() - те же timeout и обработка 308 для resumable upload, что у build().
+    """
+    http = getattr(_local, "http", None)
+    if http is None:
+        http = _local.http = build_http()
+    return http
+
+
+class BoundService:
+    """Resource с привязанными credentials: каждый HttpRequest выполняется через http обертки"""
+
+    def __init__(self, resource: Resource, http: Any, path: tuple[str, ...] = ()):
+        self._resource = resource
+        self._http = http
+        self._path = path
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._resource, name)
+        if not callable(attr):
+            return attr
+
+        def bound(*args: Any, **kwargs: Any) -> Any:
+            if not args and not kwargs:
+                # Коллекции (videos(), captions(), ...) не зависят от credentials - собираются один раз
+                key = (*self._path, name)
+                with _collections_lock:
+                    collection = _collections.get(key)
+                if collection is not None:
+                    return BoundService(collection, self._http, key)
+
+            result = attr(*args, **kwargs)
+            if isinstance(result, HttpRequest):
+                result.http = self._http
+                return result
+            if isinstance(result, Resource):
+                key = (*self._path, name)
+                if not args and not kwargs:
+                    with _collections_lock:
+                        _collections.setdefault(key, result)
+                return BoundService(result, self._http, key)
+            return result
+
+        return bound
+
+
+def youtube_service(credentials: Any) -> BoundService:
+    """YouTube Data API v3 для credentials (дешево: без discovery и нового соединения)."""
+    http = google_auth_httplib2.AuthorizedHttp(credentials, http=shared_http())
+    return BoundService(base_service(API_NAME, API_VERSION), http)
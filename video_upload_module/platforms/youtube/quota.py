@@ -0,0 +1,392 @@
+"""Учет квоты YouTube Data API по credential (каналу).
+
+YouTube выдает дневную квоту в units (по умолчанию 10 000), которая
+сбрасывается в полночь по тихоокеанскому времени. Каждый метод API стоит
+фиксированное число units (QUOTA_COSTS): videos.insert - 1600,
+captions.insert - 400, thumbnails.set и playlistItems.insert - по 50.
+Раньше расход нигде не учитывался: когда bulk загрузка исчерпывала квоту,
+все оставшиеся upload_recording_to_platform падали с 403 quotaExceeded и
+уходили в повторы вслепую.
+
+YouTubeQuotaLedger:
+- резервирует units атомарно до вызова API (reserve/charge); если не
+  помещается - QuotaExhaustedError со временем сброса квоты
+- загрузка видео резервирует весь пакет (insert + плейлист + обложка) сразу,
+  чтобы на границе квоты не остаться с видео без плейлиста и обложки
+- отложенные загрузки стоят в очереди по приоритету; defer() раскладывает
+  очередь по окнам квоты и возвращает время запуска, поэтому после сброса
+  загрузки идут по порядку, а не все разом
+- аргументы отложенной задачи паркуются в Redis (park), а не публикуются с
+  countdown до окна: ETA дольше visibility_timeout Redis broker доставляется
+  повторно и загружает видео дважды; release_due() (beat задача
+  api.tasks.upload.release_deferred_uploads) ставит загрузки в очередь
+  незадолго до их времени запуска
+- status() - остаток, время сброса и прогноз выгрузки очереди
+
+Redis недоступен - учет пропускается (загрузка не блокируется), как и в
+api.tasks.scheduling.
+
+Состояние в Redis (тот же инстанс, что и broker):
+    leap:ytquota:used:{credential_id}:{YYYYmmdd}  - израсходовано units за окно (TTL)
+    leap:ytquota:pending:{credential_id}          - zset отложенных загрузок (score - порядок)
+    leap:ytquota:pending_units:{credential_id}    - hash загрузка -> units
+    leap:ytquota:parked:{credential_id}           - hash загрузка -> аргументы отложенной задачи (JSON)
+    leap:ytquota:parked_credentials               - set credential_id с припаркованными загрузками
+"""
+
+import json
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+from typing import Any
+from zoneinfo import ZoneInfo
+
+import redis
+
+from api.config import get_settings
+from config.settings import settings
+from logger import get_logger
+
+logger = get_logger()
+
+# Стоимость методов в units (https://developers.google.com/youtube/v3/determine_quota_cost)
+QUOTA_COSTS: dict[str, int] = {
+    "videos.insert": 1600,
+    "videos.update": 50,
+    "videos.delete": 50,
+    "videos.list": 1,
+    "captions.insert": 400,
+    "thumbnails.set": 50,
+    "playlistItems.insert": 50,
+    "playlistItems.delete": 50,
+    "playlistItems.list": 1,
+    "playlists.insert": 50,
+    "playlists.update": 50,
+    "playlists.delete": 50,
+    "playlists.list": 1,
+}
+
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+QUOTA_ERROR_REASONS = frozenset({"quotaExceeded", "dailyLimitExceeded"})
+
+# Приоритет загрузки в очереди отложенных (больше - раньше)
+UPLOAD_PRIORITY_PIPELINE = 0  # автоматическая загрузка после обработки / bulk
+UPLOAD_PRIORITY_MANUAL = 2  # загрузка или повтор, запрошенные пользователем
+MAX_UPLOAD_PRIORITY = 9
+
+DEFER_STAGGER_SECONDS = 30  # интервал между отложенными загрузками одного окна
+MIN_DEFER_SECONDS = 60
+RELEASE_AHEAD_SECONDS = 300  # припаркованная загрузка ставится в очередь не раньше, чем за 5 минут до запуска
+USED_TTL_SECONDS = 2 * 24 * 3600
+PENDING_TTL_SECONDS = 14 * 24 * 3600
+
+USED_KEY = "leap:ytquota:used:{credential_id}:{window}"
+PENDING_KEY = "leap:ytquota:pending:{credential_id}"
+PENDING_UNITS_KEY = "leap:ytquota:pending_units:{credential_id}"
+PARKED_KEY = "leap:ytquota:parked:{credential_id}"
+PARKED_CREDENTIALS_KEY = "leap:ytquota:parked_credentials"
+
+# Резерв без превышения лимита: -1 - не помещается, иначе израсходовано после резерва
+_RESERVE_SCRIPT = """
+local used = tonumber(redis.call('GET', KEYS[1]) or '0')
+local units = tonumber(ARGV[1])
+if used + units > tonumber(ARGV[2]) then
+    return -1
+end
+used = redis.call('INCRBY', KEYS[1], units)
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return used
+"""
+
+_RELEASE_SCRIPT = """
+local used = redis.call('DECRBY', KEYS[1], ARGV[1])
+if used < 0 then
+    redis.call('SET', KEYS[1], 0, 'KEEPTTL')
+    return 0
+end
+return used
+"""
+
+
+class QuotaExhaustedError(Exception):
+    """Вызов не помещается в остаток квоты текущего окна."""
+
+    def __init__(self, credential_id: int, units: int, remaining: int, retry_at: datetime):
+        super().__init__(
+            f"YouTube quota exhausted for credential {credential_id}: "
+            f"need {units} units, {remaining} left until {retry_at.isoformat()}"
+        )
+        self.credential_id = credential_id
+        self.units = units
+        self.remaining = remaining
+        self.retry_at = retry_at
+
+
+@dataclass
+class QuotaStatus:
+    """Состояние квоты канала"""
+
+    credential_id: int
+    daily_limit: int
+    used: int
+    remaining: int
+    resets_at: datetime
+    pending_uploads: int
+    pending_units: int
+    projected_drain_at: datetime | None  # когда будет выгружена очередь отложенных (None - очередь пуста)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@lru_cache(maxsize=1)
+def _redis() -> redis.Redis:
+    return redis.Redis.from_url(
+        get_settings().celery_broker_url,
+        decode_responses=True,
+        socket_timeout=1,
+        socket_connect_timeout=1,
+    )
+
+
+def quota_window(now: datetime | None = None) -> tuple[str, datetime]:
+    """Текущее окно квоты: (YYYYmmdd по тихоокеанскому времени, момент следующего сброса в UTC)."""
+    local = (now or datetime.now(UTC)).astimezone(QUOTA_TIMEZONE)
+    midnight = local.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    return local.strftime("%Y%m%d"), midnight.astimezone(UTC)
+
+
+def upload_cost(playlist: bool = False, thumbnail: bool = False, captions: int = 0) -> int:
+    """Units на загрузку видео со всеми сопутствующими вызовами."""
+    units = QUOTA_COSTS["videos.insert"] + captions * QUOTA_COSTS["captions.insert"]
+    if playlist:
+        units += QUOTA_COSTS["playlistItems.insert"]
+    if thumbnail:
+        units += QUOTA_COSTS["thumbnails.set"]
+    return units
+
+
+def is_quota_error(error: Exception) -> bool:
+    """HttpError из-за исчерпанной квоты (403 quotaExceeded/dailyLimitExceeded, а не ошибка авторизации)."""
+    details = getattr(error, "error_details", None) or []
+    reasons = {detail.get("reason") for detail in details if isinstance(detail, dict)}
+    if reasons & QUOTA_ERROR_REASONS:
+        return True
+    message = str(error)
+    return any(reason in message for reason in QUOTA_ERROR_REASONS)
+
+
+def pending_entry(recording_id: int, platform: str, preset_id: int | None = None) -> str:
+    """Идентификатор загрузки в очереди отложенных."""
+    return f"{recording_id}:{platform.lower()}:{preset_id or ''}"
+
+
+class YouTubeQuotaLedger:
+    """Расход и резервирование квоты YouTube по credential_id"""
+
+    def __init__(self, daily_limit: int | None = None):
+        self.daily_limit = daily_limit or settings.upload.youtube_daily_quota
+
+    def used(self, credential_id: int, now: datetime | None = None) -> int:
+        window, _ = quota_window(now)
+        try:
+            value = _redis().get(USED_KEY.format(credential_id=credential_id, window=window))
+        except redis.RedisError as e:
+            logger.warning(f"YouTube quota: failed to read usage for credential {credential_id}: {e}")
+            return 0
+        return int(value or 0)
+
+    def reserve(self, credential_id: int, units: int, now: datetime | None = None) -> int:
+        """
+        Зарезервировать units в текущем окне.
+
+        Returns:
+            Остаток квоты после резерва
+
+        Raises:
+            QuotaExhaustedError: units не помещаются в остаток
+        """
+        window, resets_at = quota_window(now)
+        key = USED_KEY.format(credential_id=credential_id, window=window)
+        try:
+            used = _redis().eval(_RESERVE_SCRIPT, 1, key, units, self.daily_limit, USED_TTL_SECONDS)
+        except redis.RedisError as e:
+            logger.warning(f"YouTube quota: reservation skipped for credential {credential_id}: {e}")
+            return self.daily_limit
+
+        if used < 0:
+            remaining = max(0, self.daily_limit - self.used(credential_id, now))
+            raise QuotaExhaustedError(credential_id, units, remaining, resets_at)
+        return self.daily_limit - used
+
+    def charge(self, credential_id: int, method: str, count: int = 1) -> int:
+        """Зарезервировать units на вызов метода API (см. QUOTA_COSTS)."""
+        return self.reserve(credential_id, QUOTA_COSTS[method] * count)
+
+    def release(self, credential_id: int, units: int, now: datetime | None = None) -> None:
+        """Вернуть резерв вызова, который не выполнен (ошибка сети/API до результата)."""
+        window, _ = quota_window(now)
+        try:
+            _redis().eval(_RELEASE_SCRIPT, 1, USED_KEY.format(credential_id=credential_id, window=window), units)
+        except redis.RedisError as e:
+            logger.warning(f"YouTube quota: failed to release {units} units for credential {credential_id}: {e}")
+
+    def mark_exhausted(self, credential_id: int, now: datetime | None = None) -> None:
+        """API ответил quotaExceeded: до сброса окно считается израсходованным."""
+        window, _ = quota_window(now)
+        try:
+            _redis().set(
+                USED_KEY.format(credential_id=credential_id, window=window), self.daily_limit, ex=USED_TTL_SECONDS
+            )
+        except redis.RedisError as e:
+            logger.warning(f"YouTube quota: failed to mark credential {credential_id} exhausted: {e}")
+
+    # ========================================
+    # DEFERRED UPLOADS
+    # ========================================
+
+    def defer(
+        self, credential_id: int, entry: str, units: int, priority: int = 0, now: datetime | None = None
+    ) -> datetime:
+        """
+        Поставить загрузку в очередь отложенных и вернуть время ее запуска.
+
+        Порядок в очереди - по приоритету, затем по времени первого откладывания
+        (повторное откладывание той же загрузки не сдвигает ее в конец).
+        """
+        now = now or datetime.now(UTC)
+        priority = min(max(priority, 0), MAX_UPLOAD_PRIORITY)
+        score = (MAX_UPLOAD_PRIORITY - priority) * 1e10 + now.timestamp()
+        pending_key = PENDING_KEY.format(credential_id=credential_id)
+        units_key = PENDING_UNITS_KEY.format(credential_id=credential_id)
+        try:
+            pipe = _redis().pipeline()
+            pipe.zadd(pending_key, {entry: score}, nx=True)
+            pipe.hset(units_key, entry, units)
+            pipe.expire(pending_key, PENDING_TTL_SECONDS)
+            pipe.expire(units_key, PENDING_TTL_SECONDS)
+            pipe.execute()
+            schedule = self._plan(credential_id, now)
+        except redis.RedisError as e:
+            logger.warning(f"YouTube quota: failed to queue deferred upload {entry}: {e}")
+            schedule = {}
+
+        return schedule.get(entry) or quota_window(now)[1]
+
+    def complete(self, credential_id: int, entry: str) -> None:
+        """Убрать загрузку из очереди отложенных (выполнена или окончательно упала)."""
+        try:
+            pipe = _redis().pipeline()
+            pipe.zrem(PENDING_KEY.format(credential_id=credential_id), entry)
+            pipe.hdel(PENDING_UNITS_KEY.format(credential_id=credential_id), entry)
+            pipe.hdel(PARKED_KEY.format(credential_id=credential_id), entry)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"YouTube quota: failed to remove deferred upload {entry}: {e}")
+
+    def park(self, credential_id: int, entry: str, task_kwargs: dict[str, Any]) -> None:
+        """Сохранить аргументы отложенной загрузки до ее времени запуска (см. release_due)."""
+        parked_key = PARKED_KEY.format(credential_id=credential_id)
+        try:
+            pipe = _redis().pipeline()
+            pipe.hset(parked_key, entry, json.dumps(task_kwargs))
+            pipe.expire(parked_key, PENDING_TTL_SECONDS)
+            pipe.sadd(PARKED_CREDENTIALS_KEY, credential_id)
+            pipe.expire(PARKED_CREDENTIALS_KEY, PENDING_TTL_SECONDS)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.error(f"YouTube quota: failed to park deferred upload {entry}, it will not resume: {e}")
+
+    def release_due(self, now: datetime | None = None) -> list[tuple[int, str, dict[str, Any], int]]:
+        """
+        Забрать припаркованные загрузки, время запуска которых наступает в ближайшие RELEASE_AHEAD_SECONDS.
+
+        Загрузка остается в очереди отложенных (и в плане окон) до complete(); из hash
+        припаркованных она удаляется (HDEL - захват, второй проход ее не выпустит).
+
+        Returns:
+            [(credential_id, entry, аргументы задачи, countdown в секундах), ...]
+        """
+        now = now or datetime.now(UTC)
+        horizon = now + timedelta(seconds=RELEASE_AHEAD_SECONDS)
+        client = _redis()
+        released = []
+        for raw_credential_id in client.smembers(PARKED_CREDENTIALS_KEY):
+            credential_id = int(raw_credential_id)
+            parked_key = PARKED_KEY.format(credential_id=credential_id)
+            parked = client.hgetall(parked_key)
+            if not parked:
+                continue
+            for entry, start_at in self._plan(credential_id, now).items():
+                if entry not in parked or start_at > horizon:
+                    continue
+                if client.hdel(parked_key, entry):
+                    countdown = max(0, int((start_at - now).total_seconds()))
+                    released.append((credential_id, entry, json.loads(parked[entry]), countdown))
+        return released
+
+    def _pending(self, credential_id: int) -> list[tuple[str, int]]:
+        """Отложенные загрузки по порядку: [(entry, units), ...]."""
+        client = _redis()
+        entries = client.zrange(PENDING_KEY.format(credential_id=credential_id), 0, -1)
+        units = client.hgetall(PENDING_UNITS_KEY.format(credential_id=credential_id))
+        return [(entry, int(units.get(entry) or QUOTA_COSTS["videos.insert"])) for entry in entries]
+
+    def _plan(self, credential_id: int, now: datetime) -> dict[str, datetime]:
+        """
+        Разложить очередь отложенных по окнам квоты: entry -> время запуска.
+
+        Загрузки занимают окна по порядку очереди (более поздняя не обгоняет
+        более раннюю); внутри окна запуски разнесены на DEFER_STAGGER_SECONDS.
+        """
+        window_start = now
+        remaining = max(0, self.daily_limit - self.used(credential_id, now))
+        position = 0
+        schedule: dict[str, datetime] = {}
+
+        for entry, units in self._pending(credential_id):
+            units = min(units, self.daily_limit)
+            while units > remaining:
+                # Следующее окно (сброс считается по календарю: учитывает переход на летнее время)
+                _, window_start = quota_window(window_start)
+                remaining = self.daily_limit
+                position = 0
+            remaining -= units
+
+            schedule[entry] = window_start + timedelta(seconds=MIN_DEFER_SECONDS + position * DEFER_STAGGER_SECONDS)
+            position += 1
+        return schedule
+
+    def status(self, credential_id: int, now: datetime | None = None) -> QuotaStatus:
+        """Остаток квоты канала и прогноз выгрузки очереди отложенных."""
+        now = now or datetime.now(UTC)
+        _, resets_at = quota_window(now)
+        used = self.used(credential_id, now)
+        try:
+            pending = self._pending(credential_id)
+            schedule = self._plan(credential_id, now) if pending else {}
+        except redis.RedisError as e:
+            logger.warning(f"YouTube quota: failed to read deferred uploads for credential {credential_id}: {e}")
+            pending, schedule = [], {}
+
+        return QuotaStatus(
+            credential_id=credential_id,
+            daily_limit=self.daily_limit,
+            used=used,
+            remaining=max(0, self.daily_limit - used),
+            resets_at=resets_at,
+            pending_uploads=len(pending),
+            pending_units=sum(units for _, units in pending),
+            projected_drain_at=max(schedule.values()) if schedule else None,
+        )
+
+
+_ledger: YouTubeQuotaLedger | None = None
+
+
+def get_quota_ledger() -> YouTubeQuotaLedger:
+    """Глобальный YouTubeQuotaLedger процесса."""
+    global _ledger
+    if _ledger is None:
+        _ledger = YouTubeQuotaLedger()
+    return _ledger
@@ -12,6 +12,8 @@ from google.auth.transport.requests import Request
 
 from logger import get_logger
 
+from .quota import is_quota_error
+
 logger = get_logger()
 
 T = TypeVar("T")
@@ -36,6 +38,8 @@ def is_youtube_auth_error(error: Exception) -> bool:
         from googleapiclient.errors import HttpError
 
         if isinstance(error, HttpError) and error.resp:
+            if error.resp.status == 403 and is_quota_error(error):
+                return False  # 403 quotaExceeded - не ошибка токена, refresh не поможет
             return error.resp.status in (401, 403)
     except ImportError:
         pass
@@ -60,6 +64,7 @@ def requires_valid_token(max_retries: int = 1):
 
     Requires: self.credentials, self.credential_provider, self.service
     """
+
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         @functools.wraps(func)
         async def wrapper(self, *args: Any, **kwargs: Any) -> T:
@@ -94,14 +99,17 @@ def requires_valid_token(max_retries: int = 1):
                         if not self.credentials.refresh_token:
                             raise TokenRefreshError("youtube", "No refresh_token", original_error=e) from e
 
-                        self.credentials.refresh(Request())
-
                         if hasattr(self, "credential_provider") and self.credential_provider:
-                            await self.credential_provider.update_google_credentials(self.credentials)
+                            self.credentials = await self.credential_provider.refresh_google_credentials(
+                                self.credentials
+                            )
+                        else:
+                            self.credentials.refresh(Request())
 
                         if hasattr(self, "service") and self.service:
-                            from googleapiclient.discovery import build
-                            self.service = build("youtube", "v3", credentials=self.credentials)
+                            from .client import youtube_service
+
+                            self.service = youtube_service(self.credentials)
 
                         logger.info("YouTube token refreshed")
                         continue
@@ -116,6 +124,7 @@ def requires_valid_token(max_retries: int = 1):
             raise RuntimeError("Unexpected state in decorator")
 
         return wrapper
+
     return decorator
 
 
@@ -124,6 +133,7 @@ def requires_valid_vk_token(max_retries: int = 1):
 
     Requires: self.config.access_token, self.credential_provider
     """
+
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         @functools.wraps(func)
         async def wrapper(self, *args: Any, **kwargs: Any) -> T:
@@ -171,4 +181,5 @@ def requires_valid_vk_token(max_retries: int = 1):
             raise RuntimeError("Unexpected state in decorator")
 
         return wrapper
+
     return decorator
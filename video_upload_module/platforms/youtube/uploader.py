@@ -6,9 +6,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any
 
-from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaFileUpload
 
@@ -17,6 +15,8 @@ from logger import get_logger
 from ...config_factory import YouTubeConfig
 from ...core.base import BaseUploader, UploadResult
 from ...credentials_provider import CredentialProvider, FileCredentialProvider
+from .client import youtube_service
+from .quota import QUOTA_COSTS, QuotaExhaustedError, get_quota_ledger, is_quota_error, upload_cost
 from .token_handler import TokenRefreshError, requires_valid_token
 
 logger = get_logger()
@@ -25,12 +25,37 @@ logger = get_logger()
 class YouTubeUploader(BaseUploader):
     """YouTube video uploader."""
 
-    def __init__(self, config: YouTubeConfig, credential_provider: CredentialProvider | None = None):
+    def __init__(
+        self,
+        config: YouTubeConfig,
+        credential_provider: CredentialProvider | None = None,
+        credential_id: int | None = None,
+    ):
         super().__init__(config)
         self.config = config
         self.service = None
         self.credentials = None
         self.credential_provider = credential_provider
+        self.credential_id = credential_id  # ключ учета квоты (None - без учета, файловые credentials)
+
+    def _reserve_quota(self, units: int) -> None:
+        """Зарезервировать units квоты до вызова API (QuotaExhaustedError - не помещается)."""
+        if self.credential_id is not None:
+            get_quota_ledger().reserve(self.credential_id, units)
+
+    def _release_quota(self, units: int) -> None:
+        """Вернуть резерв вызова, который не выполнен."""
+        if self.credential_id is not None:
+            get_quota_ledger().release(self.credential_id, units)
+
+    def _handle_quota_error(self, error: HttpError, units: int) -> None:
+        """403 quotaExceeded: окно израсходовано, вызов откладывается (QuotaExhaustedError)."""
+        if self.credential_id is None or not is_quota_error(error):
+            return
+        ledger = get_quota_ledger()
+        ledger.mark_exhausted(self.credential_id)
+        status = ledger.status(self.credential_id)
+        raise QuotaExhaustedError(self.credential_id, units, 0, status.resets_at) from error
 
     async def authenticate(self) -> bool:
         """Authenticate with YouTube API."""
@@ -46,10 +71,8 @@ class YouTubeUploader(BaseUploader):
                 if self.credentials and self.credentials.refresh_token:
                     try:
                         logger.info("Refreshing YouTube access token...")
-                        self.credentials.refresh(Request())
+                        self.credentials = await self.credential_provider.refresh_google_credentials(self.credentials)
                         refreshed_successfully = True
-
-                        await self.credential_provider.update_google_credentials(self.credentials)
                         logger.info("YouTube token refreshed and saved successfully")
 
                     except Exception as e:
@@ -84,7 +107,7 @@ class YouTubeUploader(BaseUploader):
                     )
                     return False
 
-            self.service = build("youtube", "v3", credentials=self.credentials)
+            self.service = youtube_service(self.credentials)
             self._authenticated = True
 
             logger.info("YouTube authentication successful")
@@ -124,6 +147,12 @@ class YouTubeUploader(BaseUploader):
             if not await self.authenticate():
                 return None
 
+        # Весь пакет вызовов резервируется до videos.insert
+        has_thumbnail = bool(thumbnail_path and Path(thumbnail_path).exists())
+        quota_units = upload_cost(playlist=bool(playlist_id), thumbnail=has_thumbnail)
+        self._reserve_quota(quota_units)
+        refund = True  # Резерв возвращается, если videos.insert не выполнен
+
         try:
             final_description = description if description else f"Uploaded {self._get_timestamp()}"
             logger.debug(f"YouTube description length: {len(final_description)} characters")
@@ -188,6 +217,7 @@ class YouTubeUploader(BaseUploader):
                             logger.warning(f"Ignored exception: {e}")
 
             if "id" in response:
+                refund = False
                 video_id = response["id"]
                 video_url = f"https://www.youtube.com/watch?v={video_id}"
 
@@ -214,7 +244,7 @@ class YouTubeUploader(BaseUploader):
                         logger.error(f"Playlist addition error: {e}")
                         result.metadata["playlist_error"] = str(e)
 
-                if thumbnail_path and Path(thumbnail_path).exists():
+                if has_thumbnail:
                     try:
                         from .thumbnail_manager import YouTubeThumbnailManager
 
@@ -239,11 +269,17 @@ class YouTubeUploader(BaseUploader):
             logger.error(f"Token error: {e}")
             return None
         except HttpError as e:
+            # quotaExceeded: окно помечено израсходованным, резерв не возвращается
+            refund = not is_quota_error(e)
+            self._handle_quota_error(e, quota_units)
             logger.error(f"YouTube API error: {e}")
             return None
         except Exception as e:
             logger.error(f"Video upload error: {e}")
             return None
+        finally:
+            if refund:
+                self._release_quota(quota_units)
 
     @requires_valid_token(max_retries=1)
     async def upload_caption(
@@ -263,6 +299,9 @@ class YouTubeUploader(BaseUploader):
             logger.error(f"Caption file not found: {caption_path}")
             return False
 
+        self._reserve_quota(QUOTA_COSTS["captions.insert"])
+        refund = True
+
         mime_type = "application/octet-stream"
         if caption_path.lower().endswith(".vtt"):
             mime_type = "text/vtt"
@@ -287,6 +326,7 @@ class YouTubeUploader(BaseUploader):
             response = request.execute()
 
             if response and response.get("id"):
+                refund = False
                 logger.info(f"Captions uploaded: caption_id={response['id']}")
                 return True
 
@@ -297,11 +337,16 @@ class YouTubeUploader(BaseUploader):
             logger.error(f"Token error during caption upload: {e}")
             return False
         except HttpError as e:
+            refund = not is_quota_error(e)
+            self._handle_quota_error(e, QUOTA_COSTS["captions.insert"])
             logger.error(f"YouTube Captions API error: {e}")
             return False
         except Exception as e:
             logger.error(f"Caption upload error: {e}")
             return False
+        finally:
+            if refund:
+                self._release_quota(QUOTA_COSTS["captions.insert"])
 
     @requires_valid_token(max_retries=1)
     async def get_video_info(self, video_id: str) -> dict[str, Any] | None:
@@ -309,6 +354,12 @@ class YouTubeUploader(BaseUploader):
         if not self._authenticated:
             return None
 
+        try:
+            self._reserve_quota(QUOTA_COSTS["videos.list"])
+        except QuotaExhaustedError as e:
+            logger.warning(f"Skipping get_video_info for {video_id}: {e}")
+            return None
+
         try:
             request = self.service.videos().list(part="snippet,statistics,status", id=video_id)
             response = request.execute()
@@ -338,6 +389,12 @@ class YouTubeUploader(BaseUploader):
         if not self._authenticated:
             return False
 
+        try:
+            self._reserve_quota(QUOTA_COSTS["videos.delete"])
+        except QuotaExhaustedError as e:
+            logger.warning(f"Skipping delete_video for {video_id}: {e}")
+            return False
+
         try:
             request = self.service.videos().delete(id=video_id)
             request.execute()
@@ -51,7 +51,9 @@ async def create_youtube_uploader_from_db(
     )
 
     # Create uploader with credential provider
-    uploader = YouTubeUploader(config=youtube_config, credential_provider=credential_provider)
+    uploader = YouTubeUploader(
+        config=youtube_config, credential_provider=credential_provider, credential_id=credential_id
+    )
 
     logger.info(f"Created YouTubeUploader with DB credential ID: {credential_id}")
     return uploader